@@ -0,0 +1,55 @@
+"""Lotes: claims de itens em blocos (vários workers por execução)
+
+Revision ID: bex001_batch_item_chunk_claims
+Revises: pub005_search_streaming_resume
+Create Date: 2026-10-17
+
+O worker deixa de reivindicar a execução inteira: pega blocos de itens
+(`FOR UPDATE SKIP LOCKED`) com lease por bloco, então vários workers
+dividem uma planilha grande e lotes pequenos não esperam atrás dela.
+Idempotente.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "bex001_batch_item_chunk_claims"
+down_revision = "pub005_search_streaming_resume"
+branch_labels = None
+depends_on = None
+
+_TABLE = "lotes_itens"
+_INDEX = "ix_lotes_itens_execution_status"
+
+
+def _has_col(table: str, col: str) -> bool:
+    insp = sa.inspect(op.get_bind())
+    if not insp.has_table(table):
+        return False
+    return col in {c["name"] for c in insp.get_columns(table)}
+
+
+def _has_index(table: str, name: str) -> bool:
+    insp = sa.inspect(op.get_bind())
+    if not insp.has_table(table):
+        return False
+    return name in {i["name"] for i in insp.get_indexes(table)}
+
+
+def upgrade() -> None:
+    if not _has_col(_TABLE, "claimed_by"):
+        op.add_column(_TABLE, sa.Column("claimed_by", sa.String(), nullable=True))
+    if not _has_col(_TABLE, "claim_expires_at"):
+        op.add_column(_TABLE, sa.Column("claim_expires_at", sa.DateTime(timezone=True), nullable=True))
+    # Busca de itens reivindicáveis: (execution_id, status) + lease.
+    if not _has_index(_TABLE, _INDEX):
+        op.create_index(_INDEX, _TABLE, ["execution_id", "status"])
+
+
+def downgrade() -> None:
+    if _has_index(_TABLE, _INDEX):
+        op.drop_index(_INDEX, table_name=_TABLE)
+    for col in ("claim_expires_at", "claimed_by"):
+        if _has_col(_TABLE, col):
+            op.drop_column(_TABLE, col)
@@ -0,0 +1,47 @@
+"""Lotes: índice parcial de fingerprints com sucesso
+
+Revision ID: bex002_batch_item_success_fingerprint_index
+Revises: bex001_batch_item_chunk_claims
+Create Date: 2026-10-17
+
+A deduplicação de tarefas deixa de carregar todo fingerprint com sucesso
+da história num set: sonda em bloco só os fingerprints do lote atual.
+O índice parcial (status = 'SUCESSO') cobre exatamente essa sonda e é bem
+menor que o índice cheio de `fingerprint`. Não é UNIQUE: a base já tem
+duplicatas antigas (reprocessamentos antes do dedup). Idempotente.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "bex002_batch_item_success_fingerprint_index"
+down_revision = "bex001_batch_item_chunk_claims"
+branch_labels = None
+depends_on = None
+
+_TABLE = "lotes_itens"
+_INDEX = "ix_lotes_itens_fingerprint_sucesso"
+
+
+def _has_index(table: str, name: str) -> bool:
+    insp = sa.inspect(op.get_bind())
+    if not insp.has_table(table):
+        return False
+    return name in {i["name"] for i in insp.get_indexes(table)}
+
+
+def upgrade() -> None:
+    if not _has_index(_TABLE, _INDEX):
+        op.create_index(
+            _INDEX,
+            _TABLE,
+            ["fingerprint"],
+            postgresql_where=sa.text("status = 'SUCESSO' AND fingerprint IS NOT NULL"),
+            sqlite_where=sa.text("status = 'SUCESSO' AND fingerprint IS NOT NULL"),
+        )
+
+
+def downgrade() -> None:
+    if _has_index(_TABLE, _INDEX):
+        op.drop_index(_INDEX, table_name=_TABLE)
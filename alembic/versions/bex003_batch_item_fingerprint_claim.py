@@ -0,0 +1,53 @@
+"""Lotes: reserva de fingerprint por execução (dedup entre blocos)
+
+Revision ID: bex003_batch_item_fingerprint_claim
+Revises: cal001_calendario_forense
+Create Date: 2026-10-17
+
+Com a execução dividida em blocos entre workers, duas linhas iguais da
+planilha podem cair em blocos diferentes e passar juntas pela sonda de
+sucesso. Antes de chamar o L1 o item grava o fingerprint em
+`fingerprint_claim`; o índice único (execution_id, fingerprint_claim)
+faz a 2ª linha cair como duplicada. Falha solta a reserva. Idempotente.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "bex003_batch_item_fingerprint_claim"
+down_revision = "cal001_calendario_forense"
+branch_labels = None
+depends_on = None
+
+_TABLE = "lotes_itens"
+_INDEX = "ux_lotes_itens_execution_fingerprint_claim"
+
+
+def _has_col(table: str, col: str) -> bool:
+    insp = sa.inspect(op.get_bind())
+    if not insp.has_table(table):
+        return False
+    return col in {c["name"] for c in insp.get_columns(table)}
+
+
+def _has_index(table: str, name: str) -> bool:
+    insp = sa.inspect(op.get_bind())
+    if not insp.has_table(table):
+        return False
+    return name in {i["name"] for i in insp.get_indexes(table)}
+
+
+def upgrade() -> None:
+    if not _has_col(_TABLE, "fingerprint_claim"):
+        op.add_column(_TABLE, sa.Column("fingerprint_claim", sa.String(), nullable=True))
+    # NULL não conflita: só itens com reserva ativa (em voo ou com sucesso).
+    if not _has_index(_TABLE, _INDEX):
+        op.create_index(_INDEX, _TABLE, ["execution_id", "fingerprint_claim"], unique=True)
+
+
+def downgrade() -> None:
+    if _has_index(_TABLE, _INDEX):
+        op.drop_index(_INDEX, table_name=_TABLE)
+    if _has_col(_TABLE, "fingerprint_claim"):
+        op.drop_column(_TABLE, "fingerprint_claim")
@@ -0,0 +1,65 @@
+"""Store endereçado por conteúdo: blob_object + blob_ref
+
+Revision ID: blob001_store
+Revises: perf011_rollups
+Create Date: 2026-10-17
+
+Um blob por SHA-256 (`<blob_store_path>/sha256/aa/bb/<hash>`) com o nº de
+referências, e as referências em si — (namespace do módulo, path relativo
+legado), que continua existindo como hard link pro blob. Os volumes
+existentes são adotados por `scripts/blob_dedup.py`. Idempotente.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "blob001_store"
+down_revision = "perf011_rollups"
+branch_labels = None
+depends_on = None
+
+
+def _has_table(name: str) -> bool:
+    bind = op.get_bind()
+    return sa.inspect(bind).has_table(name)
+
+
+def _has_index(table: str, name: str) -> bool:
+    bind = op.get_bind()
+    return any(ix["name"] == name for ix in sa.inspect(bind).get_indexes(table))
+
+
+def upgrade() -> None:
+    if not _has_table("blob_object"):
+        op.create_table(
+            "blob_object",
+            sa.Column("sha256", sa.String(64), primary_key=True),
+            sa.Column("size_bytes", sa.BigInteger(), nullable=False),
+            sa.Column("ref_count", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column("orphaned_at", sa.DateTime(timezone=True), nullable=True),
+        )
+    if not _has_index("blob_object", "ix_blob_object_orphaned_at"):
+        op.create_index("ix_blob_object_orphaned_at", "blob_object", ["orphaned_at"])
+
+    if not _has_table("blob_ref"):
+        op.create_table(
+            "blob_ref",
+            sa.Column("namespace", sa.String(32), primary_key=True),
+            sa.Column("relative_path", sa.String(), primary_key=True),
+            sa.Column(
+                "sha256", sa.String(64),
+                sa.ForeignKey("blob_object.sha256"), nullable=False,
+            ),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+    if not _has_index("blob_ref", "ix_blob_ref_sha256"):
+        op.create_index("ix_blob_ref_sha256", "blob_ref", ["sha256"])
+
+
+def downgrade() -> None:
+    if _has_table("blob_ref"):
+        op.drop_table("blob_ref")
+    if _has_table("blob_object"):
+        op.drop_table("blob_object")
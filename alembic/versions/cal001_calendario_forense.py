@@ -0,0 +1,58 @@
+"""Calendário forense: recessos/suspensões nacionais, por tribunal e comarca
+
+Revision ID: cal001_calendario_forense
+Revises: blob001_store
+Create Date: 2026-10-17
+
+Intervalos sem contagem de prazo usados pelo índice de dias úteis do
+prazo_calculator (ver app/services/prazos_iniciais/calendario_forense.py).
+tribunal NULL = nacional; comarca = código OOOO do CNJ. Começa vazia —
+sem linhas, o cálculo é o de sempre (só feriados nacionais). Idempotente.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "cal001_calendario_forense"
+down_revision = "blob001_store"
+branch_labels = None
+depends_on = None
+
+_TABLE = "calendario_forense_suspensao"
+_INDEX = "ix_calendario_forense_tribunal_comarca"
+
+
+def _has_table(name: str) -> bool:
+    bind = op.get_bind()
+    return sa.inspect(bind).has_table(name)
+
+
+def _has_index(table: str, name: str) -> bool:
+    insp = sa.inspect(op.get_bind())
+    if not insp.has_table(table):
+        return False
+    return name in {i["name"] for i in insp.get_indexes(table)}
+
+
+def upgrade() -> None:
+    if not _has_table(_TABLE):
+        op.create_table(
+            _TABLE,
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("tribunal", sa.String(16), nullable=True),
+            sa.Column("comarca", sa.String(16), nullable=True),
+            sa.Column("data_inicio", sa.Date(), nullable=False),
+            sa.Column("data_fim", sa.Date(), nullable=False),
+            sa.Column("tipo", sa.String(16), nullable=False, server_default="feriado"),
+            sa.Column("descricao", sa.String(), nullable=True),
+            sa.Column("ativo", sa.Boolean(), nullable=False, server_default=sa.true()),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+    if not _has_index(_TABLE, _INDEX):
+        op.create_index(_INDEX, _TABLE, ["tribunal", "comarca"])
+
+
+def downgrade() -> None:
+    if _has_table(_TABLE):
+        op.drop_table(_TABLE)
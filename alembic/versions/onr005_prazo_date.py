@@ -0,0 +1,99 @@
+"""OneRequest: prazo tipado (prazo_date) pra farol/KPIs/ordenação em SQL
+
+Revision ID: onr005_prazo_date
+Revises: bex002_batch_item_success_fingerprint_index
+Create Date: 2026-10-17
+
+`onr_solicitacoes.prazo` é string DD/MM/YYYY (como vem do BB); a listagem
+fazia o parse em Python de TODO o conjunto filtrado a cada página. Aqui:
+  - prazo_date : Date, espelho tipado de `prazo` (o model mantém via @validates);
+  - ix_onr_solicitacoes_prazo_date_id : (prazo_date, id) — ordem da listagem e
+    paginação keyset.
+Backfill em lotes com o MESMO parse do model (portável entre Postgres/SQLite;
+prazo inválido fica NULL = "sem prazo", como antes). Idempotente.
+"""
+
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "onr005_prazo_date"
+down_revision = "bex002_batch_item_success_fingerprint_index"
+branch_labels = None
+depends_on = None
+
+
+_TABLE = "onr_solicitacoes"
+_INDEX = "ix_onr_solicitacoes_prazo_date_id"
+_BATCH = 1000
+
+
+def _has_column(table: str, column: str) -> bool:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    return any(col["name"] == column for col in inspector.get_columns(table))
+
+
+def _has_index(table: str, name: str) -> bool:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    return any(ix["name"] == name for ix in inspector.get_indexes(table))
+
+
+def _parse_prazo(prazo):
+    if not prazo:
+        return None
+    try:
+        return datetime.strptime(prazo.strip(), "%d/%m/%Y").date()
+    except (ValueError, TypeError, AttributeError):
+        return None
+
+
+def _backfill() -> None:
+    bind = op.get_bind()
+    tabela = sa.table(
+        _TABLE,
+        sa.column("id", sa.Integer),
+        sa.column("prazo", sa.String),
+        sa.column("prazo_date", sa.Date),
+    )
+    update = (
+        tabela.update()
+        .where(tabela.c.id == sa.bindparam("b_id"))
+        .values(prazo_date=sa.bindparam("b_prazo_date"))
+    )
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(tabela.c.id, tabela.c.prazo)
+            .where(tabela.c.id > last_id, tabela.c.prazo.isnot(None), tabela.c.prazo_date.is_(None))
+            .order_by(tabela.c.id)
+            .limit(_BATCH)
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+        params = [
+            {"b_id": row.id, "b_prazo_date": parsed}
+            for row in rows
+            if (parsed := _parse_prazo(row.prazo)) is not None
+        ]
+        if params:
+            bind.execute(update, params)
+
+
+def upgrade() -> None:
+    if not _has_column(_TABLE, "prazo_date"):
+        op.add_column(_TABLE, sa.Column("prazo_date", sa.Date(), nullable=True))
+    _backfill()
+    if not _has_index(_TABLE, _INDEX):
+        op.create_index(_INDEX, _TABLE, ["prazo_date", "id"])
+
+
+def downgrade() -> None:
+    if _has_index(_TABLE, _INDEX):
+        op.drop_index(_INDEX, table_name=_TABLE)
+    if _has_column(_TABLE, "prazo_date"):
+        op.drop_column(_TABLE, "prazo_date")
@@ -0,0 +1,41 @@
+"""Minha Equipe: índice em perf_l1_tarefa.l1_task_id (ingest delta)
+
+Revision ID: perf010_tarefa_l1_task_id_index
+Revises: onr005_prazo_date
+Create Date: 2026-10-17
+
+O ingest do "Agenda Analytics" ganhou um modo delta que casa o relatório com a
+tabela por l1_task_id (update do que mudou, insert do novo, delete do que saiu).
+  - ix_perf_tarefa_l1_task_id : (l1_task_id) — chave desse join.
+O replace total (tabela-sombra + rename) recria os índices a partir dos da
+viva, então este entra nas duas formas de carga. Idempotente.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "perf010_tarefa_l1_task_id_index"
+down_revision = "onr005_prazo_date"
+branch_labels = None
+depends_on = None
+
+
+_TABLE = "perf_l1_tarefa"
+_INDEX = "ix_perf_tarefa_l1_task_id"
+
+
+def _has_index(table: str, name: str) -> bool:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    return any(ix["name"] == name for ix in inspector.get_indexes(table))
+
+
+def upgrade() -> None:
+    if not _has_index(_TABLE, _INDEX):
+        op.create_index(_INDEX, _TABLE, ["l1_task_id"])
+
+
+def downgrade() -> None:
+    if _has_index(_TABLE, _INDEX):
+        op.drop_index(_INDEX, table_name=_TABLE)
@@ -0,0 +1,117 @@
+"""Minha Equipe: rollups diários (perf_rollup_conclusao/ciclo/backlog)
+
+Revision ID: perf011_rollups
+Revises: perf010_tarefa_l1_task_id_index
+Create Date: 2026-10-17
+
+Agregados de perf_l1_tarefa refeitos a cada ingest (ver
+app/services/performance/rollups.py), lidos por `equipe`, pelo resumo do
+relatório de setor e pelo diagnóstico do Balanceador:
+  - perf_rollup_conclusao : (dia, pessoa, subtipo) concluídas/com prazo/no prazo;
+  - perf_rollup_ciclo     : (dia, pessoa, bucket) histograma log do cycle time;
+  - perf_rollup_backlog   : (pessoa, subtipo, prazo_dia) pendentes.
+No Postgres já sai populado (mesmo SQL do refresh), pra não deixar as telas
+vazias até o próximo ingest. Idempotente.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "perf011_rollups"
+down_revision = "perf010_tarefa_l1_task_id_index"
+branch_labels = None
+depends_on = None
+
+
+_CICLO_BASE = 1.05
+
+_BACKFILL = (
+    """
+    INSERT INTO perf_rollup_conclusao (dia, pessoa_id, subtipo, concluido, com_prazo, no_prazo)
+    SELECT date(concluido_em AT TIME ZONE 'America/Sao_Paulo'), pessoa_id, subtipo,
+           COUNT(*),
+           COUNT(*) FILTER (WHERE prazo_previsto IS NOT NULL),
+           COUNT(*) FILTER (WHERE prazo_previsto IS NOT NULL AND concluido_em <= prazo_previsto)
+    FROM perf_l1_tarefa
+    WHERE status = 'Cumprido' AND pessoa_id IS NOT NULL AND concluido_em IS NOT NULL
+    GROUP BY 1, 2, 3
+    """,
+    f"""
+    INSERT INTO perf_rollup_ciclo (dia, pessoa_id, bucket, n)
+    SELECT date(concluido_em AT TIME ZONE 'America/Sao_Paulo'), pessoa_id,
+           floor(ln(greatest(EXTRACT(EPOCH FROM (concluido_em - cadastrado_em))::float8, 1.0))
+                 / ln({_CICLO_BASE}::float8))::int,
+           COUNT(*)
+    FROM perf_l1_tarefa
+    WHERE status = 'Cumprido' AND pessoa_id IS NOT NULL
+      AND concluido_em IS NOT NULL AND cadastrado_em IS NOT NULL
+    GROUP BY 1, 2, 3
+    """,
+    """
+    INSERT INTO perf_rollup_backlog (pessoa_id, subtipo, prazo_dia, pendente)
+    SELECT pessoa_id, subtipo, date(prazo_previsto AT TIME ZONE 'America/Sao_Paulo'), COUNT(*)
+    FROM perf_l1_tarefa
+    WHERE status = 'Pendente' AND pessoa_id IS NOT NULL
+    GROUP BY 1, 2, 3
+    """,
+)
+
+
+def _has_table(name: str) -> bool:
+    bind = op.get_bind()
+    return sa.inspect(bind).has_table(name)
+
+
+def upgrade() -> None:
+    created = False
+    if not _has_table("perf_rollup_conclusao"):
+        op.create_table(
+            "perf_rollup_conclusao",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("dia", sa.Date(), nullable=False),
+            sa.Column("pessoa_id", sa.Integer(), nullable=False),
+            sa.Column("subtipo", sa.String(), nullable=True),
+            sa.Column("concluido", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("com_prazo", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("no_prazo", sa.Integer(), nullable=False, server_default="0"),
+        )
+        op.create_index("ix_perf_rollup_conclusao_dia_pessoa", "perf_rollup_conclusao", ["dia", "pessoa_id"])
+        created = True
+
+    if not _has_table("perf_rollup_ciclo"):
+        op.create_table(
+            "perf_rollup_ciclo",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("dia", sa.Date(), nullable=False),
+            sa.Column("pessoa_id", sa.Integer(), nullable=False),
+            sa.Column("bucket", sa.Integer(), nullable=False),
+            sa.Column("n", sa.Integer(), nullable=False, server_default="0"),
+        )
+        op.create_index("ix_perf_rollup_ciclo_dia_pessoa", "perf_rollup_ciclo", ["dia", "pessoa_id"])
+        created = True
+
+    if not _has_table("perf_rollup_backlog"):
+        op.create_table(
+            "perf_rollup_backlog",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("pessoa_id", sa.Integer(), nullable=False),
+            sa.Column("subtipo", sa.String(), nullable=True),
+            sa.Column("prazo_dia", sa.Date(), nullable=True),
+            sa.Column("pendente", sa.Integer(), nullable=False, server_default="0"),
+        )
+        op.create_index("ix_perf_rollup_backlog_pessoa", "perf_rollup_backlog", ["pessoa_id"])
+        created = True
+
+    if created and op.get_bind().dialect.name == "postgresql":
+        op.execute("DELETE FROM perf_rollup_conclusao")
+        op.execute("DELETE FROM perf_rollup_ciclo")
+        op.execute("DELETE FROM perf_rollup_backlog")
+        for sql in _BACKFILL:
+            op.execute(sql)
+
+
+def downgrade() -> None:
+    for t in ("perf_rollup_backlog", "perf_rollup_ciclo", "perf_rollup_conclusao"):
+        if _has_table(t):
+            op.drop_table(t)
@@ -0,0 +1,52 @@
+"""Publicações: captura em streaming com retomada pelo último $skip
+
+Revision ID: pub005_search_streaming_resume
+Revises: rl001_legal_one_rate_bucket
+Create Date: 2026-10-16
+
+create_and_run_search passa a processar a janela do L1 bloco a bloco
+(fetch → pré-filtro → enrich → dedup → persist). Cada bloco commitado grava
+o $skip seguinte e um heartbeat; se o worker morrer, o watchdog retoma a
+busca de onde parou em vez de só marcá-la como FALHA. Idempotente.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "pub005_search_streaming_resume"
+down_revision = "rl001_legal_one_rate_bucket"
+branch_labels = None
+depends_on = None
+
+_TABLE = "publicacao_buscas"
+
+
+def _has_col(table: str, col: str) -> bool:
+    insp = sa.inspect(op.get_bind())
+    if not insp.has_table(table):
+        return False
+    return col in {c["name"] for c in insp.get_columns(table)}
+
+
+def upgrade() -> None:
+    if not _has_col(_TABLE, "only_unlinked"):
+        op.add_column(
+            _TABLE,
+            sa.Column("only_unlinked", sa.Boolean(), nullable=False, server_default="false"),
+        )
+    if not _has_col(_TABLE, "resume_skip"):
+        op.add_column(_TABLE, sa.Column("resume_skip", sa.Integer(), nullable=True))
+    if not _has_col(_TABLE, "resume_attempts"):
+        op.add_column(
+            _TABLE,
+            sa.Column("resume_attempts", sa.Integer(), nullable=False, server_default="0"),
+        )
+    if not _has_col(_TABLE, "heartbeat_at"):
+        op.add_column(_TABLE, sa.Column("heartbeat_at", sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    for col in ("heartbeat_at", "resume_attempts", "resume_skip", "only_unlinked"):
+        if _has_col(_TABLE, col):
+            op.drop_column(_TABLE, col)
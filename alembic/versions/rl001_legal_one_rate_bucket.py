@@ -0,0 +1,38 @@
+"""Legal One: balde de rate limit compartilhado entre workers
+
+Revision ID: rl001_legal_one_rate_bucket
+Revises: rcr005_pontos_atencao
+Create Date: 2026-10-16
+
+Token-bucket do L1 em 1 linha do Postgres (tokens + epoch do último refill),
+pra o limite de 1.2 req/s valer pro cluster inteiro e não por processo.
+Ver app/services/legal_one_rate_limit.py. Idempotente.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "rl001_legal_one_rate_bucket"
+down_revision = "rcr005_pontos_atencao"
+branch_labels = None
+depends_on = None
+
+
+def _has_table(t: str) -> bool:
+    return sa.inspect(op.get_bind()).has_table(t)
+
+
+def upgrade() -> None:
+    if not _has_table("legal_one_rate_bucket"):
+        op.create_table(
+            "legal_one_rate_bucket",
+            sa.Column("name", sa.String(64), primary_key=True),
+            sa.Column("tokens", sa.Float(), nullable=False),
+            sa.Column("refilled_at", sa.Float(), nullable=False),
+        )
+
+
+def downgrade() -> None:
+    if _has_table("legal_one_rate_bucket"):
+        op.drop_table("legal_one_rate_bucket")
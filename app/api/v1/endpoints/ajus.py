@@ -141,6 +141,11 @@ class DispatchBatchResponse(BaseModel):
     errored: list[dict]
 
 
+class DispatchBacklogResponse(DispatchBatchResponse):
+    blocked_classification_count: int = 0
+    requests: int = 0
+
+
 class BackfillCompletedRequest(BaseModel):
     """
     Filtros opcionais pro backfill da fila AJUS a partir dos intakes
@@ -405,6 +410,28 @@ def dispatch_pending(
     return DispatchBatchResponse(**result)
 
 
+@router.post(
+    "/andamentos/dispatch-backlog",
+    response_model=DispatchBacklogResponse,
+    summary=(
+        "Drena a fila pendente em varias requests AJUS de "
+        f"{MAX_ITENS_POR_REQUEST} itens disparadas em paralelo "
+        "(claim com SKIP LOCKED, PDFs enviados em streaming)."
+    ),
+)
+def dispatch_backlog(
+    max_items: Optional[int] = Query(default=None, ge=1, le=5000),
+    max_concurrent: Optional[int] = Query(default=None, ge=1, le=16),
+    db: Session = Depends(get_db),
+    _: LegalOneUser = Depends(auth_security.require_permission("prazos_iniciais")),
+):
+    service = AjusQueueService(db)
+    result = service.dispatch_pending_concurrent(
+        max_items=max_items, max_concurrent=max_concurrent,
+    )
+    return DispatchBacklogResponse(**result)
+
+
 @router.post(
     "/andamentos/backfill-from-intakes",
     response_model=BackfillCompletedResponse,
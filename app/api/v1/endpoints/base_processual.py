@@ -312,7 +312,7 @@ from app.models.base_processual import (
     UPLOAD_STATUS_CONCLUIDO,
 )
 from app.services.base_processual.diff import compute_diff_hash
-from app.services.base_processual.upload_processor import _payload_normalized_json
+from app.services.base_processual.bulk_ingest import _payload_normalized_json
 
 
 def _today_utc() -> datetime:
@@ -39,7 +39,7 @@ from app.services.base_processual.exporter import (
     dispatch_template,
     list_templates,
 )
-from app.services.base_processual.storage import save_export_xlsx
+from app.services.base_processual.storage import export_xlsx_path
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/admin/base-processual", tags=["Base Processual"])
@@ -87,13 +87,13 @@ def create_export(
     db.flush()  # pra ter o id
 
     try:
-        xlsx_bytes, total_rows, normalized = dispatch_template(
-            template, db, payload.params or {}
+        file_path = export_xlsx_path(export.id)
+        file_bytes, total_rows, normalized = dispatch_template(
+            template, db, payload.params or {}, file_path
         )
-        file_path = save_export_xlsx(export.id, xlsx_bytes)
         export.status = EXPORT_STATUS_PRONTO
         export.file_path = file_path
-        export.file_bytes = len(xlsx_bytes)
+        export.file_bytes = file_bytes
         export.total_rows = total_rows
         export.params_json = normalized
         export.finished_at = datetime.utcnow()
@@ -335,6 +335,24 @@ def get_pending_metrics(db: Session = Depends(get_db)):
     }
 
 
+@router.get("/pending/ingest-metrics")
+def get_pending_ingest_metrics(
+    window_minutes: int = Query(default=60, ge=1, le=7 * 24 * 60),
+    db: Session = Depends(get_db),
+    current_user: LegalOneUser = Depends(auth_security.get_current_user),
+):
+    """Throughput do ingest do motor dormente (admin): PDFs/min, tempo medio
+    de ingest, economia de compressao e concorrencia efetiva do pool."""
+    from app.services.classificador.pending_worker import ingest_throughput
+
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Apenas administradores podem ver as metricas de ingest.",
+        )
+    return ingest_throughput(db, window_minutes=window_minutes)
+
+
 @router.get("/pending")
 def list_pending(
     status_filter: Optional[str] = Query(None, alias="status"),
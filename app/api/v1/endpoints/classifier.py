@@ -11,15 +11,13 @@ Rotas:
   POST   /batches/{id}/cancel   → Cancela um batch em andamento
 """
 
-from io import BytesIO
-
 from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, UploadFile
-from fastapi.responses import StreamingResponse
 
 from app.core import auth as auth_security
 from app.core.dependencies import get_classification_service
 from app.core.uploads import validate_spreadsheet_file_metadata
 from app.services.classifier.classification_service import ClassificationService
+from app.services.xlsx_stream import xlsx_file_response
 
 router = APIRouter()
 
@@ -120,17 +118,11 @@ def export_batch_results(
 ):
     """Exporta os resultados como planilha XLSX para download."""
     try:
-        xlsx_bytes = service.export_results_to_xlsx(batch_id)
+        path = service.export_results_to_xlsx(batch_id)
     except ValueError as exc:
         raise HTTPException(status_code=404, detail=str(exc))
 
-    return StreamingResponse(
-        BytesIO(xlsx_bytes),
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={
-            "Content-Disposition": f"attachment; filename=classificacao_batch_{batch_id}.xlsx"
-        },
-    )
+    return xlsx_file_response(path, f"classificacao_batch_{batch_id}.xlsx")
 
 
 @router.post("/batches/{batch_id}/cancel")
@@ -26,6 +26,7 @@ from app.services.legal_one_client import LegalOneApiClient
 from app.services.onerequest import suggestions
 from app.services.onerequest.intake_service import OnerequestIntakeService
 from app.services.onerequest.service import OnerequestService
+from app.services.xlsx_stream import xlsx_file_response
 
 logger = logging.getLogger(__name__)
 
@@ -202,6 +203,8 @@ class ListResponse(BaseModel):
     total: int
     kpis: Dict[str, int]
     items: List[SolicitacaoOut]
+    # Passe de volta em `cursor` pra próxima página; None = última página.
+    next_cursor: Optional[str] = None
 
 
 class OptionsResponse(BaseModel):
@@ -255,27 +258,32 @@ def listar_solicitacoes(
     prazo_ate: Optional[date] = Query(None, description="Prazo fatal até esta data"),
     limit: int = Query(50, ge=1, le=500),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="next_cursor da página anterior (paginação keyset; ignora offset)"),
     db: Session = Depends(get_db),
 ):
     service = OnerequestService(db)
-    return service.list_solicitacoes(
-        status_sistema=status_sistema or None,
-        status_tratamento=status_tratamento,
-        responsavel_user_id=responsavel_user_id,
-        setor=setor,
-        busca=busca,
-        farol=farol,
-        sem_responsavel=sem_responsavel,
-        sem_anotacao=sem_anotacao,
-        sem_processo_l1=sem_processo_l1,
-        concluidas=concluidas,
-        disp_de=disp_de,
-        disp_ate=disp_ate,
-        prazo_de=prazo_de,
-        prazo_ate=prazo_ate,
-        limit=limit,
-        offset=offset,
-    )
+    try:
+        return service.list_solicitacoes(
+            status_sistema=status_sistema or None,
+            status_tratamento=status_tratamento,
+            responsavel_user_id=responsavel_user_id,
+            setor=setor,
+            busca=busca,
+            farol=farol,
+            sem_responsavel=sem_responsavel,
+            sem_anotacao=sem_anotacao,
+            sem_processo_l1=sem_processo_l1,
+            concluidas=concluidas,
+            disp_de=disp_de,
+            disp_ate=disp_ate,
+            prazo_de=prazo_de,
+            prazo_ate=prazo_ate,
+            limit=limit,
+            offset=offset,
+            cursor=cursor,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
 
 
 @router.get(
@@ -302,10 +310,8 @@ def exportar_solicitacoes(
 ):
     from datetime import datetime as _dt
 
-    from fastapi import Response
-
     service = OnerequestService(db)
-    xlsx = service.export_xlsx(
+    path = service.export_xlsx(
         status_sistema=status_sistema or None,
         status_tratamento=status_tratamento,
         responsavel_user_id=responsavel_user_id,
@@ -322,11 +328,7 @@ def exportar_solicitacoes(
         prazo_ate=prazo_ate,
     )
     fname = f"onerequest-dmis-{_dt.now().strftime('%Y%m%d-%H%M')}.xlsx"
-    return Response(
-        content=xlsx,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={"Content-Disposition": f'attachment; filename="{fname}"'},
-    )
+    return xlsx_file_response(path, fname)
 
 
 class DashboardResponse(BaseModel):
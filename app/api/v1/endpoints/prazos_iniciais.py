@@ -1555,7 +1555,8 @@ async def upload_intake_pdf(
     Fluxo:
     1. Lê o PDF do processo, valida tamanho.
     2. Roda o motor de extração (pdfplumber + extractor PJe TJBA ou
-       fallback texto cru).
+       fallback texto cru) no pool de processos — fila cheia = 503 com
+       Retry-After.
     3. Se extração OK: cria intake com `source=USER_UPLOAD`,
        `submitted_by_*` do JWT; PDF do processo NÃO é gravado em disco
        (só os bytes/SHA pra auditoria) — economiza armazenamento.
@@ -1568,7 +1569,11 @@ async def upload_intake_pdf(
        `external_id` (`upload-{sha8}`). Re-subir o mesmo PDF retorna
        o intake existente.
     """
-    from app.services.prazos_iniciais.pdf_extractor import extract as pdf_extract
+    from app.services.prazos_iniciais.pdf_extractor.pool import (
+        ExtractionPoolSaturated,
+        ExtractionTimeout,
+        extract_async,
+    )
     from app.services.prazos_iniciais.storage import (
         validate_pdf_bytes,
     )
@@ -1643,8 +1648,21 @@ async def upload_intake_pdf(
             user_message="Este PDF já tinha sido cadastrado antes.",
         )
 
-    # 4. Roda o motor de extração.
-    extraction = pdf_extract(processo_bytes)
+    # 4. Roda o motor de extração — no pool de processos, pra um PDF
+    #    grande não travar as outras requests deste worker.
+    try:
+        extraction = await extract_async(processo_bytes)
+    except ExtractionPoolSaturated as exc:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(exc),
+            headers={"Retry-After": str(exc.retry_after)},
+        )
+    except ExtractionTimeout as exc:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"{exc} Verifique se o arquivo não está corrompido.",
+        )
 
     # 5. Resolve CNJ — preferir o do extractor; sem ele, criar intake
     #    sem CNJ válido é problemático porque cnj_number é NOT NULL.
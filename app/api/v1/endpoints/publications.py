@@ -24,6 +24,7 @@ from sqlalchemy.orm import Session
 from app.core import auth as auth_security
 from app.core.dependencies import get_db, get_api_client
 from app.models.publication_batch import PUB_BATCH_STATUS_FAILED
+from app.services.classifier.prompts import invalidate_system_prompt_cache
 from app.services.legal_one_client import LegalOneApiClient
 from app.services.publication_batch_classifier import PublicationBatchClassifier
 from app.services.publication_export_service import export_records_grouped_xlsx
@@ -887,6 +888,9 @@ def submit_classification_feedback(
         rec.natureza_processo = payload.corrected_natureza
 
     service.db.commit()
+    # Feedback entra nos exemplos do prompt do escritório (sem escritório =
+    # global, vale pra todos).
+    invalidate_system_prompt_cache(fb.office_external_id)
     return {"message": "Feedback registrado com sucesso.", "id": fb.id}
 
 
@@ -1329,6 +1333,7 @@ def create_classification_override(
     )
     db.add(override)
     db.commit()
+    invalidate_system_prompt_cache(override.office_external_id)
     db.refresh(override)
     return {
         "id": override.id,
@@ -1358,6 +1363,7 @@ def update_classification_override(
     if body.custom_description is not None:
         override.custom_description = body.custom_description
     db.commit()
+    invalidate_system_prompt_cache(override.office_external_id)
     return {"ok": True, "id": override.id, "is_active": override.is_active}
 
 
@@ -1472,6 +1478,7 @@ def migrate_override_to_v2(
     override.taxonomy_version = "v2"
     override.needs_taxonomy_review = False
     db.commit()
+    invalidate_system_prompt_cache(override.office_external_id)
     db.refresh(override)
     return {
         "id": override.id,
@@ -1550,6 +1557,7 @@ def bulk_create_classification_overrides(
         )
         created += 1
     db.commit()
+    invalidate_system_prompt_cache()
     return {
         "created": created,
         "skipped_existing": skipped,
@@ -1627,6 +1635,7 @@ def bulk_create_overrides_for_office(
         created += 1
 
     db.commit()
+    invalidate_system_prompt_cache(body.office_external_id)
     return {
         "created": created,
         "skipped_existing": skipped,
@@ -1661,6 +1670,7 @@ def bulk_delete_classification_overrides(
     count = q.count()
     q.delete(synchronize_session=False)
     db.commit()
+    invalidate_system_prompt_cache()
     return {"deleted": count}
 
 
@@ -1676,8 +1686,10 @@ def delete_classification_override(
     override = db.query(OfficeClassificationOverride).filter_by(id=override_id).first()
     if not override:
         raise HTTPException(404, "Override não encontrado.")
+    office_external_id = override.office_external_id
     db.delete(override)
     db.commit()
+    invalidate_system_prompt_cache(office_external_id)
     return {"ok": True}
 
 
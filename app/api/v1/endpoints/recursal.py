@@ -52,7 +52,11 @@ from app.services.recursal.cost_calculator import calcular_custo, derive_uf_from
 from app.services.recursal.parecer import render_assunto, render_parecer
 from app.services.recursal.produtos import categoria_de
 from app.services.recursal.ocr import ocr_paginas_imagem
-from app.services.prazos_iniciais.pdf_extractor import extract as pdf_extract
+from app.services.prazos_iniciais.pdf_extractor.pool import (
+    ExtractionPoolSaturated,
+    ExtractionTimeout,
+    extract_async,
+)
 from app.services.prazos_iniciais.storage import (
     PdfValidationError,
     validate_pdf_bytes,
@@ -231,8 +235,21 @@ async def upload_processo(
             user_message="Este PDF já tinha sido enviado antes.",
         )
 
-    # Extração mecânica (reusa o motor de Prazos Iniciais).
-    extraction = pdf_extract(pdf_bytes)
+    # Extração mecânica (reusa o motor de Prazos Iniciais, no pool de
+    # processos — fora do event loop).
+    try:
+        extraction = await extract_async(pdf_bytes)
+    except ExtractionPoolSaturated as exc:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(exc),
+            headers={"Retry-After": str(exc.retry_after)},
+        )
+    except ExtractionTimeout as exc:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"{exc} Verifique se o arquivo não está corrompido.",
+        )
 
     integra = dict(extraction.integra_json or {})
     integra_has_content = bool(
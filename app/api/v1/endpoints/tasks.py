@@ -795,6 +795,14 @@ def resume_execution(execution_id: int, db: Session = Depends(get_db)):
     execution.worker_id = None
     execution.heartbeat_at = None
     execution.lease_expires_at = None
+    # Claims de bloco que sobraram da pausa voltam pra fila na hora.
+    db.query(BatchExecutionItem).filter(
+        BatchExecutionItem.execution_id == execution_id,
+        BatchExecutionItem.claimed_by.isnot(None),
+    ).update(
+        {BatchExecutionItem.claimed_by: None, BatchExecutionItem.claim_expires_at: None},
+        synchronize_session=False,
+    )
     db.commit()
     return {"message": "Lote retornou para a fila e sera retomado pelo worker.", "status": execution.status}
 
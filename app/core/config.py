@@ -38,11 +38,41 @@ class Settings(BaseSettings):
     batch_worker_enabled: bool = True
     batch_worker_poll_interval_seconds: int = 5
     batch_worker_lease_seconds: int = 300
+    # Itens de um lote processados em paralelo (cada um com sua session).
+    # O ritmo real contra o L1 continua limitado pelo rate limiter
+    # compartilhado — as lanes só escondem a latência de cada chamada.
+    batch_item_concurrency: int = 4
+    # Sinal de controle (pausa/cancelamento) + heartbeat e flush dos
+    # contadores do lote rodam por tempo, não por item.
+    batch_control_check_seconds: float = 5.0
+    batch_counts_flush_seconds: float = 10.0
+    # Workers reivindicam itens em blocos (SKIP LOCKED + lease por item), então
+    # vários dividem o mesmo lote. Bloco pequeno = escalonamento mais justo
+    # entre lotes; grande = menos idas à fila.
+    batch_claim_chunk_size: int = 25
+    # Threads de worker por processo Uvicorn (cada uma reivindica seus blocos).
+    batch_worker_threads: int = 1
 
     legal_one_base_url: str | None = None
     legal_one_client_id: str | None = None
     legal_one_client_secret: str | None = None
     legal_one_position_fix_status_file: str | None = None
+    # Rate limit do L1 (90 req/min oficiais; usamos 1.2 req/s de margem).
+    # O balde é compartilhado pelo CLUSTER: "postgres" (tabela
+    # legal_one_rate_bucket; em sqlite cai pra memória), "file" (JSON +
+    # filelock no volume /app/data) ou "memory" (por processo, legado).
+    legal_one_rate_limit_backend: str = "postgres"
+    legal_one_rate_limit_per_second: float = 1.2
+    legal_one_rate_limit_burst: float = 5.0
+    legal_one_rate_limit_file: str = "/app/data/legal_one_rate_limit.json"
+    # Tokens que só chamadas interativas (UI) podem usar — jobs de
+    # background (índice de processos, auto-refresh) param antes disso.
+    legal_one_rate_limit_interactive_reserve: float = 2.0
+    # Paginação concorrente (transporte httpx async): depois que a 1ª página
+    # traz o @odata.count, até N páginas $skip ficam em voo ao mesmo tempo.
+    # O rate limiter acima continua valendo por requisição.
+    legal_one_concurrent_pagination: bool = True
+    legal_one_page_fanout: int = 6
     legal_one_web_username: str | None = None
     legal_one_web_password: str | None = None
     legal_one_web_key_label: str | None = None
@@ -75,6 +105,18 @@ class Settings(BaseSettings):
     datajud_api_key: str | None = None
     datajud_timeout_seconds: int = 30
     datajud_default_page_size: int = 100
+    # Varredura em lote do Citações BM: CNJs por consulta `_search`, tribunais
+    # (aliases) consultados em paralelo e intervalo mínimo entre duas consultas
+    # ao MESMO tribunal (a API pública throttla por rajada).
+    datajud_scan_batch_size: int = 50
+    datajud_scan_concurrent_tribunals: int = 4
+    datajud_scan_alias_interval_seconds: float = 0.25
+    # Sync incremental do monitoramento processual (search_after por
+    # @timestamp): docs por página, teto de páginas por tribunal numa rodada
+    # e janela da primeira rodada de um tribunal sem cursor.
+    datajud_incremental_page_size: int = 1000
+    datajud_incremental_max_pages: int = 200
+    datajud_incremental_initial_lookback_days: int = 1
 
     comunica_base_url: str = "https://comunicaapi.pje.jus.br"
     comunica_timeout_seconds: int = 30
@@ -83,6 +125,11 @@ class Settings(BaseSettings):
     process_monitoring_idle_window_days: int = 15
     process_monitoring_recency_window_days: int = 10
 
+    # Minha Equipe: o ingest diário do "Agenda Analytics" aplica só a diferença
+    # por (l1_task_id, pessoa_id, envolvido_nome) em vez de trocar a
+    # perf_l1_tarefa inteira.
+    perf_ingest_delta: bool = False
+
     # ── Publication Capture (Legal One /Updates) ──────────────────────
     # Quando um escritório é capturado pela primeira vez (nenhum cursor
     # prévio), a rodagem inicial olha para trás este número de dias.
@@ -108,6 +155,17 @@ class Settings(BaseSettings):
     classifier_model: str = "claude-haiku-4-5-20251001"
     classifier_max_concurrent: int = 5
     classifier_max_tokens: int = 4096
+    # Orçamento inicial do limiter adaptativo (classifier/rate_limit.py) até a
+    # 1ª resposta trazer os headers anthropic-ratelimit-* do tier real.
+    classifier_initial_rpm: int = 50
+    classifier_initial_tpm: int = 40000
+    # Auto-classificação: commit a cada N registros classificados, pra um
+    # crash no meio da rodada não perder o que já foi pago.
+    classifier_commit_every: int = 20
+    # Prompt caching (cache_control) nas chamadas de classificação + TTL do
+    # LRU de system prompts por escritório (classifier/prompts.py).
+    classifier_prompt_caching: bool = True
+    classifier_prompt_cache_ttl_seconds: int = 600
 
     # ── Prazos Iniciais ───────────────────────────────────────────────
     # Chave(s) que autenticam a automação externa no endpoint de intake.
@@ -127,8 +185,40 @@ class Settings(BaseSettings):
     # próprio. PDF do processo é descartado após extração ok pra não
     # encher disco.
     prazos_iniciais_max_upload_pdf_mb: int = 100
+    # Extração mecânica (pdfplumber) roda num pool de processos fora do
+    # event loop — ver pdf_extractor/pool.py. 0 = CPUs do host divididas
+    # por UVICORN_WORKERS. Fila = PDFs aguardando worker além dos que
+    # estão rodando; cheia → 503 com Retry-After.
+    prazos_iniciais_extract_workers: int = 0
+    prazos_iniciais_extract_queue_max: int = 8
+    prazos_iniciais_extract_timeout_seconds: int = 180
+    prazos_iniciais_extract_retry_after_seconds: int = 15
+    # Motor de texto: "auto" = PyMuPDF com fallback por página pro
+    # pdfplumber (mesma saída, ~10x mais rápido); "pdfplumber" = só ele.
+    prazos_iniciais_text_engine: str = "auto"
+    # Cache do texto por página, endereçado pelo SHA-256 do PDF. Vazio =
+    # <prazos_iniciais_storage_path>/text_cache.
+    prazos_iniciais_text_cache_enabled: bool = True
+    prazos_iniciais_text_cache_path: str = ""
+    # Poda diária (GC do blob store): sem hit há mais de N dias sai; acima
+    # de N MB saem os menos usados. 0 = sem limite.
+    prazos_iniciais_text_cache_max_age_days: int = 30
+    prazos_iniciais_text_cache_max_mb: int = 2048
+    # Store compartilhado endereçado por conteúdo (app/services/blob_store):
+    # PDFs/arquivos de prazos iniciais, Classificador, AJUS e GED LegalOne
+    # gravados 1x em <blob_store_path>/sha256/aa/bb/<hash>; os paths legados
+    # viram hard links. Vazio = "blobs" ao lado de prazos_iniciais_storage_path
+    # (precisa estar no MESMO volume pro hard link — senão cai pra cópia).
+    blob_store_enabled: bool = True
+    blob_store_path: str = ""
+    # Blob sem referência só é apagado pelo GC depois dessa carência.
+    blob_store_gc_grace_hours: int = 24
     # Quantos dias manter o PDF local após confirmação de upload no GED.
     prazos_iniciais_retention_days: int = 7
+    # Calendários forenses (recessos/suspensões por tribunal/comarca, tabela
+    # calendario_forense_suspensao) ficam em memória por esse tempo —
+    # alteração na tabela vale no máximo depois disso.
+    prazos_calendario_cache_seconds: int = 600
     # Parâmetros do agregador (janela antes de submeter batch pra Anthropic).
     prazos_iniciais_batch_window_seconds: int = 600
     prazos_iniciais_batch_min_size: int = 5
@@ -154,6 +244,16 @@ class Settings(BaseSettings):
     recursal_ocr_enabled: bool = True
     recursal_ocr_max_pages: int = 15
     recursal_ocr_max_chars: int = 18_000
+    # Páginas em paralelo (1 processo = render + tesseract de 1 página).
+    # 0 = CPUs do host divididas por UVICORN_WORKERS; 1 = serial, sem pool.
+    recursal_ocr_workers: int = 0
+    # Cache do OCR por (hash da imagem da página, idioma, dpi). Vazio =
+    # <prazos_iniciais_storage_path>/ocr_cache.
+    recursal_ocr_cache_enabled: bool = True
+    recursal_ocr_cache_path: str = ""
+    # Poda diária pelo GC do blob store, como o cache de texto. 0 = sem limite.
+    recursal_ocr_cache_max_age_days: int = 30
+    recursal_ocr_cache_max_mb: int = 512
 
     # ─── Classificador — motor dormente (cla003) ───────────────────────
     # API keys aceitas no endpoint publico POST /classificador/intake/pdf
@@ -170,11 +270,14 @@ class Settings(BaseSettings):
     classificador_pending_worker_interval_seconds: int = 60
     # Concorrencia interna do worker: quantos PDFs processa em paralelo
     # dentro de UM mesmo lote. Cada thread = 1 PDF (extract + compress
-    # + save). Padrao 4 e' conservador pra nao estourar CPU em PDFs
-    # grandes; pode subir pra 8-12 se tiver mais cpu disponivel.
+    # + save). 0 (padrao) = dimensiona pelo host: CPUs disponiveis pro
+    # processo (cpuset do container), com teto em
+    # classificador_pending_worker_max_concurrency. Valor > 0 fixa.
     # IMPORTANTE: cada thread cria sua propria SessionLocal — DB nao
-    # bottleneca, mas memoria sim (cada PDF de 30MB ocupa RAM).
-    classificador_pending_worker_concurrency: int = 4
+    # bottleneca, mas memoria sim (cada PDF de 30MB ocupa RAM) — o teto
+    # existe por isso.
+    classificador_pending_worker_concurrency: int = 0
+    classificador_pending_worker_max_concurrency: int = 12
     # Auto-classify: se True, dispara classify do lote logo apos criar.
     classificador_pending_auto_classify: bool = True
 
@@ -326,6 +429,12 @@ class Settings(BaseSettings):
     # AJUS. Sobrevive à rotina de cleanup do prazos_iniciais. Apagado
     # automaticamente após inserção bem-sucedida (sucesso da AJUS).
     ajus_storage_path: str = "/app/data/ajus_pdfs"
+    # Dispatch concorrente (`dispatch_pending_concurrent`): itens
+    # claimados por chamada e quantas requests de 20 ficam em voo ao
+    # mesmo tempo. Cada request em voo lê os PDFs do disco em streaming,
+    # então a memória não cresce com o tamanho do lote.
+    ajus_dispatch_max_items: int = 400
+    ajus_dispatch_max_concurrent: int = 4
 
     # ── Classificação AJUS via RPA Playwright (Chunk 2) ───────────────
     # Selectors XPath, paths do portal e domínio do cliente NÃO ficam
@@ -404,6 +513,15 @@ class Settings(BaseSettings):
     # padrao do MD); False = so' digitos "92992022665".
     contatos_legalone_phone_keep_mask: bool = True
 
+    # ── Varredura de andamentos (runner Node varredura-andamentos.js) ──
+    # Runs grandes são divididas em N shards, cada um num processo Node
+    # (1 browser cada). Todos reaproveitam o cookie da sessão web do 1º
+    # shard (storage state), então só ele faz login no OnePass.
+    varredura_runner_shards: int = 3
+    # Quanto o worker espera o 1º shard logar antes de subir os demais
+    # (se estourar, os outros sobem assim mesmo e logam sozinhos).
+    varredura_login_wait_seconds: int = 120
+
 
     model_config = SettingsConfigDict(
         env_file=".env",
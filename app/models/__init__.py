@@ -74,3 +74,5 @@ from .analise_recursal import (
     AnaliseRecursalBatch,
     RecursalCustaTabela,
 )
+from .blob_store import BlobObject, BlobRef
+from .calendario_forense import CalendarioForenseSuspensao
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, JSON, String
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, JSON, String, text
 from sqlalchemy.orm import relationship
 
 from app.db.session import Base
@@ -62,5 +62,30 @@ class BatchExecutionItem(Base):
     error_message = Column(String, nullable=True)
     fingerprint = Column(String, nullable=True, index=True)
     input_data = Column(JSON, nullable=True)
+    # Claim por bloco: o worker que pegou o item e até quando vale o lease.
+    # Lease vencido = item volta a ser reivindicável por outro worker.
+    claimed_by = Column(String, nullable=True)
+    claim_expires_at = Column(DateTime(timezone=True), nullable=True)
+    # Reserva do fingerprint na execução, tomada antes da chamada ao L1 e
+    # solta se o item falhar: duas linhas iguais em blocos de workers
+    # diferentes não criam a mesma tarefa duas vezes (índice único abaixo).
+    fingerprint_claim = Column(String, nullable=True)
 
     execution = relationship("BatchExecution", back_populates="items")
+
+    __table_args__ = (
+        Index("ix_lotes_itens_execution_status", "execution_id", "status"),
+        # Sonda de dedup (`probe_successful_fingerprints`): só linhas com sucesso.
+        Index(
+            "ix_lotes_itens_fingerprint_sucesso",
+            "fingerprint",
+            postgresql_where=text("status = 'SUCESSO' AND fingerprint IS NOT NULL"),
+            sqlite_where=text("status = 'SUCESSO' AND fingerprint IS NOT NULL"),
+        ),
+        Index(
+            "ux_lotes_itens_execution_fingerprint_claim",
+            "execution_id",
+            "fingerprint_claim",
+            unique=True,
+        ),
+    )
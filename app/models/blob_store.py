@@ -0,0 +1,35 @@
+"""Store de arquivos endereçado por conteúdo (ver app/services/blob_store).
+
+Tabelas (prefixo blob_*):
+- blob_object — um blob por SHA-256 em `<blob_store_path>/sha256/aa/bb/<hash>`,
+                com o nº de referências vivas.
+- blob_ref    — quem aponta pro blob: (namespace do módulo, path relativo
+                legado). O path legado é um hard link pro blob.
+"""
+
+from sqlalchemy import BigInteger, Column, DateTime, ForeignKey, Index, Integer, String
+from sqlalchemy.sql import func
+
+from app.db.session import Base
+
+
+class BlobObject(Base):
+    __tablename__ = "blob_object"
+
+    sha256 = Column(String(64), primary_key=True)
+    size_bytes = Column(BigInteger, nullable=False)
+    ref_count = Column(Integer, nullable=False, server_default="0")
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Quando o ref_count chegou a 0 — o GC só apaga depois da carência.
+    orphaned_at = Column(DateTime(timezone=True), nullable=True, index=True)
+
+
+class BlobRef(Base):
+    __tablename__ = "blob_ref"
+    __table_args__ = (Index("ix_blob_ref_sha256", "sha256"),)
+
+    # "prazos_iniciais" | "ajus" | "ged_legalone" — ver blob_store.NAMESPACE_* e namespace_roots().
+    namespace = Column(String(32), primary_key=True)
+    relative_path = Column(String, primary_key=True)
+    sha256 = Column(String(64), ForeignKey("blob_object.sha256"), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,38 @@
+"""Recessos, suspensões e feriados locais do calendário forense.
+
+Uma linha = um intervalo [data_inicio, data_fim] (inclusive) sem contagem
+de prazo. Escopo pela combinação tribunal/comarca:
+- tribunal NULL                 → nacional (ex.: recesso do art. 220 CPC);
+- tribunal "TJBA", comarca NULL → todo o tribunal (recesso regimental,
+                                  feriado estadual, suspensão por portaria);
+- tribunal + comarca            → só aquela comarca/unidade de origem
+                                  (código OOOO do CNJ; feriado municipal).
+
+Consumido por `app/services/prazos_iniciais/calendario_forense.py`.
+"""
+
+from sqlalchemy import Boolean, Column, Date, DateTime, Index, Integer, String
+from sqlalchemy.sql import func, true
+
+from app.db.session import Base
+
+CALENDARIO_TIPO_FERIADO = "feriado"
+CALENDARIO_TIPO_RECESSO = "recesso"
+CALENDARIO_TIPO_SUSPENSAO = "suspensao"
+
+
+class CalendarioForenseSuspensao(Base):
+    __tablename__ = "calendario_forense_suspensao"
+    __table_args__ = (
+        Index("ix_calendario_forense_tribunal_comarca", "tribunal", "comarca"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    tribunal = Column(String(16), nullable=True)
+    comarca = Column(String(16), nullable=True)
+    data_inicio = Column(Date, nullable=False)
+    data_fim = Column(Date, nullable=False)
+    tipo = Column(String(16), nullable=False, server_default=CALENDARIO_TIPO_FERIADO)
+    descricao = Column(String, nullable=True)
+    ativo = Column(Boolean, nullable=False, server_default=true(), default=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -11,15 +11,21 @@ Tabela (prefixo onr*):
 - onr_solicitacoes — uma linha por DMI (número da solicitação é a chave).
 """
 
+from datetime import date, datetime
+from typing import Optional
+
 from sqlalchemy import (
     Boolean,
     Column,
+    Date,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
 )
+from sqlalchemy.orm import validates
 from sqlalchemy.sql import func
 
 from app.db.session import Base
@@ -46,6 +52,16 @@ STATUS_TRATAMENTO_ERRO = "ERRO"
 STATUS_TRATAMENTO_AGUARDANDO_PROCESSO = "AGUARDANDO_PROCESSO"
 
 
+def parse_prazo(prazo: Optional[str]) -> Optional[date]:
+    """Prazo do BB (DD/MM/YYYY) -> date. Formato inválido vira None."""
+    if not prazo:
+        return None
+    try:
+        return datetime.strptime(prazo.strip(), "%d/%m/%Y").date()
+    except (ValueError, TypeError, AttributeError):
+        return None
+
+
 class OnerequestSolicitacao(Base):
     __tablename__ = "onr_solicitacoes"
 
@@ -62,6 +78,9 @@ class OnerequestSolicitacao(Base):
     # Prazo do BB (DD/MM/YYYY). ATENÇÃO: no agendamento vira o `vencimento`
     # (só aparece na descrição da tarefa), NÃO a data da tarefa. Ver §6 do plano.
     prazo = Column(String, nullable=True)
+    # Espelho tipado de `prazo`, mantido por `_sync_prazo_date` em toda escrita
+    # (intake, sync, edição). A listagem calcula farol/KPIs/ordem em SQL por ele.
+    prazo_date = Column(Date, nullable=True)
     texto_dmi = Column(Text, nullable=True)
     # CNJ (20 dígitos) resolvido pela API interna do BB. Pode vir vazio ou
     # "sujo" (~3% dos casos) — nesses, resolve-se por NPJ ou trata manual.
@@ -137,6 +156,16 @@ class OnerequestSolicitacao(Base):
     )
     updated_at = Column(DateTime(timezone=True), onupdate=func.now(), nullable=True)
 
+    __table_args__ = (
+        # Ordem da listagem (prazo asc, sem prazo no fim, id) + paginação keyset.
+        Index("ix_onr_solicitacoes_prazo_date_id", "prazo_date", "id"),
+    )
+
+    @validates("prazo")
+    def _sync_prazo_date(self, _key, value):
+        self.prazo_date = parse_prazo(value)
+        return value
+
 
 class OnerequestAnotacao(Base):
     """Log append-only de anotações por DMI (auditoria: quem/quando/texto).
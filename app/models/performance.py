@@ -8,15 +8,19 @@ Tabelas (prefixo perf*):
 - perf_pessoa            — roster (nome/cargo/squad/posição).
 - perf_l1_tarefa         — uma linha por tarefa do L1.
 - perf_subtipo_categoria — natureza de cada subtipo (operacional/profundo/ruído).
+- perf_rollup_*          — agregados diários de perf_l1_tarefa (refeitos no ingest;
+                           ver app/services/performance/rollups.py).
 """
 
 from sqlalchemy import (
     BigInteger,
     Boolean,
     Column,
+    Date,
     DateTime,
     Float,
     ForeignKey,
+    Index,
     Integer,
     LargeBinary,
     String,
@@ -63,6 +67,10 @@ class PerfPessoa(Base):
 
 class PerfTarefa(Base):
     __tablename__ = "perf_l1_tarefa"
+    # (l1_task_id, pessoa_id, envolvido_nome) é a chave do ingest delta
+    # (seed.seed_tarefas(delta=True)); o índice em l1_task_id basta pro
+    # casamento (poucas linhas por tarefa).
+    __table_args__ = (Index("ix_perf_tarefa_l1_task_id", "l1_task_id"),)
 
     id = Column(Integer, primary_key=True)
     l1_task_id = Column(BigInteger, nullable=True)
@@ -92,6 +100,47 @@ class PerfSubtipoCategoria(Base):
     updated_at = Column(DateTime(timezone=True), server_default=func.now())
 
 
+class PerfRollupConclusao(Base):
+    """Concluídas por (dia BRT, pessoa, subtipo), com prazo e no prazo."""
+
+    __tablename__ = "perf_rollup_conclusao"
+    __table_args__ = (Index("ix_perf_rollup_conclusao_dia_pessoa", "dia", "pessoa_id"),)
+
+    id = Column(Integer, primary_key=True)
+    dia = Column(Date, nullable=False)
+    pessoa_id = Column(Integer, nullable=False)
+    subtipo = Column(String, nullable=True)
+    concluido = Column(Integer, nullable=False, server_default="0")
+    com_prazo = Column(Integer, nullable=False, server_default="0")
+    no_prazo = Column(Integer, nullable=False, server_default="0")
+
+
+class PerfRollupCiclo(Base):
+    """Histograma log do cycle time por (dia BRT, pessoa): n tarefas no bucket."""
+
+    __tablename__ = "perf_rollup_ciclo"
+    __table_args__ = (Index("ix_perf_rollup_ciclo_dia_pessoa", "dia", "pessoa_id"),)
+
+    id = Column(Integer, primary_key=True)
+    dia = Column(Date, nullable=False)
+    pessoa_id = Column(Integer, nullable=False)
+    bucket = Column(Integer, nullable=False)
+    n = Column(Integer, nullable=False, server_default="0")
+
+
+class PerfRollupBacklog(Base):
+    """Pendentes por (pessoa, subtipo, dia BRT do prazo); prazo_dia NULL = sem prazo."""
+
+    __tablename__ = "perf_rollup_backlog"
+    __table_args__ = (Index("ix_perf_rollup_backlog_pessoa", "pessoa_id"),)
+
+    id = Column(Integer, primary_key=True)
+    pessoa_id = Column(Integer, nullable=False)
+    subtipo = Column(String, nullable=True)
+    prazo_dia = Column(Date, nullable=True)
+    pendente = Column(Integer, nullable=False, server_default="0")
+
+
 class PerfBoardTarefa(Base):
     """Curadoria do board 'Tarefas mais importantes' por time. Quando há linhas
     pra um time, o board mostra EXATAMENTE esses subtipos (na ordem); sem linhas,
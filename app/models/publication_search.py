@@ -54,6 +54,16 @@ class PublicationSearch(Base):
     progress_detail = Column(String, nullable=True)  # detalhe textual (ex: "1.250 publicações encontradas")
     progress_pct = Column(Integer, nullable=True)    # percentual estimado 0–100
 
+    # Captura em streaming (bloco a bloco): ponto de retomada e batimento.
+    # resume_skip = $skip da 1ª página do L1 ainda não commitada (None em
+    # buscas com lista pré-buscada pelo scheduler — essas não retomam).
+    # heartbeat_at avança a cada bloco commitado; o watchdog usa ele (não o
+    # created_at) pra distinguir busca lenta de busca morta.
+    only_unlinked = Column(Boolean, nullable=False, default=False, server_default="false")
+    resume_skip = Column(Integer, nullable=True)
+    resume_attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)
+
     # Resultados
     total_found = Column(Integer, default=0)
     total_new = Column(Integer, default=0)
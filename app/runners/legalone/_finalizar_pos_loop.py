@@ -53,9 +53,10 @@ def aguardar_loop_terminar() -> None:
 
 
 def carregar_items_todas_runs() -> list[dict]:
-    """Items 'ok' de status.json de todas as runs da feature."""
+    """Items 'ok' de todas as runs da feature (status.json ou progress-*.jsonl)."""
     from app.db.session import SessionLocal
     from app.models.varredura import VarreduraRun
+    from app.services.varredura.varredura_service import read_run_items
 
     base = Path("/app/output/playwright/legalone/varredura-andamentos")
     db = SessionLocal()
@@ -80,14 +81,7 @@ def carregar_items_todas_runs() -> list[dict]:
     seen: set[int] = set()
     items_out: list[dict] = []
     for r in runs:
-        sp = base / f"run-{r.id}" / "status.json"
-        if not sp.exists():
-            continue
-        try:
-            data = json.loads(sp.read_text(encoding="utf-8"))
-        except Exception:
-            continue
-        for it in data.get("items") or []:
+        for it in read_run_items(base / f"run-{r.id}"):
             if (it.get("status") or "").lower() != "ok":
                 continue
             lid = int(it.get("lawsuitId") or 0)
@@ -39,6 +39,7 @@ def coletar_pending_de_todas_runs() -> tuple[set[int], set[int]]:
     runs da feature planilha-relatorios."""
     from app.db.session import SessionLocal
     from app.models.varredura import VarreduraRun
+    from app.services.varredura.varredura_service import read_run_items
 
     base_dir = Path(
         "/app/output/playwright/legalone/varredura-andamentos"
@@ -65,14 +66,7 @@ def coletar_pending_de_todas_runs() -> tuple[set[int], set[int]]:
     ja_ok: set[int] = set()
     pending: set[int] = set()
     for r in runs:
-        sp = base_dir / f"run-{r.id}" / "status.json"
-        if not sp.exists():
-            continue
-        try:
-            data = json.loads(sp.read_text(encoding="utf-8"))
-        except Exception:
-            continue
-        for it in data.get("items") or []:
+        for it in read_run_items(base_dir / f"run-{r.id}"):
             lid = int(it.get("lawsuitId") or 0)
             if not lid:
                 continue
@@ -334,15 +334,17 @@ Gere o JSON conforme as instrucoes do system."""
 def processar_processos_com_ia(
     run_id: int, capa_by_lawsuit: dict
 ) -> dict[int, dict]:
-    """Pra cada processo concluido da run, le andamentos do status.json,
-    chama Sonnet (8 threads), retorna mapa { lawsuit_id -> dict }."""
-    status_path = Path(
-        f"/app/output/playwright/legalone/varredura-andamentos/run-{run_id}/status.json"
+    """Pra cada processo concluido da run, le andamentos dos progress-*.jsonl
+    (ou do status.json, em runs antigas), chama Sonnet (8 threads), retorna
+    mapa { lawsuit_id -> dict }."""
+    from app.services.varredura.varredura_service import read_run_items
+
+    run_dir = Path(
+        f"/app/output/playwright/legalone/varredura-andamentos/run-{run_id}"
     )
-    if not status_path.exists():
-        raise FileNotFoundError(f"status.json nao encontrado em {status_path}")
-    status_data = json.loads(status_path.read_text(encoding="utf-8"))
-    items = status_data.get("items") or []
+    items = read_run_items(run_dir)
+    if not items:
+        raise FileNotFoundError(f"Nenhum resultado da varredura em {run_dir}")
 
     # Cache pra retomada
     cache: dict[int, dict] = {}
@@ -24,6 +24,16 @@
  *     ]
  *   }
  *
+ * Modo shard (varredura grande dividida em N processos pelo worker Python):
+ *   --progress <jsonl>      1 linha JSON por item concluido (append-only),
+ *                           no formato de `items[]` acima. O worker le so'
+ *                           o que foi acrescentado desde o ultimo offset.
+ *                           Com --progress o status.json fica so' com o
+ *                           resumo (sem `items`).
+ *   --storage-state <json>  cookie da sessao web compartilhado entre os
+ *                           shards: reaproveitado se existir, regravado a
+ *                           cada login.
+ *
  * Exit 0 em sucesso (mesmo com items individuais em erro), 1 em falha
  * fatal (login impossivel, browser crash).
  */
@@ -78,6 +88,19 @@ function writeJsonFile(filePath, payload) {
   fs.writeFileSync(filePath, JSON.stringify(payload, null, 2));
 }
 
+function appendJsonLine(filePath, payload) {
+  fs.appendFileSync(filePath, `${JSON.stringify(payload)}\n`);
+}
+
+async function saveStorageState(context, filePath) {
+  if (!filePath) return;
+  // tmp + rename: outro shard lendo o arquivo nunca pega JSON pela metade.
+  const state = await context.storageState();
+  const tmp = `${filePath}.${process.pid}.tmp`;
+  fs.writeFileSync(tmp, JSON.stringify(state));
+  fs.renameSync(tmp, filePath);
+}
+
 async function waitForPageSettle(page, delayMs = 0) {
   await page
     .waitForLoadState('domcontentloaded', { timeout: 120000 })
@@ -155,7 +178,10 @@ async function capturePageContext(page) {
     .catch(() => ({ url: page.url(), title: '', bodyStart: '' }));
 }
 
-async function login(page, { username, password, keyLabel, returnUrl }) {
+async function login(
+  page,
+  { username, password, keyLabel, returnUrl, storageStatePath },
+) {
   await page.goto(returnUrl, {
     waitUntil: 'domcontentloaded',
     timeout: 120000,
@@ -231,6 +257,7 @@ async function login(page, { username, password, keyLabel, returnUrl }) {
     const ctx = await capturePageContext(page);
     const blob = `${ctx.url}\n${ctx.title}\n${ctx.bodyStart}`;
     if (!isAuthenticationContext(blob)) {
+      await saveStorageState(page.context(), storageStatePath).catch(() => {});
       return;
     }
   }
@@ -270,7 +297,13 @@ async function createLoggedInSession(loginConfig) {
     launchOptions.channel = process.env.PLAYWRIGHT_CHANNEL;
   }
   const browser = await chromium.launch(launchOptions);
-  const context = await browser.newContext();
+  const sharedState =
+    loginConfig.storageStatePath && fs.existsSync(loginConfig.storageStatePath)
+      ? readJsonFile(loginConfig.storageStatePath, null)
+      : null;
+  const context = await browser.newContext(
+    sharedState ? { storageState: sharedState } : {},
+  );
   // Bloqueia recursos pesados (imgs/fonts/media) — pagina interna do
   // L1 nao depende deles e isso acelera o load.
   await context.route('**/*', (route) => {
@@ -281,6 +314,16 @@ async function createLoggedInSession(loginConfig) {
     return route.continue();
   });
   const page = await context.newPage();
+  if (sharedState) {
+    // Cookie de outro shard: so' loga se a sessao ja' caiu.
+    await page
+      .goto(loginConfig.returnUrl, { waitUntil: 'domcontentloaded', timeout: 120000 })
+      .catch(() => {});
+    const ctx = await capturePageContext(page);
+    if (!isAuthenticationContext(`${ctx.url}\n${ctx.title}\n${ctx.bodyStart}`)) {
+      return { browser, context, page };
+    }
+  }
   await login(page, loginConfig);
   return { browser, context, page };
 }
@@ -462,6 +505,7 @@ async function main() {
     args.output ||
     path.join(path.dirname(inputPath), `varredura-${Date.now()}.json`);
   const maxAttempts = Math.max(1, Number(args['max-attempts'] || '2'));
+  const progressPath = typeof args.progress === 'string' ? args.progress : null;
 
   const inputData = readJsonFile(inputPath, null);
   if (!inputData || !Array.isArray(inputData.items)) {
@@ -487,6 +531,8 @@ async function main() {
     password,
     keyLabel,
     returnUrl: `${BASE_URL}/home`,
+    storageStatePath:
+      typeof args['storage-state'] === 'string' ? args['storage-state'] : null,
   };
 
   const results = items.map((it) => ({
@@ -510,7 +556,7 @@ async function main() {
         (r) => r.status !== RUNNER_STATUS_PENDING,
       ).length,
       windowDays,
-      items: results,
+      ...(progressPath ? {} : { items: results }),
     });
   };
 
@@ -555,7 +601,6 @@ async function main() {
         }
       }
       result.finishedAt = new Date().toISOString();
-      persist('running');
       console.log(
         JSON.stringify({
           lawsuitId: item.lawsuitId,
@@ -564,6 +609,14 @@ async function main() {
           error: result.error,
         }),
       );
+      if (progressPath) {
+        appendJsonLine(progressPath, result);
+        // Andamentos ja' foram pro JSONL — nao acumula em memoria.
+        result.andamentos = [];
+        if ((i + 1) % 25 === 0) persist('running');
+      } else {
+        persist('running');
+      }
     }
 
     persist('completed');
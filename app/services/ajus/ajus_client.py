@@ -17,7 +17,9 @@ Importante:
   - Limite de 20 itens por request — caller particiona se for maior.
   - Resposta retorna 200 mesmo com falhas individuais. Cada item da
     resposta tem `inserido: true|false`. Iterar e tratar parcialmente.
-  - PDF anexado vai como base64 dentro de `arquivos[].base64`.
+  - PDF anexado vai como base64 dentro de `arquivos[].base64`. Em
+    `inserir_prazos_stream` o anexo é passado como caminho e o base64
+    é gerado do disco enquanto o body sai (sem PDF inteiro em memória).
   - Limite por arquivo: 10MB. Limite total por prazo: 30MB.
   - Limite de arquivos por prazo: 10.
   - Logs NÃO incluem login/senha em claro.
@@ -26,7 +28,9 @@ Importante:
 from __future__ import annotations
 
 import base64
+import json
 import logging
+import os
 from dataclasses import dataclass
 from typing import Any, Optional
 
@@ -99,6 +103,7 @@ class AjusClient:
         login: Optional[str] = None,
         senha: Optional[str] = None,
         timeout: int = DEFAULT_TIMEOUT_SECONDS,
+        session: Optional[requests.Session] = None,
     ) -> None:
         self._base_url = (base_url or settings.ajus_base_url).rstrip("/")
         self._bearer = bearer_token or settings.ajus_bearer_token
@@ -106,6 +111,7 @@ class AjusClient:
         self._login = login or settings.ajus_login
         self._senha = senha or settings.ajus_senha
         self._timeout = timeout
+        self._session = session
 
         missing = [
             name
@@ -169,127 +175,268 @@ class AjusClient:
             "AJUS inserir-prazos: enviando %d item(s) — base_url=%s cliente=%s",
             len(itens), self._base_url, self._cliente,
         )
+        _log_payload(itens)
 
-        # Log estrutural do payload (sem base64 cru, sem credenciais).
-        # Critico pra diagnosticar rejeicao "Para concluir o andamento
-        # HABILITACAO" -- queremos saber EXATAMENTE o que sai daqui.
         try:
-            for idx, prazo in enumerate(itens):
-                ident = prazo.get("identificadorAcao") or {}
-                arquivos = prazo.get("arquivos") or []
-                arquivos_summary = []
-                for a in arquivos:
-                    nome = a.get("nome") if isinstance(a, dict) else None
-                    b64 = a.get("base64") if isinstance(a, dict) else ""
-                    arquivos_summary.append({
-                        "nome": nome,
-                        "base64_len": len(b64) if isinstance(b64, str) else None,
-                        "base64_first_24": (
-                            b64[:24] if isinstance(b64, str) else None
-                        ),
-                    })
-                logger.info(
-                    "AJUS payload[%d]: keys=%s identificadorAcao=%s "
-                    "codAndamento=%r situacao=%r dataEvento=%r "
-                    "dataAgendamento=%r dataFatal=%r informacao_len=%d "
-                    "arquivos=%s",
-                    idx,
-                    sorted(prazo.keys()),
-                    ident,
-                    prazo.get("codAndamento"),
-                    prazo.get("situacao"),
-                    prazo.get("dataEvento"),
-                    prazo.get("dataAgendamento"),
-                    prazo.get("dataFatal"),
-                    len(prazo.get("informacao") or ""),
-                    arquivos_summary,
-                )
-        except Exception:  # noqa: BLE001
-            logger.exception("AJUS payload-log falhou (segue mesmo assim)")
-
-        try:
-            response = requests.post(
+            response = self._post(
                 url, json=body, headers=self._headers(), timeout=self._timeout,
             )
         except requests.RequestException as exc:
             raise AjusApiError(f"Falha de rede ao chamar AJUS: {exc}") from exc
 
-        # Log da resposta crua. Independente de status, queremos ver o
-        # que a AJUS realmente devolveu — header importante e body inteiro
-        # (truncado em 4KB pra log nao explodir).
+        return _parse_response(response)
+
+    def inserir_prazos_stream(
+        self, itens: list[dict[str, Any]],
+    ) -> list[AjusInsertResultItem]:
+        """
+        Igual ao `inserir_prazos`, mas os anexos vão como caminho no disco
+        (`arquivos[] = {"nome": ..., "path": ...}`) e o body JSON é gerado
+        em streaming: o base64 de cada PDF é codificado em blocos direto
+        do arquivo enquanto a request sai. Nenhum PDF inteiro (nem o body
+        de ~20 × 10MB) fica em memória.
+
+        O tamanho do body é calculado antes (tamanho do base64 é
+        determinístico), então a request sai com Content-Length e não
+        chunked — a AJUS não garante suporte a Transfer-Encoding.
+
+        Raises: os mesmos de `inserir_prazos`.
+        """
+        if not itens:
+            raise ValueError("inserir_prazos_stream: lista de itens vazia.")
+        if len(itens) > MAX_ITENS_POR_REQUEST:
+            raise ValueError(
+                f"inserir_prazos_stream: máximo de {MAX_ITENS_POR_REQUEST} itens "
+                f"por request — recebeu {len(itens)}. Particione no caller."
+            )
+
+        url = f"{self._base_url}/inserir-prazos"
         logger.info(
-            "AJUS inserir-prazos: resposta status=%d content-type=%s "
-            "body[:4000]=%r",
-            response.status_code,
-            response.headers.get("Content-Type"),
-            response.text[:4000],
+            "AJUS inserir-prazos (stream): enviando %d item(s) — base_url=%s cliente=%s",
+            len(itens), self._base_url, self._cliente,
         )
+        _log_payload(itens)
 
-        if response.status_code == 401:
-            raise AjusApiError(
-                "AJUS retornou 401 — token ou login/senha inválidos. "
-                "Verifique AJUS_BEARER_TOKEN e AJUS_LOGIN/AJUS_SENHA."
-            )
-        if response.status_code == 403:
-            raise AjusApiError("AJUS retornou 403 — acesso negado.")
-        if response.status_code >= 500:
-            raise AjusApiError(
-                f"AJUS retornou {response.status_code}: {response.text[:500]}"
+        try:
+            body = _StreamedPrazosBody(self._login, self._senha, itens)
+            response = self._post(
+                url, data=body, headers=self._headers(), timeout=self._timeout,
             )
-        if response.status_code != 200:
-            raise AjusApiError(
-                f"AJUS retornou status inesperado {response.status_code}: "
-                f"{response.text[:500]}"
+        except (requests.RequestException, OSError) as exc:
+            raise AjusApiError(f"Falha de rede ao chamar AJUS: {exc}") from exc
+
+        return _parse_response(response)
+
+    def _post(self, url: str, **kwargs) -> requests.Response:
+        # Com `session` (dispatcher concorrente) reaproveita o pool de
+        # conexões; sem ela, segue com o `requests.post` avulso de sempre.
+        if self._session is not None:
+            return self._session.post(url, **kwargs)
+        return requests.post(url, **kwargs)
+
+
+def _log_payload(itens: list[dict[str, Any]]) -> None:
+    # Log estrutural do payload (sem base64 cru, sem credenciais).
+    # Critico pra diagnosticar rejeicao "Para concluir o andamento
+    # HABILITACAO" -- queremos saber EXATAMENTE o que sai daqui.
+    try:
+        for idx, prazo in enumerate(itens):
+            ident = prazo.get("identificadorAcao") or {}
+            arquivos = prazo.get("arquivos") or []
+            arquivos_summary = []
+            for a in arquivos:
+                if isinstance(a, dict) and "path" in a:
+                    arquivos_summary.append({
+                        "nome": a.get("nome"),
+                        "path": str(a["path"]),
+                        "base64_len": _base64_len(os.path.getsize(a["path"])),
+                    })
+                    continue
+                nome = a.get("nome") if isinstance(a, dict) else None
+                b64 = a.get("base64") if isinstance(a, dict) else ""
+                arquivos_summary.append({
+                    "nome": nome,
+                    "base64_len": len(b64) if isinstance(b64, str) else None,
+                    "base64_first_24": (
+                        b64[:24] if isinstance(b64, str) else None
+                    ),
+                })
+            logger.info(
+                "AJUS payload[%d]: keys=%s identificadorAcao=%s "
+                "codAndamento=%r situacao=%r dataEvento=%r "
+                "dataAgendamento=%r dataFatal=%r informacao_len=%d "
+                "arquivos=%s",
+                idx,
+                sorted(prazo.keys()),
+                ident,
+                prazo.get("codAndamento"),
+                prazo.get("situacao"),
+                prazo.get("dataEvento"),
+                prazo.get("dataAgendamento"),
+                prazo.get("dataFatal"),
+                len(prazo.get("informacao") or ""),
+                arquivos_summary,
             )
+    except Exception:  # noqa: BLE001
+        logger.exception("AJUS payload-log falhou (segue mesmo assim)")
+
+
+def _parse_response(response: requests.Response) -> list[AjusInsertResultItem]:
+    """Valida status/formato da resposta do inserir-prazos e converte."""
+    # Log da resposta crua. Independente de status, queremos ver o
+    # que a AJUS realmente devolveu — header importante e body inteiro
+    # (truncado em 4KB pra log nao explodir).
+    logger.info(
+        "AJUS inserir-prazos: resposta status=%d content-type=%s "
+        "body[:4000]=%r",
+        response.status_code,
+        response.headers.get("Content-Type"),
+        response.text[:4000],
+    )
 
-        try:
-            data = response.json()
-        except ValueError as exc:
-            raise AjusApiError(
-                f"AJUS retornou body não-JSON: {response.text[:500]}",
-            ) from exc
-
-        if not isinstance(data, list):
-            raise AjusApiError(
-                f"AJUS deveria retornar uma lista de resultados, "
-                f"mas retornou {type(data).__name__}: {str(data)[:300]}"
+    if response.status_code == 401:
+        raise AjusApiError(
+            "AJUS retornou 401 — token ou login/senha inválidos. "
+            "Verifique AJUS_BEARER_TOKEN e AJUS_LOGIN/AJUS_SENHA."
+        )
+    if response.status_code == 403:
+        raise AjusApiError("AJUS retornou 403 — acesso negado.")
+    if response.status_code >= 500:
+        raise AjusApiError(
+            f"AJUS retornou {response.status_code}: {response.text[:500]}"
+        )
+    if response.status_code != 200:
+        raise AjusApiError(
+            f"AJUS retornou status inesperado {response.status_code}: "
+            f"{response.text[:500]}"
+        )
+
+    try:
+        data = response.json()
+    except ValueError as exc:
+        raise AjusApiError(
+            f"AJUS retornou body não-JSON: {response.text[:500]}",
+        ) from exc
+
+    if not isinstance(data, list):
+        raise AjusApiError(
+            f"AJUS deveria retornar uma lista de resultados, "
+            f"mas retornou {type(data).__name__}: {str(data)[:300]}"
+        )
+
+    out: list[AjusInsertResultItem] = []
+    for raw in data:
+        if not isinstance(raw, dict):
+            logger.warning("AJUS item de resposta não-dict: %r", raw)
+            continue
+        out.append(
+            AjusInsertResultItem(
+                inserido=bool(raw.get("inserido")),
+                cod_informacao_judicial=raw.get("codInformacaoJudicial"),
+                msg=raw.get("msg"),
+                identificador_acao=raw.get("identificadorAcao") or {},
             )
+        )
 
-        out: list[AjusInsertResultItem] = []
-        for raw in data:
-            if not isinstance(raw, dict):
-                logger.warning("AJUS item de resposta não-dict: %r", raw)
-                continue
-            out.append(
-                AjusInsertResultItem(
-                    inserido=bool(raw.get("inserido")),
-                    cod_informacao_judicial=raw.get("codInformacaoJudicial"),
-                    msg=raw.get("msg"),
-                    identificador_acao=raw.get("identificadorAcao") or {},
-                )
+    logger.info(
+        "AJUS inserir-prazos: respondeu %d resultado(s); sucessos=%d falhas=%d",
+        len(out),
+        sum(1 for r in out if r.inserido),
+        sum(1 for r in out if not r.inserido),
+    )
+    # Log explicito de cada falha pra acelerar diagnostico — operador
+    # nao precisa abrir o item da fila pra ver o erro_message: ja
+    # aparece direto no log do container.
+    for idx, result in enumerate(out):
+        if not result.inserido:
+            cnj = (
+                result.identificador_acao.get("numeroProcesso")
+                if isinstance(result.identificador_acao, dict)
+                else None
+            )
+            logger.warning(
+                "AJUS inserir-prazos: item[%d] cnj=%s rejeitado — msg=%r",
+                idx, cnj, result.msg,
             )
+    return out
 
-        logger.info(
-            "AJUS inserir-prazos: respondeu %d resultado(s); sucessos=%d falhas=%d",
-            len(out),
-            sum(1 for r in out if r.inserido),
-            sum(1 for r in out if not r.inserido),
+
+# ─── Body em streaming (anexos lidos do disco) ───────────────────────
+
+# Bloco de leitura do PDF: múltiplo de 3 pra que cada pedaço vire base64
+# sem padding no meio (só o último bloco do arquivo pode ter "=").
+_B64_READ_BLOCK = 3 * 64 * 1024
+
+
+def _base64_len(size_bytes: int) -> int:
+    return 4 * ((size_bytes + 2) // 3)
+
+
+class _StreamedPrazosBody:
+    """
+    Body JSON do inserir-prazos montado sob demanda. Os pedaços fixos
+    (credenciais, campos do prazo, nome do anexo) são serializados com
+    `json.dumps` na construção; cada anexo vira uma referência
+    (path, tamanho) que só é lida — e codificada em base64 bloco a
+    bloco — quando a request está saindo.
+
+    `__len__` devolve o tamanho exato do body: o `requests` manda
+    Content-Length em vez de chunked.
+    """
+
+    def __init__(self, login: Optional[str], senha: Optional[str], itens: list[dict[str, Any]]) -> None:
+        parts: list[bytes | tuple[str, int]] = []
+        head = json.dumps({"login": login, "senha": senha})
+        parts.append((head[:-1] + ', "prazos": [').encode("utf-8"))
+        for i, prazo in enumerate(itens):
+            arquivos = prazo.get("arquivos") or []
+            campos = json.dumps({k: v for k, v in prazo.items() if k != "arquivos"})
+            if not arquivos:
+                parts.append(campos.encode("utf-8"))
+            else:
+                sep = ", " if len(campos) > 2 else ""
+                parts.append((campos[:-1] + sep + '"arquivos": [').encode("utf-8"))
+                for j, arq in enumerate(arquivos):
+                    nome = json.dumps({"nome": arq.get("nome")})
+                    parts.append((nome[:-1] + ', "base64": "').encode("utf-8"))
+                    if "path" in arq:
+                        path = str(arq["path"])
+                        parts.append((path, os.path.getsize(path)))
+                    else:
+                        parts.append(str(arq.get("base64") or "").encode("ascii"))
+                    parts.append(b'"}' + (b", " if j < len(arquivos) - 1 else b""))
+                parts.append(b"]}")
+            if i < len(itens) - 1:
+                parts.append(b", ")
+        parts.append(b"]}")
+        self._parts = parts
+
+    def __len__(self) -> int:
+        return sum(
+            len(p) if isinstance(p, bytes) else _base64_len(p[1])
+            for p in self._parts
         )
-        # Log explicito de cada falha pra acelerar diagnostico — operador
-        # nao precisa abrir o item da fila pra ver o erro_message: ja
-        # aparece direto no log do container.
-        for idx, result in enumerate(out):
-            if not result.inserido:
-                cnj = (
-                    result.identificador_acao.get("numeroProcesso")
-                    if isinstance(result.identificador_acao, dict)
-                    else None
-                )
-                logger.warning(
-                    "AJUS inserir-prazos: item[%d] cnj=%s rejeitado — msg=%r",
-                    idx, cnj, result.msg,
+
+    def __iter__(self):
+        for part in self._parts:
+            if isinstance(part, bytes):
+                yield part
+                continue
+            path, size = part
+            lidos = 0
+            with open(path, "rb") as fh:
+                while lidos < size:
+                    block = fh.read(min(_B64_READ_BLOCK, size - lidos))
+                    if not block:
+                        break
+                    lidos += len(block)
+                    yield base64.b64encode(block)
+            if lidos != size:
+                # Content-Length já foi anunciado — arquivo mudou no meio.
+                raise AjusApiError(
+                    f"Anexo {path} mudou de tamanho durante o envio "
+                    f"({lidos} de {size} bytes)."
                 )
-        return out
 
 
 # ─── Helpers de formatação ───────────────────────────────────────────
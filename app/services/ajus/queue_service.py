@@ -9,7 +9,9 @@ Fluxo:
      via UNIQUE em intake_id.
   2. Operador acumula e clica "Enviar lote" → `dispatch_pending_batch`
      pega N pendentes, monta payload AJUS, envia via AjusClient,
-     atualiza fila com resultado (sucesso/erro) item a item.
+     atualiza fila com resultado (sucesso/erro) item a item. Backlog
+     grande → `dispatch_pending_concurrent` (várias requests de 20 em
+     paralelo, body com os PDFs em streaming do disco).
   3. Item com `inserido=true` → status="sucesso", PDF apagado da
      storage AJUS (cleanup), `cod_informacao_judicial` salvo.
   4. Item com `inserido=false` → status="erro", PDF mantido pra retry,
@@ -21,19 +23,24 @@ Storage do PDF:
   - Layout idêntico: `YYYY/MM/DD/{uuid}.pdf`
   - A cópia é feita NO ENFILEIRAMENTO pra sobreviver ao cleanup dos PDFs
     de prazos iniciais (que pode rodar antes do operador disparar AJUS).
+    Com o blob store, a "cópia" é um hard link pro mesmo blob — não ocupa
+    disco de novo (ver `app/services/blob_store`).
 """
 
 from __future__ import annotations
 
 import logging
 import re
-import shutil
 import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import date, datetime, time, timedelta, timezone
 from pathlib import Path
 from typing import Iterable, Optional
 
-from sqlalchemy.orm import Session
+import requests
+from requests.adapters import HTTPAdapter
+from sqlalchemy import update
+from sqlalchemy.orm import Session, selectinload
 
 from app.core.config import settings
 from app.models.ajus import (
@@ -47,6 +54,7 @@ from app.models.ajus import (
     AjusCodAndamento,
 )
 from app.models.prazo_inicial import PrazoInicialIntake
+from app.services import blob_store
 from app.services.ajus.ajus_client import (
     MAX_ITENS_POR_REQUEST,
     AjusApiError,
@@ -138,9 +146,7 @@ def _copy_pdf_to_ajus_storage(source_relative_path: str) -> Optional[str]:
     rel_dir = f"{now.year:04d}/{now.month:02d}/{now.day:02d}"
     filename = f"{uuid.uuid4().hex}.pdf"
     rel_path = f"{rel_dir}/{filename}"
-    dest_abs = _ajus_storage_root() / rel_path
-    dest_abs.parent.mkdir(parents=True, exist_ok=True)
-    shutil.copy2(source_abs, dest_abs)
+    dest_abs = blob_store.store_copy(blob_store.NAMESPACE_AJUS, rel_path, source_abs)
     logger.info(
         "AJUS enqueue: PDF copiado %s → %s",
         source_abs, dest_abs,
@@ -160,9 +166,7 @@ def _save_pdf_bytes_to_ajus_storage(pdf_bytes: bytes) -> Optional[str]:
     rel_dir = f"{now.year:04d}/{now.month:02d}/{now.day:02d}"
     filename = f"{uuid.uuid4().hex}.pdf"
     rel_path = f"{rel_dir}/{filename}"
-    dest_abs = _ajus_storage_root() / rel_path
-    dest_abs.parent.mkdir(parents=True, exist_ok=True)
-    dest_abs.write_bytes(pdf_bytes)
+    dest_abs = blob_store.store_bytes(blob_store.NAMESPACE_AJUS, rel_path, pdf_bytes)
     logger.info(
         "AJUS bulk: PDF salvo em %s (%d bytes)", dest_abs, len(pdf_bytes),
     )
@@ -178,6 +182,7 @@ def _delete_ajus_pdf_copy(relative_path: Optional[str]) -> None:
         if abs_path.exists():
             abs_path.unlink()
             logger.info("AJUS cleanup: PDF apagado %s", abs_path)
+        blob_store.release(blob_store.NAMESPACE_AJUS, relative_path)
     except OSError as exc:  # noqa: BLE001
         logger.warning(
             "AJUS cleanup: falha apagando %s: %s — segue (cron defensivo "
@@ -469,6 +474,118 @@ def _build_arquivos_for_item(
     return [{"nome": "habilitacao.pdf", "base64": base64_str}]
 
 
+def _preflight_arquivo_path(
+    item: "AjusAndamentoQueue",
+    intake: Optional[PrazoInicialIntake],
+    *,
+    label: str = "dispatch",
+) -> Path:
+    """
+    Versão "só disco" do `_build_arquivos_for_item` pro dispatch
+    concorrente: resolve o caminho do PDF (cópia AJUS → fallback pelo
+    intake, re-copiando JIT) e valida magic bytes e tamanho lendo só o
+    cabeçalho + stat. O conteúdo é lido depois, em streaming, pelo
+    `AjusClient.inserir_prazos_stream`.
+
+    `intake` vem pré-carregado pelo caller (1 query pro lote inteiro).
+
+    Raises:
+        AjusAttachmentError: mesmas causas/mensagens do
+            `_build_arquivos_for_item`.
+    """
+    path: Optional[Path] = None
+    if item.pdf_path:
+        candidate = _ajus_storage_abs(item.pdf_path)
+        if candidate.exists():
+            path = candidate
+        else:
+            logger.warning(
+                "AJUS %s: item %d tem pdf_path=%r mas arquivo sumiu — "
+                "tentando fallback pelo intake.",
+                label, item.id, item.pdf_path,
+            )
+
+    source_path = None
+    if intake is not None:
+        source_path = getattr(intake, "habilitacao_pdf_path", None) or intake.pdf_path
+    if path is None and source_path:
+        source_abs = Path(settings.prazos_iniciais_storage_path) / source_path
+        if source_abs.exists():
+            path = source_abs
+            try:
+                new_rel = _copy_pdf_to_ajus_storage(source_path)
+                if new_rel:
+                    item.pdf_path = new_rel
+                    path = _ajus_storage_abs(new_rel)
+            except OSError as exc:  # noqa: BLE001
+                logger.warning(
+                    "AJUS %s: fallback nao conseguiu re-copiar pra storage "
+                    "AJUS (segue com o arquivo de origem): %s", label, exc,
+                )
+
+    if path is None:
+        if item.pdf_path or source_path:
+            details = (
+                f"item.pdf_path={item.pdf_path!r}, "
+                f"intake_id={item.intake_id}, "
+                f"intake_has_source={bool(source_path)}"
+            )
+            raise AjusAttachmentError(
+                "PDF da habilitacao deveria estar anexado mas nao foi "
+                f"possivel ler do storage. Detalhes: {details}. "
+                "Use 'Anexar PDF' nessa linha pra subir manualmente."
+            )
+        raise AjusAttachmentError(
+            "Item sem PDF anexado. Use 'Anexar PDF' pra subir a "
+            "habilitacao antes de disparar."
+        )
+
+    try:
+        size_bytes = path.stat().st_size
+        with path.open("rb") as fh:
+            head = fh.read(16)
+    except OSError as exc:
+        raise AjusAttachmentError(
+            f"Falha lendo o PDF do storage ({path}): {exc}. "
+            "Use 'Anexar PDF' nessa linha pra subir manualmente."
+        ) from exc
+    if size_bytes == 0:
+        raise AjusAttachmentError(
+            "PDF lido tem 0 bytes (arquivo vazio no storage). "
+            "Cancele e re-anexe pelo 'Anexar PDF'."
+        )
+    if not head.startswith(_PDF_MAGIC):
+        raise AjusAttachmentError(
+            f"Arquivo no storage nao tem magic bytes de PDF "
+            f"(primeiros 4 bytes esperados: %PDF, recebidos: 0x{head.hex()}). "
+            "Cancele e re-anexe pelo 'Anexar PDF'."
+        )
+    try:
+        validate_arquivo_size(size_bytes)
+    except ValueError as exc:
+        raise AjusAttachmentError(
+            f"PDF excede limite AJUS de 10MB ({size_bytes} bytes). "
+            "Reduza o arquivo (compressao/divisao) e re-anexe."
+        ) from exc
+    return path
+
+
+def _prazo_entry(item: "AjusAndamentoQueue") -> dict:
+    """Campos do prazo AJUS pra um item da fila (sem `arquivos`)."""
+    entry: dict = {
+        "identificadorAcao": {"numeroProcesso": format_cnj_with_mask(item.cnj_number)},
+        "codAndamento": item.cod_andamento.codigo,
+        "situacao": item.situacao,
+        "dataEvento": format_date_brl(item.data_evento),
+        "dataAgendamento": format_date_brl(item.data_agendamento),
+        "dataFatal": format_date_brl(item.data_fatal),
+        "informacao": item.informacao,
+    }
+    if item.hora_agendamento:
+        entry["horaAgendamento"] = item.hora_agendamento.strftime("%H:%M")
+    return entry
+
+
 # ─── Lógica de fila ──────────────────────────────────────────────────
 
 
@@ -566,13 +683,21 @@ class AjusQueueService:
             )
 
         # Datas: data_evento = hoje (data do recebimento). Agendamento e
-        # fatal somam offsets em dias úteis (CPC) a partir do evento.
+        # fatal somam offsets em dias úteis (CPC) a partir do evento —
+        # no calendário do tribunal/comarca do processo (recessos).
+        from app.services.prazos_iniciais.calendario_forense import (
+            calendario_do_processo,
+        )
+
+        calendar = calendario_do_processo(self.db, intake.cnj_number)
         data_evento = date.today()
         data_agendamento = add_business_days(
             data_evento, cod_andamento.dias_agendamento_offset_uteis,
+            calendar=calendar,
         )
         data_fatal = add_business_days(
             data_evento, cod_andamento.dias_fatal_offset_uteis,
+            calendar=calendar,
         )
 
         # Render do `informacao` com placeholders simples.
@@ -1091,6 +1216,198 @@ class AjusQueueService:
             "blocked_classification_count": len(blocked_by_class),
         }
 
+    def dispatch_pending_concurrent(
+        self,
+        *,
+        max_items: Optional[int] = None,
+        max_concurrent: Optional[int] = None,
+    ) -> dict:
+        """
+        Drena a fila pendente em várias requests de 20 itens ao mesmo
+        tempo — pra backlog de milhares de habilitações, onde o
+        `dispatch_pending_batch` (1 request sequencial por clique, PDF
+        inteiro em memória) não escala.
+
+        - Claim de até `max_items` pendentes com `FOR UPDATE SKIP LOCKED`
+          (2 disparos simultâneos não pegam o mesmo item) → ENVIANDO.
+        - Pre-flight do anexo só no disco (`_preflight_arquivo_path`),
+          intakes carregados numa query só.
+        - Particiona em requests de `MAX_ITENS_POR_REQUEST` e dispara até
+          `max_concurrent` POSTs em paralelo (threads, sessão HTTP
+          compartilhada). Cada body é gerado em streaming, com o base64
+          dos PDFs codificado do disco em blocos.
+        - Resultados aplicados na thread principal (a Session não é
+          thread-safe); intakes de devolução avançam num UPDATE só.
+
+        Falha global de uma request só derruba os itens dela.
+
+        Returns: mesmo shape do dispatch_pending_batch + `requests`.
+        """
+        max_items = max_items or settings.ajus_dispatch_max_items
+        max_concurrent = max(1, max_concurrent or settings.ajus_dispatch_max_concurrent)
+
+        pending = (
+            self.db.query(AjusAndamentoQueue)
+            .options(selectinload(AjusAndamentoQueue.cod_andamento))
+            .filter(AjusAndamentoQueue.status == AJUS_QUEUE_PENDENTE)
+            .order_by(AjusAndamentoQueue.created_at.asc())
+            .with_for_update(skip_locked=True)
+            .limit(max_items)
+            .all()
+        )
+        original_count = len(pending)
+        pending, blocked_by_class = _split_blocked_by_classification(
+            self.db, pending,
+        )
+        empty = {
+            "candidates": original_count,
+            "success_count": 0,
+            "error_count": 0,
+            "success_ids": [],
+            "errored": [],
+            "blocked_classification_count": len(blocked_by_class),
+            "requests": 0,
+        }
+        if not pending:
+            self.db.commit()  # solta os locks dos bloqueados
+            return empty
+
+        for item in pending:
+            item.status = AJUS_QUEUE_ENVIANDO
+        self.db.commit()
+
+        intake_ids = {i.intake_id for i in pending if i.intake_id}
+        intakes = {
+            it.id: it
+            for it in (
+                self.db.query(PrazoInicialIntake)
+                .filter(PrazoInicialIntake.id.in_(intake_ids))
+                .all()
+            )
+        } if intake_ids else {}
+
+        prontos: list[tuple[AjusAndamentoQueue, dict]] = []
+        for item in pending:
+            try:
+                path = _preflight_arquivo_path(
+                    item, intakes.get(item.intake_id), label="dispatch_concurrent",
+                )
+            except AjusAttachmentError as exc:
+                item.status = AJUS_QUEUE_ERRO
+                item.error_message = str(exc)
+                logger.warning(
+                    "AJUS dispatch_concurrent: item %d (cnj=%s) excluido "
+                    "do payload por anexo invalido: %s",
+                    item.id, item.cnj_number, exc,
+                )
+                continue
+            entry = _prazo_entry(item)
+            entry["arquivos"] = [{"nome": "habilitacao.pdf", "path": str(path)}]
+            prontos.append((item, entry))
+        self.db.commit()
+
+        lotes = [
+            prontos[i:i + MAX_ITENS_POR_REQUEST]
+            for i in range(0, len(prontos), MAX_ITENS_POR_REQUEST)
+        ]
+        resultados: list[tuple[list, object]] = []
+        if lotes:
+            try:
+                with requests.Session() as http:
+                    adapter = HTTPAdapter(
+                        pool_connections=1, pool_maxsize=max_concurrent,
+                    )
+                    http.mount("https://", adapter)
+                    http.mount("http://", adapter)
+                    client = AjusClient(session=http)
+                    with ThreadPoolExecutor(
+                        max_workers=min(max_concurrent, len(lotes)),
+                        thread_name_prefix="ajus-dispatch",
+                    ) as pool:
+                        futures = {
+                            pool.submit(
+                                client.inserir_prazos_stream,
+                                [entry for _, entry in lote],
+                            ): lote
+                            for lote in lotes
+                        }
+                        for fut in as_completed(futures):
+                            try:
+                                resultados.append((futures[fut], fut.result()))
+                            except AjusApiError as exc:
+                                logger.exception(
+                                    "AJUS dispatch_concurrent: falha global numa request",
+                                )
+                                resultados.append((futures[fut], exc))
+            except AjusConfigError as exc:
+                logger.exception("AJUS dispatch_concurrent: config ausente")
+                resultados = [(lote, exc) for lote in lotes]
+
+        success_ids: list[int] = []
+        sucesso_intakes: list[int] = []
+        now = datetime.now(timezone.utc)
+        for lote, outcome in resultados:
+            if isinstance(outcome, Exception):
+                for item, _ in lote:
+                    item.status = AJUS_QUEUE_ERRO
+                    item.error_message = f"Falha global no envio: {outcome}"
+                continue
+            # Resposta na mesma ordem do payload.
+            for (item, _), result in zip(lote, outcome):
+                item.dispatched_at = now
+                if result.inserido:
+                    item.status = AJUS_QUEUE_SUCESSO
+                    item.cod_informacao_judicial = result.cod_informacao_judicial
+                    item.error_message = None
+                    success_ids.append(item.id)
+                    if item.intake_id:
+                        sucesso_intakes.append(item.intake_id)
+                else:
+                    item.status = AJUS_QUEUE_ERRO
+                    item.error_message = result.msg or "Falha sem mensagem da AJUS."
+            for item, _ in lote[len(outcome):]:
+                # AJUS devolveu menos resultados que itens enviados.
+                item.status = AJUS_QUEUE_ERRO
+                item.error_message = "AJUS nao devolveu resultado pra este item."
+
+        if sucesso_intakes:
+            # Pin019: devoluções enviadas avançam pra ENVIADA — 1 UPDATE
+            # pro lote inteiro em vez de 1 SELECT por item.
+            from app.models.prazo_inicial import (
+                INTAKE_STATUS_DEVOLUCAO_PENDING,
+                INTAKE_STATUS_DEVOLUCAO_SENT,
+            )
+            self.db.execute(
+                update(PrazoInicialIntake)
+                .where(
+                    PrazoInicialIntake.id.in_(sucesso_intakes),
+                    PrazoInicialIntake.status == INTAKE_STATUS_DEVOLUCAO_PENDING,
+                )
+                .values(status=INTAKE_STATUS_DEVOLUCAO_SENT)
+                .execution_options(synchronize_session="fetch")
+            )
+        self.db.commit()
+
+        errored = [
+            {"id": i.id, "msg": i.error_message}
+            for i in pending if i.status == AJUS_QUEUE_ERRO
+        ]
+        logger.info(
+            "AJUS dispatch_concurrent: %d candidato(s), %d request(s), "
+            "sucessos=%d erros=%d bloqueados=%d",
+            len(pending), len(lotes), len(success_ids), len(errored),
+            len(blocked_by_class),
+        )
+        return {
+            **empty,
+            "candidates": len(pending),
+            "success_count": len(success_ids),
+            "error_count": len(errored),
+            "success_ids": success_ids,
+            "errored": errored,
+            "requests": len(lotes),
+        }
+
     # ── Dispatch pontual (1 item soh) ───────────────────────────────
 
     def dispatch_one(self, item_id: int) -> dict:
@@ -0,0 +1,390 @@
+"""Motor set-based da ingestao do upload de Base Processual.
+
+O loop antigo do `process_upload` fazia, por linha nova, `add` + `flush`
+do processo, outro `flush` do snapshot e o `add` do evento — uma listagem
+de 60k linhas do AJUS virava ~120k round-trips. Aqui o upload roda em duas
+fases:
+
+1. `build_plan`: uma passada pelas linhas calcula os diff hashes e
+   classifica cada cod_ajus (ENTROU / RESSURGIDO / ATUALIZADO / INALTERADO)
+   contra o estado atual, carregado em blocos so' com as colunas que o
+   diff usa. SAIU sai da mesma leitura. Sem nenhuma escrita — o dry-run
+   para aqui.
+2. `apply_plan`: grava em blocos — processos novos e snapshots via
+   INSERT multi-linha com RETURNING (ids voltam na ordem dos parametros),
+   updates por PK em executemany, eventos num INSERT multi-linha.
+
+A semantica dos eventos e dos summaries e' a mesma do loop antigo,
+inclusive pra cod_ajus repetido no arquivo.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from decimal import Decimal
+from typing import Iterable, Iterator, Optional
+
+from sqlalchemy import insert, update
+from sqlalchemy.orm import Session
+
+from app.models.base_processual import (
+    BaseProcessualEvento,
+    BaseProcessualProcesso,
+    BaseProcessualSnapshot,
+    EVENTO_ATUALIZADO,
+    EVENTO_ENTROU,
+    EVENTO_SAIU,
+    PRESENCA_ATIVO,
+    PRESENCA_REMOVIDO,
+)
+from app.services.base_processual.diff import (
+    compute_changed_fields,
+    compute_diff_hash,
+)
+
+# Linhas por INSERT/UPDATE em lote.
+WRITE_CHUNK_SIZE = 1000
+# cod_ajus / ids por IN na leitura do estado atual.
+LOOKUP_CHUNK_SIZE = 5000
+# Cap pra preview de eventos no dry-run (UI nao precisa carregar tudo)
+EVENTOS_PREVIEW_CAP = 200
+
+# Classificacao interna da linha; RESSURGIDO vira evento ENTROU com flag.
+TIPO_ENTROU = "ENTROU"
+TIPO_RESSURGIDO = "RESSURGIDO"
+TIPO_ATUALIZADO = "ATUALIZADO"
+TIPO_INALTERADO = "INALTERADO"
+
+# Campos gerenciados internamente — nao vem do XLSX. Skip em CREATE e em UPDATE.
+_PROCESSO_INTERNAL_FIELDS = {
+    "first_seen_upload_id",
+    "last_seen_upload_id",
+    "removed_at_upload_id",
+    "current_snapshot_id",
+    "presenca_status",
+    "created_at",
+    "updated_at",
+    "id",
+}
+
+# Em UPDATE, alem dos internos, nao toca cod_ajus (chave natural).
+# Em CREATE, cod_ajus SIM precisa entrar (vem do norm).
+_PROCESSO_SKIP_ON_UPDATE = _PROCESSO_INTERNAL_FIELDS | {"cod_ajus"}
+
+_PROCESSO_COLUMNS = frozenset(BaseProcessualProcesso.__table__.columns.keys())
+
+
+def _serialize_for_payload(value):
+    """Serializa Decimal/datetime/date pra JSON-safe (string ISO)."""
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return value
+
+
+def _payload_normalized_json(normalized: dict) -> dict:
+    return {k: _serialize_for_payload(v) for k, v in normalized.items()}
+
+
+def _payload_raw_json(raw: dict) -> dict:
+    return {k: _serialize_for_payload(v) for k, v in raw.items()}
+
+
+def _processo_values(normalized: dict, skip: set[str]) -> dict:
+    return {
+        k: v for k, v in normalized.items() if k not in skip and k in _PROCESSO_COLUMNS
+    }
+
+
+def _chunks(items: list, size: int) -> Iterator[list]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+@dataclass
+class RowPlan:
+    tipo: str
+    cod_ajus: str
+    norm: dict
+    raw: dict
+    diff_hash: str
+    # None pra processo que ainda nao existe (ENTROU, ou repetido dele).
+    processo_id: Optional[int] = None
+    prev_snapshot_id: Optional[int] = None
+    changed_fields: Optional[dict] = None
+    normalized_json: Optional[dict] = None
+
+
+@dataclass
+class IngestPlan:
+    rows: list[RowPlan] = field(default_factory=list)
+    # (processo_id, cod_ajus, current_snapshot_id) dos ATIVOS fora do arquivo.
+    saidas: list[tuple[int, str, Optional[int]]] = field(default_factory=list)
+    novos: int = 0
+    removidos: int = 0
+    atualizados: int = 0
+    inalterados: int = 0
+    eventos_preview: list[dict] = field(default_factory=list)
+
+
+def _load_current_state(db: Session, cods: Iterable[str]) -> dict[str, dict]:
+    """Estado atual por cod_ajus: id, presenca, snapshot corrente e seu hash."""
+    state: dict[str, dict] = {}
+    for chunk in _chunks(sorted(cods), LOOKUP_CHUNK_SIZE):
+        rows = (
+            db.query(
+                BaseProcessualProcesso.id,
+                BaseProcessualProcesso.cod_ajus,
+                BaseProcessualProcesso.presenca_status,
+                BaseProcessualProcesso.current_snapshot_id,
+                BaseProcessualSnapshot.diff_hash,
+            )
+            .outerjoin(
+                BaseProcessualSnapshot,
+                BaseProcessualSnapshot.id == BaseProcessualProcesso.current_snapshot_id,
+            )
+            .filter(BaseProcessualProcesso.cod_ajus.in_(chunk))
+            .all()
+        )
+        for row in rows:
+            state[row.cod_ajus] = {
+                "id": row.id,
+                "presenca": row.presenca_status,
+                "snapshot_id": row.current_snapshot_id,
+                "diff_hash": row.diff_hash,
+            }
+    return state
+
+
+def _load_snapshot_payloads(db: Session, snapshot_ids: Iterable[int]) -> dict[int, dict]:
+    payloads: dict[int, dict] = {}
+    for chunk in _chunks(sorted(set(snapshot_ids)), LOOKUP_CHUNK_SIZE):
+        for snap_id, payload in (
+            db.query(BaseProcessualSnapshot.id, BaseProcessualSnapshot.payload_normalized)
+            .filter(BaseProcessualSnapshot.id.in_(chunk))
+            .all()
+        ):
+            payloads[snap_id] = payload or {}
+    return payloads
+
+
+def build_plan(db: Session, normalized_rows: list[tuple[dict, dict]]) -> IngestPlan:
+    """Classifica todas as linhas contra o estado atual, sem escrever nada."""
+    plan = IngestPlan()
+    cods_no_arquivo = {norm["cod_ajus"] for _, norm in normalized_rows}
+    state = _load_current_state(db, cods_no_arquivo)
+
+    for raw, norm in normalized_rows:
+        cod = norm["cod_ajus"]
+        diff_hash = compute_diff_hash(norm)
+        current = state.get(cod)
+        row = RowPlan(tipo=TIPO_INALTERADO, cod_ajus=cod, norm=norm, raw=raw, diff_hash=diff_hash)
+
+        if current is None:
+            row.tipo = TIPO_ENTROU
+        elif current["presenca"] == PRESENCA_REMOVIDO:
+            row.tipo = TIPO_RESSURGIDO
+        elif current["diff_hash"] != diff_hash:
+            row.tipo = TIPO_ATUALIZADO
+        if current is not None:
+            row.processo_id = current["id"]
+            row.prev_snapshot_id = current["snapshot_id"]
+        if row.tipo != TIPO_INALTERADO and current is not None and current.get("in_file"):
+            # Mesmo cod_ajus repetido no arquivo com conteudo diferente: o
+            # loop antigo caia no UNIQUE (processo, upload) do snapshot.
+            raise ValueError(f"cod_ajus {cod} repetido no arquivo com dados divergentes.")
+
+        plan.rows.append(row)
+        # Linhas seguintes do mesmo cod_ajus enxergam o estado pos-linha.
+        state[cod] = {
+            "id": row.processo_id,
+            "presenca": PRESENCA_ATIVO,
+            "snapshot_id": row.prev_snapshot_id,
+            "diff_hash": diff_hash,
+            "in_file": True,
+        }
+
+    # changed_fields so' precisa do payload anterior dos ATUALIZADOs.
+    before_payloads = _load_snapshot_payloads(
+        db,
+        (r.prev_snapshot_id for r in plan.rows if r.tipo == TIPO_ATUALIZADO and r.prev_snapshot_id),
+    )
+    for row in plan.rows:
+        if row.tipo == TIPO_INALTERADO:
+            plan.inalterados += 1
+            continue
+        row.normalized_json = _payload_normalized_json(row.norm)
+        if row.tipo == TIPO_ATUALIZADO:
+            row.changed_fields = compute_changed_fields(
+                before_payloads.get(row.prev_snapshot_id, {}), row.normalized_json
+            )
+            plan.atualizados += 1
+            _preview(plan, EVENTO_ATUALIZADO, row.cod_ajus, row.changed_fields)
+        elif row.tipo == TIPO_RESSURGIDO:
+            row.changed_fields = {"_ressurgimento": True}
+            plan.novos += 1
+            _preview(plan, EVENTO_ENTROU, row.cod_ajus, row.changed_fields)
+        else:
+            plan.novos += 1
+            _preview(plan, EVENTO_ENTROU, row.cod_ajus, None)
+
+    # SAIDAS — processos ATIVOS hoje que nao vieram no arquivo. Filtra em
+    # Python: NOT IN com dezenas de milhares de cods e' pior que ler a
+    # coluna de ids ativos.
+    if cods_no_arquivo:
+        for proc_id, cod, snapshot_id in (
+            db.query(
+                BaseProcessualProcesso.id,
+                BaseProcessualProcesso.cod_ajus,
+                BaseProcessualProcesso.current_snapshot_id,
+            )
+            .filter(BaseProcessualProcesso.presenca_status == PRESENCA_ATIVO)
+            .yield_per(LOOKUP_CHUNK_SIZE)
+        ):
+            if cod in cods_no_arquivo:
+                continue
+            plan.saidas.append((proc_id, cod, snapshot_id))
+            plan.removidos += 1
+            _preview(plan, EVENTO_SAIU, cod, None)
+
+    return plan
+
+
+def _preview(plan: IngestPlan, tipo: str, cod: str, changed: Optional[dict]) -> None:
+    if len(plan.eventos_preview) < EVENTOS_PREVIEW_CAP:
+        plan.eventos_preview.append({"tipo": tipo, "cod_ajus": cod, "changed_fields": changed})
+
+
+def _insert_returning_ids(db: Session, model, rows: list[dict]) -> list[int]:
+    """INSERT multi-linha com RETURNING id, na ordem de `rows`."""
+    ids: list[int] = []
+    stmt = insert(model).returning(model.id, sort_by_parameter_order=True)
+    for chunk in _chunks(rows, WRITE_CHUNK_SIZE):
+        ids.extend(db.execute(stmt, chunk).scalars().all())
+    return ids
+
+
+def _bulk_update(db: Session, model, rows: list[dict]) -> None:
+    """UPDATE por PK em executemany (cada dict traz `id`)."""
+    for chunk in _chunks(rows, WRITE_CHUNK_SIZE):
+        db.execute(update(model), chunk)
+
+
+def apply_plan(db: Session, plan: IngestPlan, upload_id: int) -> None:
+    """Grava o plano na transacao corrente (commit fica com o chamador)."""
+    # 1) Processos novos — cod_ajus repetido no arquivo so' entra uma vez.
+    novos = [r for r in plan.rows if r.tipo == TIPO_ENTROU]
+    novo_ids = _insert_returning_ids(
+        db,
+        BaseProcessualProcesso,
+        [
+            {
+                **_processo_values(r.norm, _PROCESSO_INTERNAL_FIELDS),
+                "presenca_status": PRESENCA_ATIVO,
+                "first_seen_upload_id": upload_id,
+                "last_seen_upload_id": upload_id,
+            }
+            for r in novos
+        ],
+    )
+    id_by_cod = {r.cod_ajus: pid for r, pid in zip(novos, novo_ids)}
+    for row in plan.rows:
+        if row.processo_id is None:
+            row.processo_id = id_by_cod[row.cod_ajus]
+
+    # 2) Snapshots de tudo que nao e' INALTERADO.
+    changed = [r for r in plan.rows if r.tipo != TIPO_INALTERADO]
+    snapshot_ids = _insert_returning_ids(
+        db,
+        BaseProcessualSnapshot,
+        [
+            {
+                "processo_id": r.processo_id,
+                "upload_id": upload_id,
+                "cod_ajus": r.cod_ajus,
+                "payload_normalized": r.normalized_json,
+                "payload_raw": _payload_raw_json(r.raw),
+                "diff_hash": r.diff_hash,
+            }
+            for r in changed
+        ],
+    )
+
+    # 3) Estado do processo: campos do XLSX + ponteiro pro snapshot novo.
+    updates_by_tipo: dict[str, list[dict]] = {
+        TIPO_ENTROU: [],
+        TIPO_RESSURGIDO: [],
+        TIPO_ATUALIZADO: [],
+    }
+    for row, snapshot_id in zip(changed, snapshot_ids):
+        values = {"id": row.processo_id, "current_snapshot_id": snapshot_id}
+        if row.tipo != TIPO_ENTROU:
+            values.update(_processo_values(row.norm, _PROCESSO_SKIP_ON_UPDATE))
+            values["last_seen_upload_id"] = upload_id
+        if row.tipo == TIPO_RESSURGIDO:
+            values["presenca_status"] = PRESENCA_ATIVO
+            values["removed_at_upload_id"] = None
+        updates_by_tipo[row.tipo].append(values)
+    for rows in updates_by_tipo.values():
+        _bulk_update(db, BaseProcessualProcesso, rows)
+
+    # 4) INALTERADO — so' campos volateis.
+    _bulk_update(
+        db,
+        BaseProcessualProcesso,
+        [
+            {
+                "id": r.processo_id,
+                "last_seen_upload_id": upload_id,
+                "dias_ult_atualizacao": r.norm.get("dias_ult_atualizacao"),
+                "data_ult_andamento": r.norm.get("data_ult_andamento"),
+            }
+            for r in plan.rows
+            if r.tipo == TIPO_INALTERADO
+        ],
+    )
+
+    # 5) SAIU
+    saida_ids = [proc_id for proc_id, _, _ in plan.saidas]
+    for chunk in _chunks(saida_ids, LOOKUP_CHUNK_SIZE):
+        db.query(BaseProcessualProcesso).filter(
+            BaseProcessualProcesso.id.in_(chunk)
+        ).update(
+            {
+                BaseProcessualProcesso.presenca_status: PRESENCA_REMOVIDO,
+                BaseProcessualProcesso.removed_at_upload_id: upload_id,
+            },
+            synchronize_session=False,
+        )
+
+    # 6) Eventos, na mesma ordem do loop antigo (arquivo, depois saidas).
+    eventos = [
+        {
+            "upload_id": upload_id,
+            "processo_id": row.processo_id,
+            "cod_ajus": row.cod_ajus,
+            "tipo_evento": EVENTO_ATUALIZADO if row.tipo == TIPO_ATUALIZADO else EVENTO_ENTROU,
+            "changed_fields": row.changed_fields,
+            "snapshot_before_id": row.prev_snapshot_id,
+            "snapshot_after_id": snapshot_id,
+        }
+        for row, snapshot_id in zip(changed, snapshot_ids)
+    ]
+    eventos.extend(
+        {
+            "upload_id": upload_id,
+            "processo_id": proc_id,
+            "cod_ajus": cod,
+            "tipo_evento": EVENTO_SAIU,
+            "changed_fields": None,
+            "snapshot_before_id": snapshot_id,
+            "snapshot_after_id": None,
+        }
+        for proc_id, cod, snapshot_id in plan.saidas
+    )
+    for chunk in _chunks(eventos, WRITE_CHUNK_SIZE):
+        db.execute(insert(BaseProcessualEvento), chunk)
@@ -1,7 +1,10 @@
 """Geracao XLSX dos 6 templates de relatorio do Base Processual (Chunk 5).
 
-Cada template recebe (db, params) e devolve (xlsx_bytes, total_rows, params_normalized).
-A funcao publica `dispatch_template(name, db, params)` roteia por nome.
+Cada template recebe (db, params, writer) — escreve as abas num
+`StreamingXlsxWriter` (write-only, memoria constante) — e devolve
+(total_rows, params_normalized). A funcao publica
+`dispatch_template(name, db, params, target_path)` roteia por nome e grava o
+XLSX direto em disco.
 
 V1: SINCRONO — pra carteira de ~6k processos cada template gera em < 5s.
 V2: APScheduler pra >50k processos + queueing.
@@ -9,15 +12,12 @@ V2: APScheduler pra >50k processos + queueing.
 
 from __future__ import annotations
 
-import io
 import logging
 from datetime import date, datetime, timedelta
 from decimal import Decimal
-from typing import Any, Callable, Optional
+from typing import Any, Callable, Iterator, Optional
 
-import openpyxl
-from openpyxl.styles import Alignment, Font, PatternFill
-from openpyxl.utils import get_column_letter
+from openpyxl.styles import Font, PatternFill
 from sqlalchemy import types as sa_types
 from sqlalchemy import func as sa_func
 from sqlalchemy.orm import Session
@@ -39,6 +39,7 @@ from app.models.base_processual import (
     PRESENCA_ATIVO,
     PRESENCA_REMOVIDO,
 )
+from app.services.xlsx_stream import StreamingXlsxWriter
 
 logger = logging.getLogger(__name__)
 
@@ -47,49 +48,12 @@ logger = logging.getLogger(__name__)
 HEADER_FILL = PatternFill("solid", fgColor="E5E7EB")
 HEADER_FONT = Font(bold=True, color="111827")
 
+# Linhas por round-trip nas listas grandes (cursor server-side no Postgres).
+_YIELD_PER = 1000
 
-def _new_workbook() -> openpyxl.Workbook:
-    wb = openpyxl.Workbook()
-    # remove a sheet default — vamos criar tudo via _add_sheet
-    if wb.active is not None:
-        wb.remove(wb.active)
-    return wb
-
-
-def _add_sheet(
-    wb: openpyxl.Workbook,
-    name: str,
-    headers: list[str],
-    rows: list[list],
-) -> int:
-    """Cria sheet com header estilizado + rows. Retorna numero de rows escritas."""
-    ws = wb.create_sheet(title=name[:31])
-    ws.append(headers)
-    for cell in ws[1]:
-        cell.fill = HEADER_FILL
-        cell.font = HEADER_FONT
-        cell.alignment = Alignment(horizontal="left", vertical="center")
-    for r in rows:
-        ws.append(r)
-    # Auto widths conservadores: limita 8..60.
-    for i, _ in enumerate(headers, start=1):
-        col_letter = get_column_letter(i)
-        max_len = 8
-        for r in range(1, min(ws.max_row + 1, 200)):
-            v = ws.cell(row=r, column=i).value
-            if v is None:
-                continue
-            ln = len(str(v))
-            if ln > max_len:
-                max_len = ln
-        ws.column_dimensions[col_letter].width = min(60, max_len + 2)
-    return len(rows)
-
-
-def _wb_to_bytes(wb: openpyxl.Workbook) -> bytes:
-    out = io.BytesIO()
-    wb.save(out)
-    return out.getvalue()
+
+def _new_writer() -> StreamingXlsxWriter:
+    return StreamingXlsxWriter(header_font=HEADER_FONT, header_fill=HEADER_FILL)
 
 
 def _parse_date(value: Any) -> Optional[date]:
@@ -143,7 +107,9 @@ def _iso_or_blank(dt) -> str:
 # ============================================================================
 
 
-def gen_movimentacao_semanal(db: Session, params: dict) -> tuple[bytes, int, dict]:
+def gen_movimentacao_semanal(
+    db: Session, params: dict, writer: StreamingXlsxWriter
+) -> tuple[int, dict]:
     """Sumario por dia + listas Entraram/Sairam/Atualizados no periodo.
 
     Default: ultimos 7 dias (incluindo hoje).
@@ -158,8 +124,6 @@ def gen_movimentacao_semanal(db: Session, params: dict) -> tuple[bytes, int, dic
     end = datetime(to_d.year, to_d.month, to_d.day) + timedelta(days=1)
     norm_params = {"from_date": from_d.isoformat(), "to_date": to_d.isoformat()}
 
-    wb = _new_workbook()
-
     # Sumario por dia
     day_col = sa_func.cast(BaseProcessualEvento.created_at, sa_types.Date)
     rows_sum = (
@@ -188,8 +152,8 @@ def gen_movimentacao_semanal(db: Session, params: dict) -> tuple[bytes, int, dic
             bucket.get(EVENTO_ATUALIZADO, 0) + bucket.get(EVENTO_ATUALIZADO_MANUAL, 0),
         ])
         cur += timedelta(days=1)
-    _add_sheet(
-        wb, "Sumário",
+    writer.add_sheet(
+        "Sumário",
         ["Data", "Entraram", "Saíram", "Atualizados"],
         sumario_rows,
     )
@@ -206,50 +170,38 @@ def gen_movimentacao_semanal(db: Session, params: dict) -> tuple[bytes, int, dic
             .filter(BaseProcessualEvento.created_at < end)
             .filter(BaseProcessualEvento.tipo_evento.in_(tipos))
             .order_by(BaseProcessualEvento.created_at.desc())
-            .all()
         )
 
     headers_ev = [
         "Quando", "Cód AJUS", "CNJ", "Empresa", "UF",
         "Comarca", "Responsável", "Valor causa", "Tipo",
     ]
-    entrou_list = []
-    for e, p in _query_eventos([EVENTO_ENTROU]):
-        entrou_list.append([
-            _iso_or_blank(e.created_at), e.cod_ajus,
-            p.numero_processo_mascarado or "", p.empresa or "", p.uf or "",
-            p.comarca or "", p.usuario_responsavel or "",
-            _money(p.valor_causa), e.tipo_evento,
-        ])
-    _add_sheet(wb, "Entraram", headers_ev, entrou_list)
-
-    saiu_list = []
-    for e, p in _query_eventos([EVENTO_SAIU]):
-        saiu_list.append([
-            _iso_or_blank(e.created_at), e.cod_ajus,
-            p.numero_processo_mascarado or "", p.empresa or "", p.uf or "",
-            p.comarca or "", p.usuario_responsavel or "",
-            _money(p.valor_causa), e.tipo_evento,
-        ])
-    _add_sheet(wb, "Saíram", headers_ev, saiu_list)
-
-    headers_atu = headers_ev + ["Campos mudados"]
-    atu_list = []
-    for e, p in _query_eventos([EVENTO_ATUALIZADO, EVENTO_ATUALIZADO_MANUAL]):
-        campos = ", ".join((e.changed_fields or {}).keys()) if e.changed_fields else ""
-        atu_list.append([
-            _iso_or_blank(e.created_at), e.cod_ajus,
-            p.numero_processo_mascarado or "", p.empresa or "", p.uf or "",
-            p.comarca or "", p.usuario_responsavel or "",
-            _money(p.valor_causa), e.tipo_evento, campos,
-        ])
-    _add_sheet(wb, "Atualizados", headers_atu, atu_list)
 
-    total = len(entrou_list) + len(saiu_list) + len(atu_list)
-    return _wb_to_bytes(wb), total, norm_params
+    def _linhas_eventos(tipos: list[str], *, com_campos: bool = False) -> Iterator[list]:
+        for e, p in _query_eventos(tipos).yield_per(_YIELD_PER):
+            linha = [
+                _iso_or_blank(e.created_at), e.cod_ajus,
+                p.numero_processo_mascarado or "", p.empresa or "", p.uf or "",
+                p.comarca or "", p.usuario_responsavel or "",
+                _money(p.valor_causa), e.tipo_evento,
+            ]
+            if com_campos:
+                linha.append(", ".join((e.changed_fields or {}).keys()) if e.changed_fields else "")
+            yield linha
+
+    total = writer.add_sheet("Entraram", headers_ev, _linhas_eventos([EVENTO_ENTROU]))
+    total += writer.add_sheet("Saíram", headers_ev, _linhas_eventos([EVENTO_SAIU]))
+    total += writer.add_sheet(
+        "Atualizados",
+        headers_ev + ["Campos mudados"],
+        _linhas_eventos([EVENTO_ATUALIZADO, EVENTO_ATUALIZADO_MANUAL], com_campos=True),
+    )
+    return total, norm_params
 
 
-def gen_carteira_responsavel(db: Session, params: dict) -> tuple[bytes, int, dict]:
+def gen_carteira_responsavel(
+    db: Session, params: dict, writer: StreamingXlsxWriter
+) -> tuple[int, dict]:
     """Agrupado por usuario_responsavel da carteira ATIVA: totais e valores."""
     empresa = (params.get("empresa") or "").strip() or None
     norm_params = {"empresa": empresa} if empresa else {}
@@ -283,16 +235,17 @@ def gen_carteira_responsavel(db: Session, params: dict) -> tuple[bytes, int, dic
         for r in rows_data
     ]
 
-    wb = _new_workbook()
-    _add_sheet(
-        wb, "Carteira por responsável",
+    writer.add_sheet(
+        "Carteira por responsável",
         ["Responsável", "Ativos", "Σ Valor causa", "Σ Valor contingência"],
         rows,
     )
-    return _wb_to_bytes(wb), len(rows), norm_params
+    return len(rows), norm_params
 
 
-def gen_sumicos_periodo(db: Session, params: dict) -> tuple[bytes, int, dict]:
+def gen_sumicos_periodo(
+    db: Session, params: dict, writer: StreamingXlsxWriter
+) -> tuple[int, dict]:
     """Processos com presenca=REMOVIDO + SAIU dentro do periodo (default = mes corrente)."""
     from_d = _parse_date(params.get("from_date"))
     to_d = _parse_date(params.get("to_date"))
@@ -332,17 +285,18 @@ def gen_sumicos_periodo(db: Session, params: dict) -> tuple[bytes, int, dict]:
             _partes_nomes(p.autores_json),
         ])
 
-    wb = _new_workbook()
-    _add_sheet(
-        wb, "Sumiços",
+    writer.add_sheet(
+        "Sumiços",
         ["Saiu em", "Cód AJUS", "CNJ", "Empresa", "UF", "Comarca",
          "Responsável", "Valor causa", "Autores"],
         rows,
     )
-    return _wb_to_bytes(wb), len(rows), norm_params
+    return len(rows), norm_params
 
 
-def gen_variacao_valores(db: Session, params: dict) -> tuple[bytes, int, dict]:
+def gen_variacao_valores(
+    db: Session, params: dict, writer: StreamingXlsxWriter
+) -> tuple[int, dict]:
     """Processos com mudanca de valor_causa >= threshold_pct comparando.
 
     Compara o snapshot ATUAL (current_snapshot_id) com o PRIMEIRO snapshot
@@ -400,17 +354,18 @@ def gen_variacao_valores(db: Session, params: dict) -> tuple[bytes, int, dict]:
         ])
     rows.sort(key=lambda r: abs(r[8]), reverse=True)
 
-    wb = _new_workbook()
-    _add_sheet(
-        wb, "Variação de valores",
+    writer.add_sheet(
+        "Variação de valores",
         ["Cód AJUS", "CNJ", "Empresa", "UF", "Responsável",
          "Antes", "Depois", "Δ Absoluto", "Δ %"],
         rows,
     )
-    return _wb_to_bytes(wb), len(rows), norm_params
+    return len(rows), norm_params
 
 
-def gen_carteira_uf_comarca(db: Session, params: dict) -> tuple[bytes, int, dict]:
+def gen_carteira_uf_comarca(
+    db: Session, params: dict, writer: StreamingXlsxWriter
+) -> tuple[int, dict]:
     """Pivot por UF + comarca: total ATIVOS e soma valor causa.
 
     Sheet 1: UF-Comarca detalhado. Sheet 2: UF agregado.
@@ -466,17 +421,18 @@ def gen_carteira_uf_comarca(db: Session, params: dict) -> tuple[bytes, int, dict
         for r in rows_uf
     ]
 
-    wb = _new_workbook()
-    _add_sheet(
-        wb, "UF + Comarca",
+    writer.add_sheet(
+        "UF + Comarca",
         ["UF", "Comarca", "Ativos", "Σ Valor causa"],
         detail,
     )
-    _add_sheet(wb, "UF", ["UF", "Ativos", "Σ Valor causa"], agreg)
-    return _wb_to_bytes(wb), len(detail) + len(agreg), norm_params
+    writer.add_sheet("UF", ["UF", "Ativos", "Σ Valor causa"], agreg)
+    return len(detail) + len(agreg), norm_params
 
 
-def gen_snapshot_completo(db: Session, params: dict) -> tuple[bytes, int, dict]:
+def gen_snapshot_completo(
+    db: Session, params: dict, writer: StreamingXlsxWriter
+) -> tuple[int, dict]:
     """Estado atual de todos os processos da carteira (1 linha por processo).
 
     Default: presenca=ATIVO_NA_BASE. Para incluir REMOVIDOs, passe presenca_status=ambos.
@@ -503,57 +459,56 @@ def gen_snapshot_completo(db: Session, params: dict) -> tuple[bytes, int, dict]:
         "Distribuído em", "Processo Virtual", "Nº Contrato",
         "Autores", "Réus", "Presença na base",
     ]
-    rows = []
-    for p in q.yield_per(500):
-        rows.append([
-            p.cod_ajus,
-            p.numero_processo_mascarado or "",
-            p.numero_pasta or "",
-            p.numero_interno or "",
-            p.acao_principal or "",
-            p.materia or "",
-            p.risco_prob_perda or "",
-            p.tipo_acao or "",
-            p.polo or "",
-            p.natureza or "",
-            p.numero_vara or "",
-            p.foro or "",
-            p.comarca or "",
-            p.uf or "",
-            p.empresa,
-            p.grupo_responsavel or "",
-            p.usuario_responsavel or "",
-            p.escritorio_responsavel or "",
-            p.situacao_processo,
-            p.justica_honorario or "",
-            _money(p.valor_causa),
-            _money(p.valor_prev_acordo),
-            _money(p.valor_acordo),
-            _money(p.valor_discutido),
-            _money(p.valor_exito),
-            _money(p.valor_condenacao),
-            _money(p.valor_contingencia),
-            p.ult_andamento or "",
-            _iso_or_blank(p.data_ult_andamento),
-            p.dias_ult_atualizacao if p.dias_ult_atualizacao is not None else "",
-            _iso_or_blank(p.distribuido_em),
-            "Sim" if p.processo_virtual else ("Não" if p.processo_virtual is False else ""),
-            p.numero_contrato or "",
-            _partes_nomes(p.autores_json),
-            _partes_nomes(p.reus_json),
-            p.presenca_status,
-        ])
 
-    wb = _new_workbook()
-    _add_sheet(wb, "Snapshot", headers, rows)
-    return _wb_to_bytes(wb), len(rows), norm_params
+    def _linhas() -> Iterator[list]:
+        for p in q.yield_per(_YIELD_PER):
+            yield [
+                p.cod_ajus,
+                p.numero_processo_mascarado or "",
+                p.numero_pasta or "",
+                p.numero_interno or "",
+                p.acao_principal or "",
+                p.materia or "",
+                p.risco_prob_perda or "",
+                p.tipo_acao or "",
+                p.polo or "",
+                p.natureza or "",
+                p.numero_vara or "",
+                p.foro or "",
+                p.comarca or "",
+                p.uf or "",
+                p.empresa,
+                p.grupo_responsavel or "",
+                p.usuario_responsavel or "",
+                p.escritorio_responsavel or "",
+                p.situacao_processo,
+                p.justica_honorario or "",
+                _money(p.valor_causa),
+                _money(p.valor_prev_acordo),
+                _money(p.valor_acordo),
+                _money(p.valor_discutido),
+                _money(p.valor_exito),
+                _money(p.valor_condenacao),
+                _money(p.valor_contingencia),
+                p.ult_andamento or "",
+                _iso_or_blank(p.data_ult_andamento),
+                p.dias_ult_atualizacao if p.dias_ult_atualizacao is not None else "",
+                _iso_or_blank(p.distribuido_em),
+                "Sim" if p.processo_virtual else ("Não" if p.processo_virtual is False else ""),
+                p.numero_contrato or "",
+                _partes_nomes(p.autores_json),
+                _partes_nomes(p.reus_json),
+                p.presenca_status,
+            ]
+
+    return writer.add_sheet("Snapshot", headers, _linhas()), norm_params
 
 
 # ============================================================================
 # Roteador
 # ============================================================================
 
-_REGISTRY: dict[str, Callable[[Session, dict], tuple[bytes, int, dict]]] = {
+_REGISTRY: dict[str, Callable[[Session, dict, StreamingXlsxWriter], tuple[int, dict]]] = {
     EXPORT_TPL_MOVIMENTACAO_SEMANAL: gen_movimentacao_semanal,
     EXPORT_TPL_CARTEIRA_RESPONSAVEL: gen_carteira_responsavel,
     EXPORT_TPL_SUMICOS_PERIODO: gen_sumicos_periodo,
@@ -564,16 +519,22 @@ _REGISTRY: dict[str, Callable[[Session, dict], tuple[bytes, int, dict]]] = {
 
 
 def dispatch_template(
-    template_name: str, db: Session, params: Optional[dict]
-) -> tuple[bytes, int, dict]:
-    """Dispara o template adequado. Levanta ValueError se nao existir."""
+    template_name: str, db: Session, params: Optional[dict], target_path: str
+) -> tuple[int, int, dict]:
+    """Gera o template em `target_path`. Levanta ValueError se nao existir.
+
+    Retorna (file_bytes, total_rows, params_normalized).
+    """
     fn = _REGISTRY.get(template_name)
     if fn is None:
         raise ValueError(
             f"Template desconhecido: {template_name!r}. "
             f"Validos: {sorted(_REGISTRY.keys())}"
         )
-    return fn(db, params or {})
+    writer = _new_writer()
+    total_rows, norm_params = fn(db, params or {}, writer)
+    file_bytes = writer.save(target_path)
+    return file_bytes, total_rows, norm_params
 
 
 def list_templates() -> list[str]:
@@ -73,11 +73,9 @@ def get_exports_dir() -> Path:
     return path
 
 
-def save_export_xlsx(export_id: int, content: bytes) -> str:
-    """Salva XLSX de export em disco. Naming determinista por export_id."""
-    target = get_exports_dir() / f"export-{export_id}.xlsx"
-    target.write_bytes(content)
-    return str(target)
+def export_xlsx_path(export_id: int) -> str:
+    """Caminho do XLSX de export (o exporter grava direto nele). Naming determinista por export_id."""
+    return str(get_exports_dir() / f"export-{export_id}.xlsx")
 
 
 def read_export_xlsx(storage_path: str) -> bytes:
@@ -8,9 +8,10 @@ Fluxo:
 Idempotencia: file_sha256 UNIQUE — reupload identico devolve resultado
 anterior com status=IDEMPOTENTE.
 
-Dry-run: executa pipeline real, captura summaries, da rollback e cria
-uma linha DRY_RUN separada com os summaries + eventos_preview pra UI.
-Commit posterior re-le o XLSX do disco e executa pipeline real.
+Dry-run: classifica tudo (bulk_ingest.build_plan) sem escrever, da
+rollback da linha PROCESSANDO e cria uma linha DRY_RUN separada com os
+summaries + eventos_preview pra UI. Commit posterior re-le o XLSX do
+disco e executa pipeline real.
 """
 
 from __future__ import annotations
@@ -19,7 +20,6 @@ import hashlib
 import logging
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
-from decimal import Decimal
 from pathlib import Path
 from typing import Optional
 
@@ -30,11 +30,6 @@ from app.models.base_processual import (
     BaseProcessualProcesso,
     BaseProcessualSnapshot,
     BaseProcessualUpload,
-    EVENTO_ATUALIZADO,
-    EVENTO_ENTROU,
-    EVENTO_SAIU,
-    PRESENCA_ATIVO,
-    PRESENCA_REMOVIDO,
     UPLOAD_STATUS_CONCLUIDO,
     UPLOAD_STATUS_DRY_RUN,
     UPLOAD_STATUS_FALHOU,
@@ -42,9 +37,9 @@ from app.models.base_processual import (
     UPLOAD_STATUS_LOTE_HISTORICO,
     UPLOAD_STATUS_PROCESSANDO,
 )
-from app.services.base_processual.diff import (
-    compute_changed_fields,
-    compute_diff_hash,
+from app.services.base_processual.bulk_ingest import (
+    apply_plan,
+    build_plan,
 )
 from app.services.base_processual.parsers import (
     normalize_str,
@@ -68,8 +63,6 @@ logger = logging.getLogger(__name__)
 MAX_PARSING_FAILURE_RATIO = 0.05
 # TTL de dry-runs antes de commit (planning: 30min)
 DRY_RUN_TTL_MINUTES = 30
-# Cap pra preview de eventos no dry-run (UI nao precisa carregar tudo)
-EVENTOS_PREVIEW_CAP = 200
 
 
 @dataclass
@@ -155,52 +148,6 @@ def normalize_row(raw: dict) -> dict:
     }
 
 
-def _serialize_for_payload(value):
-    """Serializa Decimal/datetime/date pra JSON-safe (string ISO)."""
-    if isinstance(value, Decimal):
-        return str(value)
-    if isinstance(value, datetime):
-        return value.isoformat()
-    if hasattr(value, "isoformat"):
-        return value.isoformat()
-    return value
-
-
-def _payload_normalized_json(normalized: dict) -> dict:
-    return {k: _serialize_for_payload(v) for k, v in normalized.items()}
-
-
-def _payload_raw_json(raw: dict) -> dict:
-    return {k: _serialize_for_payload(v) for k, v in raw.items()}
-
-
-# Campos gerenciados internamente — nao vem do XLSX. Skip em CREATE e em UPDATE.
-_PROCESSO_INTERNAL_FIELDS = {
-    "first_seen_upload_id",
-    "last_seen_upload_id",
-    "removed_at_upload_id",
-    "current_snapshot_id",
-    "presenca_status",
-    "created_at",
-    "updated_at",
-    "id",
-}
-
-# Em UPDATE, alem dos internos, nao toca cod_ajus (chave natural).
-# Em CREATE, cod_ajus SIM precisa entrar (vem do norm).
-_PROCESSO_SKIP_ON_UPDATE = _PROCESSO_INTERNAL_FIELDS | {"cod_ajus"}
-
-
-def _apply_normalized_to_processo(
-    processo: BaseProcessualProcesso, normalized: dict
-) -> None:
-    for k, v in normalized.items():
-        if k in _PROCESSO_SKIP_ON_UPDATE:
-            continue
-        if hasattr(processo, k):
-            setattr(processo, k, v)
-
-
 def process_upload(
     db: Session,
     *,
@@ -324,200 +271,14 @@ def process_upload(
                 ),
             )
 
-        cods_no_arquivo = {n["cod_ajus"] for _, n in normalized_rows}
-
-        # Pre-carrega processos existentes que vao casar — evita N+1.
-        existing_by_cod: dict[str, BaseProcessualProcesso] = {}
-        if cods_no_arquivo:
-            for p in (
-                db.query(BaseProcessualProcesso)
-                .filter(BaseProcessualProcesso.cod_ajus.in_(cods_no_arquivo))
-                .all()
-            ):
-                existing_by_cod[p.cod_ajus] = p
-
-        novos = removidos = atualizados = inalterados = 0
-        eventos_preview: list[dict] = []
-
-        # 3) Loop principal — ENTROU / RESSURGIDO / ATUALIZADO / INALTERADO
-        for raw, norm in normalized_rows:
-            cod = norm["cod_ajus"]
-            diff_hash = compute_diff_hash(norm)
-            processo = existing_by_cod.get(cod)
-            normalized_json = _payload_normalized_json(norm)
-            raw_json = _payload_raw_json(raw)
-
-            if processo is None:
-                # ENTROU — usa _INTERNAL_FIELDS (nao _SKIP_ON_UPDATE) pra
-                # NAO filtrar cod_ajus no INSERT.
-                processo = BaseProcessualProcesso(
-                    **{
-                        k: v
-                        for k, v in norm.items()
-                        if k not in _PROCESSO_INTERNAL_FIELDS
-                        and hasattr(BaseProcessualProcesso, k)
-                    }
-                )
-                processo.presenca_status = PRESENCA_ATIVO
-                processo.first_seen_upload_id = upload_id
-                processo.last_seen_upload_id = upload_id
-                db.add(processo)
-                db.flush()
-                snapshot = BaseProcessualSnapshot(
-                    processo_id=processo.id,
-                    upload_id=upload_id,
-                    cod_ajus=cod,
-                    payload_normalized=normalized_json,
-                    payload_raw=raw_json,
-                    diff_hash=diff_hash,
-                )
-                db.add(snapshot)
-                db.flush()
-                processo.current_snapshot_id = snapshot.id
-                evento = BaseProcessualEvento(
-                    upload_id=upload_id,
-                    processo_id=processo.id,
-                    cod_ajus=cod,
-                    tipo_evento=EVENTO_ENTROU,
-                    changed_fields=None,
-                    snapshot_before_id=None,
-                    snapshot_after_id=snapshot.id,
-                )
-                db.add(evento)
-                novos += 1
-                if len(eventos_preview) < EVENTOS_PREVIEW_CAP:
-                    eventos_preview.append(
-                        {"tipo": EVENTO_ENTROU, "cod_ajus": cod, "changed_fields": None}
-                    )
-                existing_by_cod[cod] = processo
-            elif processo.presenca_status == PRESENCA_REMOVIDO:
-                # RESSURGIMENTO — reabre como ENTROU com flag _ressurgimento
-                _apply_normalized_to_processo(processo, norm)
-                processo.presenca_status = PRESENCA_ATIVO
-                processo.removed_at_upload_id = None
-                processo.last_seen_upload_id = upload_id
-                db.flush()
-                snapshot = BaseProcessualSnapshot(
-                    processo_id=processo.id,
-                    upload_id=upload_id,
-                    cod_ajus=cod,
-                    payload_normalized=normalized_json,
-                    payload_raw=raw_json,
-                    diff_hash=diff_hash,
-                )
-                db.add(snapshot)
-                db.flush()
-                prev_snapshot_id = processo.current_snapshot_id
-                processo.current_snapshot_id = snapshot.id
-                evento = BaseProcessualEvento(
-                    upload_id=upload_id,
-                    processo_id=processo.id,
-                    cod_ajus=cod,
-                    tipo_evento=EVENTO_ENTROU,
-                    changed_fields={"_ressurgimento": True},
-                    snapshot_before_id=prev_snapshot_id,
-                    snapshot_after_id=snapshot.id,
-                )
-                db.add(evento)
-                novos += 1
-                if len(eventos_preview) < EVENTOS_PREVIEW_CAP:
-                    eventos_preview.append(
-                        {
-                            "tipo": EVENTO_ENTROU,
-                            "cod_ajus": cod,
-                            "changed_fields": {"_ressurgimento": True},
-                        }
-                    )
-            else:
-                # ATIVO + ja existe — checa diff
-                current_snapshot = None
-                if processo.current_snapshot_id:
-                    current_snapshot = (
-                        db.query(BaseProcessualSnapshot)
-                        .filter(
-                            BaseProcessualSnapshot.id == processo.current_snapshot_id
-                        )
-                        .first()
-                    )
-                old_hash = current_snapshot.diff_hash if current_snapshot else None
-                if old_hash == diff_hash:
-                    # INALTERADO — atualiza so' campos volateis
-                    processo.last_seen_upload_id = upload_id
-                    processo.dias_ult_atualizacao = norm.get("dias_ult_atualizacao")
-                    processo.data_ult_andamento = norm.get("data_ult_andamento")
-                    inalterados += 1
-                else:
-                    # ATUALIZADO
-                    before_payload = (
-                        current_snapshot.payload_normalized
-                        if current_snapshot
-                        else {}
-                    ) or {}
-                    changed = compute_changed_fields(before_payload, normalized_json)
-                    _apply_normalized_to_processo(processo, norm)
-                    processo.last_seen_upload_id = upload_id
-                    db.flush()
-                    snapshot = BaseProcessualSnapshot(
-                        processo_id=processo.id,
-                        upload_id=upload_id,
-                        cod_ajus=cod,
-                        payload_normalized=normalized_json,
-                        payload_raw=raw_json,
-                        diff_hash=diff_hash,
-                    )
-                    db.add(snapshot)
-                    db.flush()
-                    prev_snapshot_id = processo.current_snapshot_id
-                    processo.current_snapshot_id = snapshot.id
-                    evento = BaseProcessualEvento(
-                        upload_id=upload_id,
-                        processo_id=processo.id,
-                        cod_ajus=cod,
-                        tipo_evento=EVENTO_ATUALIZADO,
-                        changed_fields=changed,
-                        snapshot_before_id=prev_snapshot_id,
-                        snapshot_after_id=snapshot.id,
-                    )
-                    db.add(evento)
-                    atualizados += 1
-                    if len(eventos_preview) < EVENTOS_PREVIEW_CAP:
-                        eventos_preview.append(
-                            {
-                                "tipo": EVENTO_ATUALIZADO,
-                                "cod_ajus": cod,
-                                "changed_fields": changed,
-                            }
-                        )
-
-        # 4) Detecta SAIDAS — processos ATIVOS hoje que nao vieram no arquivo
-        if cods_no_arquivo:
-            ativos_query = (
-                db.query(BaseProcessualProcesso)
-                .filter(BaseProcessualProcesso.presenca_status == PRESENCA_ATIVO)
-                .filter(~BaseProcessualProcesso.cod_ajus.in_(cods_no_arquivo))
-            )
-            for proc in ativos_query.all():
-                proc.presenca_status = PRESENCA_REMOVIDO
-                proc.removed_at_upload_id = upload_id
-                evento = BaseProcessualEvento(
-                    upload_id=upload_id,
-                    processo_id=proc.id,
-                    cod_ajus=proc.cod_ajus,
-                    tipo_evento=EVENTO_SAIU,
-                    changed_fields=None,
-                    snapshot_before_id=proc.current_snapshot_id,
-                    snapshot_after_id=None,
-                )
-                db.add(evento)
-                removidos += 1
-                if len(eventos_preview) < EVENTOS_PREVIEW_CAP:
-                    eventos_preview.append(
-                        {
-                            "tipo": EVENTO_SAIU,
-                            "cod_ajus": proc.cod_ajus,
-                            "changed_fields": None,
-                        }
-                    )
+        # 3) Classifica tudo numa passada (sem escrita) — ENTROU / RESSURGIDO /
+        # ATUALIZADO / INALTERADO / SAIU. Dry-run nao precisa de mais nada.
+        plan = build_plan(db, normalized_rows)
+        novos = plan.novos
+        removidos = plan.removidos
+        atualizados = plan.atualizados
+        inalterados = plan.inalterados
+        eventos_preview = plan.eventos_preview
 
         upload.summary_novos = novos
         upload.summary_removidos = removidos
@@ -559,6 +320,9 @@ def process_upload(
                 eventos_preview=eventos_preview,
             )
 
+        # 4) Persiste em lote: INSERT multi-linha + RETURNING, UPDATE por PK.
+        apply_plan(db, plan, upload_id)
+
         upload.status = UPLOAD_STATUS_CONCLUIDO
         upload.committed_at = datetime.now(timezone.utc)
         db.commit()
@@ -18,7 +18,11 @@ from app.models.batch_execution import (
     BatchExecutionItem,
 )
 from app.models.legal_one import LegalOneOffice, LegalOneTaskSubType, LegalOneUser
-from app.services.batch_utils import build_task_fingerprint, load_successful_fingerprints
+from app.services.batch_utils import (
+    InFlightFingerprints,
+    build_task_fingerprint,
+    probe_successful_fingerprints,
+)
 
 from .base_strategy import BaseStrategy
 
@@ -311,7 +315,17 @@ class SpreadsheetStrategy(BaseStrategy):
         rows = extracted["rows"]
 
         caches = await self._load_caches()
-        existing_fingerprints = load_successful_fingerprints(self.db)
+        # Resolve todas as linhas antes: o histórico é sondado uma vez, só
+        # com os fingerprints desta planilha.
+        resolved = []
+        for row_data in rows:
+            try:
+                resolved.append((self._resolve_row_context(row_data, caches)["fingerprint"], None))
+            except Exception as exc:
+                resolved.append((None, exc))
+        existing_fingerprints = probe_successful_fingerprints(
+            self.db, [fingerprint for fingerprint, _ in resolved if fingerprint]
+        )
         seen_fingerprints = set()
 
         preview_rows = []
@@ -320,13 +334,13 @@ class SpreadsheetStrategy(BaseStrategy):
         duplicate_rows_in_file = 0
         duplicate_rows_in_history = 0
 
-        for row_index, row_data in enumerate(rows, start=2):
+        for row_index, (row_data, (fingerprint, resolve_error)) in enumerate(zip(rows, resolved), start=2):
             errors = []
             warnings = []
 
             try:
-                context = self._resolve_row_context(row_data, caches)
-                fingerprint = context["fingerprint"]
+                if resolve_error is not None:
+                    raise resolve_error
                 if fingerprint in seen_fingerprints:
                     warnings.append("Duplicada na propria planilha.")
                     duplicate_rows_in_file += 1
@@ -380,7 +394,9 @@ class SpreadsheetStrategy(BaseStrategy):
         self.db.commit()
 
         caches = await self._load_caches()
-        known_fingerprints = load_successful_fingerprints(self.db)
+        known_fingerprints = InFlightFingerprints(
+            probe=lambda fingerprints: probe_successful_fingerprints(self.db, fingerprints)
+        )
         lawsuit_lookup, prefetched_cnj_numbers = self.preload_lawsuits_by_cnj(rows)
 
         for row_data in rows:
@@ -406,6 +422,7 @@ class SpreadsheetStrategy(BaseStrategy):
                 lawsuit_lookup=lawsuit_lookup,
                 prefetched_cnj_numbers=prefetched_cnj_numbers,
             )
+            known_fingerprints.release_pending()
             if success:
                 success_count += 1
             else:
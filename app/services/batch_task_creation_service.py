@@ -1,11 +1,15 @@
 import asyncio
 import logging
+import threading
+import time as time_module
+from collections import OrderedDict
+from dataclasses import dataclass, field
 from datetime import datetime, time, timedelta, timezone
 from typing import Any
 from zoneinfo import ZoneInfo
 
-from sqlalchemy import and_, or_
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import and_, exists, func, or_
+from sqlalchemy.orm import Session, joinedload, sessionmaker
 
 from app.api.v1.schemas import BatchInteractiveCreationRequest, BatchTaskCreationRequest
 from app.core.config import settings
@@ -29,10 +33,105 @@ from app.services.batch_strategies.base_strategy import BaseStrategy
 from app.services.batch_strategies.onerequest_strategy import OnerequestStrategy
 from app.services.batch_strategies.onesid_strategy import OnesidStrategy
 from app.services.batch_strategies.spreadsheet_strategy import SpreadsheetStrategy
-from app.services.batch_utils import build_task_fingerprint, load_successful_fingerprints
+from app.services.batch_utils import (
+    FingerprintReservations,
+    InFlightFingerprints,
+    build_task_fingerprint,
+    make_fingerprint_probe,
+)
 from app.services.legal_one_client import LegalOneApiClient
 
 
+@dataclass
+class _ExecutionPrefetch:
+    """
+    O que um bloco reaproveita do bloco anterior da mesma execução neste
+    processo: caches de escritório/usuário/subtipo (objetos destacados da
+    session, só com atributos já carregados — servem pra todas as lanes) e
+    os processos já buscados no L1 por CNJ.
+    """
+
+    caches: dict[str, Any] | None = None
+    lawsuit_lookup: dict[str, dict[str, Any]] = field(default_factory=dict)
+    prefetched_cnj_numbers: set[str] = field(default_factory=set)
+
+
+# Execuções recentes deste processo (cada thread do worker pega blocos de
+# poucas execuções por vez); a mais antiga sai primeiro.
+_PREFETCH_MAX_EXECUTIONS = 8
+_prefetch_by_execution: "OrderedDict[int, _ExecutionPrefetch]" = OrderedDict()
+_prefetch_lock = threading.Lock()
+
+
+def _execution_prefetch(execution_id: int) -> _ExecutionPrefetch:
+    with _prefetch_lock:
+        prefetch = _prefetch_by_execution.get(execution_id)
+        if prefetch is None:
+            prefetch = _prefetch_by_execution[execution_id] = _ExecutionPrefetch()
+        _prefetch_by_execution.move_to_end(execution_id)
+        while len(_prefetch_by_execution) > _PREFETCH_MAX_EXECUTIONS:
+            _prefetch_by_execution.popitem(last=False)
+        return prefetch
+
+
+def _drop_execution_prefetch(execution_id: int) -> None:
+    with _prefetch_lock:
+        _prefetch_by_execution.pop(execution_id, None)
+
+
+class _ItemLane:
+    """
+    Uma "faixa" de execução de itens do lote: session + handler próprios.
+
+    Lanes com `threaded=True` rodam cada item num thread (o client do L1 é
+    síncrono) — a session da lane só é usada por um item por vez. O handler
+    é montado na 1ª execução via `handler_factory(db)`, já no thread da lane.
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        *,
+        handler=None,
+        handler_factory=None,
+        threaded: bool = False,
+        worker_id: str | None = None,
+    ):
+        self.db = db
+        self._handler = handler
+        self._handler_factory = handler_factory
+        self._threaded = threaded
+        # Com claim por bloco: só processa itens que ainda são deste worker
+        # (lease vencido + reivindicado por outro = pula).
+        self._worker_id = worker_id
+
+    async def _run_item(self, item_id: int, fingerprints: InFlightFingerprints | None) -> str | None:
+        if self._handler is None:
+            self._handler = await self._handler_factory(self.db)
+        item = self.db.query(BatchExecutionItem).filter(BatchExecutionItem.id == item_id).first()
+        if not item or item.status not in {"PENDENTE", "REPROCESSANDO"}:
+            return None
+        if self._worker_id is not None and item.claimed_by != self._worker_id:
+            return None
+        if fingerprints is not None:
+            fingerprints.bind_item(item.id)
+        try:
+            await self._handler(item)
+        finally:
+            if fingerprints is not None:
+                fingerprints.release_pending()
+        return item.status
+
+    async def run(self, item_id: int, fingerprints: InFlightFingerprints | None = None) -> str | None:
+        if not self._threaded:
+            return await self._run_item(item_id, fingerprints)
+        return await asyncio.to_thread(asyncio.run, self._run_item(item_id, fingerprints))
+
+    def close(self) -> None:
+        if self._threaded:
+            self.db.close()
+
+
 class BatchTaskCreationService:
     def __init__(self, db: Session, client: LegalOneApiClient | None):
         self.db = db
@@ -78,6 +177,7 @@ class BatchTaskCreationService:
         return success_count, failure_count
 
     def _finalize_execution(self, execution_log: BatchExecution, *, cancelled: bool = False) -> None:
+        _drop_execution_prefetch(execution_log.id)
         success_count, failure_count = self._refresh_execution_counts(execution_log.id)
         execution_log = self.db.query(BatchExecution).filter(BatchExecution.id == execution_log.id).first()
         if not execution_log:
@@ -182,13 +282,48 @@ class BatchTaskCreationService:
 
         return lawsuit_lookup, prefetched, None
 
-    def _handle_preload_stop(self, execution_id: int, signal: str) -> None:
+    def _preload_execution_lawsuits(
+        self,
+        prefetch: _ExecutionPrefetch,
+        cnj_numbers: list[Any],
+        execution_id: int,
+        worker_id: str,
+    ) -> tuple[dict[str, dict[str, Any]], set[str], str | None]:
+        """`_preload_lawsuits_chunked` só com os CNJs do bloco que nenhum
+        bloco anterior da execução (neste processo) já buscou."""
+        missing = [
+            cnj_number
+            for cnj_number in cnj_numbers
+            if self._normalize_cnj_number(cnj_number) not in prefetch.prefetched_cnj_numbers
+        ]
+        lawsuit_lookup, prefetched, stop_signal = self._preload_lawsuits_chunked(
+            missing, execution_id, worker_id,
+        )
+        if stop_signal is None:
+            prefetch.lawsuit_lookup.update(lawsuit_lookup)
+            prefetch.prefetched_cnj_numbers.update(prefetched)
+        return prefetch.lawsuit_lookup, prefetch.prefetched_cnj_numbers, stop_signal
+
+    async def _spreadsheet_caches(self, prefetch: _ExecutionPrefetch) -> dict[str, Any]:
+        """Caches da planilha, carregados 1x por execução numa session à
+        parte e destacados (sem lazy load: `parent_type` vem no joinedload),
+        então a session do worker e as das lanes usam os mesmos objetos."""
+        if prefetch.caches is None:
+            db = sessionmaker(bind=self.db.get_bind(), autocommit=False, autoflush=False)()
+            try:
+                prefetch.caches = await SpreadsheetStrategy(db, self.client)._load_caches()
+            finally:
+                db.close()
+        return prefetch.caches
+
+    def _handle_preload_stop(self, execution_id: int, signal: str, worker_id: str) -> None:
         execution = self.db.query(BatchExecution).filter(BatchExecution.id == execution_id).first()
         if not execution:
             return
         if signal == BATCH_STATUS_CANCELLED:
             self._finalize_execution(execution, cancelled=True)
         elif signal == BATCH_STATUS_PAUSED:
+            self._release_item_claims(execution_id, worker_id)
             self._clear_execution_claim(execution)
             self.db.commit()
         # MISSING / LOST: outra replica assumiu — nada a finalizar aqui.
@@ -259,69 +394,187 @@ class BatchTaskCreationService:
         self.db.commit()
         return execution_log
 
-    def _claimable_execution_filter(self, now_utc: datetime):
-        return or_(
-            BatchExecution.status == BATCH_STATUS_PENDING,
-            and_(
-                BatchExecution.status == BATCH_STATUS_PROCESSING,
+    def _claimable_item_filter(self, now_utc: datetime):
+        return and_(
+            BatchExecutionItem.status.in_(["PENDENTE", "REPROCESSANDO"]),
+            or_(
+                BatchExecutionItem.claim_expires_at.is_(None),
+                BatchExecutionItem.claim_expires_at < now_utc,
+            ),
+        )
+
+    def _finalize_drained_executions(self, now_utc: datetime) -> None:
+        """
+        Fecha execuções sem nada a reivindicar que ninguém vai finalizar:
+        lote sem itens (toda linha filtrada no upload) ou worker que morreu
+        depois de gravar o último bloco e antes de `_finalize_execution`.
+        Só com lease da execução vencido/nulo — um worker vivo finaliza a
+        própria.
+        """
+        has_unfinished = exists().where(
+            BatchExecutionItem.execution_id == BatchExecution.id,
+            BatchExecutionItem.status.in_(["PENDENTE", "REPROCESSANDO"]),
+        )
+        drained = (
+            self.db.query(BatchExecution)
+            .filter(
+                BatchExecution.processor_type.in_(QUEUEABLE_BATCH_PROCESSORS),
+                BatchExecution.status.in_([BATCH_STATUS_PENDING, BATCH_STATUS_PROCESSING]),
                 or_(
                     BatchExecution.lease_expires_at.is_(None),
                     BatchExecution.lease_expires_at < now_utc,
                 ),
-            ),
+                ~has_unfinished,
+            )
+            .order_by(BatchExecution.id.asc())
+            .limit(10)
+            .all()
         )
+        for execution in drained:
+            self._finalize_execution(execution)
 
-    def claim_next_execution(self, worker_id: str) -> int | None:
+    def claim_next_item_chunk(
+        self,
+        worker_id: str,
+        chunk_size: int | None = None,
+    ) -> tuple[int, list[int]] | None:
+        """
+        Reivindica um bloco de itens pendentes pra este worker.
+
+        Vários workers dividem a mesma execução: cada um pega até
+        `batch_claim_chunk_size` itens com `FOR UPDATE SKIP LOCKED` (no
+        sqlite o SKIP LOCKED some e o UPDATE condicional garante o claim) e
+        um lease por item, renovado pelo heartbeat. Escalonamento justo: a
+        execução com MENOS itens em voo vem primeiro (empate: a mais antiga)
+        — um lote interativo pequeno não espera atrás de uma planilha de
+        5.000 linhas, ele pega o próximo worker livre.
+
+        Retorna (execution_id, item_ids) ou None se não há nada a fazer.
+        """
         now_utc = self._utcnow()
+        chunk_size = max(1, chunk_size or settings.batch_claim_chunk_size)
+        self._finalize_drained_executions(now_utc)
+
+        in_flight = (
+            self.db.query(
+                BatchExecutionItem.execution_id.label("execution_id"),
+                func.count(BatchExecutionItem.id).label("claimed"),
+            )
+            .filter(
+                BatchExecutionItem.status.in_(["PENDENTE", "REPROCESSANDO"]),
+                BatchExecutionItem.claim_expires_at >= now_utc,
+            )
+            .group_by(BatchExecutionItem.execution_id)
+            .subquery()
+        )
+        has_claimable = exists().where(
+            BatchExecutionItem.execution_id == BatchExecution.id,
+            self._claimable_item_filter(now_utc),
+        )
         candidate_rows = (
             self.db.query(BatchExecution.id)
+            .outerjoin(in_flight, in_flight.c.execution_id == BatchExecution.id)
             .filter(
                 BatchExecution.processor_type.in_(QUEUEABLE_BATCH_PROCESSORS),
-                self._claimable_execution_filter(now_utc),
+                BatchExecution.status.in_([BATCH_STATUS_PENDING, BATCH_STATUS_PROCESSING]),
+                has_claimable,
+            )
+            .order_by(
+                func.coalesce(in_flight.c.claimed, 0).asc(),
+                BatchExecution.start_time.asc(),
+                BatchExecution.id.asc(),
             )
-            .order_by(BatchExecution.start_time.asc(), BatchExecution.id.asc())
             .limit(10)
             .all()
         )
 
+        lease_until = now_utc + self._lease_duration
         for candidate in candidate_rows:
-            updated = (
+            item_ids = [
+                row.id
+                for row in (
+                    self.db.query(BatchExecutionItem.id)
+                    .filter(
+                        BatchExecutionItem.execution_id == candidate.id,
+                        self._claimable_item_filter(now_utc),
+                    )
+                    .order_by(BatchExecutionItem.id.asc())
+                    .limit(chunk_size)
+                    .with_for_update(skip_locked=True)
+                    .all()
+                )
+            ]
+            if not item_ids:
+                self.db.rollback()
+                continue
+
+            claimed = (
+                self.db.query(BatchExecutionItem)
+                .filter(
+                    BatchExecutionItem.id.in_(item_ids),
+                    self._claimable_item_filter(now_utc),
+                )
+                .update(
+                    {
+                        BatchExecutionItem.claimed_by: worker_id,
+                        BatchExecutionItem.claim_expires_at: lease_until,
+                    },
+                    synchronize_session=False,
+                )
+            )
+            # Pausa/cancelamento entre o SELECT e aqui: não reivindica.
+            execution_updated = (
                 self.db.query(BatchExecution)
                 .filter(
                     BatchExecution.id == candidate.id,
-                    self._claimable_execution_filter(now_utc),
+                    BatchExecution.status.in_([BATCH_STATUS_PENDING, BATCH_STATUS_PROCESSING]),
                 )
                 .update(
                     {
                         BatchExecution.status: BATCH_STATUS_PROCESSING,
                         BatchExecution.worker_id: worker_id,
                         BatchExecution.heartbeat_at: now_utc,
-                        BatchExecution.lease_expires_at: now_utc + self._lease_duration,
+                        BatchExecution.lease_expires_at: lease_until,
                         BatchExecution.end_time: None,
                     },
                     synchronize_session=False,
                 )
             )
-            if updated:
+            if claimed and execution_updated:
                 self.db.commit()
-                return candidate.id
+                if claimed < len(item_ids):
+                    # Sqlite sem SKIP LOCKED: outro worker levou parte do bloco.
+                    item_ids = [
+                        row.id
+                        for row in self.db.query(BatchExecutionItem.id).filter(
+                            BatchExecutionItem.id.in_(item_ids),
+                            BatchExecutionItem.claimed_by == worker_id,
+                        )
+                    ]
+                return candidate.id, item_ids
             self.db.rollback()
 
         return None
 
-    def heartbeat_execution(self, execution_id: int, worker_id: str) -> bool:
+    def heartbeat_execution(
+        self,
+        execution_id: int,
+        worker_id: str,
+        item_ids: list[int] | None = None,
+    ) -> bool:
+        """Renova o lease do bloco deste worker (e marca a execução como viva)."""
         now_utc = self._utcnow()
+        lease_until = now_utc + self._lease_duration
         updated = (
             self.db.query(BatchExecution)
             .filter(
                 BatchExecution.id == execution_id,
-                BatchExecution.worker_id == worker_id,
                 BatchExecution.status == BATCH_STATUS_PROCESSING,
             )
             .update(
                 {
                     BatchExecution.heartbeat_at: now_utc,
-                    BatchExecution.lease_expires_at: now_utc + self._lease_duration,
+                    BatchExecution.lease_expires_at: lease_until,
                 },
                 synchronize_session=False,
             )
@@ -329,10 +582,69 @@ class BatchTaskCreationService:
         if not updated:
             self.db.rollback()
             return False
+        item_filter = [
+            BatchExecutionItem.execution_id == execution_id,
+            BatchExecutionItem.claimed_by == worker_id,
+            BatchExecutionItem.status.in_(["PENDENTE", "REPROCESSANDO"]),
+        ]
+        if item_ids is not None:
+            item_filter.append(BatchExecutionItem.id.in_(item_ids))
+        self.db.query(BatchExecutionItem).filter(*item_filter).update(
+            {BatchExecutionItem.claim_expires_at: lease_until},
+            synchronize_session=False,
+        )
         self.db.commit()
         return True
 
+    def _release_item_claims(self, execution_id: int, worker_id: str) -> None:
+        """Devolve à fila os itens ainda pendentes reivindicados por este worker."""
+        self.db.query(BatchExecutionItem).filter(
+            BatchExecutionItem.execution_id == execution_id,
+            BatchExecutionItem.claimed_by == worker_id,
+            BatchExecutionItem.status.in_(["PENDENTE", "REPROCESSANDO"]),
+        ).update(
+            {
+                BatchExecutionItem.claimed_by: None,
+                BatchExecutionItem.claim_expires_at: None,
+            },
+            synchronize_session=False,
+        )
+        self.db.commit()
+
+    def _fail_item_claims(
+        self, execution_id: int, worker_id: str, item_ids: list[int], error: str
+    ) -> None:
+        """Marca como falha os itens ainda pendentes do bloco deste worker."""
+        self.db.query(BatchExecutionItem).filter(
+            BatchExecutionItem.execution_id == execution_id,
+            BatchExecutionItem.id.in_(item_ids),
+            BatchExecutionItem.claimed_by == worker_id,
+            BatchExecutionItem.status.in_(["PENDENTE", "REPROCESSANDO"]),
+        ).update(
+            {
+                BatchExecutionItem.status: "FALHA",
+                BatchExecutionItem.error_message: error,
+                BatchExecutionItem.claimed_by: None,
+                BatchExecutionItem.claim_expires_at: None,
+            },
+            synchronize_session=False,
+        )
+        self.db.commit()
+
+    def _has_unfinished_items(self, execution_id: int) -> bool:
+        return (
+            self.db.query(BatchExecutionItem.id)
+            .filter(
+                BatchExecutionItem.execution_id == execution_id,
+                BatchExecutionItem.status.in_(["PENDENTE", "REPROCESSANDO"]),
+            )
+            .first()
+            is not None
+        )
+
     def _get_control_signal(self, execution_id: int, worker_id: str) -> str:
+        # Com vários workers na mesma execução, `worker_id` da execução é só
+        # o último a reivindicar — a posse real é o claim de cada item.
         execution = (
             self.db.query(BatchExecution)
             .filter(BatchExecution.id == execution_id)
@@ -344,10 +656,57 @@ class BatchTaskCreationService:
             return BATCH_STATUS_PAUSED
         if execution.status == BATCH_STATUS_CANCELLED:
             return BATCH_STATUS_CANCELLED
-        if execution.worker_id != worker_id:
-            return "LOST"
         return execution.status
 
+    @staticmethod
+    def _interactive_fingerprint(
+        payload: dict[str, Any],
+        subtype: LegalOneTaskSubType,
+        end_datetime_iso: str,
+    ) -> str:
+        return build_task_fingerprint(
+            process_number=payload["cnj_number"],
+            subtype_identifier=subtype.external_id,
+            responsible_identifier=payload["responsible_external_id"],
+            due_datetime_iso=end_datetime_iso,
+            origin_identifier=subtype.parent_type.external_id,
+        )
+
+    def _interactive_fingerprints(self, payloads: list[dict[str, Any]]) -> list[str]:
+        """Fingerprints do bloco pra sonda em lote; linha inválida fica de fora
+        (o item falha depois, na validação de sempre)."""
+        subtypes: dict[int, LegalOneTaskSubType] = {}
+        fingerprints = []
+        for payload in payloads:
+            try:
+                subtype_id = int(payload["sub_type_id"])
+                if subtype_id not in subtypes:
+                    subtypes[subtype_id] = self._resolve_interactive_subtype(subtype_id)
+                end_datetime_iso = self._build_interactive_deadline_iso(
+                    payload["due_date"],
+                    payload.get("due_time"),
+                )
+                fingerprints.append(
+                    self._interactive_fingerprint(payload, subtypes[subtype_id], end_datetime_iso)
+                )
+            except Exception:
+                continue
+        return fingerprints
+
+    @staticmethod
+    def _spreadsheet_fingerprints(
+        strategy: SpreadsheetStrategy,
+        rows: list[dict[str, Any]],
+        caches: dict[str, Any],
+    ) -> list[str]:
+        fingerprints = []
+        for row in rows:
+            try:
+                fingerprints.append(strategy._resolve_row_context(row, caches)["fingerprint"])
+            except Exception:
+                continue
+        return fingerprints
+
     async def _process_interactive_item(
         self,
         log_item: BatchExecutionItem,
@@ -363,13 +722,7 @@ class BatchTaskCreationService:
                 payload["due_date"],
                 payload.get("due_time"),
             )
-            fingerprint = build_task_fingerprint(
-                process_number=payload["cnj_number"],
-                subtype_identifier=subtype.external_id,
-                responsible_identifier=payload["responsible_external_id"],
-                due_datetime_iso=end_datetime_iso,
-                origin_identifier=subtype.parent_type.external_id,
-            )
+            fingerprint = self._interactive_fingerprint(payload, subtype, end_datetime_iso)
             log_item.fingerprint = fingerprint
 
             if fingerprint in known_fingerprints:
@@ -427,91 +780,210 @@ class BatchTaskCreationService:
             self.db.commit()
             return False
 
+    def _flush_execution_counts(self, execution_id: int, counters: dict[str, int]) -> None:
+        """Soma (não sobrescreve) os contadores em memória — vários workers
+        gravam na mesma execução. Zera `counters` depois de gravar."""
+        if not counters["SUCESSO"] and not counters["FALHA"]:
+            return
+        self.db.query(BatchExecution).filter(BatchExecution.id == execution_id).update(
+            {
+                BatchExecution.success_count: func.coalesce(BatchExecution.success_count, 0) + counters["SUCESSO"],
+                BatchExecution.failure_count: func.coalesce(BatchExecution.failure_count, 0) + counters["FALHA"],
+            },
+            synchronize_session=False,
+        )
+        self.db.commit()
+        counters["SUCESSO"] = counters["FALHA"] = 0
+
+    def _check_execution_control(
+        self,
+        execution_id: int,
+        worker_id: str,
+        item_ids: list[int] | None = None,
+    ) -> str | None:
+        """Sinal de parada (pausado/cancelado/perdido) ou None pra seguir. Renova o lease."""
+        signal = self._get_control_signal(execution_id, worker_id)
+        if signal in {BATCH_STATUS_PAUSED, BATCH_STATUS_CANCELLED, "MISSING", "LOST"}:
+            return signal
+        if not self.heartbeat_execution(execution_id, worker_id, item_ids):
+            return "LOST"
+        return None
+
+    def _build_item_lanes(
+        self, concurrency: int, item_handler, handler_factory, worker_id: str | None,
+    ) -> list["_ItemLane"]:
+        if concurrency <= 1 or handler_factory is None:
+            return [_ItemLane(self.db, handler=item_handler, worker_id=worker_id)]
+        # Uma session por lane, no mesmo engine da session do worker.
+        lane_session = sessionmaker(bind=self.db.get_bind(), autocommit=False, autoflush=False)
+        return [
+            _ItemLane(
+                lane_session(),
+                handler_factory=handler_factory,
+                threaded=True,
+                worker_id=worker_id,
+            )
+            for _ in range(concurrency)
+        ]
+
     async def _process_items_loop(
         self,
         execution_id: int,
         worker_id: str,
         *,
         item_handler,
+        handler_factory=None,
+        fingerprints: InFlightFingerprints | None = None,
+        item_ids: list[int] | None = None,
     ) -> None:
-        item_ids = [
-            row.id
-            for row in (
-                self.db.query(BatchExecutionItem.id)
-                .filter(
-                    BatchExecutionItem.execution_id == execution_id,
-                    BatchExecutionItem.status.in_(["PENDENTE", "REPROCESSANDO"]),
+        """
+        Executa em pipeline os itens do bloco reivindicado (`item_ids`) — ou,
+        sem bloco, todos os pendentes do lote.
+
+        Até `batch_item_concurrency` itens em voo, cada lane com sua própria
+        session (`handler_factory(db)` monta o handler da lane); sem factory
+        roda em série com `item_handler` na session do worker. Sinal de
+        controle + heartbeat rodam a cada `batch_control_check_seconds` e os
+        contadores de sucesso/falha ficam em memória, gravados a cada
+        `batch_counts_flush_seconds` — o COUNT real só roda no fim
+        (`_finalize_execution`), pelo worker que drenar o último bloco.
+        """
+        chunk_ids = item_ids
+        if item_ids is None:
+            item_ids = [
+                row.id
+                for row in (
+                    self.db.query(BatchExecutionItem.id)
+                    .filter(
+                        BatchExecutionItem.execution_id == execution_id,
+                        BatchExecutionItem.status.in_(["PENDENTE", "REPROCESSANDO"]),
+                    )
+                    .order_by(BatchExecutionItem.id.asc())
+                    .all()
                 )
-                .order_by(BatchExecutionItem.id.asc())
-                .all()
-            )
-        ]
-
-        for item_id in item_ids:
-            signal = self._get_control_signal(execution_id, worker_id)
-            if signal == BATCH_STATUS_PAUSED:
-                execution = self.db.query(BatchExecution).filter(BatchExecution.id == execution_id).first()
-                if execution:
-                    self._clear_execution_claim(execution)
-                    self.db.commit()
-                return
-            if signal == BATCH_STATUS_CANCELLED:
-                execution = self.db.query(BatchExecution).filter(BatchExecution.id == execution_id).first()
-                if execution:
-                    self._finalize_execution(execution, cancelled=True)
-                return
-            if signal in {"MISSING", "LOST"}:
-                return
-            if not self.heartbeat_execution(execution_id, worker_id):
-                return
-
-            item = self.db.query(BatchExecutionItem).filter(BatchExecutionItem.id == item_id).first()
-            if not item or item.status not in {"PENDENTE", "REPROCESSANDO"}:
-                continue
-            await item_handler(item)
-            self._refresh_execution_counts(execution_id)
+            ]
+
+        counters = {"SUCESSO": 0, "FALHA": 0}
+        lanes = self._build_item_lanes(
+            min(max(1, settings.batch_item_concurrency), max(1, len(item_ids))),
+            item_handler,
+            handler_factory,
+            worker_id if chunk_ids is not None else None,
+        )
+        idle_lanes: asyncio.Queue = asyncio.Queue()
+        for lane in lanes:
+            idle_lanes.put_nowait(lane)
+        in_flight: set[asyncio.Task] = set()
+
+        async def _run(lane: "_ItemLane", item_id: int) -> None:
+            try:
+                status = await lane.run(item_id, fingerprints)
+                if status in counters:
+                    counters[status] += 1
+            except Exception as exc:
+                logging.error("Erro no item %s da execucao %s: %s", item_id, execution_id, exc, exc_info=True)
+            finally:
+                idle_lanes.put_nowait(lane)
+
+        stop_signal: str | None = None
+        next_control_at = 0.0
+        next_flush_at = time_module.monotonic() + settings.batch_counts_flush_seconds
+        try:
+            for item_id in item_ids:
+                lane = await idle_lanes.get()
+                now = time_module.monotonic()
+                if now >= next_control_at:
+                    stop_signal = self._check_execution_control(execution_id, worker_id, chunk_ids)
+                    if stop_signal is not None:
+                        idle_lanes.put_nowait(lane)
+                        break
+                    next_control_at = now + settings.batch_control_check_seconds
+                if now >= next_flush_at:
+                    self._flush_execution_counts(execution_id, counters)
+                    next_flush_at = now + settings.batch_counts_flush_seconds
+
+                task = asyncio.create_task(_run(lane, item_id))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+
+            # Itens já em voo terminam (a chamada ao L1 não tem como ser
+            # abortada no meio) antes de tratar pausa/cancelamento.
+            if in_flight:
+                await asyncio.gather(*in_flight, return_exceptions=True)
+        finally:
+            for lane in lanes:
+                lane.close()
+
+        if stop_signal in {"MISSING", "LOST"}:
+            return
 
         execution = self.db.query(BatchExecution).filter(BatchExecution.id == execution_id).first()
         if not execution:
             return
 
-        status = self._get_control_signal(execution_id, worker_id)
+        self._flush_execution_counts(execution_id, counters)
+        status = stop_signal or self._get_control_signal(execution_id, worker_id)
         if status == BATCH_STATUS_CANCELLED:
             self._finalize_execution(execution, cancelled=True)
             return
         if status == BATCH_STATUS_PAUSED:
+            self._release_item_claims(execution_id, worker_id)
             self._clear_execution_claim(execution)
             self.db.commit()
             return
+        # Outros workers ainda com blocos em voo: quem drenar o último finaliza.
+        if chunk_ids is not None and self._has_unfinished_items(execution_id):
+            return
         self._finalize_execution(execution)
 
-    async def process_claimed_execution(self, execution_id: int, worker_id: str) -> None:
-        execution = (
-            self.db.query(BatchExecution)
-            .options(joinedload(BatchExecution.items))
-            .filter(BatchExecution.id == execution_id)
-            .first()
+    def _claimed_fingerprints(self) -> InFlightFingerprints:
+        """Dedup do bloco: histórico de sucesso sob demanda + reserva no banco
+        (outra linha igual pode estar em voo no bloco de outro worker)."""
+        bind = self.db.get_bind()
+        return InFlightFingerprints(
+            probe=make_fingerprint_probe(bind),
+            reservations=FingerprintReservations(bind),
+        )
+
+    def _load_pending_items(
+        self, execution_id: int, item_ids: list[int] | None
+    ) -> list[BatchExecutionItem]:
+        """Itens pendentes do bloco reivindicado (ou do lote todo, sem bloco)."""
+        query = self.db.query(BatchExecutionItem).filter(
+            BatchExecutionItem.execution_id == execution_id,
+            BatchExecutionItem.status.in_(["PENDENTE", "REPROCESSANDO"]),
         )
-        if not execution or execution.worker_id != worker_id:
+        if item_ids is not None:
+            query = query.filter(BatchExecutionItem.id.in_(item_ids))
+        return query.order_by(BatchExecutionItem.id.asc()).all()
+
+    async def process_claimed_execution(
+        self,
+        execution_id: int,
+        worker_id: str,
+        item_ids: list[int] | None = None,
+    ) -> None:
+        execution = self.db.query(BatchExecution).filter(BatchExecution.id == execution_id).first()
+        if not execution or execution.status != BATCH_STATUS_PROCESSING:
             return
+        pending_items = self._load_pending_items(execution_id, item_ids)
 
         try:
             if execution.processor_type == BATCH_PROCESSOR_SPREADSHEET_UPLOAD:
+                prefetch = _execution_prefetch(execution.id)
                 strategy = SpreadsheetStrategy(self.db, self.client)
-                caches = await strategy._load_caches()
-                known_fingerprints = load_successful_fingerprints(self.db)
-                pending_rows = [
-                    item.input_data or {}
-                    for item in execution.items
-                    if item.status in {"PENDENTE", "REPROCESSANDO"}
-                ]
-                lawsuit_lookup, prefetched_cnj_numbers, stop_signal = self._preload_lawsuits_chunked(
+                caches = await self._spreadsheet_caches(prefetch)
+                known_fingerprints = self._claimed_fingerprints()
+                pending_rows = [item.input_data or {} for item in pending_items]
+                known_fingerprints.prime(self._spreadsheet_fingerprints(strategy, pending_rows, caches))
+                lawsuit_lookup, prefetched_cnj_numbers, stop_signal = self._preload_execution_lawsuits(
+                    prefetch,
                     [row.get("CNJ") for row in pending_rows],
                     execution.id,
                     worker_id,
                 )
                 if stop_signal is not None:
-                    self._handle_preload_stop(execution.id, stop_signal)
+                    self._handle_preload_stop(execution.id, stop_signal, worker_id)
                     return
 
                 async def handle_item(item: BatchExecutionItem):
@@ -524,27 +996,45 @@ class BatchTaskCreationService:
                         prefetched_cnj_numbers=prefetched_cnj_numbers,
                     )
 
+                async def make_lane_handler(db: Session):
+                    # Os caches são destacados (nada de lazy load): as lanes
+                    # compartilham os da execução.
+                    lane_strategy = SpreadsheetStrategy(db, self.client)
+
+                    async def handle_lane_item(item: BatchExecutionItem):
+                        await lane_strategy.process_single_item(
+                            item,
+                            item.input_data or {},
+                            caches,
+                            known_fingerprints=known_fingerprints,
+                            lawsuit_lookup=lawsuit_lookup,
+                            prefetched_cnj_numbers=prefetched_cnj_numbers,
+                        )
+
+                    return handle_lane_item
+
                 await self._process_items_loop(
                     execution.id,
                     worker_id,
                     item_handler=handle_item,
+                    handler_factory=make_lane_handler,
+                    fingerprints=known_fingerprints,
+                    item_ids=item_ids,
                 )
                 return
 
             if execution.processor_type == BATCH_PROCESSOR_SPREADSHEET_INTERACTIVE:
-                known_fingerprints = load_successful_fingerprints(self.db)
-                pending_payloads = [
-                    item.input_data or {}
-                    for item in execution.items
-                    if item.status in {"PENDENTE", "REPROCESSANDO"}
-                ]
-                lawsuit_lookup, prefetched_cnj_numbers, stop_signal = self._preload_lawsuits_chunked(
+                known_fingerprints = self._claimed_fingerprints()
+                pending_payloads = [item.input_data or {} for item in pending_items]
+                known_fingerprints.prime(self._interactive_fingerprints(pending_payloads))
+                lawsuit_lookup, prefetched_cnj_numbers, stop_signal = self._preload_execution_lawsuits(
+                    _execution_prefetch(execution.id),
                     [payload.get("cnj_number") for payload in pending_payloads],
                     execution.id,
                     worker_id,
                 )
                 if stop_signal is not None:
-                    self._handle_preload_stop(execution.id, stop_signal)
+                    self._handle_preload_stop(execution.id, stop_signal, worker_id)
                     return
 
                 async def handle_item(item: BatchExecutionItem):
@@ -555,10 +1045,26 @@ class BatchTaskCreationService:
                         prefetched_cnj_numbers=prefetched_cnj_numbers,
                     )
 
+                async def make_lane_handler(db: Session):
+                    lane_service = BatchTaskCreationService(db, self.client)
+
+                    async def handle_lane_item(item: BatchExecutionItem):
+                        await lane_service._process_interactive_item(
+                            item,
+                            known_fingerprints=known_fingerprints,
+                            lawsuit_lookup=lawsuit_lookup,
+                            prefetched_cnj_numbers=prefetched_cnj_numbers,
+                        )
+
+                    return handle_lane_item
+
                 await self._process_items_loop(
                     execution.id,
                     worker_id,
                     item_handler=handle_item,
+                    handler_factory=make_lane_handler,
+                    fingerprints=known_fingerprints,
+                    item_ids=item_ids,
                 )
                 return
 
@@ -569,12 +1075,20 @@ class BatchTaskCreationService:
             self.db.commit()
         except Exception as exc:
             logging.error("Erro ao processar execucao %s: %s", execution_id, exc, exc_info=True)
+            self.db.rollback()
             execution = self.db.query(BatchExecution).filter(BatchExecution.id == execution_id).first()
-            if execution:
-                self._finalize_execution(
-                    execution,
-                    cancelled=(execution.status == BATCH_STATUS_CANCELLED),
-                )
+            if not execution:
+                return
+            if execution.status == BATCH_STATUS_CANCELLED:
+                self._finalize_execution(execution, cancelled=True)
+                return
+            if item_ids is not None:
+                # Só o bloco deste worker falha; os dos outros seguem e quem
+                # drenar o último finaliza.
+                self._fail_item_claims(execution_id, worker_id, item_ids, str(exc))
+                if self._has_unfinished_items(execution_id):
+                    return
+            self._finalize_execution(execution)
 
     async def process_spreadsheet_request(self, file_content: bytes, execution_id: int):
         logging.info("Iniciando processamento legado de lote via planilha. ID Execucao: %s", execution_id)
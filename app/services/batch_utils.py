@@ -1,4 +1,9 @@
-from sqlalchemy.orm import Session
+import threading
+from collections import OrderedDict
+from typing import Callable, Iterable
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, sessionmaker
 
 from app.models.batch_execution import BatchExecutionItem
 
@@ -21,13 +26,212 @@ def build_task_fingerprint(
     return "|".join(normalized_parts)
 
 
-def load_successful_fingerprints(db: Session) -> set[str]:
-    rows = (
-        db.query(BatchExecutionItem.fingerprint)
-        .filter(
-            BatchExecutionItem.status == "SUCESSO",
-            BatchExecutionItem.fingerprint.isnot(None),
+# Tamanho do IN de cada sonda — bem abaixo do limite de parâmetros do driver.
+_PROBE_CHUNK_SIZE = 500
+# Fingerprints com sucesso lembrados por processo (sucesso é permanente:
+# o que está aqui é duplicata garantida e pula o banco).
+_RECENT_SUCCESS_MAX = 50_000
+
+_recent_successes: "OrderedDict[str, None]" = OrderedDict()
+_recent_successes_lock = threading.Lock()
+
+
+def remember_successful_fingerprints(fingerprints: Iterable[str]) -> None:
+    with _recent_successes_lock:
+        for fingerprint in fingerprints:
+            _recent_successes[fingerprint] = None
+            _recent_successes.move_to_end(fingerprint)
+        while len(_recent_successes) > _RECENT_SUCCESS_MAX:
+            _recent_successes.popitem(last=False)
+
+
+def probe_successful_fingerprints(db: Session, fingerprints: Iterable[str]) -> set[str]:
+    """
+    Quais dos `fingerprints` já têm item com SUCESSO. Sonda em blocos pelo
+    índice parcial `ix_lotes_itens_fingerprint_sucesso` — custo proporcional
+    ao lote atual, não à história inteira da tabela.
+    """
+    candidates = {fp for fp in fingerprints if fp}
+    with _recent_successes_lock:
+        found = {fp for fp in candidates if fp in _recent_successes}
+    pending = sorted(candidates - found)
+    hits: set[str] = set()
+    for start in range(0, len(pending), _PROBE_CHUNK_SIZE):
+        chunk = pending[start:start + _PROBE_CHUNK_SIZE]
+        hits.update(
+            row[0]
+            for row in (
+                db.query(BatchExecutionItem.fingerprint)
+                .filter(
+                    BatchExecutionItem.status == "SUCESSO",
+                    BatchExecutionItem.fingerprint.in_(chunk),
+                )
+                .distinct()
+                .all()
+            )
         )
-        .all()
-    )
-    return {row[0] for row in rows if row[0]}
+    if hits:
+        remember_successful_fingerprints(hits)
+    return found | hits
+
+
+def make_fingerprint_probe(bind) -> Callable[[list[str]], set[str]]:
+    """`probe_successful_fingerprints` com session própria por chamada —
+    seguro pras lanes do lote, que rodam em threads diferentes."""
+    session_factory = sessionmaker(bind=bind, autocommit=False, autoflush=False)
+
+    def _probe(fingerprints: list[str]) -> set[str]:
+        db = session_factory()
+        try:
+            return probe_successful_fingerprints(db, fingerprints)
+        finally:
+            db.close()
+
+    return _probe
+
+
+class FingerprintReservations:
+    """
+    Reserva de fingerprint por execução no banco (`fingerprint_claim` +
+    índice único `ux_lotes_itens_execution_fingerprint_claim`).
+
+    O `InFlightFingerprints` só enxerga o bloco do próprio worker; com a
+    execução dividida entre workers, uma linha igual pode estar em voo em
+    outro processo. `reserve` grava o fingerprint no item antes da chamada
+    ao L1 — conflito no índice = outro item da execução já reservou (em voo
+    ou com sucesso). Reentrante: o item que já tem a reserva (lease vencido
+    e reprocessado) reserva de novo. Session própria por chamada, como a
+    sonda — seguro pras lanes.
+    """
+
+    def __init__(self, bind):
+        self._session_factory = sessionmaker(bind=bind, autocommit=False, autoflush=False)
+
+    def reserve(self, item_id: int, fingerprint: str) -> bool:
+        db = self._session_factory()
+        try:
+            db.query(BatchExecutionItem).filter(BatchExecutionItem.id == item_id).update(
+                {BatchExecutionItem.fingerprint_claim: fingerprint},
+                synchronize_session=False,
+            )
+            db.commit()
+            return True
+        except IntegrityError:
+            db.rollback()
+            return False
+        finally:
+            db.close()
+
+    def release(self, item_id: int) -> None:
+        """Solta a reserva de um item que não terminou com sucesso."""
+        db = self._session_factory()
+        try:
+            db.query(BatchExecutionItem).filter(
+                BatchExecutionItem.id == item_id,
+                BatchExecutionItem.status != "SUCESSO",
+            ).update(
+                {BatchExecutionItem.fingerprint_claim: None},
+                synchronize_session=False,
+            )
+            db.commit()
+        finally:
+            db.close()
+
+
+class InFlightFingerprints:
+    """
+    Conjunto de fingerprints já processados com sucesso que também reserva
+    os que estão em voo. Com itens do lote rodando em paralelo, duas linhas
+    iguais da planilha passariam juntas pelo `fingerprint in known` antes
+    de qualquer uma chegar no `known.add(...)`; aqui o `in` já reserva o
+    fingerprint pro thread que perguntou, e a 2ª linha cai como duplicada.
+
+    Mesma interface que as estratégias usam no `set` (`in` / `add`).
+    `release_pending()` — chamado ao fim de cada item — devolve a reserva
+    de um item que falhou, pra uma linha igual posterior poder tentar.
+
+    Com `probe` (ex.: `probe_successful_fingerprints` amarrado a uma
+    session), o histórico vem do banco sob demanda: `prime(...)` sonda em
+    bloco os fingerprints do bloco atual e um fingerprint nunca sondado é
+    consultado sozinho no primeiro `in`.
+
+    Com `reservations`, o `in` que reserva em memória também reserva no
+    banco pro item ligado ao thread (`bind_item`) — se outro worker já tem
+    o fingerprint, o item cai como duplicado.
+    """
+
+    def __init__(
+        self,
+        known: set[str] | None = None,
+        probe: Callable[[list[str]], set[str]] | None = None,
+        reservations: FingerprintReservations | None = None,
+    ):
+        self._known = set(known or ())
+        self._pending: set[str] = set()
+        self._probe = probe
+        self._reservations = reservations
+        self._probed: set[str] = set()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def prime(self, fingerprints: Iterable[str]) -> None:
+        if self._probe is None:
+            return
+        with self._lock:
+            candidates = [
+                fp for fp in set(fingerprints)
+                if fp and fp not in self._probed and fp not in self._known
+            ]
+        if not candidates:
+            return
+        hits = self._probe(candidates)
+        with self._lock:
+            self._known.update(hits)
+            self._probed.update(candidates)
+
+    def __contains__(self, fingerprint: str) -> bool:
+        if self._probe is not None:
+            self.prime([fingerprint])
+        with self._lock:
+            if fingerprint in self._known or fingerprint in self._pending:
+                return True
+            self._pending.add(fingerprint)
+            self._local.reserved = fingerprint
+        item_id = getattr(self._local, "item_id", None)
+        if self._reservations is not None and item_id is not None:
+            if not self._reservations.reserve(item_id, fingerprint):
+                self._local.reserved = None
+                with self._lock:
+                    self._pending.discard(fingerprint)
+                return True
+            self._local.db_reserved = item_id
+        return False
+
+    def __len__(self) -> int:
+        return len(self._known)
+
+    def add(self, fingerprint: str) -> None:
+        with self._lock:
+            self._known.add(fingerprint)
+            self._pending.discard(fingerprint)
+        if getattr(self._local, "reserved", None) == fingerprint:
+            # Sucesso: a reserva no banco fica (duplicata garantida).
+            self._local.db_reserved = None
+        remember_successful_fingerprints([fingerprint])
+
+    def bind_item(self, item_id: int | None) -> None:
+        """Item processado pelo thread atual (dono da reserva no banco)."""
+        self._local.item_id = item_id
+
+    def release_pending(self) -> None:
+        db_reserved = getattr(self._local, "db_reserved", None)
+        self._local.db_reserved = None
+        self._local.item_id = None
+        if db_reserved is not None and self._reservations is not None:
+            self._reservations.release(db_reserved)
+        reserved = getattr(self._local, "reserved", None)
+        if reserved is None:
+            return
+        self._local.reserved = None
+        with self._lock:
+            self._pending.discard(reserved)
@@ -14,53 +14,62 @@ class BatchExecutionWorker:
     def __init__(self):
         self.worker_id = f"worker-{uuid.uuid4()}"
         self._stop_event = threading.Event()
-        self._thread: threading.Thread | None = None
+        self._threads: list[threading.Thread] = []
         self._poll_interval = max(settings.batch_worker_poll_interval_seconds, 1)
 
     def start(self) -> None:
         if not settings.batch_worker_enabled:
             logging.info("Batch worker desabilitado por configuracao.")
             return
-        if self._thread and self._thread.is_alive():
+        if any(thread.is_alive() for thread in self._threads):
             return
 
-        self._thread = threading.Thread(
-            target=self._run_loop,
-            name="batch-execution-worker",
-            daemon=True,
-        )
-        self._thread.start()
-        logging.info("Batch worker iniciado com id %s.", self.worker_id)
+        # Cada thread tem id próprio: o claim dos itens é por worker_id.
+        thread_count = max(1, settings.batch_worker_threads)
+        self._threads = [
+            threading.Thread(
+                target=self._run_loop,
+                args=(self.worker_id if thread_count == 1 else f"{self.worker_id}-{index}",),
+                name=f"batch-execution-worker-{index}",
+                daemon=True,
+            )
+            for index in range(thread_count)
+        ]
+        for thread in self._threads:
+            thread.start()
+        logging.info("Batch worker iniciado com id %s (%d thread(s)).", self.worker_id, thread_count)
 
     def stop(self) -> None:
         self._stop_event.set()
-        if self._thread and self._thread.is_alive():
-            self._thread.join(timeout=10)
+        for thread in self._threads:
+            if thread.is_alive():
+                thread.join(timeout=10)
 
-    def _process_execution(self, execution_id: int) -> None:
+    def _process_execution(self, execution_id: int, item_ids: list[int], worker_id: str) -> None:
         db = SessionLocal()
         try:
             service = BatchTaskCreationService(db=db, client=LegalOneApiClient())
-            asyncio.run(service.process_claimed_execution(execution_id, self.worker_id))
+            asyncio.run(service.process_claimed_execution(execution_id, worker_id, item_ids))
         except Exception as exc:
             logging.error("Erro ao processar execucao %s no worker: %s", execution_id, exc, exc_info=True)
         finally:
             db.close()
 
-    def _run_loop(self) -> None:
+    def _run_loop(self, worker_id: str) -> None:
         while not self._stop_event.is_set():
             db = SessionLocal()
-            claimed_execution_id = None
+            claimed = None
             try:
                 service = BatchTaskCreationService(db=db, client=None)
-                claimed_execution_id = service.claim_next_execution(self.worker_id)
+                claimed = service.claim_next_item_chunk(worker_id)
             except Exception as exc:
                 logging.error("Erro ao consultar fila de lotes: %s", exc, exc_info=True)
             finally:
                 db.close()
 
-            if claimed_execution_id is None:
+            if claimed is None:
                 time.sleep(self._poll_interval)
                 continue
 
-            self._process_execution(claimed_execution_id)
+            execution_id, item_ids = claimed
+            self._process_execution(execution_id, item_ids, worker_id)
@@ -0,0 +1,29 @@
+"""Store de arquivos endereçado por conteúdo (dedup entre módulos)."""
+
+from app.services.blob_store.store import (
+    NAMESPACE_AJUS,
+    NAMESPACE_GED_LEGALONE,
+    NAMESPACE_PRAZOS_INICIAIS,
+    adopt,
+    blob_path,
+    blob_root,
+    namespace_roots,
+    release,
+    sha256_file,
+    store_bytes,
+    store_copy,
+)
+
+__all__ = [
+    "NAMESPACE_AJUS",
+    "NAMESPACE_GED_LEGALONE",
+    "NAMESPACE_PRAZOS_INICIAIS",
+    "adopt",
+    "blob_path",
+    "blob_root",
+    "namespace_roots",
+    "release",
+    "sha256_file",
+    "store_bytes",
+    "store_copy",
+]
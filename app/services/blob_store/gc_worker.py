@@ -0,0 +1,249 @@
+"""
+GC do blob store — um cron só no lugar dos cleanups por módulo.
+
+Cada execução (diária, 03:15 UTC — horário do antigo
+`prazos_iniciais.pdf_cleanup`):
+
+1. roda as políticas de retenção dos módulos (`_retention_policies`):
+   elas decidem QUAIS paths legados não servem mais e os apagam pelo
+   `delete_*` do módulo, que solta a referência — e podam os caches
+   derivados que moram no mesmo volume (`prune_cache_dir`);
+2. solta referências cujo path legado sumiu do disco (apagado fora do
+   `delete_*`, volume restaurado de backup etc.);
+3. apaga blobs com `ref_count` 0 há mais de `blob_store_gc_grace_hours`;
+4. apaga arquivos do store sem linha no banco (crash entre gravar o blob
+   e registrar a referência), também só depois da carência.
+
+O GC só apaga dentro de `blob_root()` e dos diretórios de cache — path
+legado quem apaga é o módulo.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable, Optional
+
+from sqlalchemy import delete, exists
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.blob_store import BlobObject, BlobRef
+from app.services.blob_store.store import (
+    blob_path,
+    blob_root,
+    namespace_roots,
+    release_ref,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _retention_policies() -> list[tuple[str, Callable[[Session], dict]]]:
+    from app.services.prazos_iniciais.pdf_cleanup_worker import cleanup_local_pdfs
+    from app.services.prazos_iniciais.pdf_extractor.text_extractor import text_cache_root
+    from app.services.recursal.ocr import ocr_cache_root
+
+    return [
+        ("prazos_iniciais", cleanup_local_pdfs),
+        (
+            "text_cache",
+            lambda db: prune_cache_dir(
+                text_cache_root(),
+                max_age_days=settings.prazos_iniciais_text_cache_max_age_days,
+                max_mb=settings.prazos_iniciais_text_cache_max_mb,
+            ),
+        ),
+        (
+            "ocr_cache",
+            lambda db: prune_cache_dir(
+                ocr_cache_root(),
+                max_age_days=settings.recursal_ocr_cache_max_age_days,
+                max_mb=settings.recursal_ocr_cache_max_mb,
+            ),
+        ),
+    ]
+
+
+def prune_cache_dir(
+    root,
+    *,
+    max_age_days: int,
+    max_mb: int,
+    now: Optional[datetime] = None,
+) -> dict[str, int]:
+    """
+    Poda um cache em disco cujo conteúdo é sempre recalculável: apaga o que
+    não é tocado há mais de `max_age_days` e, se ainda passar de `max_mb`,
+    os arquivos de mtime mais antigo até caber (os caches tocam o mtime no
+    hit). 0 desliga o limite respectivo. Best-effort — erro de disco só pula
+    o arquivo.
+    """
+    stats = {"files_deleted": 0, "bytes_freed": 0}
+    root = Path(root)
+    if not root.is_dir():
+        return stats
+    now_ts = (now or _utcnow()).timestamp()
+    cutoff = now_ts - max_age_days * 86400 if max_age_days > 0 else None
+
+    kept: list[tuple[float, int, str]] = []
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            path = os.path.join(dirpath, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            if cutoff is not None and st.st_mtime < cutoff:
+                _unlink_cache_file(path, st.st_size, stats)
+            else:
+                kept.append((st.st_mtime, st.st_size, path))
+
+    if max_mb > 0:
+        total = sum(size for _, size, _ in kept)
+        limit = max_mb * 1024 * 1024
+        for _, size, path in sorted(kept):
+            if total <= limit:
+                break
+            if _unlink_cache_file(path, size, stats):
+                total -= size
+    return stats
+
+
+def _unlink_cache_file(path: str, size: int, stats: dict[str, int]) -> bool:
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        return False
+    except OSError as exc:
+        logger.warning("blob_store.gc: falha podando cache %s: %s", path, exc)
+        return False
+    stats["files_deleted"] += 1
+    stats["bytes_freed"] += size
+    return True
+
+
+def collect_garbage(db: Session, *, now: Optional[datetime] = None) -> dict[str, int]:
+    """Passos 2-4 (ver docstring do módulo). Devolve contadores."""
+    now = now or _utcnow()
+    cutoff = now - timedelta(hours=settings.blob_store_gc_grace_hours)
+    stats = {
+        "refs_dangling": 0,
+        "blobs_deleted": 0,
+        "untracked_deleted": 0,
+        "bytes_freed": 0,
+    }
+
+    # ── 2. Referências sem arquivo ──
+    roots = namespace_roots()
+    refs = db.query(BlobRef.namespace, BlobRef.relative_path).all()
+    for namespace, relative_path in refs:
+        root = roots.get(namespace)
+        if root is not None and (root / relative_path).exists():
+            continue
+        if release_ref(db, namespace, relative_path):
+            stats["refs_dangling"] += 1
+    db.commit()
+
+    # ── 3. Blobs sem referência ──
+    orphans = (
+        db.query(BlobObject.sha256)
+        .filter(BlobObject.ref_count <= 0, BlobObject.orphaned_at < cutoff)
+        .all()
+    )
+    for (sha256,) in orphans:
+        # Condicional: uma referência nova entre o SELECT e aqui salva o blob.
+        result = db.execute(
+            delete(BlobObject).where(
+                BlobObject.sha256 == sha256,
+                BlobObject.ref_count <= 0,
+                ~exists().where(BlobRef.sha256 == sha256),
+            )
+        )
+        db.commit()
+        if result.rowcount:
+            stats["bytes_freed"] += _unlink_blob(blob_path(sha256))
+            stats["blobs_deleted"] += 1
+
+    # ── 4. Arquivos do store sem linha no banco ──
+    base = blob_root() / "sha256"
+    if base.is_dir():
+        tracked = {sha for (sha,) in db.query(BlobObject.sha256)}
+        cutoff_ts = cutoff.timestamp()
+        for dirpath, _, filenames in os.walk(base):
+            for name in filenames:
+                if name in tracked:
+                    continue
+                path = os.path.join(dirpath, name)
+                try:
+                    if os.stat(path).st_mtime >= cutoff_ts:
+                        continue
+                except OSError:
+                    continue
+                stats["bytes_freed"] += _unlink_blob(path)
+                stats["untracked_deleted"] += 1
+
+    return stats
+
+
+def _unlink_blob(path) -> int:
+    """Apaga o blob; bytes liberados (0 se algum path legado ainda o usa)."""
+    try:
+        st = os.stat(path)
+        os.unlink(path)
+    except FileNotFoundError:
+        return 0
+    except OSError as exc:
+        logger.warning("blob_store.gc: falha apagando %s: %s", path, exc)
+        return 0
+    return st.st_size if st.st_nlink == 1 else 0
+
+
+def _tick() -> None:
+    """Wrapper que o APScheduler chama. Cria sessão própria por execução."""
+    db: Session = SessionLocal()
+    try:
+        logger.info("blob_gc.tick.start")
+        for name, policy in _retention_policies():
+            try:
+                logger.info("blob_gc.retention %s %s", name, policy(db))
+            except Exception:
+                db.rollback()
+                logger.exception("blob_gc.retention.error %s", name)
+        stats = collect_garbage(db)
+        logger.info(
+            "blob_gc.tick.finish refs_dangling=%d blobs_deleted=%d "
+            "untracked_deleted=%d bytes_freed=%d",
+            stats["refs_dangling"],
+            stats["blobs_deleted"],
+            stats["untracked_deleted"],
+            stats["bytes_freed"],
+        )
+    except Exception:
+        logger.exception("blob_gc.tick.error")
+    finally:
+        db.close()
+
+
+def register_blob_gc_job(scheduler) -> None:
+    """
+    Registra o job no APScheduler. Roda 1x por dia às 03:15 UTC
+    (horário baixo de uso pra evitar disputar com o operador).
+    """
+    scheduler.add_job(
+        _tick,
+        trigger="cron",
+        hour=3,
+        minute=15,
+        id="blob_store.gc",
+        replace_existing=True,
+        misfire_grace_time=3600,  # aceita execução atrasada até 1h
+    )
+    logger.info("blob_store GC registrado (diário 03:15 UTC).")
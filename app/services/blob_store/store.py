@@ -0,0 +1,328 @@
+"""
+Store de arquivos endereçado por conteúdo, compartilhado entre módulos.
+
+Prazos iniciais (habilitação), Classificador (íntegra, mesmo storage do
+PI), a cópia AJUS da habilitação e o GED LegalOne gravavam cada um a sua
+cópia de todo arquivo — a mesma petição subida em 3 módulos ocupava 3x o
+volume. Aqui o conteúdo é gravado UMA vez:
+
+    {BLOB_STORE_PATH}/sha256/aa/bb/<sha256>
+
+e o path legado de cada módulo (`YYYY/MM/DD/{uuid}.ext`, que é o que fica
+nas colunas `pdf_path`/`file_path`) vira um hard link pro blob — quem lê
+o arquivo não muda nada. Sem hard link (outro volume), tenta reflink
+(FICLONE) e por último copia.
+
+Referências ficam no banco (`blob_ref`: namespace + path legado →
+sha256; `blob_object.ref_count`). O módulo apaga o path legado como
+sempre e chama `release`; o blob sem referência é apagado pelo GC
+(`gc_worker`) depois de `blob_store_gc_grace_hours`.
+
+Arquivos são imutáveis: ninguém reescreve um path legado no lugar (todo
+mundo grava tmp + rename) — com hard link, escrever in-place alteraria o
+blob de todos os módulos.
+
+Contabilidade é best-effort (sessão própria): falha no banco não derruba
+o upload — o arquivo está gravado, só fica sem dedup até o
+`scripts/blob_dedup.py` adotar de novo.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import shutil
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.blob_store import BlobObject, BlobRef
+
+logger = logging.getLogger(__name__)
+
+NAMESPACE_PRAZOS_INICIAIS = "prazos_iniciais"
+NAMESPACE_AJUS = "ajus"
+NAMESPACE_GED_LEGALONE = "ged_legalone"
+
+# ioctl FICLONE (linux/fs.h) — cópia copy-on-write em btrfs/xfs.
+_FICLONE = 0x40049409
+_CHUNK = 1024 * 1024
+
+
+def namespace_roots() -> dict[str, Path]:
+    """Raiz do storage legado de cada namespace."""
+    return {
+        NAMESPACE_PRAZOS_INICIAIS: Path(settings.prazos_iniciais_storage_path),
+        NAMESPACE_AJUS: Path(settings.ajus_storage_path),
+        NAMESPACE_GED_LEGALONE: Path(settings.ged_legalone_storage_path),
+    }
+
+
+def blob_root() -> Path:
+    return Path(
+        settings.blob_store_path
+        or Path(settings.prazos_iniciais_storage_path).parent / "blobs"
+    )
+
+
+def blob_path(sha256: str) -> Path:
+    return blob_root() / "sha256" / sha256[:2] / sha256[2:4] / sha256
+
+
+def sha256_file(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(_CHUNK), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+# ─── Gravação ─────────────────────────────────────────────────────────
+
+
+def store_bytes(
+    namespace: str,
+    relative_path: str,
+    data: bytes,
+    *,
+    sha256: Optional[str] = None,
+) -> Path:
+    """Grava `data` em `<raiz do namespace>/<relative_path>` via blob.
+
+    Devolve o caminho absoluto legado. Com o store desligado (ou sem
+    volume pro blob), grava direto no path legado como antes.
+
+    Raises:
+        OSError — se nem a gravação direta no path legado funcionar.
+    """
+    dest = namespace_roots()[namespace] / relative_path
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    sha256 = sha256 or hashlib.sha256(data).hexdigest()
+
+    if settings.blob_store_enabled:
+        try:
+            blob = _ensure_blob(sha256, data=data)
+            _materialize(blob, dest)
+        except OSError as exc:
+            logger.warning(
+                "blob_store: gravando %s/%s sem dedup: %s",
+                namespace, relative_path, exc,
+            )
+        else:
+            _add_ref(namespace, relative_path, sha256, len(data))
+            return dest
+
+    _write_atomic(dest, data)
+    return dest
+
+
+def store_copy(namespace: str, relative_path: str, source: Path) -> Path:
+    """Cópia de um arquivo já gravado (ex.: habilitação do PI → AJUS).
+
+    Com o store, a "cópia" é só mais um hard link pro mesmo blob.
+    """
+    dest = namespace_roots()[namespace] / relative_path
+    dest.parent.mkdir(parents=True, exist_ok=True)
+
+    if settings.blob_store_enabled:
+        try:
+            sha256 = sha256_file(source)
+            blob = _ensure_blob(sha256, source=source)
+            _materialize(blob, dest)
+        except OSError as exc:
+            logger.warning(
+                "blob_store: copiando %s → %s/%s sem dedup: %s",
+                source, namespace, relative_path, exc,
+            )
+        else:
+            _add_ref(namespace, relative_path, sha256, dest.stat().st_size)
+            return dest
+
+    shutil.copy2(source, dest)
+    return dest
+
+
+def adopt(namespace: str, relative_path: str) -> tuple[str, int]:
+    """Põe um arquivo legado já existente no store (migração).
+
+    Se o conteúdo já tem blob, o arquivo legado é trocado por um hard
+    link pro blob. Devolve (sha256, bytes liberados) — 0 quando o
+    arquivo já era o blob ou ainda tinha outro link.
+    """
+    path = namespace_roots()[namespace] / relative_path
+    st = path.stat()
+    sha256 = sha256_file(path)
+    blob = blob_path(sha256)
+    freed = 0
+    if not blob.exists():
+        _ensure_blob(sha256, source=path)
+    elif not os.path.samefile(blob, path):
+        if _materialize(blob, path) and st.st_nlink == 1:
+            freed = st.st_size
+    _add_ref(namespace, relative_path, sha256, st.st_size)
+    return sha256, freed
+
+
+def release(namespace: str, relative_path: str) -> bool:
+    """Solta a referência do path legado (que o módulo acabou de apagar).
+
+    O blob fica até o GC. Devolve True se havia referência.
+    """
+    try:
+        with SessionLocal() as db:
+            released = release_ref(db, namespace, relative_path)
+            db.commit()
+            return released
+    except Exception as exc:  # noqa: BLE001
+        logger.warning(
+            "blob_store: falha soltando ref %s/%s: %s",
+            namespace, relative_path, exc,
+        )
+        return False
+
+
+# ─── Sistema de arquivos ──────────────────────────────────────────────
+
+
+def _tmp_name(path: Path) -> Path:
+    return path.with_name(
+        f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+    )
+
+
+def _write_atomic(dest: Path, data: bytes) -> None:
+    tmp = _tmp_name(dest)
+    tmp.write_bytes(data)
+    os.replace(tmp, dest)
+
+
+def _ensure_blob(
+    sha256: str, *, data: Optional[bytes] = None, source: Optional[Path] = None,
+) -> Path:
+    """Blob do conteúdo — grava se ainda não existe.
+
+    De `source`, o próprio arquivo vira o blob (hard link, sem cópia).
+    """
+    blob = blob_path(sha256)
+    if blob.exists():
+        return blob
+    blob.parent.mkdir(parents=True, exist_ok=True)
+    tmp = _tmp_name(blob)
+    if data is not None:
+        tmp.write_bytes(data)
+    else:
+        assert source is not None
+        _link_or_copy(source, tmp)
+    # Outro processo gravando o mesmo conteúdo: o rename é atômico e os
+    # dois arquivos são iguais — tanto faz quem ganha.
+    os.replace(tmp, blob)
+    return blob
+
+
+def _materialize(blob: Path, dest: Path) -> bool:
+    """`dest` passa a ser o blob (hard link > reflink > cópia).
+
+    True se o espaço em disco é compartilhado com o blob.
+    """
+    tmp = _tmp_name(dest)
+    shared = _link_or_copy(blob, tmp)
+    os.replace(tmp, dest)
+    return shared
+
+
+def _link_or_copy(src: Path, dst: Path) -> bool:
+    try:
+        os.link(src, dst)
+        return True
+    except OSError:
+        pass
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        try:
+            import fcntl
+
+            fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+            return True
+        except (ImportError, OSError):
+            pass
+        shutil.copyfileobj(fsrc, fdst, _CHUNK)
+    return False
+
+
+# ─── Contagem de referências ──────────────────────────────────────────
+
+
+def _add_ref(namespace: str, relative_path: str, sha256: str, size: int) -> None:
+    try:
+        with SessionLocal() as db:
+            add_ref(db, namespace, relative_path, sha256, size)
+            db.commit()
+    except Exception as exc:  # noqa: BLE001
+        logger.warning(
+            "blob_store: falha registrando ref %s/%s → %s: %s",
+            namespace, relative_path, sha256[:8], exc,
+        )
+
+
+def add_ref(
+    db: Session, namespace: str, relative_path: str, sha256: str, size: int,
+) -> None:
+    """Registra (namespace, path) → sha256 na sessão dada (sem commit)."""
+    ref = db.get(BlobRef, (namespace, relative_path))
+    if ref is not None and ref.sha256 == sha256:
+        return
+
+    if db.get(BlobObject, sha256) is None:
+        try:
+            with db.begin_nested():
+                db.add(BlobObject(sha256=sha256, size_bytes=size, ref_count=0))
+        except IntegrityError:
+            pass  # outro processo registrou o mesmo conteúdo
+    db.execute(
+        update(BlobObject)
+        .where(BlobObject.sha256 == sha256)
+        .values(ref_count=BlobObject.ref_count + 1, orphaned_at=None)
+    )
+    if ref is None:
+        db.add(BlobRef(namespace=namespace, relative_path=relative_path, sha256=sha256))
+    else:
+        # Path regravado com outro conteúdo.
+        old = ref.sha256
+        ref.sha256 = sha256
+        db.flush()
+        _decrement(db, old)
+
+
+def release_ref(db: Session, namespace: str, relative_path: str) -> bool:
+    ref = db.get(BlobRef, (namespace, relative_path))
+    if ref is None:
+        return False
+    sha256 = ref.sha256
+    db.delete(ref)
+    db.flush()
+    _decrement(db, sha256)
+    return True
+
+
+def _decrement(db: Session, sha256: str) -> None:
+    db.execute(
+        update(BlobObject)
+        .where(BlobObject.sha256 == sha256)
+        .values(ref_count=BlobObject.ref_count - 1)
+    )
+    db.execute(
+        update(BlobObject)
+        .where(
+            BlobObject.sha256 == sha256,
+            BlobObject.ref_count <= 0,
+            BlobObject.orphaned_at.is_(None),
+        )
+        .values(orphaned_at=datetime.now(timezone.utc))
+    )
@@ -11,14 +11,27 @@ A chave da API pública do CNJ é gratuita e compartilhada; mantemos um
 fallback embutido pra o módulo funcionar mesmo sem env configurada
 (mesmo padrão do projeto Lake). Em produção, setar DATAJUD_API_KEY no
 Coolify (com ou sem o prefixo "APIKey ").
+
+Varredura geral: `AsyncDataJudScanner` consulta VÁRIOS CNJs do mesmo
+tribunal num único `_search` (bool/should dos mesmos `match` validados),
+num pool httpx compartilhado (HTTP/2 quando o pacote `h2` está instalado),
+com intervalo mínimo entre consultas ao mesmo alias.
 """
 
+import asyncio
 import logging
 import time
-from typing import Any
+from typing import Any, Sequence
 
 import httpx
 
+try:  # HTTP/2 é opcional: sem `h2`, o pool fica em HTTP/1.1 keep-alive.
+    import h2  # noqa: F401
+
+    _HTTP2 = True
+except ImportError:  # pragma: no cover - depende do ambiente
+    _HTTP2 = False
+
 from app.core.config import settings
 from app.services.process_monitoring.datajud_client import DataJudClient
 
@@ -91,7 +104,11 @@ def buscar_movimentos(
             time.sleep(_BACKOFF_BASE_SECONDS * (2 ** tentativa))
     if resp is None:
         raise ultimo_erro or RuntimeError("DataJud: falha sem exceção registrada.")
-    hits = resp.get("hits", {}).get("hits", []) or []
+    return parse_hits(resp.get("hits", {}).get("hits", []) or [])
+
+
+def parse_hits(hits: Sequence[dict[str, Any]]) -> dict[str, Any]:
+    """Docs do DataJud de UM processo (um por grau) -> resultado do scan."""
     if not hits:
         return {"status": "SEM_HITS", "classe": None, "movimentos": []}
 
@@ -118,3 +135,133 @@ def buscar_movimentos(
                 }
             )
     return {"status": "OK", "classe": classe, "movimentos": movimentos}
+
+
+# ── Varredura em lote ────────────────────────────────────────────────
+# Docs por processo na busca unitária; o lote pede isso × nº de CNJs.
+_DOCS_POR_PROCESSO = 30
+_SOURCE_FIELDS = ["numeroProcesso", "grau", "classe", "movimentos"]
+
+
+def _lote_payload(cnjs: Sequence[str]) -> dict[str, Any]:
+    return {
+        "query": {
+            "bool": {
+                "should": [{"match": {"numeroProcesso": c}} for c in cnjs],
+                "minimum_should_match": 1,
+            }
+        },
+        "size": _DOCS_POR_PROCESSO * len(cnjs),
+        "_source": _SOURCE_FIELDS,
+    }
+
+
+class AsyncDataJudScanner:
+    """
+    Pool HTTP compartilhado pela varredura inteira. Cada `_search` passa por
+    `_pace(alias)`: consultas ao MESMO tribunal respeitam um intervalo mínimo,
+    tribunais diferentes andam em paralelo (quem limita quantos é o chamador).
+    """
+
+    def __init__(
+        self,
+        alias_interval_seconds: float | None = None,
+        max_connections: int | None = None,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ):
+        self._interval = (
+            settings.datajud_scan_alias_interval_seconds
+            if alias_interval_seconds is None
+            else alias_interval_seconds
+        )
+        self._max_connections = max(
+            1, max_connections or settings.datajud_scan_concurrent_tribunals
+        )
+        self._transport = transport
+        self._http: httpx.AsyncClient | None = None
+        self._next_at: dict[str, float] = {}
+        self._alias_locks: dict[str, asyncio.Lock] = {}
+        self._headers = {
+            "Authorization": _resolve_api_key(),
+            "Content-Type": "application/json",
+        }
+        self._base_url = settings.datajud_base_url.rstrip("/")
+
+    async def __aenter__(self) -> "AsyncDataJudScanner":
+        limits = httpx.Limits(
+            max_connections=self._max_connections,
+            max_keepalive_connections=self._max_connections,
+        )
+        self._http = httpx.AsyncClient(
+            limits=limits,
+            timeout=settings.datajud_timeout_seconds,
+            http2=_HTTP2 and self._transport is None,
+            transport=self._transport,
+        )
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    async def _pace(self, alias: str) -> None:
+        lock = self._alias_locks.setdefault(alias, asyncio.Lock())
+        async with lock:
+            wait = self._next_at.get(alias, 0.0) - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._next_at[alias] = time.monotonic() + self._interval
+
+    async def search(self, alias: str, payload: dict[str, Any]) -> dict[str, Any]:
+        """POST `_search` com o mesmo retry/backoff da busca unitária."""
+        assert self._http is not None, "use AsyncDataJudScanner dentro de 'async with'"
+        ultimo_erro: Exception | None = None
+        for tentativa in range(_MAX_TENTATIVAS):
+            await self._pace(alias)
+            try:
+                resp = await self._http.post(
+                    f"{self._base_url}/{alias}/_search",
+                    headers=self._headers,
+                    json=payload,
+                )
+                resp.raise_for_status()
+                return resp.json()
+            except httpx.HTTPStatusError as exc:
+                status = exc.response.status_code
+                if status != 429 and not 500 <= status < 600:
+                    raise
+                ultimo_erro = exc
+            except (httpx.TimeoutException, httpx.TransportError) as exc:
+                ultimo_erro = exc
+            if tentativa < _MAX_TENTATIVAS - 1:
+                await asyncio.sleep(_BACKOFF_BASE_SECONDS * (2 ** tentativa))
+        raise ultimo_erro or RuntimeError("DataJud: falha sem exceção registrada.")
+
+    async def buscar_lote(
+        self, alias: str, cnjs: Sequence[str]
+    ) -> dict[str, dict[str, Any]]:
+        """Movimentos de vários CNJs (só dígitos) do mesmo tribunal.
+
+        Retorna {cnj: resultado no formato de `buscar_movimentos`}. Se a
+        resposta encher o `size` (algum processo com muitos graus/docs), o
+        lote é dividido ao meio e refeito — nunca devolve processo truncado.
+        """
+        if not cnjs:
+            return {}
+        payload = _lote_payload(cnjs)
+        resp = await self.search(alias, payload)
+        hits = resp.get("hits", {}).get("hits", []) or []
+        if len(hits) >= payload["size"] and len(cnjs) > 1:
+            meio = len(cnjs) // 2
+            resultado = await self.buscar_lote(alias, cnjs[:meio])
+            resultado.update(await self.buscar_lote(alias, cnjs[meio:]))
+            return resultado
+
+        por_cnj: dict[str, list[dict[str, Any]]] = {c: [] for c in cnjs}
+        for hit in hits:
+            numero = (hit.get("_source") or {}).get("numeroProcesso")
+            digits = "".join(ch for ch in str(numero or "") if ch.isdigit())
+            if digits in por_cnj:
+                por_cnj[digits].append(hit)
+        return {c: parse_hits(docs) for c, docs in por_cnj.items()}
@@ -15,20 +15,13 @@ Os termos são propositalmente abrangentes (operador filtra os falsos):
 - "edital"   -> edital de citação
 """
 
-import unicodedata
 from typing import Any
 
+from app.services.keyword_matcher import KeywordMatcher, fold_text
+
 # Termos que disparam o destaque (já sem acento, minúsculos).
 TERMOS_CITACAO = ("cita", "mandado", "edital")
-
-
-def _normalizar(texto: Any) -> str:
-    if texto is None:
-        return ""
-    s = str(texto)
-    s = unicodedata.normalize("NFKD", s)
-    s = "".join(c for c in s if not unicodedata.combining(c))
-    return s.lower()
+_MATCHER = KeywordMatcher(TERMOS_CITACAO)
 
 
 def _textos_do_movimento(nome: str | None, complementos: Any) -> list[str]:
@@ -60,8 +53,7 @@ def avaliar_candidato(
     transparência ao operador (cit_match_termo).
     """
     for texto in _textos_do_movimento(nome, complementos):
-        normalizado = _normalizar(texto)
-        for termo in TERMOS_CITACAO:
-            if termo in normalizado:
-                return True, termo
+        termo = _MATCHER.first(fold_text(texto))
+        if termo:
+            return True, termo
     return False, None
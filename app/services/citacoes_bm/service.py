@@ -8,15 +8,16 @@ Regra de ouro: o sistema só TRAZ movimentações. O status de citação é
 alterado EXCLUSIVAMENTE pelo operador (nunca pelo scan).
 """
 
+import asyncio
 import hashlib
 import logging
-import time
 from datetime import datetime, timezone
 from typing import Any, Iterable
 
-from sqlalchemy import func, or_
+from sqlalchemy import func, insert, or_, update
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.core.utils import format_cnj
 from app.models.citacoes_bm import (
     ORIGEM_L1_AUTO,
@@ -31,13 +32,17 @@ from app.models.citacoes_bm import (
     CitacaoBMProcesso,
 )
 from app.models.legal_one import LegalOneOffice
-from app.services.citacoes_bm.datajud import buscar_movimentos, get_client
+from app.services.citacoes_bm.datajud import (
+    AsyncDataJudScanner,
+    buscar_movimentos,
+)
 from app.services.citacoes_bm.heuristic import avaliar_candidato
 from app.services.citacoes_bm.tribunal_alias import (
     cnj_digits,
     resolve_tribunal_alias,
     uf_do_cnj,
 )
+from app.services.legal_one_async import run_sync
 
 logger = logging.getLogger(__name__)
 
@@ -120,6 +125,34 @@ def _to_int(value: Any) -> int | None:
         return None
 
 
+def _mov_fingerprint(mov: dict[str, Any]) -> str:
+    return _movement_fingerprint(
+        mov.get("grau"),
+        mov.get("codigo"),
+        mov.get("dataHora"),
+        mov.get("nome"),
+        mov.get("complementos"),
+    )
+
+
+def _movimento_row(processo_id: int, mov: dict[str, Any], fp: str) -> dict[str, Any]:
+    """Colunas de um CitacaoBMMovimento novo (mesmo dict serve ao ORM e ao insert em lote)."""
+    cand, termo = avaliar_candidato(mov.get("nome"), mov.get("complementos"))
+    return {
+        "processo_id": processo_id,
+        "codigo_tpu": _to_int(mov.get("codigo")),
+        "nome": mov.get("nome") or "Movimento sem nome",
+        "grau": mov.get("grau"),
+        "data_hora": _parse_dt(mov.get("dataHora")),
+        "complementos": mov.get("complementos") or None,
+        "orgao_julgador": mov.get("orgao"),
+        "fingerprint": fp,
+        "is_candidato_citacao": cand,
+        "cit_match_termo": termo,
+        "lido": False,
+    }
+
+
 class CitacoesBMService:
     def __init__(self, db: Session, l1_client: Any | None = None) -> None:
         self.db = db
@@ -319,9 +352,11 @@ class CitacoesBMService:
         }
 
     # ── Varredura DataJud ─────────────────────────────────────────────
-    def _recompute_counters(self, proc: CitacaoBMProcesso) -> None:
-        agg = (
+    def _contadores(self, processo_ids: list[int]) -> dict[int, dict[str, Any]]:
+        """Contadores denormalizados de vários processos num único GROUP BY."""
+        rows = (
             self.db.query(
+                CitacaoBMMovimento.processo_id,
                 func.count(CitacaoBMMovimento.id),
                 func.count(CitacaoBMMovimento.id).filter(
                     CitacaoBMMovimento.lido.is_(False)
@@ -331,14 +366,31 @@ class CitacoesBMService:
                     CitacaoBMMovimento.is_candidato_citacao.is_(True)
                 ),
             )
-            .filter(CitacaoBMMovimento.processo_id == proc.id)
-            .one()
+            .filter(CitacaoBMMovimento.processo_id.in_(processo_ids))
+            .group_by(CitacaoBMMovimento.processo_id)
+            .all()
         )
-        total, novos, last_mov, candidatos = agg
-        proc.total_movimentos = int(total or 0)
-        proc.novos_movimentos = int(novos or 0)
-        proc.last_movement_at = last_mov
-        proc.tem_candidato_citacao = bool(candidatos)
+        contadores = {
+            pid: {
+                "total_movimentos": 0,
+                "novos_movimentos": 0,
+                "last_movement_at": None,
+                "tem_candidato_citacao": False,
+            }
+            for pid in processo_ids
+        }
+        for pid, total, novos, last_mov, candidatos in rows:
+            contadores[pid] = {
+                "total_movimentos": int(total or 0),
+                "novos_movimentos": int(novos or 0),
+                "last_movement_at": last_mov,
+                "tem_candidato_citacao": bool(candidatos),
+            }
+        return contadores
+
+    def _recompute_counters(self, proc: CitacaoBMProcesso) -> None:
+        for campo, valor in self._contadores([proc.id])[proc.id].items():
+            setattr(proc, campo, valor)
 
     def scan_processo(
         self, proc: CitacaoBMProcesso, client: Any | None = None
@@ -379,32 +431,11 @@ class CitacoesBMService:
         }
         novos = 0
         for mov in resultado["movimentos"]:
-            fp = _movement_fingerprint(
-                mov.get("grau"),
-                mov.get("codigo"),
-                mov.get("dataHora"),
-                mov.get("nome"),
-                mov.get("complementos"),
-            )
+            fp = _mov_fingerprint(mov)
             if fp in existing_fps:
                 continue
             existing_fps.add(fp)
-            cand, termo = avaliar_candidato(mov.get("nome"), mov.get("complementos"))
-            self.db.add(
-                CitacaoBMMovimento(
-                    processo_id=proc.id,
-                    codigo_tpu=_to_int(mov.get("codigo")),
-                    nome=mov.get("nome") or "Movimento sem nome",
-                    grau=mov.get("grau"),
-                    data_hora=_parse_dt(mov.get("dataHora")),
-                    complementos=mov.get("complementos") or None,
-                    orgao_julgador=mov.get("orgao"),
-                    fingerprint=fp,
-                    is_candidato_citacao=cand,
-                    cit_match_termo=termo,
-                    lido=False,
-                )
-            )
+            self.db.add(CitacaoBMMovimento(**_movimento_row(proc.id, mov, fp)))
             novos += 1
 
         self.db.flush()
@@ -416,10 +447,19 @@ class CitacoesBMService:
         return {"status": SCAN_OK, "novos": novos}
 
     def scan_all(self, limit: int | None = None) -> dict[str, Any]:
-        """Varre todos os processos ativos (job diário / botão geral)."""
-        client = get_client()
+        """Varre todos os processos ativos (job diário / botão geral).
+
+        Agrupa por tribunal e consulta o DataJud em lotes de
+        `datajud_scan_batch_size` CNJs, com tribunais em paralelo (pool HTTP
+        único, ritmo por alias). Cada lote grava os movimentos novos num
+        insert só, com uma sondagem de fingerprints por lote, e commita.
+        """
         query = (
-            self.db.query(CitacaoBMProcesso)
+            self.db.query(
+                CitacaoBMProcesso.id,
+                CitacaoBMProcesso.cnj,
+                CitacaoBMProcesso.tribunal_alias,
+            )
             .filter(CitacaoBMProcesso.monitoramento_ativo.is_(True))
             .order_by(
                 CitacaoBMProcesso.last_scan_at.asc().nullsfirst(),
@@ -428,28 +468,138 @@ class CitacoesBMService:
         )
         if limit:
             query = query.limit(limit)
-        processos = query.all()
-
-        ok = sem_hits = erro = total_novos = 0
-        for idx, proc in enumerate(processos):
-            if idx:
-                # Educado com a API pública do DataJud (evita throttle 429).
-                time.sleep(0.25)
-            res = self.scan_processo(proc, client=client)
-            if res["status"] == SCAN_OK:
-                ok += 1
-                total_novos += res.get("novos", 0)
-            elif res["status"] == SCAN_SEM_HITS:
-                sem_hits += 1
+        alvos = query.all()
+
+        totais = {"ok": 0, "sem_hits": 0, "erro": 0, "novos_movimentos": 0}
+        por_alias: dict[str, list[tuple[int, str]]] = {}
+        sem_alias: list[int] = []
+        for pid, cnj, alias in alvos:
+            alias = alias or resolve_tribunal_alias(cnj)
+            if alias:
+                por_alias.setdefault(alias, []).append((pid, cnj))
             else:
-                erro += 1
-        return {
-            "processos": len(processos),
-            "ok": ok,
-            "sem_hits": sem_hits,
-            "erro": erro,
-            "novos_movimentos": total_novos,
+                sem_alias.append(pid)
+
+        if sem_alias:
+            self._marcar_scan(sem_alias, SCAN_ERRO, "Tribunal não mapeado para o CNJ.")
+            totais["erro"] += len(sem_alias)
+        if por_alias:
+            run_sync(self._scan_tribunais(por_alias, totais))
+        return {"processos": len(alvos), **totais}
+
+    async def _scan_tribunais(
+        self, por_alias: dict[str, list[tuple[int, str]]], totais: dict[str, int]
+    ) -> None:
+        batch_size = max(1, settings.datajud_scan_batch_size)
+        semaphore = asyncio.Semaphore(max(1, settings.datajud_scan_concurrent_tribunals))
+
+        async with AsyncDataJudScanner() as scanner:
+
+            async def _tribunal(alias: str, alvos: list[tuple[int, str]]) -> None:
+                async with semaphore:
+                    for start in range(0, len(alvos), batch_size):
+                        lote = alvos[start : start + batch_size]
+                        try:
+                            resultados = await scanner.buscar_lote(
+                                alias, [cnj for _pid, cnj in lote]
+                            )
+                        except Exception as exc:
+                            logger.warning(
+                                "Scan DataJud em lote falhou [%s, %d CNJs]: %s",
+                                alias, len(lote), exc,
+                            )
+                            self._marcar_scan(
+                                [pid for pid, _cnj in lote], SCAN_ERRO, str(exc)[:500], alias
+                            )
+                            totais["erro"] += len(lote)
+                            continue
+                        # Síncrono dentro do loop: a sessão nunca é usada
+                        # por duas corrotinas ao mesmo tempo.
+                        self._aplicar_lote(alias, lote, resultados, totais)
+
+            await asyncio.gather(*(_tribunal(a, lote) for a, lote in por_alias.items()))
+
+    def _marcar_scan(
+        self,
+        processo_ids: list[int],
+        status: str,
+        erro: str | None,
+        alias: str | None = None,
+    ) -> None:
+        campos: dict[str, Any] = {
+            "last_scan_at": _now(),
+            "last_scan_status": status,
+            "last_scan_error": erro,
         }
+        if alias:
+            campos["tribunal_alias"] = alias
+        self.db.execute(
+            update(CitacaoBMProcesso)
+            .where(CitacaoBMProcesso.id.in_(processo_ids))
+            .values(**campos)
+        )
+        self.db.commit()
+
+    def _aplicar_lote(
+        self,
+        alias: str,
+        lote: list[tuple[int, str]],
+        resultados: dict[str, dict[str, Any]],
+        totais: dict[str, int],
+    ) -> None:
+        """Grava o resultado de um lote: movimentos novos + estado/contadores."""
+        ids = [pid for pid, _cnj in lote]
+        try:
+            conhecidos = set(
+                self.db.query(
+                    CitacaoBMMovimento.processo_id, CitacaoBMMovimento.fingerprint
+                ).filter(CitacaoBMMovimento.processo_id.in_(ids))
+            )
+            agora = _now()
+            novos_rows: list[dict[str, Any]] = []
+            sem_hits: list[int] = []
+            com_hits: list[int] = []
+            for pid, cnj in lote:
+                resultado = resultados.get(cnj) or {"status": SCAN_SEM_HITS}
+                if resultado["status"] == SCAN_SEM_HITS:
+                    sem_hits.append(pid)
+                    continue
+                com_hits.append(pid)
+                for mov in resultado["movimentos"]:
+                    fp = _mov_fingerprint(mov)
+                    if (pid, fp) in conhecidos:
+                        continue
+                    conhecidos.add((pid, fp))
+                    novos_rows.append(_movimento_row(pid, mov, fp))
+
+            if novos_rows:
+                self.db.execute(insert(CitacaoBMMovimento), novos_rows)
+            estado = {
+                "tribunal_alias": alias,
+                "last_scan_at": agora,
+                "last_scan_error": None,
+            }
+            updates = [
+                {"id": pid, **estado, "last_scan_status": SCAN_SEM_HITS} for pid in sem_hits
+            ]
+            if com_hits:
+                contadores = self._contadores(com_hits)
+                updates.extend(
+                    {"id": pid, **estado, "last_scan_status": SCAN_OK, **contadores[pid]}
+                    for pid in com_hits
+                )
+            self.db.execute(update(CitacaoBMProcesso), updates)
+            self.db.commit()
+        except Exception as exc:
+            self.db.rollback()
+            logger.exception("Citações BM: falha gravando lote [%s].", alias)
+            self._marcar_scan(ids, SCAN_ERRO, str(exc)[:500], alias)
+            totais["erro"] += len(lote)
+            return
+
+        totais["ok"] += len(com_hits)
+        totais["sem_hits"] += len(sem_hits)
+        totais["novos_movimentos"] += len(novos_rows)
 
     # ── Ações do operador ─────────────────────────────────────────────
     def marcar_citacao(
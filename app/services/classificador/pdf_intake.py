@@ -41,10 +41,8 @@ from app.models.classificador import (
 )
 from app.core.config import settings
 from app.services.classificador.pdf_compressor import compress_pdf
-from app.services.prazos_iniciais.pdf_extractor import (
-    ExtractionResult,
-    extract,
-)
+from app.services.prazos_iniciais.pdf_extractor import ExtractionResult
+from app.services.prazos_iniciais.pdf_extractor.pool import extract_in_pool
 from app.services.prazos_iniciais.storage import (
     PdfValidationError,
     delete_pdf,
@@ -155,13 +153,17 @@ def ingest_pdf(
     # 4. Extracao mecanica (reusa motor do PI) — usa bytes comprimidos
     # ja que sao identicos textualmente ao original (pikepdf nao mexe
     # em texto). Economia: 1 leitura a mais nao tem.
+    # Roda no pool de processos do PI (pdfplumber segura o GIL — em thread
+    # os PDFs do motor dormente nao paralelizavam de verdade). Sem
+    # backpressure: quem chama aqui ja esta fora do event loop e espera.
     t0 = time.time()
     try:
-        result: ExtractionResult = extract(final_bytes)
+        result: ExtractionResult = extract_in_pool(final_bytes, backpressure=False)
     except Exception as exc:  # noqa: BLE001
         # Defesa em profundidade — `extract` nunca deveria levantar
-        # (`__init__.py` ja captura tudo e devolve fallback). Mas se
-        # acontecer, persiste como ERRO_CAPTURA pra operador investigar.
+        # (`__init__.py` ja captura tudo e devolve fallback), mas o pool
+        # levanta ExtractionTimeout. Persiste como ERRO_CAPTURA pra
+        # operador investigar.
         logger.exception("Classificador.intake_pdf: extract() levantou: %s", exc)
         result = ExtractionResult(
             success=False,
@@ -178,6 +180,12 @@ def ingest_pdf(
         result.extractor_used, result.confidence, result.success,
     )
 
+    timings = {
+        "compress_seconds": round(t_compress, 2),
+        "save_seconds": round(t_save, 2),
+        "extract_seconds": round(t_extract, 2),
+    }
+
     # 5. Resolve CNJ final — extractor > hint > None
     cnj_final = result.cnj_number or cnj_hint or None
 
@@ -223,7 +231,9 @@ def ingest_pdf(
                 "incoming_lote_id": lote_id,
                 "incoming_filename": pdf_filename,
                 "incoming_sha256": stored.sha256,
+                "pending_id": (metadata or {}).get("pending_id"),
                 "compression": compression.to_dict(),
+                "timings": timings,
             })
             existing.metadata_json = existing_meta
             existing.extractor_used = result.extractor_used or existing.extractor_used
@@ -260,11 +270,7 @@ def ingest_pdf(
     # 7. Persiste processo — inclui stats de compressao no metadata
     meta_final = dict(metadata or {})
     meta_final["compression"] = compression.to_dict()
-    meta_final["timings"] = {
-        "compress_seconds": round(t_compress, 2),
-        "save_seconds": round(t_save, 2),
-        "extract_seconds": round(t_extract, 2),
-    }
+    meta_final["timings"] = timings
 
     # Extrai partes do capa_json pras colunas separadas (UI/serializer
     # leem direto delas; eles ficavam null antes do fix).
@@ -2,15 +2,18 @@
 50 por cliente, cria lotes automaticamente e dispara classify.
 
 Pattern:
-- A cada tick (default 60s), pra cada cliente_nome distinto na fila:
-  - Pega ate BATCH_SIZE (50) PDFs em status=PENDENTE
-  - Se count == BATCH_SIZE OU oldest received_at > BATCH_TIMEOUT (30min):
+- A cada tick (default 60s), 1 agregado (count + received_at mais antigo)
+  por cliente_nome na fila — nao carrega as linhas PENDENTE.
+  - Se count >= BATCH_SIZE (50) OU oldest received_at > BATCH_TIMEOUT (30min):
+    - Reivindica ate BATCH_SIZE PDFs com `FOR UPDATE SKIP LOCKED` (varios
+      processos Uvicorn rodam o tick — cada PDF entra em 1 lote so)
     - Cria lote novo (cliente_nome herdado dos PDFs)
     - Move PDFs pra ALOCADO + amarra lote_id
     - Pra cada PDF: roda ingest_pdf (le bytes do volume + extracao mecanica)
       → marca PROCESSADO + processo_id
     - Se TUDO ok e CLASSIFICADOR_PENDING_AUTO_CLASSIFY=True, dispara
       classify do lote (Anthropic Batches em background).
+    - Enquanto sobrar BATCH_SIZE cheio no grupo, reivindica o proximo chunk.
 - Se um PDF falha em ingest, marca ERRO mas nao bloqueia os outros do mesmo lote.
 - Se TODOS falham, lote fica com 0 processos OK — operador apaga via UI.
 
@@ -22,20 +25,21 @@ from __future__ import annotations
 
 import asyncio
 import logging
-from collections import defaultdict
+import os
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from datetime import datetime, timezone
-from pathlib import Path
+from datetime import datetime, timedelta, timezone
 from typing import Optional
 
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.interval import IntervalTrigger
+from sqlalchemy import func
 
 from app.core.config import settings
 from app.db.session import SessionLocal
 from app.models.classificador import (
     ClassificadorLote,
     ClassificadorPdfPending,
+    ClassificadorProcesso,
     LOTE_STATUS_RASCUNHO,
     PENDING_STATUS_ALOCADO,
     PENDING_STATUS_ERRO,
@@ -67,18 +71,39 @@ def _read_pdf_from_storage(pdf_path: str) -> Optional[bytes]:
         return None
 
 
-def _should_flush_group(pending_list: list[ClassificadorPdfPending],
+def _should_flush_group(count: int, oldest: Optional[datetime],
                        batch_size: int, timeout_minutes: int) -> bool:
     """Decide se um grupo de PDFs pendentes deve virar lote agora."""
-    if not pending_list:
+    if count <= 0:
         return False
-    if len(pending_list) >= batch_size:
+    if count >= batch_size:
         return True
-    oldest = min(p.received_at for p in pending_list if p.received_at)
+    if oldest is None:
+        return False
+    if oldest.tzinfo is None:
+        # SQLite devolve naive — received_at e' gravado em UTC.
+        oldest = oldest.replace(tzinfo=timezone.utc)
     age = datetime.now(timezone.utc) - oldest
     return age.total_seconds() >= timeout_minutes * 60
 
 
+def _ingest_concurrency() -> int:
+    """Threads de ingest por lote — 0 no setting = dimensiona pelo host.
+
+    Em modo auto usa as CPUs disponiveis pro processo (respeita cpuset/
+    affinity do container), com teto em `classificador_pending_worker_
+    max_concurrency` — cada thread segura 1 PDF inteiro em RAM.
+    """
+    configured = settings.classificador_pending_worker_concurrency
+    if configured > 0:
+        return configured
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except (AttributeError, OSError):
+        cpus = os.cpu_count() or 1
+    return max(1, min(cpus, settings.classificador_pending_worker_max_concurrency))
+
+
 def _process_one_pdf(pending_id: int, lote_id: int) -> bool:
     """Processa 1 PDF do pending — funcao roda em thread separada.
 
@@ -159,10 +184,35 @@ def _process_one_pdf(pending_id: int, lote_id: int) -> bool:
         db.close()
 
 
+def _claim_group(db, cliente_key: str, batch_size: int) -> list[ClassificadorPdfPending]:
+    """Reivindica ate batch_size PENDENTES do cliente (mais antigos primeiro).
+
+    `FOR UPDATE SKIP LOCKED`: as linhas ficam travadas ate o commit que as
+    move pra ALOCADO (em `_process_group`); outro processo rodando o tick ao
+    mesmo tempo pula essas e pega as proximas. No SQLite (testes) o
+    `with_for_update` e' ignorado.
+    """
+    return (
+        db.query(ClassificadorPdfPending)
+        .filter(
+            ClassificadorPdfPending.status == PENDING_STATUS_PENDENTE,
+            func.coalesce(ClassificadorPdfPending.cliente_nome, "") == cliente_key,
+        )
+        .order_by(ClassificadorPdfPending.received_at.asc(), ClassificadorPdfPending.id.asc())
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+
+
 def _process_group(
     db, pending_list: list[ClassificadorPdfPending], batch_size: int,
 ) -> Optional[int]:
-    """Cria 1 lote + processa ate batch_size PDFs do grupo. Retorna lote_id."""
+    """Cria 1 lote + processa ate batch_size PDFs do grupo. Retorna lote_id.
+
+    `pending_list` vem de `_claim_group` — o commit que aloca os PDFs ao
+    lote e' o mesmo que solta o lock da reivindicacao.
+    """
     # Limita ao batch_size
     pending_list = pending_list[:batch_size]
     if not pending_list:
@@ -203,9 +253,9 @@ def _process_group(
 
     # 3. Pra cada PDF: le bytes + ingest_pdf — em PARALELO via ThreadPoolExecutor
     # Cada thread tem sua propria DB session (SQLAlchemy nao e' thread-safe).
-    # Concorrencia configuravel via setting classificador_pending_worker_concurrency.
+    # Concorrencia: setting classificador_pending_worker_concurrency (0 = CPUs do host).
     pending_ids = [p.id for p in pending_list]
-    concurrency = max(1, settings.classificador_pending_worker_concurrency)
+    concurrency = max(1, min(_ingest_concurrency(), len(pending_ids)))
     t0 = datetime.now(timezone.utc)
 
     results: list[bool] = []
@@ -266,55 +316,183 @@ def _tick() -> None:
 
     db = SessionLocal()
     try:
-        # Carrega TODOS os PENDENTES
-        pending_all = (
-            db.query(ClassificadorPdfPending)
+        # Agregado por cliente_nome (None e "" caem na mesma chave) — o
+        # tamanho da fila nao muda o custo do tick.
+        cliente_key = func.coalesce(ClassificadorPdfPending.cliente_nome, "")
+        groups = (
+            db.query(
+                cliente_key,
+                func.count(ClassificadorPdfPending.id),
+                func.min(ClassificadorPdfPending.received_at),
+            )
             .filter(ClassificadorPdfPending.status == PENDING_STATUS_PENDENTE)
-            .order_by(ClassificadorPdfPending.received_at.asc())
+            .group_by(cliente_key)
             .all()
         )
-        if not pending_all:
+        db.rollback()  # encerra a transacao de leitura antes dos claims
+        if not groups:
             return
 
-        # Agrupa por cliente_nome (None vira chave "")
-        groups: dict[str, list[ClassificadorPdfPending]] = defaultdict(list)
-        for p in pending_all:
-            key = p.cliente_nome or ""
-            groups[key].append(p)
-
         batch_size = settings.classificador_batch_size
         timeout = settings.classificador_batch_timeout_minutes
 
         logger.debug(
             "pending_worker: %d pendentes em %d grupos (cliente)",
-            len(pending_all), len(groups),
+            sum(int(c) for _, c, _ in groups), len(groups),
         )
 
-        for cliente_key, plist in groups.items():
-            if not _should_flush_group(plist, batch_size, timeout):
+        for key, count, oldest in groups:
+            count = int(count)
+            if not _should_flush_group(count, oldest, batch_size, timeout):
                 logger.debug(
                     "pending_worker: cliente=%r tem %d PDFs (aguardando %d ou %dmin)",
-                    cliente_key or "(sem cliente)", len(plist), batch_size, timeout,
+                    key or "(sem cliente)", count, batch_size, timeout,
                 )
                 continue
-            # Pode haver mais que batch_size — _process_group corta no limite,
-            # e proxima rodada agarra o resto
-            try:
-                _process_group(db, plist, batch_size)
-            except Exception as exc:  # noqa: BLE001
-                logger.exception(
-                    "pending_worker: erro processando grupo cliente=%r: %s",
-                    cliente_key, exc,
-                )
-                # Rollback do que estiver pendente nessa transacao
+            # 1o chunk sai pela regra acima; os seguintes so se ainda houver
+            # batch_size cheio — a sobra espera a proxima rodada.
+            restante = count
+            while True:
                 try:
-                    db.rollback()
-                except Exception:
-                    pass
+                    claimed = _claim_group(db, key, batch_size)
+                    # O agregado foi lido antes do claim: com SKIP LOCKED,
+                    # outro processo pode ter levado parte do grupo. Sobra
+                    # menor que batch_size so' sai se ja' passou do timeout.
+                    if not claimed or not _should_flush_group(
+                        len(claimed), claimed[0].received_at, batch_size, timeout,
+                    ):
+                        db.rollback()
+                        break
+                    _process_group(db, claimed, batch_size)
+                except Exception as exc:  # noqa: BLE001
+                    logger.exception(
+                        "pending_worker: erro processando grupo cliente=%r: %s",
+                        key, exc,
+                    )
+                    # Rollback do que estiver pendente nessa transacao
+                    try:
+                        db.rollback()
+                    except Exception:
+                        pass
+                    break
+                restante -= len(claimed)
+                if len(claimed) < batch_size or restante < batch_size:
+                    break
     finally:
         db.close()
 
 
+def _ingest_entry(meta: dict, pending_id: int, lote_id: Optional[int]) -> dict:
+    """Entrada de metadata com compression/timings do ingest DESSE pending.
+
+    Processo reaproveitado pelo dedup por CNJ mantem no topo os numeros do
+    1o ingest; cada PDF seguinte vira uma entrada em `dedup_history`. Casa
+    por `pending_id` e, em entradas antigas (sem ele), pelo lote de entrada.
+    """
+    if meta.get("pending_id") == pending_id:
+        return meta
+    history = meta.get("dedup_history") or []
+    for entry in reversed(history):
+        if entry.get("pending_id") == pending_id:
+            return entry
+    if lote_id is not None:
+        for entry in reversed(history):
+            if entry.get("pending_id") is None and entry.get("incoming_lote_id") == lote_id:
+                return entry
+    return meta
+
+
+def ingest_throughput(db, window_minutes: int = 60) -> dict:
+    """Throughput do ingest do motor dormente na janela (PDFs finalizados).
+
+    - pdfs_por_minuto: PROCESSADO+ERRO com processed_at na janela / minutos;
+    - ingest medio: compress+save+extract gravados pelo `ingest_pdf` em
+      `metadata_json["timings"]`; e alocado → processado (inclui espera por
+      thread livre no pool);
+    - compressao: soma de `metadata_json["compression"]` (pdf_compressor).
+
+    Agrega por pending, nao por processo: N PDFs deduplicados por CNJ no
+    mesmo processo contam N vezes, cada um com a sua entrada de
+    `dedup_history` (ver `_ingest_entry`).
+    """
+    now = datetime.now(timezone.utc)
+    since = now - timedelta(minutes=window_minutes)
+    rows = (
+        db.query(
+            ClassificadorPdfPending.id,
+            ClassificadorPdfPending.status,
+            ClassificadorPdfPending.lote_id,
+            ClassificadorPdfPending.processo_id,
+            ClassificadorPdfPending.allocated_at,
+            ClassificadorPdfPending.processed_at,
+        )
+        .filter(
+            ClassificadorPdfPending.processed_at.isnot(None),
+            ClassificadorPdfPending.processed_at >= since,
+        )
+        .all()
+    )
+
+    ok = sum(1 for r in rows if r.status == PENDING_STATUS_PROCESSADO)
+    wall = [
+        (r.processed_at - r.allocated_at).total_seconds()
+        for r in rows if r.allocated_at is not None
+    ]
+
+    processo_ids = {r.processo_id for r in rows if r.processo_id}
+    metas = {
+        pid: meta or {}
+        for pid, meta in (
+            db.query(ClassificadorProcesso.id, ClassificadorProcesso.metadata_json)
+            .filter(ClassificadorProcesso.id.in_(processo_ids))
+            .all()
+        )
+    } if processo_ids else {}
+
+    ingest_secs: list[float] = []
+    original = compressed = 0
+    comprimidos = 0
+    for r in rows:
+        if r.processo_id not in metas:
+            continue
+        entry = _ingest_entry(metas[r.processo_id], r.id, r.lote_id)
+        timings = entry.get("timings") or {}
+        if timings:
+            ingest_secs.append(
+                sum(float(timings.get(k) or 0) for k in
+                    ("compress_seconds", "save_seconds", "extract_seconds"))
+            )
+        comp = entry.get("compression")
+        if comp:
+            original += int(comp.get("original_size") or 0)
+            compressed += int(comp.get("compressed_size") or 0)
+            if comp.get("tool") == "pikepdf":
+                comprimidos += 1
+
+    def _avg(values: list[float]) -> Optional[float]:
+        return round(sum(values) / len(values), 2) if values else None
+
+    saved = max(0, original - compressed)
+    return {
+        "window_minutes": window_minutes,
+        "pdfs_finalizados": len(rows),
+        "pdfs_processados": ok,
+        "pdfs_erro": len(rows) - ok,
+        "pdfs_por_minuto": round(len(rows) / window_minutes, 2) if window_minutes else None,
+        "ingest_medio_segundos": _avg(ingest_secs),
+        "alocado_para_processado_medio_segundos": _avg(wall),
+        "compressao": {
+            "pdfs_comprimidos": comprimidos,
+            "bytes_originais": original,
+            "bytes_finais": compressed,
+            "bytes_economizados": saved,
+            "economia_pct": round(saved / original * 100, 2) if original else None,
+        },
+        "concorrencia_ingest": _ingest_concurrency(),
+        "generated_at": now.isoformat(),
+    }
+
+
 def register_classificador_pending_job(scheduler: BackgroundScheduler) -> None:
     """Registra o tick periodico do motor dormente."""
     if not settings.classificador_pending_worker_enabled:
@@ -338,6 +516,6 @@ def register_classificador_pending_job(scheduler: BackgroundScheduler) -> None:
         interval,
         settings.classificador_batch_size,
         settings.classificador_batch_timeout_minutes,
-        settings.classificador_pending_worker_concurrency,
+        _ingest_concurrency(),
         settings.classificador_pending_auto_classify,
     )
@@ -11,6 +11,7 @@ from typing import Any
 import httpx
 
 from app.core.config import settings
+from app.services.classifier.rate_limit import estimate_tokens, get_rate_limiter
 
 logger = logging.getLogger(__name__)
 
@@ -39,6 +40,42 @@ class AnthropicClassifierClient:
                 "ANTHROPIC_API_KEY não configurada. "
                 "Adicione ao .env ou passe como parâmetro."
             )
+        # Um AsyncClient reaproveitado entre chamadas (pool de conexões/TLS).
+        # Preso ao loop que o criou — recriado se o client for usado em outro.
+        self._http: httpx.AsyncClient | None = None
+        self._http_loop: asyncio.AbstractEventLoop | None = None
+
+    def _http_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._http is None or self._http.is_closed or self._http_loop is not loop:
+            self._http = httpx.AsyncClient(timeout=60.0)
+            self._http_loop = loop
+        return self._http
+
+    async def aclose(self) -> None:
+        """Fecha o pool de conexões de `classify`. Seguro chamar mais de uma vez."""
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+            self._http_loop = None
+
+    @staticmethod
+    def _system_payload(system_prompt: str) -> str | list[dict[str, Any]]:
+        """
+        `system` com breakpoints de prompt caching. Um `SystemPrompt`
+        (prompts.py) vira um bloco por parte — prefixo instruções+taxonomia
+        e sufixo do escritório —, cada um com `cache_control`; uma str comum
+        vira um bloco só. Limite da API: 4 breakpoints por requisição.
+        """
+        if not settings.classifier_prompt_caching or not system_prompt:
+            return system_prompt
+        blocks = getattr(system_prompt, "blocks", None) or (str(system_prompt),)
+        if len(blocks) > 4:
+            blocks = ("".join(blocks),)
+        return [
+            {"type": "text", "text": block, "cache_control": {"type": "ephemeral"}}
+            for block in blocks
+        ]
 
     def _build_headers(self) -> dict[str, str]:
         return {
@@ -65,7 +102,7 @@ class AnthropicClassifierClient:
             "model": self.model,
             "max_tokens": self.max_tokens,
             "temperature": 0,
-            "system": system_prompt,
+            "system": self._system_payload(system_prompt),
             "messages": [
                 {"role": "user", "content": user_message},
             ],
@@ -74,13 +111,24 @@ class AnthropicClassifierClient:
         max_retries = 3
         base_wait = 15  # segundos
 
+        # Admissão pelo limiter adaptativo do processo (RPM/TPM dos headers
+        # anthropic-ratelimit-*): várias chamadas em paralelo enquanto o
+        # orçamento permitir, em vez de sleeps fixos no chamador.
+        limiter = get_rate_limiter()
+        estimated_tokens = estimate_tokens(system_prompt, user_message)
+        client = self._http_client()
+
         for attempt in range(max_retries + 1):
-            async with httpx.AsyncClient(timeout=60.0) as client:
+            await limiter.acquire(estimated_tokens)
+            try:
                 response = await client.post(
                     ANTHROPIC_API_URL,
                     headers=self._build_headers(),
                     json=payload,
                 )
+            finally:
+                limiter.release()
+            limiter.observe(response.headers)
 
             # Trata rate limit com retry
             if response.status_code == 429:
@@ -96,7 +144,9 @@ class AnthropicClassifierClient:
                         "Rate limit (429) na tentativa %d/%d. Aguardando %ds...",
                         attempt + 1, max_retries + 1, wait_time,
                     )
-                    await asyncio.sleep(wait_time)
+                    # Pausa o limiter inteiro: as chamadas irmãs também
+                    # esperam, em vez de cada uma colecionar seu próprio 429.
+                    limiter.pause(wait_time)
                     continue
                 else:
                     error_body = response.text
@@ -165,7 +215,7 @@ class AnthropicClassifierClient:
                 # Mesmo motivo da chamada síncrona — taxonomia fechada
                 # pede determinismo.
                 "temperature": 0,
-                "system": system_prompt,
+                "system": self._system_payload(system_prompt),
                 "messages": [
                     {"role": "user", "content": user_message},
                 ],
@@ -9,7 +9,7 @@ from datetime import datetime, timezone
 from io import BytesIO
 from typing import Any
 
-from openpyxl import Workbook, load_workbook
+from openpyxl import load_workbook
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
@@ -25,6 +25,7 @@ from app.models.classification import (
     ClassificationItem,
     FINAL_CLF_STATUSES,
 )
+from app.services.xlsx_stream import StreamingXlsxWriter
 
 from .ai_client import AnthropicClassifierClient
 from .prompts import SYSTEM_PROMPT, build_user_message
@@ -202,20 +203,24 @@ class ClassificationService:
 
                 self.db.commit()
 
-        tasks = [classify_item(item) for item in items]
-        await asyncio.gather(*tasks)
-
-        # Atualizar status final do batch
-        self.db.refresh(batch)
-        if batch.status != CLF_STATUS_CANCELLED:
-            batch.success_count = success
-            batch.failure_count = failed
-            batch.finished_at = datetime.now(timezone.utc)
-            batch.status = (
-                CLF_STATUS_COMPLETED if failed == 0
-                else CLF_STATUS_COMPLETED_WITH_ERRORS
-            )
-            self.db.commit()
+        try:
+            tasks = [classify_item(item) for item in items]
+            await asyncio.gather(*tasks)
+
+            # Atualizar status final do batch
+            self.db.refresh(batch)
+            if batch.status != CLF_STATUS_CANCELLED:
+                batch.success_count = success
+                batch.failure_count = failed
+                batch.finished_at = datetime.now(timezone.utc)
+                batch.status = (
+                    CLF_STATUS_COMPLETED if failed == 0
+                    else CLF_STATUS_COMPLETED_WITH_ERRORS
+                )
+                self.db.commit()
+        finally:
+            # O pool httpx do client é por batch — fecha mesmo se algo estourar.
+            await self.ai_client.aclose()
 
         return {
             "batch_id": batch_id,
@@ -278,19 +283,18 @@ class ClassificationService:
     # Exportação para planilha
     # ──────────────────────────────────────────────
 
-    def export_results_to_xlsx(self, batch_id: int) -> bytes:
-        """Gera uma planilha XLSX com os resultados da classificação."""
+    def export_results_to_xlsx(self, batch_id: int) -> str:
+        """Gera a planilha XLSX com os resultados da classificação em arquivo
+        temporário e devolve o caminho (quem chama apaga)."""
+        from openpyxl.styles import Font, PatternFill
+
         items = (
             self.db.query(ClassificationItem)
             .filter_by(batch_id=batch_id)
             .order_by(ClassificationItem.row_index)
-            .all()
+            .yield_per(1000)
         )
 
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Classificações"
-
         headers = [
             "Nº do Processo",
             "Categoria",
@@ -300,39 +304,28 @@ class ClassificationService:
             "Status",
             "Erro",
         ]
-        ws.append(headers)
-
-        from openpyxl.styles import Font, PatternFill
-        header_font = Font(bold=True, color="FFFFFF")
-        header_fill = PatternFill("solid", fgColor="2B5797")
-        for col_idx, _ in enumerate(headers, 1):
-            cell = ws.cell(row=1, column=col_idx)
-            cell.font = header_font
-            cell.fill = header_fill
-
-        for item in items:
-            ws.append([
-                item.process_number,
-                item.category or "",
-                item.subcategory or "",
-                item.confidence or "",
-                item.justification or "",
-                item.status,
-                item.error_message or "",
-            ])
-
-        # Ajustar largura das colunas
-        ws.column_dimensions["A"].width = 30
-        ws.column_dimensions["B"].width = 30
-        ws.column_dimensions["C"].width = 35
-        ws.column_dimensions["D"].width = 12
-        ws.column_dimensions["E"].width = 50
-        ws.column_dimensions["F"].width = 12
-        ws.column_dimensions["G"].width = 40
-
-        output = BytesIO()
-        wb.save(output)
-        return output.getvalue()
+        writer = StreamingXlsxWriter(
+            header_font=Font(bold=True, color="FFFFFF"),
+            header_fill=PatternFill("solid", fgColor="2B5797"),
+        )
+        writer.add_sheet(
+            "Classificações",
+            headers,
+            (
+                [
+                    item.process_number,
+                    item.category or "",
+                    item.subcategory or "",
+                    item.confidence or "",
+                    item.justification or "",
+                    item.status,
+                    item.error_message or "",
+                ]
+                for item in items
+            ),
+            widths=[30, 30, 35, 12, 50, 12, 40],
+        )
+        return writer.to_tempfile(prefix=f"classificacao-batch-{batch_id}-")
 
     # ──────────────────────────────────────────────
     # Cancelamento
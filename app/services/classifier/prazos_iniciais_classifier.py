@@ -75,7 +75,11 @@ from app.services.classifier.prazos_iniciais_schema import (
     BlocoManifestacaoAvulsa,
     PrazoInicialClassificationResponse,
 )
-from app.services.prazos_iniciais.prazo_calculator import calcular_prazo_seguro
+from app.services.prazos_iniciais.calendario_forense import calendario_do_processo
+from app.services.prazos_iniciais.prazo_calculator import (
+    BusinessCalendar,
+    calcular_prazo_seguro,
+)
 from app.services.prazos_iniciais.template_matching_service import match_templates
 
 logger = logging.getLogger(__name__)
@@ -815,6 +819,9 @@ class PrazosIniciaisBatchClassifier:
         blocks_with = 0
         blocks_without = 0
 
+        # Recessos/feriados do tribunal e da comarca do processo.
+        calendar = calendario_do_processo(self.db, intake.cnj_number)
+
         for tipo_prazo, bloco in response.blocos_aplicaveis():
             base = self._build_sugestao_base(
                 intake_id=intake.id,
@@ -822,6 +829,7 @@ class PrazosIniciaisBatchClassifier:
                 bloco=bloco,
                 confianca_geral=confianca,
                 observacoes=observacoes,
+                calendar=calendar,
             )
             subtipo_match = _derive_subtipo_for_matching(tipo_prazo, bloco)
             templates = match_templates(
@@ -868,6 +876,7 @@ class PrazosIniciaisBatchClassifier:
         bloco: Any,
         confianca_geral: str,
         observacoes: Optional[str],
+        calendar: Optional[BusinessCalendar] = None,
     ) -> PrazoInicialSugestao:
         """
         Mapeia um bloco da resposta da IA para uma linha "base" de
@@ -947,7 +956,7 @@ class PrazosIniciaisBatchClassifier:
         sugestao.prazo_tipo = prazo_tipo
         sugestao.data_base = data_base
         sugestao.data_final_calculada = calcular_prazo_seguro(
-            data_base, prazo_dias, prazo_tipo
+            data_base, prazo_dias, prazo_tipo, calendar=calendar
         )
 
         # Prazo fatal: a IA informa uma data_limit absoluta (considerando
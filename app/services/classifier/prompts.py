@@ -2,8 +2,17 @@
 Templates de prompt para o agente classificador de publicações judiciais.
 """
 
+import logging
+import threading
+import time
+from collections import OrderedDict
 from typing import Optional
-from .taxonomy import build_taxonomy_text
+
+from app.core.config import settings
+
+from .taxonomy import build_taxonomy_text, get_active_taxonomy_version
+
+logger = logging.getLogger(__name__)
 
 # IMPORTANTE: capturamos o texto v1 da taxonomia AQUI no import e
 # guardamos como constante. Isso garante que `build_system_prompt_for_office`
@@ -736,6 +745,26 @@ Resposta: {"categoria": "Decisão, Sentença e Extinção", "subcategoria": "Sen
 """
 
 
+class SystemPrompt(str):
+    """
+    System prompt montado em blocos pra prompt caching da Anthropic.
+
+    Continua sendo uma `str` (todos os callers seguem concatenando/logando
+    normalmente); `blocks` guarda o prefixo estável (instruções + taxonomia
+    do escritório) separado do sufixo por escritório (addendums + feedbacks),
+    e o `AnthropicClassifierClient` põe um breakpoint `cache_control` em cada
+    um. Concatenar com outra string devolve `str` simples — o client então
+    cacheia o prompt inteiro como um bloco só.
+    """
+
+    blocks: tuple[str, ...]
+
+    def __new__(cls, *blocks: str) -> "SystemPrompt":
+        obj = super().__new__(cls, "".join(blocks))
+        obj.blocks = tuple(b for b in blocks if b)
+        return obj
+
+
 def build_system_prompt_for_office(
     excluded: set[tuple[str, str | None]] | None = None,
     custom_additions: list[dict[str, str]] | None = None,
@@ -786,23 +815,110 @@ def build_system_prompt_for_office(
         # casos de "Classificação inválida" + IA inventando subs em massa.
         base = SYSTEM_PROMPT.replace(_BASELINE_TAXONOMY, custom_taxonomy)
 
+    # Addendums por escritório vão num bloco separado do prefixo (instruções
+    # + taxonomia): o prefixo é o mesmo pra todos os prompts do escritório
+    # (linked/unlinked) e vira um breakpoint de cache próprio.
+    suffix = ""
     if is_unlinked:
-        base += NATUREZA_PROCESSO_ADDENDUM
+        suffix += NATUREZA_PROCESSO_ADDENDUM
 
     if taxonomy_version == "v2":
-        base += SISTEMA_MENCIONADO_ADDENDUM
+        suffix += SISTEMA_MENCIONADO_ADDENDUM
 
     if feedback_examples:
-        base += feedback_examples
+        suffix += feedback_examples
 
     # Esquema do polo ATIVO: roteamento de categorias ativo + exemplos
     # proprios, no FIM do prompt (alta recencia) pra sobrepor os exemplos
     # passivo-centricos do SYSTEM_PROMPT. So pra escritorio ativo; passivo
     # e 'ambos' mantem o comportamento atual. (fix polo 2026-06)
     if polo_scope == "ativo":
-        base += ATIVO_SCHEME_ADDENDUM
+        suffix += ATIVO_SCHEME_ADDENDUM
+
+    return SystemPrompt(base, suffix)
+
+
+# ──────────────────────────────────────────────────────────────
+# LRU de prompts montados por escritório
+#
+# Montar o prompt de um escritório custa overrides + feedbacks + árvore do
+# DB, e cada rodada (busca síncrona, batch, reclassificação) refazia tudo.
+# O cache guarda o prompt final por (escritório, polo, unlinked, versão de
+# taxonomia). Além de economizar o build, mantém o texto byte-idêntico
+# entre rodadas — condição pro prompt caching da Anthropic acertar.
+#
+# Invalidação explícita: mudanças de taxonomia (invalidate_taxonomy_cache*,
+# chamados pelo taxonomy_admin e pelos templates), de overrides e de
+# feedbacks (explícito no POST /records/feedback, implícito no
+# reclassify_records; feedback sem escritório é global e limpa tudo). O TTL
+# cobre os outros workers Uvicorn, que não recebem a invalidação in-process.
+# ──────────────────────────────────────────────────────────────
 
-    return base
+_PROMPT_CACHE: "OrderedDict[tuple, tuple[float, str]]" = OrderedDict()
+_PROMPT_CACHE_LOCK = threading.Lock()
+_PROMPT_CACHE_MAX_ENTRIES = 256
+
+
+def invalidate_system_prompt_cache(office_external_id: Optional[int] = None) -> None:
+    """Descarta prompts cacheados do escritório (ou todos, com None)."""
+    with _PROMPT_CACHE_LOCK:
+        if office_external_id is None:
+            _PROMPT_CACHE.clear()
+            return
+        for key in [k for k in _PROMPT_CACHE if k[0] == office_external_id]:
+            _PROMPT_CACHE.pop(key, None)
+
+
+def get_system_prompt_for_office(
+    db,
+    office_external_id: Optional[int],
+    is_unlinked: bool = False,
+    polo_scope: Optional[str] = None,
+    taxonomy_version: Optional[str] = None,
+) -> str:
+    """
+    Prompt do escritório (overrides + feedbacks + árvore enxuta) via LRU.
+
+    `office_external_id` None/0 = publicação sem escritório (árvore global).
+    Falha ao carregar feedbacks não impede o prompt (vai sem exemplos);
+    falha nos overrides propaga — o caller decide o fallback.
+    """
+    oid = office_external_id or 0
+    key = (oid, bool(is_unlinked), polo_scope, taxonomy_version, get_active_taxonomy_version())
+    now = time.monotonic()
+    with _PROMPT_CACHE_LOCK:
+        hit = _PROMPT_CACHE.get(key)
+        if hit is not None and now - hit[0] < settings.classifier_prompt_cache_ttl_seconds:
+            _PROMPT_CACHE.move_to_end(key)
+            return hit[1]
+
+    if oid:
+        excluded, custom = load_office_overrides(db, oid)
+    else:
+        excluded, custom = set(), []
+    try:
+        feedback = build_feedback_examples(db, oid or None, office_polo=polo_scope)
+    except Exception as exc:  # noqa: BLE001
+        logger.warning(
+            "Falha ao carregar feedbacks do escritório %s: %s", oid, exc,
+        )
+        feedback = ""
+
+    prompt = build_system_prompt_for_office(
+        excluded or None,
+        custom or None,
+        is_unlinked=is_unlinked,
+        feedback_examples=feedback,
+        polo_scope=polo_scope,
+        taxonomy_version=taxonomy_version,
+        office_external_id=oid or None,
+    )
+    with _PROMPT_CACHE_LOCK:
+        _PROMPT_CACHE[key] = (now, prompt)
+        _PROMPT_CACHE.move_to_end(key)
+        while len(_PROMPT_CACHE) > _PROMPT_CACHE_MAX_ENTRIES:
+            _PROMPT_CACHE.popitem(last=False)
+    return prompt
 
 
 def load_office_overrides(
@@ -0,0 +1,178 @@
+"""
+Limiter adaptativo das chamadas síncronas à Anthropic Messages API.
+
+Antes a auto-classificação rodava com CONCURRENCY=1 e `sleep(12)` fixo por
+registro — calibrado pro tier mais baixo (5 RPM) e nunca reajustado. A API
+devolve o orçamento real em cada resposta:
+
+    anthropic-ratelimit-requests-limit / -remaining / -reset
+    anthropic-ratelimit-input-tokens-limit / -remaining / -reset
+    (ou anthropic-ratelimit-tokens-*, conforme o tier)
+
+Aqui o limiter começa conservador (`classifier_initial_rpm`/`_tpm`) e passa a
+seguir esses headers: admite uma chamada enquanto houver request e tokens
+estimados sobrando na janela atual, e no máximo `classifier_max_concurrent`
+em voo. Um 429 pausa todo mundo até o `retry-after`.
+
+O estado é protegido por `threading.Lock` e a espera é `asyncio.sleep` em
+polling curto — o mesmo limiter serve a loops diferentes (a auto-classificação
+cria um loop novo por rodada em thread auxiliar), sem primitivas asyncio
+presas a um loop.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Mapping, Optional
+
+from app.core.config import settings
+
+_WINDOW_SECONDS = 60.0
+_POLL_SECONDS = 0.05
+_MAX_SLEEP_SECONDS = 1.0
+
+# Aproximação de chars → tokens pra admissão (o valor real vem do header).
+_CHARS_PER_TOKEN = 3.5
+
+
+def estimate_tokens(*texts: str) -> int:
+    return int(sum(len(t or "") for t in texts) / _CHARS_PER_TOKEN) + 1
+
+
+def _parse_int(value: Optional[str]) -> Optional[int]:
+    try:
+        return int(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _reset_in_seconds(value: Optional[str]) -> Optional[float]:
+    """Headers `*-reset` vêm em RFC 3339; converte pra segundos a partir de agora."""
+    if not value:
+        return None
+    try:
+        reset_at = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if reset_at.tzinfo is None:
+        reset_at = reset_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (reset_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class _Window:
+    """Orçamento de uma dimensão (requests ou tokens) na janela corrente."""
+
+    def __init__(self, limit: int):
+        self.limit = max(1, int(limit))
+        self.remaining = float(self.limit)
+        self.reset_at = time.monotonic() + _WINDOW_SECONDS
+
+    def roll(self, now: float) -> None:
+        if now >= self.reset_at:
+            self.remaining = float(self.limit)
+            self.reset_at = now + _WINDOW_SECONDS
+
+    def observe(self, limit: Optional[int], remaining: Optional[int], reset_in: Optional[float], now: float) -> None:
+        if limit:
+            self.limit = limit
+        if remaining is not None:
+            # O servidor é a fonte da verdade; a contagem local só cobre o
+            # intervalo entre respostas.
+            self.remaining = float(remaining)
+        if reset_in is not None:
+            self.reset_at = now + reset_in
+
+
+class AdaptiveRateLimiter:
+    """Admissão por RPM/TPM observados + teto de concorrência."""
+
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        initial_rpm: Optional[int] = None,
+        initial_tpm: Optional[int] = None,
+    ):
+        self.max_concurrency = max(1, max_concurrency or settings.classifier_max_concurrent)
+        self._requests = _Window(initial_rpm or settings.classifier_initial_rpm)
+        self._tokens = _Window(initial_tpm or settings.classifier_initial_tpm)
+        self._in_flight = 0
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def try_reserve(self, tokens: int) -> float:
+        """Reserva 1 request + `tokens`. Retorna 0 se admitido, senão a espera sugerida."""
+        with self._lock:
+            now = time.monotonic()
+            if self._paused_until > now:
+                return self._paused_until - now
+            if self._in_flight >= self.max_concurrency:
+                return _POLL_SECONDS
+            self._requests.roll(now)
+            self._tokens.roll(now)
+            if self._requests.remaining < 1:
+                return max(_POLL_SECONDS, self._requests.reset_at - now)
+            # Uma chamada maior que a janela inteira passa sozinha quando
+            # o balde está cheio — senão nunca seria admitida.
+            need = min(float(tokens), float(self._tokens.limit))
+            if self._tokens.remaining < need:
+                return max(_POLL_SECONDS, self._tokens.reset_at - now)
+            self._requests.remaining -= 1
+            self._tokens.remaining -= need
+            self._in_flight += 1
+            return 0.0
+
+    async def acquire(self, tokens: int) -> None:
+        while True:
+            wait = self.try_reserve(tokens)
+            if wait <= 0:
+                return
+            await asyncio.sleep(min(wait, _MAX_SLEEP_SECONDS))
+
+    def release(self) -> None:
+        with self._lock:
+            self._in_flight = max(0, self._in_flight - 1)
+
+    def observe(self, headers: Mapping[str, str]) -> None:
+        """Ajusta o orçamento pelos headers `anthropic-ratelimit-*` da resposta."""
+        prefix = "anthropic-ratelimit-"
+        token_kind = "input-tokens" if headers.get(prefix + "input-tokens-limit") else "tokens"
+        with self._lock:
+            now = time.monotonic()
+            self._requests.observe(
+                _parse_int(headers.get(prefix + "requests-limit")),
+                _parse_int(headers.get(prefix + "requests-remaining")),
+                _reset_in_seconds(headers.get(prefix + "requests-reset")),
+                now,
+            )
+            self._tokens.observe(
+                _parse_int(headers.get(f"{prefix}{token_kind}-limit")),
+                _parse_int(headers.get(f"{prefix}{token_kind}-remaining")),
+                _reset_in_seconds(headers.get(f"{prefix}{token_kind}-reset")),
+                now,
+            )
+
+    def pause(self, seconds: float) -> None:
+        """429: ninguém sai até `seconds` (retry-after) passar."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+_limiter: Optional[AdaptiveRateLimiter] = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> AdaptiveRateLimiter:
+    """Limiter por processo — compartilhado por todo `AnthropicClassifierClient.classify`."""
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = AdaptiveRateLimiter()
+    return _limiter
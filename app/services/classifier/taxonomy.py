@@ -104,6 +104,9 @@ def invalidate_taxonomy_cache() -> None:
     with _TREE_CACHE_LOCK:
         _TREE_CACHE.clear()
         _TREE_CACHE_AT.clear()
+    # Prompts montados embutem o texto da árvore — caem junto.
+    from app.services.classifier.prompts import invalidate_system_prompt_cache
+    invalidate_system_prompt_cache()
 
 
 def invalidate_taxonomy_cache_for_office(office_external_id: Optional[int]) -> None:
@@ -119,6 +122,9 @@ def invalidate_taxonomy_cache_for_office(office_external_id: Optional[int]) -> N
         for k in keys_to_drop:
             _TREE_CACHE.pop(k, None)
             _TREE_CACHE_AT.pop(k, None)
+    # Template global (office=None) muda a árvore de todos os escritórios.
+    from app.services.classifier.prompts import invalidate_system_prompt_cache
+    invalidate_system_prompt_cache(office_external_id)
 
 
 def _load_template_allowed_cats(
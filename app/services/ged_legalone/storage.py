@@ -11,6 +11,8 @@ Layout:
 
 O path gravado em `ged_upload_item.file_path` / `ged_upload_batch.shared_file_path`
 e' RELATIVO a raiz — permite mover o volume sem reescrever a coluna.
+O path e' um hard link pro blob do conteudo (ver `app/services/blob_store`)
+— o mesmo PDF ja subido em prazos iniciais nao ocupa disco de novo.
 """
 
 from __future__ import annotations
@@ -23,6 +25,7 @@ from datetime import datetime, timezone
 from pathlib import Path
 
 from app.core.config import settings
+from app.services import blob_store
 
 logger = logging.getLogger(__name__)
 
@@ -104,16 +107,15 @@ def save_file(
         f"{timestamp:%d}",
         f"{uuid.uuid4().hex}.{norm}",
     )
-    absolute = _root() / relative
-    absolute.parent.mkdir(parents=True, exist_ok=True)
-
-    # Grava num temp e faz rename atomico — crash a meio caminho nao deixa
-    # arquivo truncado no volume.
-    tmp = absolute.with_suffix(absolute.suffix + ".tmp")
-    tmp.write_bytes(file_bytes)
-    tmp.replace(absolute)
-
     sha256 = hashlib.sha256(file_bytes).hexdigest()
+    # Blob + hard link, com rename atomico — crash a meio caminho nao
+    # deixa arquivo truncado no volume.
+    absolute = blob_store.store_bytes(
+        blob_store.NAMESPACE_GED_LEGALONE,
+        relative.as_posix(),
+        file_bytes,
+        sha256=sha256,
+    )
     logger.info(
         "GED LegalOne: arquivo gravado %s (%d bytes, sha256=%s...)",
         relative.as_posix(),
@@ -154,9 +156,11 @@ def delete_file(relative_path: str) -> bool:
         return False
 
     if not path.exists():
+        blob_store.release(blob_store.NAMESPACE_GED_LEGALONE, relative_path)
         return False
 
     path.unlink()
+    blob_store.release(blob_store.NAMESPACE_GED_LEGALONE, relative_path)
     # best-effort: limpa diretorios vazios subindo a arvore.
     parent = path.parent
     root = _root().resolve()
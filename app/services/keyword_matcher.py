@@ -0,0 +1,110 @@
+"""Busca de várias palavras-chave num texto numa passada só.
+
+Usado pela varredura (`varredura.regex_eventos`), pela heurística de
+citação (`citacoes_bm.heuristic`) e pela correlação do monitoramento
+(`process_monitoring.correlation_service`), que antes normalizavam e
+varriam o mesmo texto do seu jeito — uma vez por termo/regex.
+
+Fluxo:
+  1. `fold_text` normaliza o texto UMA vez: sem acento (NFKD → ASCII),
+     minúsculo e espaços colapsados. Tudo em C (normalize/encode/split).
+  2. `KeywordMatcher.find` devolve as palavras-chave presentes. Os termos
+     são agrupados pelo prefixo comum (ex.: "arquivado", "arquivamento",
+     "arquivamento definitivo" → "arquiv"): se o prefixo não aparece no
+     texto, o grupo inteiro é descartado com uma busca só.
+  3. Quem precisa do trecho exato (regex_eventos) confirma com a regex
+     específica só nos textos que passaram pelo filtro.
+
+Uma alternation única (`a|b|c`) ou lookahead pra achar sobreposições foi
+medida mais lenta que isso no `re` do CPython — ele tenta a alternation
+em cada posição, enquanto `in` usa a busca rápida de substring do str.
+Ver `scripts/bench_keyword_matcher.py`.
+"""
+
+from __future__ import annotations
+
+import unicodedata
+from typing import Any, Iterable
+
+# Prefixo mínimo pra agrupar termos: curto demais vira um filtro inútil
+# ("a", "de"), longo demais não agrupa nada.
+_PREFIXO_MIN = 4
+
+
+def fold_text(value: Any) -> str:
+    """Minúsculo, sem acento e com espaços colapsados."""
+    if value is None:
+        return ""
+    s = str(value)
+    if not s:
+        return ""
+    if not s.isascii():
+        s = unicodedata.normalize("NFKD", s).encode("ascii", "ignore").decode("ascii")
+    return " ".join(s.lower().split())
+
+
+def _prefixo_comum(a: str, b: str) -> str:
+    n = 0
+    for ca, cb in zip(a, b):
+        if ca != cb:
+            break
+        n += 1
+    return a[:n]
+
+
+class KeywordMatcher:
+    """Conjunto fixo de palavras-chave, compilado uma vez (nível de módulo).
+
+    As palavras são comparadas já dobradas por `fold_text`; `find`/`first`
+    devolvem a palavra ORIGINAL (como foi passada), na ordem de declaração.
+    O texto passado pra `find`/`first`/`any` deve vir de `fold_text`.
+    """
+
+    def __init__(self, keywords: Iterable[str]) -> None:
+        self.keywords: tuple[str, ...] = tuple(dict.fromkeys(keywords))
+        dobradas = [(fold_text(k), i) for i, k in enumerate(self.keywords)]
+
+        # Agrupa por prefixo comum (ordem alfabética deixa vizinhos juntos).
+        grupos: list[tuple[str, list[tuple[str, int]]]] = []
+        for termo, idx in sorted(dobradas):
+            if grupos:
+                prefixo, membros = grupos[-1]
+                comum = _prefixo_comum(prefixo, termo)
+                if len(comum) >= _PREFIXO_MIN:
+                    grupos[-1] = (comum, membros + [(termo, idx)])
+                    continue
+            grupos.append((termo, [(termo, idx)]))
+        self._grupos = tuple(
+            (prefixo, tuple(membros)) for prefixo, membros in grupos
+        )
+
+    def find(self, folded: str) -> list[str]:
+        """Palavras presentes em `folded`, na ordem de declaração."""
+        if not folded:
+            return []
+        # Grupo de 1 termo: prefixo == termo, a 2ª busca é redundante mas
+        # sai mais barata que ramificar no Python.
+        achados = [
+            idx
+            for prefixo, membros in self._grupos
+            if prefixo in folded
+            for termo, idx in membros
+            if termo in folded
+        ]
+        if len(achados) > 1:
+            achados.sort()
+        return [self.keywords[i] for i in achados]
+
+    def first(self, folded: str) -> str | None:
+        """1ª palavra (na ordem de declaração) presente em `folded`."""
+        achados = self.find(folded)
+        return achados[0] if achados else None
+
+    def any(self, folded: str) -> bool:
+        if not folded:
+            return False
+        return any(
+            prefixo in folded
+            and (len(membros) == 1 or any(termo in folded for termo, _ in membros))
+            for prefixo, membros in self._grupos
+        )
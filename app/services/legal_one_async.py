@@ -0,0 +1,176 @@
+"""
+Transporte assíncrono (httpx) do Legal One pra paginação concorrente.
+
+O `LegalOneApiClient` continua síncrono (`requests.Session` de classe) e é a
+API que o resto do app usa. O que este módulo resolve é a paginação: os
+loaders (`_paginated_catalog_loader`, `fetch_all_publications`, full sync do
+índice de processos) andavam página a página mesmo quando a 1ª página já diz
+o total (`@odata.count`). Com ~1-3s de latência por página, o serial nunca
+chegava perto do orçamento de 1.2 req/s.
+
+Aqui, depois da 1ª página, as demais URLs `$skip` são buscadas em paralelo
+num `httpx.AsyncClient` com pool de conexões — cada requisição ainda passa
+pelo rate limiter compartilhado (`legal_one_rate_limit`), então o tempo total
+passa a ser limitado pelo orçamento, não pela latência. Token OAuth e faixa de
+prioridade são os mesmos do client síncrono.
+
+Uso síncrono: `LegalOneApiClient._fetch_json_pages(urls)` (via `run_sync`).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import logging
+import random
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Union
+
+import httpx
+
+from app.core.config import settings
+
+if TYPE_CHECKING:
+    from app.services.legal_one_client import LegalOneApiClient
+
+logger = logging.getLogger(__name__)
+
+_RETRY_STATUSES = (429, 500, 502, 503, 504)
+_MAX_ATTEMPTS = 8
+_MAX_RATE_SLEEP_SECONDS = 1.0
+
+
+def run_sync(coro):
+    """
+    Roda uma coroutine a partir de código síncrono. Se o thread atual já
+    tem um event loop rodando (chamado de dentro de um endpoint async),
+    executa num thread auxiliar — propagando o contexto (faixa de prioridade).
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+
+    ctx = contextvars.copy_context()
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="legal-one-async") as pool:
+        return pool.submit(ctx.run, asyncio.run, coro).result()
+
+
+class AsyncLegalOneTransport:
+    """
+    GETs concorrentes contra o L1 reaproveitando auth e rate limit do client
+    síncrono. Pensado pra vida curta: abre o pool no `async with`, busca um
+    lote de páginas e fecha.
+    """
+
+    def __init__(
+        self,
+        client: "LegalOneApiClient",
+        concurrency: Optional[int] = None,
+    ):
+        self._client = client
+        self._concurrency = max(1, concurrency or settings.legal_one_page_fanout)
+        self._http: Optional[httpx.AsyncClient] = None
+
+    async def __aenter__(self) -> "AsyncLegalOneTransport":
+        limits = httpx.Limits(
+            max_connections=self._concurrency,
+            max_keepalive_connections=self._concurrency,
+        )
+        self._http = httpx.AsyncClient(limits=limits, timeout=30)
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    async def _acquire_rate_slot(self) -> None:
+        limiter = self._client._rate_limiter
+        while True:
+            # try_acquire pode ir ao Postgres/arquivo — fora do event loop.
+            wait = await asyncio.to_thread(limiter.try_acquire)
+            if wait <= 0:
+                return
+            await asyncio.sleep(min(wait, _MAX_RATE_SLEEP_SECONDS))
+
+    async def _authorized_headers(self, force: bool = False) -> Dict[str, str]:
+        await asyncio.to_thread(self._client._refresh_token_if_needed, force)
+        return {"Authorization": f"Bearer {self._client._Auth.token}"}
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """Espelha `_request_with_retry`: rate limit por tentativa, 401 → refresh, backoff em 429/5xx."""
+        assert self._http is not None, "use AsyncLegalOneTransport dentro de 'async with'"
+        last_exception: Optional[Exception] = None
+
+        for attempt in range(_MAX_ATTEMPTS):
+            await self._acquire_rate_slot()
+            try:
+                headers = await self._authorized_headers()
+                response = await self._http.request(method, url, headers=headers, **kwargs)
+                if response.status_code == 401:
+                    headers = await self._authorized_headers(force=True)
+                    response = await self._http.request(method, url, headers=headers, **kwargs)
+                if response.status_code in _RETRY_STATUSES:
+                    if response.status_code == 429:
+                        wait = min(60, (3 ** attempt)) + random.uniform(1, 5)
+                    else:
+                        wait = (2 ** attempt) + random.uniform(0, 2)
+                    logger.warning(
+                        "Status %s recebido (async). Nova tentativa em %.1fs (attempt %d/%d).",
+                        response.status_code, wait, attempt + 1, _MAX_ATTEMPTS,
+                    )
+                    await asyncio.sleep(wait)
+                    continue
+                response.raise_for_status()
+                return response
+            except (httpx.TimeoutException, httpx.TransportError) as exc:
+                last_exception = exc
+                wait = (2 ** attempt) + random.uniform(0, 2)
+                logger.warning(
+                    "Erro de conexao async (%s): %s. Nova tentativa em %.1fs.",
+                    type(exc).__name__, exc, wait,
+                )
+                await asyncio.sleep(wait)
+
+        if last_exception:
+            raise last_exception
+        raise httpx.HTTPError("Maximo de tentativas excedido sem sucesso.")
+
+    async def get_json(self, url: str) -> Dict[str, Any]:
+        response = await self.request("GET", url)
+        return response.json()
+
+    async def get_json_many(
+        self, urls: Sequence[str]
+    ) -> List[Union[Dict[str, Any], BaseException]]:
+        """
+        Busca todas as URLs com no máximo `concurrency` em voo. Resultado na
+        MESMA ordem das URLs; falhas voltam como a exceção (o chamador decide
+        se refaz em série).
+        """
+        semaphore = asyncio.Semaphore(self._concurrency)
+
+        async def _one(url: str):
+            async with semaphore:
+                return await self.get_json(url)
+
+        return await asyncio.gather(*(_one(u) for u in urls), return_exceptions=True)
+
+
+async def _fetch_many(
+    client: "LegalOneApiClient", urls: Sequence[str], concurrency: Optional[int]
+) -> List[Union[Dict[str, Any], BaseException]]:
+    async with AsyncLegalOneTransport(client, concurrency=concurrency) as transport:
+        return await transport.get_json_many(urls)
+
+
+def fetch_json_pages(
+    client: "LegalOneApiClient",
+    urls: Sequence[str],
+    concurrency: Optional[int] = None,
+) -> List[Union[Dict[str, Any], BaseException]]:
+    """Wrapper síncrono de `AsyncLegalOneTransport.get_json_many`."""
+    if not urls:
+        return []
+    return run_sync(_fetch_many(client, urls, concurrency))
@@ -9,11 +9,12 @@ import time
 import base64
 import hashlib
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 import requests
 
 from app.core.config import settings
+from app.services.legal_one_rate_limit import LegalOneRateLimiter
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
@@ -71,6 +72,11 @@ class _GlobalRateLimiter:
     de quantas threads estejam rodando.
 
     Legal One: 90 req/min ≈ 1.5 req/s.  Usamos 1.2 req/s como margem.
+
+    O balde em si mora em `legal_one_rate_limit` (Postgres/arquivo/memória,
+    conforme `legal_one_rate_limit_backend`) — assim o limite vale pro
+    cluster inteiro (4 workers Uvicorn + APScheduler de cada um), não só
+    pro processo. A faixa de prioridade vem de `legal_one_priority(...)`.
     """
 
     _instance: Optional["_GlobalRateLimiter"] = None
@@ -81,33 +87,16 @@ class _GlobalRateLimiter:
             with cls._lock:
                 if cls._instance is None:
                     cls._instance = super().__new__(cls)
-                    cls._instance._init(rate=1.2)
+                    cls._instance._limiter = LegalOneRateLimiter()
         return cls._instance
 
-    def _init(self, rate: float):
-        self._rate = rate          # tokens por segundo
-        self._capacity = 5.0       # burst máximo
-        self._tokens = self._capacity
-        self._last_refill = time.monotonic()
-        self._bucket_lock = threading.Lock()
-
-    def acquire(self):
+    def acquire(self, priority: Optional[str] = None):
         """Bloqueia até ter 1 token disponível."""
-        while True:
-            with self._bucket_lock:
-                now = time.monotonic()
-                elapsed = now - self._last_refill
-                self._tokens = min(self._capacity, self._tokens + elapsed * self._rate)
-                self._last_refill = now
-
-                if self._tokens >= 1.0:
-                    self._tokens -= 1.0
-                    return
-
-                # Calcula quanto esperar pelo próximo token
-                wait = (1.0 - self._tokens) / self._rate
+        self._limiter.acquire(priority)
 
-            time.sleep(wait)
+    def try_acquire(self, priority: Optional[str] = None) -> float:
+        """Não bloqueia: 0 se pegou o token, senão a espera sugerida (s)."""
+        return self._limiter.try_acquire(priority)
 
 
 class LegalOneApiClient:
@@ -294,7 +283,7 @@ class LegalOneApiClient:
 
         for attempt in range(8):
             # Rate limiter global: aguarda slot antes de cada tentativa.
-            # Isso impede que múltiplas threads estourem 90 req/min.
+            # Isso impede que múltiplas threads (e workers) estourem 90 req/min.
             self._rate_limiter.acquire()
 
             try:
@@ -332,6 +321,60 @@ class LegalOneApiClient:
 
         raise requests.exceptions.RequestException("Maximo de tentativas excedido sem sucesso.")
 
+    _SKIP_PARAM_RE = re.compile(r"(\$|%24)skip=(\d+)", re.IGNORECASE)
+
+    @classmethod
+    def _skip_page_urls(
+        cls, next_link: Optional[str], page_len: int, total: Any
+    ) -> List[str]:
+        """
+        A partir do nextLink da 1ª página (que traz `$skip=<page_len>`), gera
+        as URLs de TODAS as páginas restantes até `total`. Vazio quando não dá
+        pra inferir (sem count, sem $skip no link, página de tamanho inesperado).
+        """
+        try:
+            total = int(total)
+        except (TypeError, ValueError):
+            return []
+        if not next_link or page_len <= 0 or total <= page_len:
+            return []
+        match = cls._SKIP_PARAM_RE.search(next_link)
+        if not match or int(match.group(2)) != page_len:
+            return []
+        prefix, suffix = next_link[: match.start(2)], next_link[match.end(2):]
+        return [f"{prefix}{skip}{suffix}" for skip in range(page_len, total, page_len)]
+
+    def _fetch_json_pages(self, urls: List[str]) -> List[Dict[str, Any]]:
+        """
+        GET de várias páginas OData em paralelo (transporte httpx async,
+        mesmo rate limit/token), na ordem das URLs. Páginas que falharem no
+        fan-out são refeitas em série pelo `_request_with_retry` — erros
+        definitivos sobem como `requests.exceptions.HTTPError`, igual antes.
+        """
+        if not urls:
+            return []
+        if not settings.legal_one_concurrent_pagination or len(urls) == 1:
+            return [self._request_with_retry("GET", url).json() for url in urls]
+
+        from app.services.legal_one_async import fetch_json_pages
+
+        try:
+            results = fetch_json_pages(self, urls)
+        except Exception as exc:  # noqa: BLE001
+            self.logger.warning("Fan-out de paginas falhou (%s); seguindo em serie.", exc)
+            results = [exc] * len(urls)
+
+        pages: List[Dict[str, Any]] = []
+        for url, result in zip(urls, results):
+            if isinstance(result, BaseException):
+                self.logger.warning(
+                    "Pagina %s falhou no fan-out (%s: %s); refazendo em serie.",
+                    url, type(result).__name__, result,
+                )
+                result = self._request_with_retry("GET", url).json()
+            pages.append(result)
+        return pages
+
     def _paginated_catalog_loader(self, endpoint: str, params: Optional[dict] = None) -> List[Dict[str, Any]]:
         all_items: List[Dict[str, Any]] = []
         base_url = f"{self.base_url}{endpoint}"
@@ -362,6 +405,16 @@ class LegalOneApiClient:
                         endpoint,
                     )
                     is_first_page = False
+                    # Total conhecido + nextLink com $skip: busca as páginas
+                    # restantes em paralelo e continua o loop a partir do
+                    # nextLink da última (se o catálogo cresceu no meio).
+                    fanout_urls = self._skip_page_urls(
+                        data.get("@odata.nextLink"), len(page), data.get("@odata.count")
+                    )
+                    if fanout_urls:
+                        for fanned in self._fetch_json_pages(fanout_urls):
+                            all_items.extend(fanned.get("value", []))
+                            data = fanned
 
                 next_link = data.get("@odata.nextLink")
                 if next_link:
@@ -1775,53 +1828,14 @@ class LegalOneApiClient:
         Returns:
             Dict com 'value' (lista de publicações), '@odata.count', '@odata.nextLink'
         """
-        def _clean_date(d: str) -> str:
-            """Remove milissegundos e garante formato aceito pela API: 2026-04-07T00:00:00Z"""
-            # Remove milissegundos: 2026-04-07T00:00:00.000Z → 2026-04-07T00:00:00Z
-            if "." in d:
-                d = d.split(".")[0] + "Z"
-            # Se só tem data (2026-04-07), adiciona horário
-            if len(d) == 10:
-                d = d + "T00:00:00Z"
-            return d
-
-        date_from = _clean_date(date_from)
-        if date_to:
-            date_to = _clean_date(date_to)
-
-        # Campo usado no filtro de datas: por padrão creationDate (data em
-        # que o L1 disponibilizou a publicação). Pode ser alterado via env
-        # `PUBLICATION_CAPTURE_DATE_FIELD=date` para voltar ao comportamento
-        # anterior (filtro pela data efetiva da publicação no diário).
-        try:
-            from app.core.config import settings as _s
-            date_field = (_s.publication_capture_date_field or "creationDate").strip()
-        except Exception:
-            date_field = "creationDate"
-
-        filters = []
-        filters.append(f"originType eq '{self._escape_odata_literal(origin_type)}'")
-        filters.append(f"{date_field} ge {date_from}")
-        if date_to:
-            filters.append(f"{date_field} le {date_to}")
-
-        filter_str = " and ".join(filters)
-
-        # Monta a query string manualmente para evitar que requests encode o '$'
-        # em %24filter, %24expand etc. — a API OData do LegalOne não aceita isso.
-        from urllib.parse import quote
-        qs_parts = [
-            f"$filter={quote(filter_str, safe='')}",
-            "$expand=relationships",
-            f"$orderby={quote(date_field + ' desc', safe='')}",
-            f"$top={top}",
-            f"$skip={skip}",
-        ]
-        if count:
-            qs_parts.append("$count=true")
-
-        url = f"{self.base_url}/Updates?" + "&".join(qs_parts)
-        self.logger.info("Buscando publicacoes: %s", filter_str)
+        url = self._publications_url(
+            date_from,
+            date_to,
+            origin_type,
+            top=top,
+            skip=skip,
+            count=count,
+        )
 
         try:
             response = self._request_with_retry("GET", url)
@@ -1858,6 +1872,65 @@ class LegalOneApiClient:
             )
             raise
 
+    @staticmethod
+    def _clean_odata_date(d: str) -> str:
+        """Remove milissegundos e garante formato aceito pela API: 2026-04-07T00:00:00Z"""
+        # Remove milissegundos: 2026-04-07T00:00:00.000Z → 2026-04-07T00:00:00Z
+        if "." in d:
+            d = d.split(".")[0] + "Z"
+        # Se só tem data (2026-04-07), adiciona horário
+        if len(d) == 10:
+            d = d + "T00:00:00Z"
+        return d
+
+    def _publications_url(
+        self,
+        date_from: str,
+        date_to: Optional[str],
+        origin_type: str,
+        top: int,
+        skip: int,
+        count: bool,
+    ) -> str:
+        """Monta a URL de /Updates (filtro por data + paginação $top/$skip)."""
+        date_from = self._clean_odata_date(date_from)
+        if date_to:
+            date_to = self._clean_odata_date(date_to)
+
+        # Campo usado no filtro de datas: por padrão creationDate (data em
+        # que o L1 disponibilizou a publicação). Pode ser alterado via env
+        # `PUBLICATION_CAPTURE_DATE_FIELD=date` para voltar ao comportamento
+        # anterior (filtro pela data efetiva da publicação no diário).
+        try:
+            from app.core.config import settings as _s
+            date_field = (_s.publication_capture_date_field or "creationDate").strip()
+        except Exception:
+            date_field = "creationDate"
+
+        filters = []
+        filters.append(f"originType eq '{self._escape_odata_literal(origin_type)}'")
+        filters.append(f"{date_field} ge {date_from}")
+        if date_to:
+            filters.append(f"{date_field} le {date_to}")
+
+        filter_str = " and ".join(filters)
+
+        # Monta a query string manualmente para evitar que requests encode o '$'
+        # em %24filter, %24expand etc. — a API OData do LegalOne não aceita isso.
+        from urllib.parse import quote
+        qs_parts = [
+            f"$filter={quote(filter_str, safe='')}",
+            "$expand=relationships",
+            f"$orderby={quote(date_field + ' desc', safe='')}",
+            f"$top={top}",
+            f"$skip={skip}",
+        ]
+        if count:
+            qs_parts.append("$count=true")
+
+        self.logger.info("Buscando publicacoes: %s (skip=%s)", filter_str, skip)
+        return f"{self.base_url}/Updates?" + "&".join(qs_parts)
+
     def fetch_all_publications(
         self,
         date_from: str,
@@ -1870,39 +1943,15 @@ class LegalOneApiClient:
         Usa o mesmo padrão de _paginated_catalog_loader.
         """
         all_publications: List[Dict[str, Any]] = []
-        skip = 0
-        page_size = 30  # LegalOne limita $top a 30
         total_reported: Optional[int] = None
-
-        # max_pages aumentado: com 30/pag, 500 pags = 15.000 publicacoes max
-        for page in range(max_pages):
-            result = self.fetch_publications(
-                date_from=date_from,
-                date_to=date_to,
-                origin_type=origin_type,
-                top=page_size,
-                skip=skip,
-                count=(page == 0),
-            )
-
-            if page == 0:
-                total_reported = int(result.get("@odata.count") or 0)
-                self.logger.info("Total de publicacoes reportado pela API: %s", total_reported)
-
-            items = result.get("value", [])
-            if not items:
-                break
-
+        for _next_skip, items, total_reported in self.iter_publication_pages(
+            date_from=date_from,
+            date_to=date_to,
+            origin_type=origin_type,
+            max_pages=max_pages,
+        ):
             all_publications.extend(items)
 
-            # Paginacao baseada em count + item count (LegalOne nao retorna @odata.nextLink)
-            if total_reported is not None and len(all_publications) >= total_reported:
-                break
-            if len(items) < page_size:
-                break
-
-            skip += page_size
-
         self.logger.info(
             "Busca completa: %s publicacoes carregadas (total reportado: %s).",
             len(all_publications),
@@ -1910,6 +1959,74 @@ class LegalOneApiClient:
         )
         return all_publications
 
+    def iter_publication_pages(
+        self,
+        date_from: str,
+        date_to: Optional[str] = None,
+        origin_type: str = "OfficialJournalsCrawler",
+        start_skip: int = 0,
+        max_pages: int = 500,
+    ) -> Iterator[Tuple[int, List[Dict[str, Any]], int]]:
+        """
+        Gera as publicações do período em blocos, na ordem do L1, sem
+        acumular a janela inteira: cada item é `(next_skip, itens, total)`,
+        onde `next_skip` é o $skip da primeira página AINDA NÃO entregue —
+        quem persiste o bloco pode gravá-lo como ponto de retomada.
+
+        1ª página em série (traz o @odata.count); depois disso as demais
+        páginas ($skip conhecido) vão em paralelo, em janelas — o rate
+        limiter compartilhado continua ditando o ritmo real.
+        """
+        page_size = 30  # LegalOne limita $top a 30
+
+        first = self.fetch_publications(
+            date_from=date_from,
+            date_to=date_to,
+            origin_type=origin_type,
+            top=page_size,
+            skip=start_skip,
+            count=True,
+        )
+        total_reported = int(first.get("@odata.count") or 0)
+        self.logger.info("Total de publicacoes reportado pela API: %s", total_reported)
+
+        items = first.get("value", [])
+        next_skip = start_skip + page_size
+        yield next_skip, items, total_reported
+
+        # Paginacao baseada em count + item count (LegalOne nao retorna @odata.nextLink)
+        if len(items) < page_size or next_skip >= total_reported:
+            return
+
+        # max_pages: com 30/pag, 500 pags = 15.000 publicacoes max
+        last_skip = min(total_reported, max_pages * page_size)
+        skips = list(range(next_skip, last_skip, page_size))
+        window = max(1, settings.legal_one_page_fanout) * 4
+        for start in range(0, len(skips), window):
+            urls = [
+                self._publications_url(
+                    date_from,
+                    date_to,
+                    origin_type,
+                    top=page_size,
+                    skip=skip,
+                    count=False,
+                )
+                for skip in skips[start:start + window]
+            ]
+            block: List[Dict[str, Any]] = []
+            exhausted = False
+            for page in self._fetch_json_pages(urls):
+                page_items = page.get("value", [])
+                block.extend(page_items)
+                next_skip += page_size
+                if len(page_items) < page_size:
+                    exhausted = True
+                    break
+            yield next_skip, block, total_reported
+            if exhausted:
+                return
+
     def get_publication_by_id(self, update_id: int) -> Optional[Dict[str, Any]]:
         """Busca uma publicação específica pelo ID."""
         url = f"{self.base_url}/Updates/{update_id}?$expand=relationships"
@@ -0,0 +1,282 @@
+"""
+Rate limiter do Legal One compartilhado entre processos.
+
+O `_GlobalRateLimiter` antigo era um token-bucket em memória: global por
+PROCESSO. Em prod rodam 4 workers Uvicorn (cada um com seu APScheduler), então
+o ritmo real contra o L1 chegava a 4 × 1.2 req/s e a cascata de 429 com backoff
+3^attempt travava tudo. Aqui o balde vive fora do processo:
+
+- ``postgres`` (default): 1 linha em `legal_one_rate_bucket`, atualizada num
+  único UPDATE atômico (relógio do próprio servidor). Em sqlite (dev/testes)
+  cai no balde em memória — não há multi-worker.
+- ``file``: JSON pequeno no volume compartilhado (`/app/data`), serializado
+  por filelock — mesmo padrão do cookie do legacy_task_http.
+- ``memory``: comportamento antigo (por processo).
+
+Prioridade por "faixa": chamadas de background (sync do índice de processos,
+auto-refresh do OneRequest...) só consomem token se sobrar acima de uma
+reserva (`legal_one_rate_limit_interactive_reserve`). As interativas (lookups
+da UI) podem usar a reserva, então nunca ficam atrás de um sync longo. A faixa
+vem de um ContextVar — o job de background embrulha o trabalho em
+``with legal_one_priority(PRIORITY_BACKGROUND):`` sem mexer nas assinaturas.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_INTERACTIVE = "interactive"
+PRIORITY_BACKGROUND = "background"
+
+BACKEND_MEMORY = "memory"
+BACKEND_FILE = "file"
+BACKEND_POSTGRES = "postgres"
+
+# Nome da linha em legal_one_rate_bucket (permite baldes separados no futuro).
+BUCKET_NAME = "legal_one"
+
+# Teto de cada sleep entre tentativas — reavalia o balde com frequência pra
+# uma interativa que chegou depois não esperar o sleep longo de um background.
+_MAX_SLEEP_SECONDS = 1.0
+
+_current_priority: ContextVar[str] = ContextVar(
+    "legal_one_priority", default=PRIORITY_INTERACTIVE
+)
+
+
+@contextmanager
+def legal_one_priority(priority: str):
+    """Marca as chamadas ao L1 feitas dentro do bloco com a faixa dada."""
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+def current_priority() -> str:
+    return _current_priority.get()
+
+
+def set_current_priority(priority: str) -> None:
+    """Fixa a faixa do contexto atual sem escopo — pra threads dedicadas,
+    que nascem com contexto próprio e morrem no fim do trabalho."""
+    _current_priority.set(priority)
+
+
+def _refill(tokens: float, last: float, now: float, rate: float, capacity: float) -> float:
+    elapsed = max(0.0, now - last)
+    return min(capacity, tokens + elapsed * rate)
+
+
+class _MemoryBucket:
+    """Token-bucket por processo (comportamento original)."""
+
+    def __init__(self, rate: float, capacity: float):
+        self._rate = rate
+        self._capacity = capacity
+        self._tokens = capacity
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def try_take(self, need: float) -> float:
+        """Consome 1 token se houver `need` disponíveis. Retorna 0 ou a espera sugerida."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = _refill(self._tokens, self._last_refill, now, self._rate, self._capacity)
+            self._last_refill = now
+            if self._tokens >= need:
+                self._tokens -= 1.0
+                return 0.0
+            return (need - self._tokens) / self._rate
+
+
+class _FileBucket:
+    """Balde persistido num JSON do volume compartilhado, sob filelock."""
+
+    def __init__(self, rate: float, capacity: float, path: str):
+        from filelock import FileLock
+
+        self._rate = rate
+        self._capacity = capacity
+        self._path = Path(path)
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = FileLock(str(self._path) + ".lock", timeout=30)
+
+    def _read(self, now: float) -> tuple[float, float]:
+        try:
+            data = json.loads(self._path.read_text(encoding="utf-8"))
+            return float(data["tokens"]), float(data["refilled_at"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return self._capacity, now
+
+    def try_take(self, need: float) -> float:
+        with self._lock:
+            now = time.time()
+            tokens, last = self._read(now)
+            tokens = _refill(tokens, last, now, self._rate, self._capacity)
+            taken = tokens >= need
+            if taken:
+                tokens -= 1.0
+            self._path.write_text(
+                json.dumps({"tokens": tokens, "refilled_at": now}),
+                encoding="utf-8",
+            )
+        return 0.0 if taken else (need - tokens) / self._rate
+
+
+class _PostgresBucket:
+    """Balde numa linha do Postgres — 1 UPDATE atômico por aquisição."""
+
+    _TAKE_SQL = """
+        WITH cur AS (
+            SELECT name,
+                   LEAST(
+                       :capacity,
+                       tokens + GREATEST(
+                           0, EXTRACT(EPOCH FROM clock_timestamp()) - refilled_at
+                       ) * :rate
+                   ) AS available
+            FROM legal_one_rate_bucket
+            WHERE name = :name
+            FOR UPDATE
+        )
+        UPDATE legal_one_rate_bucket AS b
+        SET tokens = CASE WHEN cur.available >= :need
+                          THEN cur.available - 1 ELSE cur.available END,
+            refilled_at = EXTRACT(EPOCH FROM clock_timestamp())
+        FROM cur
+        WHERE b.name = cur.name
+        RETURNING cur.available
+    """
+
+    _SEED_SQL = """
+        INSERT INTO legal_one_rate_bucket (name, tokens, refilled_at)
+        VALUES (:name, :capacity, EXTRACT(EPOCH FROM clock_timestamp()))
+        ON CONFLICT (name) DO NOTHING
+    """
+
+    def __init__(self, rate: float, capacity: float, engine):
+        self._rate = rate
+        self._capacity = capacity
+        self._engine = engine
+
+    def try_take(self, need: float) -> float:
+        from sqlalchemy import text
+
+        params = {
+            "name": BUCKET_NAME,
+            "capacity": self._capacity,
+            "rate": self._rate,
+            "need": need,
+        }
+        with self._engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            available = conn.execute(text(self._TAKE_SQL), params).scalar()
+            if available is None:
+                # Linha ainda não existe (migration sem seed / tabela recriada).
+                conn.execute(text(self._SEED_SQL), params)
+                available = conn.execute(text(self._TAKE_SQL), params).scalar()
+        available = float(available or 0.0)
+        if available >= need:
+            return 0.0
+        return (need - available) / self._rate
+
+
+class LegalOneRateLimiter:
+    """
+    Limiter usado por `LegalOneApiClient._request_with_retry` (e pelo POST
+    do GED). Escolhe o backend por `legal_one_rate_limit_backend`; se o
+    backend compartilhado falhar (DB fora, volume read-only), degrada pro
+    balde em memória em vez de derrubar a chamada ao L1.
+    """
+
+    def __init__(
+        self,
+        rate: Optional[float] = None,
+        capacity: Optional[float] = None,
+        backend: Optional[str] = None,
+        interactive_reserve: Optional[float] = None,
+    ):
+        self._rate = float(rate if rate is not None else settings.legal_one_rate_limit_per_second)
+        self._capacity = float(
+            capacity if capacity is not None else settings.legal_one_rate_limit_burst
+        )
+        self._reserve = float(
+            interactive_reserve
+            if interactive_reserve is not None
+            else settings.legal_one_rate_limit_interactive_reserve
+        )
+        # Reserva >= capacidade deixaria o background sem token nunca.
+        self._reserve = max(0.0, min(self._reserve, self._capacity - 1.0))
+        self._backend_name = (backend or settings.legal_one_rate_limit_backend or BACKEND_MEMORY).lower()
+        self._fallback = _MemoryBucket(self._rate, self._capacity)
+        self._bucket = None
+        self._bucket_lock = threading.Lock()
+
+    @property
+    def rate(self) -> float:
+        return self._rate
+
+    def _resolve_bucket(self):
+        if self._bucket is not None:
+            return self._bucket
+        with self._bucket_lock:
+            if self._bucket is not None:
+                return self._bucket
+            bucket = self._fallback
+            try:
+                if self._backend_name == BACKEND_POSTGRES:
+                    from app.db.session import engine
+
+                    if engine.dialect.name == "postgresql":
+                        bucket = _PostgresBucket(self._rate, self._capacity, engine)
+                elif self._backend_name == BACKEND_FILE:
+                    bucket = _FileBucket(
+                        self._rate, self._capacity, settings.legal_one_rate_limit_file
+                    )
+            except Exception:  # noqa: BLE001
+                logger.warning(
+                    "Rate limiter L1: backend '%s' indisponível — usando balde em memória.",
+                    self._backend_name,
+                    exc_info=True,
+                )
+            self._bucket = bucket
+            return bucket
+
+    def _need_for(self, priority: str) -> float:
+        return 1.0 if priority == PRIORITY_INTERACTIVE else 1.0 + self._reserve
+
+    def try_acquire(self, priority: Optional[str] = None) -> float:
+        """Tenta pegar 1 token sem bloquear. Retorna 0 se pegou, senão a espera sugerida."""
+        need = self._need_for(priority or current_priority())
+        bucket = self._resolve_bucket()
+        try:
+            return bucket.try_take(need)
+        except Exception:  # noqa: BLE001
+            if bucket is self._fallback:
+                raise
+            logger.warning(
+                "Rate limiter L1: falha no backend compartilhado — usando balde em memória nesta aquisição.",
+                exc_info=True,
+            )
+            return self._fallback.try_take(need)
+
+    def acquire(self, priority: Optional[str] = None) -> None:
+        """Bloqueia até ter 1 token disponível na faixa da chamada."""
+        priority = priority or current_priority()
+        while True:
+            wait = self.try_acquire(priority)
+            if wait <= 0:
+                return
+            time.sleep(min(wait, _MAX_SLEEP_SECONDS))
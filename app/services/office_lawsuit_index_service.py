@@ -19,9 +19,11 @@ from typing import Optional
 from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.db.session import SessionLocal
 from app.models.office_lawsuit_index import OfficeLawsuitIndex, OfficeLawsuitSync
 from app.services.legal_one_client import LegalOneApiClient
+from app.services.legal_one_rate_limit import PRIORITY_BACKGROUND, set_current_priority
 
 
 logger = logging.getLogger(__name__)
@@ -150,6 +152,8 @@ class OfficeLawsuitIndexService:
 
 def _run_sync_thread(office_id: int, mode: str) -> None:
     """Executa full ou incremental sync numa sessão dedicada."""
+    # Sync é background: cede a reserva do rate limiter L1 pras lookups da UI.
+    set_current_priority(PRIORITY_BACKGROUND)
     db = SessionLocal()
     client = LegalOneApiClient()
     try:
@@ -191,48 +195,64 @@ def _do_full_sync(
     total_reported: Optional[int] = None
     all_ids: set[int] = set()
     page_size = 30  # Legal One OData $top cap
-    skip = 0
-    pages_fetched = 0
-
-    while True:
-        params = {
-            "$filter": f"responsibleOfficeId eq {office_id}",
-            "$select": "id",
-            "$top": page_size,
-            "$skip": skip,
-        }
-        if pages_fetched == 0:
-            params["$count"] = "true"
-
-        page = _fetch_lawsuits_page(client, params)
-        if page is None:
-            break
+    params = {
+        "$filter": f"responsibleOfficeId eq {office_id}",
+        "$select": "id",
+        "$top": page_size,
+        "$skip": 0,
+        "$count": "true",
+    }
 
+    # 1ª página em série (descobre o total e qual endpoint responde); as
+    # demais vão em paralelo em janelas, com progresso a cada janela.
+    page, endpoint = _fetch_lawsuits_page_with_endpoint(client, params)
+    if page is not None:
         items = page.get("value", [])
-        for it in items:
-            lid = it.get("id")
-            if lid is not None:
-                try:
-                    all_ids.add(int(lid))
-                except (TypeError, ValueError):
-                    pass
-
-        if pages_fetched == 0 and page.get("@odata.count") is not None:
+        _collect_ids(items, all_ids)
+        if page.get("@odata.count") is not None:
             total_reported = int(page["@odata.count"])
-
-        pages_fetched += 1
-
-        # Atualiza progresso
-        if total_reported:
-            pct = min(99, int(len(all_ids) * 100 / max(total_reported, 1)))
-        else:
-            pct = min(99, pages_fetched)  # fallback grosseiro
-        state.progress_pct = pct
-        db.commit()
-
-        if len(items) < page_size:
-            break
-        skip += page_size
+        _update_full_sync_progress(db, state, all_ids, total_reported, pages_fetched=1)
+
+        if len(items) >= page_size:
+            del params["$count"]
+            skips = (
+                list(range(page_size, total_reported, page_size))
+                if total_reported is not None
+                else []
+            )
+            window = max(1, settings.legal_one_page_fanout) * 4
+            pages_fetched = 1
+            # Sem count não há fan-out: quem pagina é o laço em série abaixo.
+            exhausted = total_reported is not None and not skips
+            for start in range(0, len(skips), window):
+                urls = [
+                    _lawsuits_page_url(client, endpoint, {**params, "$skip": skip})
+                    for skip in skips[start:start + window]
+                ]
+                for fanned in client._fetch_json_pages(urls):
+                    fanned_items = fanned.get("value", [])
+                    _collect_ids(fanned_items, all_ids)
+                    pages_fetched += 1
+                    if len(fanned_items) < page_size:
+                        exhausted = True
+                        break
+                _update_full_sync_progress(db, state, all_ids, total_reported, pages_fetched)
+                if exhausted:
+                    break
+
+            # Sem count (ou o escritório cresceu durante o sync): termina em série.
+            skip = page_size * pages_fetched
+            while not exhausted:
+                page = _fetch_lawsuits_page(client, {**params, "$skip": skip})
+                if page is None:
+                    break
+                items = page.get("value", [])
+                _collect_ids(items, all_ids)
+                pages_fetched += 1
+                _update_full_sync_progress(db, state, all_ids, total_reported, pages_fetched)
+                if len(items) < page_size:
+                    break
+                skip += page_size
 
     # Upsert em batches
     now = datetime.now(timezone.utc)
@@ -354,6 +374,41 @@ class _IncrementalNotSupported(Exception):
     pass
 
 
+def _collect_ids(items: list, into: set[int]) -> None:
+    for it in items:
+        lid = it.get("id")
+        if lid is not None:
+            try:
+                into.add(int(lid))
+            except (TypeError, ValueError):
+                pass
+
+
+def _update_full_sync_progress(
+    db: Session,
+    state: OfficeLawsuitSync,
+    all_ids: set[int],
+    total_reported: Optional[int],
+    pages_fetched: int,
+) -> None:
+    if total_reported:
+        pct = min(99, int(len(all_ids) * 100 / max(total_reported, 1)))
+    else:
+        pct = min(99, pages_fetched)  # fallback grosseiro
+    state.progress_pct = pct
+    db.commit()
+
+
+def _lawsuits_page_url(client: LegalOneApiClient, endpoint: str, params: dict) -> str:
+    from urllib.parse import quote
+
+    qs_parts = []
+    for k, v in params.items():
+        # Mantém encoding consistente com o resto do client
+        qs_parts.append(f"{k}={quote(str(v), safe='')}")
+    return f"{client.base_url}{endpoint}?" + "&".join(qs_parts)
+
+
 def _fetch_lawsuits_page(
     client: LegalOneApiClient,
     params: dict,
@@ -363,18 +418,23 @@ def _fetch_lawsuits_page(
     Busca uma página do /Lawsuits (fallback em /Litigations) aplicando os
     params OData. Retorna o dict bruto ({value, @odata.count, ...}) ou None.
     """
+    page, _endpoint = _fetch_lawsuits_page_with_endpoint(client, params, raise_on_400)
+    return page
+
+
+def _fetch_lawsuits_page_with_endpoint(
+    client: LegalOneApiClient,
+    params: dict,
+    raise_on_400: bool = False,
+) -> tuple[Optional[dict], Optional[str]]:
+    """Como `_fetch_lawsuits_page`, mas diz também qual endpoint respondeu."""
     import requests
-    from urllib.parse import quote
 
     for endpoint in ("/Lawsuits", "/Litigations"):
-        qs_parts = []
-        for k, v in params.items():
-            # Mantém encoding consistente com o resto do client
-            qs_parts.append(f"{k}={quote(str(v), safe='')}")
-        url = f"{client.base_url}{endpoint}?" + "&".join(qs_parts)
+        url = _lawsuits_page_url(client, endpoint, params)
         try:
             resp = client._request_with_retry("GET", url)
-            return resp.json()
+            return resp.json(), endpoint
         except requests.exceptions.HTTPError as exc:
             status = exc.response.status_code if exc.response is not None else None
             if status == 400 and raise_on_400:
@@ -386,7 +446,7 @@ def _fetch_lawsuits_page(
         except Exception as exc:
             logger.warning("Erro em %s: %s", endpoint, exc)
             continue
-    return None
+    return None, None
 
 
 def _bulk_upsert_ids(
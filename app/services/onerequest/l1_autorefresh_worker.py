@@ -42,8 +42,9 @@ def _tick() -> None:
     from app.models.onerequest import OnerequestSolicitacao, STATUS_SISTEMA_ABERTO
     from app.services.app_settings import set_setting
     from app.services.legal_one_client import LegalOneApiClient
+    from app.services.legal_one_rate_limit import PRIORITY_BACKGROUND, legal_one_priority
     from app.services.onerequest._concurrency import single_worker_lock
-    from app.services.onerequest.service import OnerequestService, _parse_prazo
+    from app.services.onerequest.service import OnerequestService
 
     if not is_enabled():
         logger.info("OneRequest auto-refresh L1: regra DESLIGADA — tick ignorado.")
@@ -59,28 +60,33 @@ def _tick() -> None:
         try:
             service = OnerequestService(db)
             hoje = date.today()
-            # Abertas; prazo é string DD/MM/YYYY, filtra "vence hoje" em Python.
-            abertas = (
+            # Abertas que vencem hoje (prazo_date = espelho tipado do prazo do BB).
+            alvos = (
                 db.query(OnerequestSolicitacao)
-                .filter(OnerequestSolicitacao.status_sistema == STATUS_SISTEMA_ABERTO)
+                .filter(
+                    OnerequestSolicitacao.status_sistema == STATUS_SISTEMA_ABERTO,
+                    OnerequestSolicitacao.prazo_date == hoje,
+                )
                 .all()
             )
-            alvos = [s for s in abertas if _parse_prazo(s.prazo) == hoje]
             logger.info("OneRequest auto-refresh L1: %s DMIs vencendo hoje.", len(alvos))
 
             ok = err = 0
             if alvos:
                 client = LegalOneApiClient()
-                for s in alvos:
-                    try:
-                        service.verificar_status_l1(s, client)
-                        ok += 1
-                    except Exception:
-                        err += 1
-                        logger.exception(
-                            "OneRequest auto-refresh L1: falha na DMI %s.",
-                            s.numero_solicitacao,
-                        )
+                # Job de background: não disputa a reserva do rate limiter L1
+                # com as consultas interativas da UI.
+                with legal_one_priority(PRIORITY_BACKGROUND):
+                    for s in alvos:
+                        try:
+                            service.verificar_status_l1(s, client)
+                            ok += 1
+                        except Exception:
+                            err += 1
+                            logger.exception(
+                                "OneRequest auto-refresh L1: falha na DMI %s.",
+                                s.numero_solicitacao,
+                            )
             logger.info(
                 "OneRequest auto-refresh L1: concluído — %s ok, %s erro de %s.",
                 ok, err, len(alvos),
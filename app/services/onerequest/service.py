@@ -14,7 +14,7 @@ import re
 from datetime import date, datetime, timedelta, timezone
 from typing import Optional
 
-from sqlalchemy import or_, text
+from sqlalchemy import and_, case, exists, extract, func, or_, text
 from sqlalchemy.orm import Session
 
 from app.models.legal_one import LegalOneUser
@@ -34,6 +34,7 @@ from app.services.batch_strategies.onerequest_strategy import (
     OnerequestStrategy,
 )
 from app.services.legal_one_client import LegalOneApiClient
+from app.services.xlsx_stream import StreamingXlsxWriter
 
 logger = logging.getLogger(__name__)
 
@@ -51,27 +52,10 @@ def _proc_utilizavel(numero_processo: Optional[str]) -> bool:
     return not any(h in low for h in _DIRTY_PROC_HINTS)
 
 
-def _parse_prazo(prazo: Optional[str]) -> Optional[date]:
-    if not prazo:
-        return None
-    try:
-        return datetime.strptime(prazo.strip(), "%d/%m/%Y").date()
-    except (ValueError, TypeError):
-        return None
-
-
 # Horário de Brasília (sem DST desde 2019) — recorte de "disponibilização".
 _BRT = timezone(timedelta(hours=-3))
 
 
-def _brt_date(dt: Optional[datetime]) -> Optional[date]:
-    if dt is None:
-        return None
-    if dt.tzinfo is None:
-        dt = dt.replace(tzinfo=timezone.utc)
-    return dt.astimezone(_BRT).date()
-
-
 def _fmt_iso_brt(iso: Optional[str]) -> Optional[str]:
     if not iso:
         return None
@@ -100,6 +84,66 @@ def _farol(prazo_date: Optional[date], hoje: date) -> str:
     return "verde"
 
 
+# Card de KPI -> cor do farol que ele conta.
+_KPI_FAROL = {
+    "atrasadas": "atrasado",
+    "hoje": "vermelho",
+    "amanha": "amarelo",
+    "fds": "roxo",
+    "futuras": "verde",
+    "sem_prazo": "cinza",  # sem prazo informado
+}
+
+
+# Prazo asc (sem prazo no fim) + id — a mesma ordem do cursor keyset.
+_ORDEM_LISTAGEM = (
+    OnerequestSolicitacao.prazo_date.asc().nulls_last(),
+    OnerequestSolicitacao.id.asc(),
+)
+
+
+def _filtrar_farol_anotacao(q, farol_sql, farol: Optional[str], sem_anotacao: Optional[bool]):
+    if farol:
+        q = q.filter(farol_sql == farol)
+    if sem_anotacao:
+        # DMIs sem anotação (justificativa do atraso, ex.: aguardando
+        # providência do cliente): NOT EXISTS correlacionado.
+        q = q.filter(
+            ~exists().where(OnerequestAnotacao.solicitacao_id == OnerequestSolicitacao.id)
+        )
+    return q
+
+
+def _brt_day_start(dia: date) -> datetime:
+    return datetime(dia.year, dia.month, dia.day, tzinfo=_BRT)
+
+
+def _encode_cursor(row: OnerequestSolicitacao) -> str:
+    """Posição (prazo_date, id) da última linha da página: "AAAA-MM-DD:id" ou ":id" (sem prazo)."""
+    prazo = row.prazo_date.isoformat() if row.prazo_date else ""
+    return f"{prazo}:{row.id}"
+
+
+def _after_cursor(cursor: str):
+    """Filtro keyset "depois de `cursor`" na ordem (prazo_date NULLS LAST, id)."""
+    try:
+        prazo_raw, id_raw = cursor.rsplit(":", 1)
+        last_id = int(id_raw)
+        last_prazo = date.fromisoformat(prazo_raw) if prazo_raw else None
+    except ValueError as exc:
+        raise ValueError(f"Cursor inválido: {cursor!r}") from exc
+
+    prazo_col = OnerequestSolicitacao.prazo_date
+    if last_prazo is None:
+        # Já estamos no bloco "sem prazo" (fim da ordem): só avança no id.
+        return and_(prazo_col.is_(None), OnerequestSolicitacao.id > last_id)
+    return or_(
+        prazo_col > last_prazo,
+        and_(prazo_col == last_prazo, OnerequestSolicitacao.id > last_id),
+        prazo_col.is_(None),
+    )
+
+
 # ── Legal One web (deep-links) ─────────────────────────────────────────
 L1_WEB_BASE_URL = "https://mdradvocacia.novajus.com.br"
 L1_BLOCKING_STATUS_IDS = {0, 4}  # Pendente, Iniciado = "em aberto"
@@ -138,7 +182,7 @@ class OnerequestService:
     # ──────────────────────────────────────────────────────────────────
     # Listagem (paginada) com farol + KPIs
     # ──────────────────────────────────────────────────────────────────
-    def list_solicitacoes(
+    def _query_solicitacoes(
         self,
         *,
         status_sistema: Optional[str] = STATUS_SISTEMA_ABERTO,
@@ -146,18 +190,15 @@ class OnerequestService:
         responsavel_user_id: Optional[int] = None,
         setor: Optional[str] = None,
         busca: Optional[str] = None,
-        farol: Optional[str] = None,
         sem_responsavel: Optional[bool] = None,
-        sem_anotacao: Optional[bool] = None,
         sem_processo_l1: Optional[bool] = None,
         concluidas: Optional[bool] = None,
         disp_de: Optional[date] = None,
         disp_ate: Optional[date] = None,
         prazo_de: Optional[date] = None,
         prazo_ate: Optional[date] = None,
-        limit: int = 50,
-        offset: int = 0,
-    ) -> dict:
+    ):
+        """Conjunto filtrado da listagem/export ANTES de farol/anotação (base dos KPIs)."""
         q = self.db.query(OnerequestSolicitacao)
         if concluidas:
             # "Concluídas" = BB respondeu (RESPONDIDO) OU operador encerrou sem
@@ -206,72 +247,95 @@ class OnerequestService:
                 OnerequestSolicitacao.status_tratamento != STATUS_TRATAMENTO_IGNORADO,
             )
 
+        prazo_col = OnerequestSolicitacao.prazo_date
+
+        # Recorte por PRAZO FATAL (campo prazo, do BB) — sem prazo fica fora.
+        if prazo_de:
+            q = q.filter(prazo_col >= prazo_de)
+        if prazo_ate:
+            q = q.filter(prazo_col <= prazo_ate)
+        # Recorte por DISPONIBILIZAÇÃO (recebido_em, em horário de Brasília):
+        # o dia BRT vira intervalo [00:00, 00:00 do dia seguinte) no timestamp.
+        if disp_de:
+            q = q.filter(OnerequestSolicitacao.recebido_em >= _brt_day_start(disp_de))
+        if disp_ate:
+            q = q.filter(
+                OnerequestSolicitacao.recebido_em < _brt_day_start(disp_ate + timedelta(days=1))
+            )
+        return q
+
+    def list_solicitacoes(
+        self,
+        *,
+        status_sistema: Optional[str] = STATUS_SISTEMA_ABERTO,
+        status_tratamento: Optional[str] = None,
+        responsavel_user_id: Optional[int] = None,
+        setor: Optional[str] = None,
+        busca: Optional[str] = None,
+        farol: Optional[str] = None,
+        sem_responsavel: Optional[bool] = None,
+        sem_anotacao: Optional[bool] = None,
+        sem_processo_l1: Optional[bool] = None,
+        concluidas: Optional[bool] = None,
+        disp_de: Optional[date] = None,
+        disp_ate: Optional[date] = None,
+        prazo_de: Optional[date] = None,
+        prazo_ate: Optional[date] = None,
+        limit: int = 50,
+        offset: int = 0,
+        cursor: Optional[str] = None,
+    ) -> dict:
         hoje = date.today()
+        q = self._query_solicitacoes(
+            status_sistema=status_sistema,
+            status_tratamento=status_tratamento,
+            responsavel_user_id=responsavel_user_id,
+            setor=setor,
+            busca=busca,
+            sem_responsavel=sem_responsavel,
+            sem_processo_l1=sem_processo_l1,
+            concluidas=concluidas,
+            disp_de=disp_de,
+            disp_ate=disp_ate,
+            prazo_de=prazo_de,
+            prazo_ate=prazo_ate,
+        )
 
-        # Passo 1: (id, prazo, recebido_em) de TODO o conjunto filtrado pra
-        # farol/KPIs/ordenação + recortes de data (disponibilização e prazo fatal).
-        leves = q.with_entities(
-            OnerequestSolicitacao.id,
-            OnerequestSolicitacao.prazo,
-            OnerequestSolicitacao.recebido_em,
-        ).all()
-        kpis = {"atrasadas": 0, "hoje": 0, "amanha": 0, "fds": 0, "futuras": 0, "sem_prazo": 0}
-        enriquecidos = []
-        for _id, prazo, recebido_em in leves:
-            pdate = _parse_prazo(prazo)
-            # Recorte por PRAZO FATAL (campo prazo, do BB).
-            if prazo_de and (pdate is None or pdate < prazo_de):
-                continue
-            if prazo_ate and (pdate is None or pdate > prazo_ate):
-                continue
-            # Recorte por DISPONIBILIZAÇÃO (recebido_em, em horário de Brasília).
-            if disp_de or disp_ate:
-                rdate = _brt_date(recebido_em)
-                if disp_de and (rdate is None or rdate < disp_de):
-                    continue
-                if disp_ate and (rdate is None or rdate > disp_ate):
-                    continue
-            farol_row = _farol(pdate, hoje)
-            if farol_row == "atrasado":
-                kpis["atrasadas"] += 1
-            elif farol_row == "vermelho":
-                kpis["hoje"] += 1
-            elif farol_row == "amarelo":
-                kpis["amanha"] += 1
-            elif farol_row == "roxo":
-                kpis["fds"] += 1
-            elif farol_row == "verde":
-                kpis["futuras"] += 1
-            else:  # cinza = sem prazo informado
-                kpis["sem_prazo"] += 1
-            # ordena por prazo asc; sem data vai pro fim
-            enriquecidos.append((_id, pdate or date.max, farol_row))
-
-        if farol:
-            enriquecidos = [e for e in enriquecidos if e[2] == farol]
-
-        # DMIs que já têm anotação (justificativa do atraso, ex.: aguardando
-        # providência do cliente). Set único pra badge "anotada"/"sem anotação"
-        # e pro filtro `sem_anotacao` (caçar atrasadas que ainda precisam de ação).
-        ids_com_anotacao = {
-            sid
-            for (sid,) in self.db.query(OnerequestAnotacao.solicitacao_id).distinct()
-        }
-        if sem_anotacao:
-            enriquecidos = [e for e in enriquecidos if e[0] not in ids_com_anotacao]
-
-        total = len(enriquecidos)
-        enriquecidos.sort(key=lambda x: x[1])
-        page_ids = [i for (i, _d, _f) in enriquecidos[offset : offset + limit]]
-
-        # Passo 2: linhas completas só da página, preservando a ordem.
-        page_map = {
-            row.id: row
-            for row in self.db.query(OnerequestSolicitacao)
-            .filter(OnerequestSolicitacao.id.in_(page_ids))
-            .all()
-        }
-        page_rows = [page_map[i] for i in page_ids if i in page_map]
+        # KPIs num único agregado (COUNT ... FILTER por farol), ANTES dos
+        # filtros de farol/anotação — os cards mostram o conjunto inteiro.
+        farol_sql = self._farol_sql(hoje)
+        kpi_row = q.with_entities(
+            *(func.count().filter(farol_sql == cor).label(kpi) for kpi, cor in _KPI_FAROL.items())
+        ).one()
+        kpis = {kpi: int(getattr(kpi_row, kpi) or 0) for kpi in _KPI_FAROL}
+
+        q = _filtrar_farol_anotacao(q, farol_sql, farol, sem_anotacao)
+        if farol or sem_anotacao:
+            total = q.with_entities(func.count(OnerequestSolicitacao.id)).scalar() or 0
+        else:
+            total = sum(kpis.values())
+
+        # Ordena por prazo asc (sem prazo no fim) + id; com `cursor` a página
+        # começa logo depois da última linha da anterior (keyset, sem OFFSET).
+        page_q = q.order_by(*_ORDEM_LISTAGEM)
+        if cursor:
+            page_q = page_q.filter(_after_cursor(cursor))
+        elif offset:
+            page_q = page_q.offset(offset)
+        page_rows = page_q.limit(limit).all()
+
+        next_cursor = None
+        if len(page_rows) == limit:
+            next_cursor = _encode_cursor(page_rows[-1])
+
+        ids_com_anotacao = set()
+        if page_rows:
+            ids_com_anotacao = {
+                sid
+                for (sid,) in self.db.query(OnerequestAnotacao.solicitacao_id)
+                .filter(OnerequestAnotacao.solicitacao_id.in_([r.id for r in page_rows]))
+                .distinct()
+            }
 
         # Resolve nome do responsável em lote.
         user_ids = {r.responsavel_user_id for r in page_rows if r.responsavel_user_id}
@@ -316,7 +380,7 @@ class OnerequestService:
                     "last_error": r.last_error,
                     "scheduled_by_nome": r.scheduled_by_nome,
                     "scheduled_at": r.scheduled_at.isoformat() if r.scheduled_at else None,
-                    "farol": _farol(_parse_prazo(r.prazo), hoje),
+                    "farol": _farol(r.prazo_date, hoje),
                     # Status no L1 (cacheado pelo botão "Atualizar status L1").
                     "l1_checked_at": r.l1_checked_at.isoformat() if r.l1_checked_at else None,
                     "l1_dmi_task_id": r.l1_dmi_task_id,
@@ -346,66 +410,99 @@ class OnerequestService:
                 }
             )
 
-        return {"total": total, "kpis": kpis, "items": items}
+        return {"total": total, "kpis": kpis, "items": items, "next_cursor": next_cursor}
+
+    def _farol_sql(self, hoje: date):
+        """`_farol` como CASE sobre `prazo_date` — mesma regra, avaliada no banco."""
+        if self.db.get_bind().dialect.name == "postgresql":
+            fim_de_semana = extract("isodow", OnerequestSolicitacao.prazo_date) >= 6
+        else:  # sqlite (testes): %w = 0 (dom) .. 6 (sáb)
+            fim_de_semana = func.strftime("%w", OnerequestSolicitacao.prazo_date).in_(("0", "6"))
+        prazo_col = OnerequestSolicitacao.prazo_date
+        return case(
+            (prazo_col.is_(None), "cinza"),
+            (prazo_col < hoje, "atrasado"),
+            (prazo_col == hoje, "vermelho"),
+            (prazo_col == hoje + timedelta(days=1), "amarelo"),
+            (fim_de_semana, "roxo"),
+            else_="verde",
+        )
 
     # ──────────────────────────────────────────────────────────────────
     # Exportação Excel (reusa exatamente os filtros do list)
     # ──────────────────────────────────────────────────────────────────
-    def export_xlsx(self, **filtros) -> bytes:
-        from io import BytesIO
+    def export_xlsx(
+        self,
+        *,
+        farol: Optional[str] = None,
+        sem_anotacao: Optional[bool] = None,
+        **filtros,
+    ) -> str:
+        """Gera o XLSX em arquivo temporário e devolve o caminho (quem chama apaga).
 
-        from openpyxl import Workbook
+        Mesmo conjunto e ordem da listagem, mas lido em streaming (`yield_per`)
+        direto pro writer — sem montar os dicts da página nem o workbook em memória.
+        """
         from openpyxl.styles import Font, PatternFill
-        from openpyxl.utils import get_column_letter
 
         filtros.pop("limit", None)
         filtros.pop("offset", None)
-        items = self.list_solicitacoes(limit=100000, offset=0, **filtros)["items"]
+        filtros.pop("cursor", None)
+        hoje = date.today()
+        q = _filtrar_farol_anotacao(
+            self._query_solicitacoes(**filtros), self._farol_sql(hoje), farol, sem_anotacao
+        )
+        q = (
+            q.outerjoin(LegalOneUser, LegalOneUser.id == OnerequestSolicitacao.responsavel_user_id)
+            .with_entities(OnerequestSolicitacao, LegalOneUser.name)
+            .order_by(*_ORDEM_LISTAGEM)
+        )
 
-        desfecho_lbl = {"respondida": "Respondida", "arquivada": "Arquivada"}
         farol_lbl = {
             "atrasado": "Atrasada", "vermelho": "Vence hoje", "amarelo": "Amanhã",
             "roxo": "Fim de semana", "verde": "Futura", "cinza": "Sem prazo",
         }
-        # (título, largura, getter)
+
+        def _desfecho(r) -> str:
+            if r.status_sistema == STATUS_SISTEMA_RESPONDIDO:
+                return "Respondida"
+            if r.status_tratamento == STATUS_TRATAMENTO_IGNORADO:
+                return "Arquivada"
+            return ""
+
+        # (título, largura, getter(solicitação, nome do responsável))
         colunas = [
-            ("DMI", 16, lambda i: i["numero_solicitacao"]),
-            ("Título", 42, lambda i: i.get("titulo")),
-            ("NPJ direcionador", 16, lambda i: i.get("npj_direcionador")),
-            ("Processo", 24, lambda i: i.get("numero_processo")),
-            ("Polo", 10, lambda i: i.get("polo")),
-            ("Disponibilizada", 18, lambda i: _fmt_iso_brt(i.get("recebido_em"))),
-            ("Prazo fatal", 12, lambda i: i.get("prazo")),
-            ("Situação do prazo", 16, lambda i: farol_lbl.get(i.get("farol"), "")),
-            ("Status BB", 12, lambda i: i.get("status_sistema")),
-            ("Tratamento", 18, lambda i: i.get("status_tratamento")),
-            ("Desfecho", 12, lambda i: desfecho_lbl.get(i.get("desfecho") or "", "")),
-            ("Responsável", 24, lambda i: i.get("responsavel_nome")),
-            ("Setor", 18, lambda i: i.get("setor")),
-            ("Agendada para", 14, lambda i: i.get("data_agendamento")),
-            ("Status no L1", 14, lambda i: i.get("l1_dmi_status_label")),
-            ("Tarefa L1", 12, lambda i: i.get("created_task_id")),
-            ("Anotação", 50, lambda i: i.get("anotacao")),
+            ("DMI", 16, lambda r, _n: r.numero_solicitacao),
+            ("Título", 42, lambda r, _n: r.titulo),
+            ("NPJ direcionador", 16, lambda r, _n: r.npj_direcionador),
+            ("Processo", 24, lambda r, _n: r.numero_processo),
+            ("Polo", 10, lambda r, _n: r.polo),
+            ("Disponibilizada", 18, lambda r, _n: _fmt_iso_brt(r.recebido_em.isoformat() if r.recebido_em else None)),
+            ("Prazo fatal", 12, lambda r, _n: r.prazo),
+            ("Situação do prazo", 16, lambda r, _n: farol_lbl.get(_farol(r.prazo_date, hoje), "")),
+            ("Status BB", 12, lambda r, _n: r.status_sistema),
+            ("Tratamento", 18, lambda r, _n: r.status_tratamento),
+            ("Desfecho", 12, lambda r, _n: _desfecho(r)),
+            ("Responsável", 24, lambda _r, n: n),
+            ("Setor", 18, lambda r, _n: r.setor),
+            ("Agendada para", 14, lambda r, _n: r.data_agendamento),
+            ("Status no L1", 14, lambda r, _n: L1_STATUS_LABELS_FULL.get(r.l1_dmi_status_id)),
+            ("Tarefa L1", 12, lambda r, _n: r.created_task_id),
+            ("Anotação", 50, lambda r, _n: r.anotacao),
         ]
 
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "DMIs"
-        head_font = Font(bold=True, color="FFFFFF")
-        head_fill = PatternFill("solid", fgColor="1F4E79")
-        for col, (titulo, largura, _g) in enumerate(colunas, start=1):
-            cell = ws.cell(row=1, column=col, value=titulo)
-            cell.font = head_font
-            cell.fill = head_fill
-            ws.column_dimensions[get_column_letter(col)].width = largura
-        for row, item in enumerate(items, start=2):
-            for col, (_t, _w, getter) in enumerate(colunas, start=1):
-                ws.cell(row=row, column=col, value=getter(item))
-        ws.freeze_panes = "A2"
-
-        buf = BytesIO()
-        wb.save(buf)
-        return buf.getvalue()
+        writer = StreamingXlsxWriter(
+            header_font=Font(bold=True, color="FFFFFF"),
+            header_fill=PatternFill("solid", fgColor="1F4E79"),
+        )
+        writer.add_sheet(
+            "DMIs",
+            [titulo for titulo, _w, _g in colunas],
+            ([getter(r, nome) for _t, _w, getter in colunas] for r, nome in q.yield_per(1000)),
+            widths=[largura for _t, largura, _g in colunas],
+            freeze_header=True,
+        )
+        return writer.to_tempfile(prefix="onerequest-dmis-")
 
     # ──────────────────────────────────────────────────────────────────
     # Dashboard — visão operacional + risco (KPIs, séries, distribuições)
@@ -416,7 +513,7 @@ class OnerequestService:
 
         # Base = DMIs abertas (em tratamento) — alimenta farol/responsável/setor.
         abertas = self.db.query(
-            OnerequestSolicitacao.prazo,
+            OnerequestSolicitacao.prazo_date,
             OnerequestSolicitacao.responsavel_user_id,
             OnerequestSolicitacao.setor,
             OnerequestSolicitacao.status_tratamento,
@@ -428,7 +525,7 @@ class OnerequestService:
         sem_responsavel = 0
         agendadas_abertas = 0
         for prazo, ruid, setor, st in abertas:
-            f = _farol(_parse_prazo(prazo), hoje)
+            f = _farol(prazo, hoje)
             farol_dist[f] = farol_dist.get(f, 0) + 1
             if st == STATUS_TRATAMENTO_AGENDADO:
                 agendadas_abertas += 1
@@ -1167,12 +1264,14 @@ class OnerequestService:
         """Agrupa as DMIs ABERTAS que vencem HOJE por responsável e monta uma
         mensagem de alerta pronta pra copiar (Teams/WhatsApp)."""
         hoje = date.today()
-        abertas = (
+        alvos = (
             self.db.query(OnerequestSolicitacao)
-            .filter(OnerequestSolicitacao.status_sistema == STATUS_SISTEMA_ABERTO)
+            .filter(
+                OnerequestSolicitacao.status_sistema == STATUS_SISTEMA_ABERTO,
+                OnerequestSolicitacao.prazo_date == hoje,
+            )
             .all()
         )
-        alvos = [s for s in abertas if _parse_prazo(s.prazo) == hoje]
 
         uids = {s.responsavel_user_id for s in alvos if s.responsavel_user_id}
         nomes: dict = {}
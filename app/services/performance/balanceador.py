@@ -67,25 +67,28 @@ class BalanceadorService:
         self.db = db
 
     def diagnostico(self, team: str) -> list[dict]:
-        """Por colaborador do time: pendentes atrasadas / fatais hoje / futuras."""
+        """Por colaborador do time: pendentes atrasadas / fatais hoje / futuras.
+
+        Lê do rollup de backlog (pendentes por pessoa × subtipo × dia do prazo,
+        refeito no ingest) — o "hoje" entra como parâmetro."""
         rows = self.db.execute(
             text(
-                f"""
+                """
                 SELECT p.id, p.nome, p.cargo, p.is_supervisor,
-                  count(t.id) FILTER (WHERE t.prazo_previsto IS NOT NULL AND {_PRAZO} < {_HOJE}) AS atrasado,
-                  count(t.id) FILTER (WHERE {_PRAZO} = {_HOJE}) AS fatal_hoje,
-                  count(t.id) FILTER (WHERE t.prazo_previsto IS NOT NULL AND {_PRAZO} > {_HOJE}) AS futuro,
-                  count(t.id) FILTER (WHERE t.prazo_previsto IS NULL) AS sem_prazo,
-                  count(t.id) AS total
+                  COALESCE(SUM(CASE WHEN b.prazo_dia < :hoje THEN b.pendente END), 0) AS atrasado,
+                  COALESCE(SUM(CASE WHEN b.prazo_dia = :hoje THEN b.pendente END), 0) AS fatal_hoje,
+                  COALESCE(SUM(CASE WHEN b.prazo_dia > :hoje THEN b.pendente END), 0) AS futuro,
+                  COALESCE(SUM(CASE WHEN b.prazo_dia IS NULL THEN b.pendente END), 0) AS sem_prazo,
+                  COALESCE(SUM(b.pendente), 0) AS total
                 FROM perf_pessoa p
-                LEFT JOIN perf_l1_tarefa t
-                  ON t.pessoa_id = p.id AND t.status = 'Pendente' AND {_NAO_ACOMP}
+                LEFT JOIN perf_rollup_backlog b
+                  ON b.pessoa_id = p.id AND lower(coalesce(b.subtipo,'')) NOT LIKE 'acompanhar%'
                 WHERE p.equipe = :team AND p.ativo
                 GROUP BY p.id, p.nome, p.cargo, p.is_supervisor
                 ORDER BY p.is_supervisor DESC, atrasado DESC, futuro DESC, p.nome
                 """
             ),
-            {"team": team},
+            {"team": team, "hoje": _hoje_brt()},
         ).fetchall()
         return [
             {
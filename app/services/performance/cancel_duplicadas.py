@@ -26,6 +26,7 @@ from sqlalchemy import func, text
 
 from app.db.session import SessionLocal
 from app.models.performance import PerfCancelJob
+from app.services.performance.rollups import refresh_rollups
 
 logger = logging.getLogger(__name__)
 
@@ -191,14 +192,15 @@ def _cancel_batch(db, job, ids: list, c) -> None:
         pendentes = [t for t in pendentes if t not in confirmados]
 
     # Espelha no snapshot local: as confirmadas viram 'Cancelado' → somem de
-    # pendente/atrasado no board (que lê do snapshot), deixando o gráfico coerente
-    # com o que foi cancelado de verdade — sem esperar o próximo ingest.
+    # pendente/atrasado no board (que lê dos rollups do snapshot), deixando o
+    # gráfico coerente com o que foi cancelado de verdade — sem esperar o
+    # próximo ingest. Rollups recalculados na mesma transação do UPDATE.
     if confirmados:
         ids_sql = ",".join(str(int(t)) for t in confirmados)
         db.execute(
             text(f"UPDATE perf_l1_tarefa SET status = 'Cancelado' WHERE l1_task_id IN ({ids_sql})")
         )
-        db.commit()
+        refresh_rollups(db)
 
     job.falhas = (job.falhas or 0) + len(pendentes)
     job.feito = job.total
@@ -127,8 +127,9 @@ def _sector_metrics(db, days: int, team=None) -> dict:
     from app.services.performance.teams import team_label
 
     svc = PerformanceService(db)
+    # Tudo dos rollups diários (perf_rollup_*): nada aqui varre a perf_l1_tarefa.
     eq = svc.equipe(days=days, team=team)
-    dash = svc.dashboard(days=days, team=team)
+    dash = svc.setor_resumo(days=days, team=team)
     return {
         "periodo_dias": days,
         "team_label": team_label(team) if team else "Todos os times",
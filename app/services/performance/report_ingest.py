@@ -5,7 +5,8 @@ manhã. Em vez de remontar via API, baixamos o arquivo pronto e ingerimos:
 
   sessão web (reuso do login .ASPXAUTH, filelock) →
   GET /agenda/reportagenda/Search → acha o "Agenda Analytics" mais recente →
-  GET /shared/ReportShared/GetFile/{id} → parser do seed (replace) + classify.
+  GET /shared/ReportShared/GetFile/{id} → parser do seed (replace atômico ou
+delta por (l1_task_id, pessoa_id, envolvido_nome)) + classify.
 
 O roster (perf_pessoa) NÃO é tocado — só as tarefas. Validado 2026-06-26:
 relatório do dia = ~365k linhas, header idêntico ao parser.
@@ -101,9 +102,27 @@ def _find_latest(session: requests.Session, base: str):
     return best
 
 
-def baixar_e_ingerir(db, *, force: bool = False) -> dict:
+def _ingerir(db, delta: bool | None) -> tuple[int, bool]:
+    """Parser do seed (replace atômico ou delta) + classify + rollups, mantendo
+    o roster intacto."""
+    from app.core.config import settings
+    from app.models.performance import PerfPessoa
+    from app.services.performance.rollups import refresh_rollups
+    from app.services.performance.seed import classify_subtipos, seed_tarefas
+
+    if delta is None:
+        delta = settings.perf_ingest_delta
+    name_to_id = {p.nome_norm: p.id for p in db.query(PerfPessoa).all()}
+    n = seed_tarefas(db, name_to_id, agenda_path=_REPORT_PATH, delta=delta)
+    classify_subtipos(db)
+    refresh_rollups(db)
+    return n, delta
+
+
+def baixar_e_ingerir(db, *, force: bool = False, delta: bool | None = None) -> dict:
     """Baixa o relatório do dia e ingere. force=True ingere o mais recente mesmo
-    que não seja de hoje (ex.: botão "Atualizar agora")."""
+    que não seja de hoje (ex.: botão "Atualizar agora"). delta=None segue
+    `settings.perf_ingest_delta`."""
     from app.services.prazos_iniciais.legacy_task_helpers import web_base_url
 
     base = web_base_url()
@@ -126,17 +145,12 @@ def baixar_e_ingerir(db, *, force: bool = False) -> dict:
     with open(_REPORT_PATH, "wb") as f:
         f.write(resp.content)
 
-    # Parser do seed (replace total) + classify, mantendo o roster intacto.
-    from app.models.performance import PerfPessoa
-    from app.services.performance.seed import classify_subtipos, seed_tarefas
-
-    name_to_id = {p.nome_norm: p.id for p in db.query(PerfPessoa).all()}
-    n = seed_tarefas(db, name_to_id, agenda_path=_REPORT_PATH)
-    classify_subtipos(db)
+    n, delta = _ingerir(db, delta)
 
     info = {
         "ok": True,
         "tarefas": n,
+        "delta": delta,
         "relatorio": rel["title"],
         "data": rel["data"],
         "bytes": len(resp.content),
@@ -228,6 +242,7 @@ def gerar_e_ingerir(
     model_id: int = AGENDA_ANALYTICS_MODEL_ID,
     espera_max_s: int = 1500,
     intervalo_s: int = 30,
+    delta: bool | None = None,
 ) -> dict:
     """Dispara a geração de um relatório FRESCO, espera ficar pronto e ingere.
     Pras rotinas (madrugada/meio-dia) e pro 'Atualizar pool agora' — não depende
@@ -272,15 +287,11 @@ def gerar_e_ingerir(
     with open(_REPORT_PATH, "wb") as f:
         f.write(resp.content)
 
-    from app.models.performance import PerfPessoa
-    from app.services.performance.seed import classify_subtipos, seed_tarefas
-
-    name_to_id = {p.nome_norm: p.id for p in db.query(PerfPessoa).all()}
-    n = seed_tarefas(db, name_to_id, agenda_path=_REPORT_PATH)
-    classify_subtipos(db)
+    n, delta = _ingerir(db, delta)
     info = {
         "ok": True,
         "tarefas": n,
+        "delta": delta,
         "relatorio": str(novo),
         "data": _hoje_str(),
         "bytes": len(resp.content),
@@ -0,0 +1,93 @@
+"""Rollups diários do "Minha Equipe" (pré-agregados de perf_l1_tarefa).
+
+`equipe`, o resumo do setor (relatório PDF) e o diagnóstico do Balanceador
+varriam a perf_l1_tarefa inteira (~224k linhas) a cada request, com
+percentile_cont, COUNT(DISTINCT date(...)) e vários FILTER. Como a tabela é
+um snapshot diário (só muda no ingest), os agregados são recalculados junto
+com o ingest e as telas leem estas tabelas pequenas:
+
+- perf_rollup_conclusao — (dia BRT, pessoa, subtipo): concluídas, com prazo, no prazo.
+- perf_rollup_ciclo     — (dia BRT, pessoa, bucket): histograma log do cycle
+                          time (cadastro → conclusão), pra mediana aproximada.
+- perf_rollup_backlog   — (pessoa, subtipo, dia do prazo BRT): pendentes.
+                          Atrasado/fatal hoje/futuro saem comparando o dia do
+                          prazo com o "hoje" da consulta.
+
+Qualquer janela de 7–90 dias vira um SUM sobre alguns milhares de linhas.
+"""
+
+import math
+
+from sqlalchemy import delete, text
+
+from app.models.performance import PerfRollupBacklog, PerfRollupCiclo, PerfRollupConclusao
+
+# Razão entre buckets consecutivos do histograma de cycle time: a mediana
+# devolvida (meio geométrico do bucket) erra no máximo ~2,5%.
+CICLO_BASE = 1.05
+
+_REFRESH_SQL = (
+    """
+    INSERT INTO perf_rollup_conclusao (dia, pessoa_id, subtipo, concluido, com_prazo, no_prazo)
+    SELECT date(concluido_em AT TIME ZONE 'America/Sao_Paulo'), pessoa_id, subtipo,
+           COUNT(*),
+           COUNT(*) FILTER (WHERE prazo_previsto IS NOT NULL),
+           COUNT(*) FILTER (WHERE prazo_previsto IS NOT NULL AND concluido_em <= prazo_previsto)
+    FROM perf_l1_tarefa
+    WHERE status = 'Cumprido' AND pessoa_id IS NOT NULL AND concluido_em IS NOT NULL
+    GROUP BY 1, 2, 3
+    """,
+    """
+    INSERT INTO perf_rollup_ciclo (dia, pessoa_id, bucket, n)
+    SELECT date(concluido_em AT TIME ZONE 'America/Sao_Paulo'), pessoa_id,
+           floor(ln(greatest(EXTRACT(EPOCH FROM (concluido_em - cadastrado_em))::float8, 1.0))
+                 / ln(CAST(:base AS float8)))::int,
+           COUNT(*)
+    FROM perf_l1_tarefa
+    WHERE status = 'Cumprido' AND pessoa_id IS NOT NULL
+      AND concluido_em IS NOT NULL AND cadastrado_em IS NOT NULL
+    GROUP BY 1, 2, 3
+    """,
+    """
+    INSERT INTO perf_rollup_backlog (pessoa_id, subtipo, prazo_dia, pendente)
+    SELECT pessoa_id, subtipo, date(prazo_previsto AT TIME ZONE 'America/Sao_Paulo'), COUNT(*)
+    FROM perf_l1_tarefa
+    WHERE status = 'Pendente' AND pessoa_id IS NOT NULL
+    GROUP BY 1, 2, 3
+    """,
+)
+
+
+def refresh_rollups(db) -> None:
+    """Recalcula os rollups a partir da perf_l1_tarefa (Postgres), numa
+    transação só: quem lê segue vendo os agregados anteriores até o commit."""
+    try:
+        for model in (PerfRollupConclusao, PerfRollupCiclo, PerfRollupBacklog):
+            db.execute(delete(model))
+        for sql in _REFRESH_SQL:
+            db.execute(text(sql), {"base": CICLO_BASE})
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+
+def remover_pessoa(db, pessoa_id: int) -> None:
+    """Tira a pessoa dos rollups, sem commit — mesmo efeito do refresh
+    depois de desvincular as tarefas dela (pessoa_id NULL não entra)."""
+    for model in (PerfRollupConclusao, PerfRollupCiclo, PerfRollupBacklog):
+        db.execute(delete(model).where(model.pessoa_id == pessoa_id))
+
+
+def mediana_ciclo(hist) -> float | None:
+    """Mediana aproximada (segundos) de um histograma [(bucket, n), ...]."""
+    buckets = sorted((int(b), int(n)) for b, n in hist if n)
+    total = sum(n for _, n in buckets)
+    if not total:
+        return None
+    acumulado = 0
+    for bucket, n in buckets:
+        acumulado += n
+        if 2 * acumulado >= total:
+            return math.pow(CICLO_BASE, bucket + 0.5)
+    return None  # pragma: no cover
@@ -8,17 +8,36 @@ Popula perf_pessoa (roster), perf_l1_tarefa (só as tarefas das pessoas do
 roster — resto é ruído) e perf_subtipo_categoria (natureza por subtipo).
 
 É o "seed do histórico via export" do plano — a ingestão incremental via API
-/Tasks entra numa fase seguinte. Idempotente: re-rodar limpa tarefas/categorias
-e regrava; pessoas são upsertadas por nome normalizado.
+/Tasks entra numa fase seguinte. Idempotente: re-rodar troca tarefas/categorias
+(ver `seed_tarefas`); pessoas são upsertadas por nome normalizado.
 
 Rodar:  docker exec onetask-api-1 python -m app.services.performance.seed
 """
 
+import csv
 import datetime
+import itertools
+import logging
+import re
+import tempfile
 import unicodedata
 
 import openpyxl
-from sqlalchemy import text
+from sqlalchemy import (
+    Column,
+    Integer,
+    MetaData,
+    Table,
+    and_,
+    delete,
+    exists,
+    func,
+    insert,
+    or_,
+    select,
+    text,
+    update,
+)
 
 from app.db.session import SessionLocal
 from app.models.performance import (
@@ -37,6 +56,8 @@ try:
 except Exception:  # pragma: no cover
     BRT = None
 
+logger = logging.getLogger(__name__)
+
 SQUADS_XLSX = "/tmp/squads.xlsx"
 AGENDA_XLSX = "/tmp/agenda.xlsx"
 
@@ -179,20 +200,46 @@ def seed_pessoas(db) -> dict:
     return {p.nome_norm: p.id for p in db.query(PerfPessoa).all()}
 
 
-def seed_tarefas(db, name_to_id: dict, agenda_path: str = AGENDA_XLSX) -> int:
-    """Replace total ATÔMICO: o delete e TODOS os inserts vão numa transação só,
-    com commit ÚNICO no fim. Se cair no meio (container morto por redeploy, erro
-    de parse), faz rollback e mantém os dados ANTIGOS completos — em vez de deixar
-    a tabela parcial. (Já aconteceu: redeploy no meio do ingest = snapshot truncado
-    com 78k de ~224k linhas e last_sync não gravado.)"""
+# Colunas gravadas pelo ingest (ordem do COPY / das tuplas do parser).
+_TAREFA_COLS = (
+    "l1_task_id",
+    "pessoa_id",
+    "cumprido_por_nome",
+    "envolvido_nome",
+    "escritorio",
+    "tipo",
+    "subtipo",
+    "status",
+    "concluido_em",
+    "cadastrado_em",
+    "prazo_previsto",
+    "pasta",
+    "cnj",
+    "uf",
+)
+_TAREFA_TABLE = PerfTarefa.__tablename__
+# Tabela-sombra do replace total: carregada inteira por COPY e trocada pela
+# viva num rename (a viva só é travada no instante da troca).
+_SHADOW_TABLE = f"{_TAREFA_TABLE}_shadow"
+_SHADOW_SUFFIX = "__shadow"
+_DELTA_TABLE = f"{_TAREFA_TABLE}_delta"
+_INSERT_BATCH = 5000
+# Spool do CSV do COPY: acima disso vai pra disco.
+_COPY_SPOOL_BYTES = 32 * 1024 * 1024
+
+
+def _txt(r, i):
+    return str(r[i]).strip() if len(r) > i and r[i] else None
+
+
+def iter_tarefas(agenda_path: str, name_to_id: dict):
+    """Linhas do "Agenda Analytics" (read-only, linha a linha) já resolvidas
+    pro roster, como tuplas na ordem de `_TAREFA_COLS`. Só Cumprido/Pendente
+    de pessoas do roster — o resto é ruído."""
     wb = openpyxl.load_workbook(agenda_path, read_only=True, data_only=True)
-    ws = wb.active
-    rows = ws.iter_rows(values_only=True)
-    next(rows)
-    n = 0
     try:
-        db.query(PerfTarefa).delete()
-        batch = []
+        rows = wb.active.iter_rows(values_only=True)
+        next(rows, None)
         for r in rows:
             status = r[STATUS] if len(r) > STATUS else None
             if status not in ("Cumprido", "Pendente"):
@@ -203,71 +250,305 @@ def seed_tarefas(db, name_to_id: dict, agenda_path: str = AGENDA_XLSX) -> int:
             pid = name_to_id.get(cumpr) if status == "Cumprido" else name_to_id.get(env)
             if not pid:
                 continue  # fora do roster = ruído (escopo: só a planilha)
-            batch.append(
-                PerfTarefa(
-                    pessoa_id=pid,
-                    cumprido_por_nome=(str(r[CUMPRIU]).strip() if len(r) > CUMPRIU and r[CUMPRIU] else None),
-                    envolvido_nome=(str(r[ENV]).strip() if len(r) > ENV and r[ENV] else None),
-                    escritorio=(str(r[ESC]).strip() if len(r) > ESC and r[ESC] else None),
-                    tipo=(str(r[TIPO]).strip() if len(r) > TIPO and r[TIPO] else None),
-                    subtipo=(str(r[SUBTIPO]).strip() if len(r) > SUBTIPO and r[SUBTIPO] else None),
-                    status=status,
-                    concluido_em=_aware(r[CONCL]) if len(r) > CONCL else None,
-                    cadastrado_em=_aware(r[CAD]) if len(r) > CAD else None,
-                    prazo_previsto=_aware(r[PRAZO]) if len(r) > PRAZO else None,
-                    l1_task_id=(int(r[ID]) if len(r) > ID and isinstance(r[ID], (int, float)) else None),
-                    pasta=(str(r[PASTA]).strip() if len(r) > PASTA and r[PASTA] else None),
-                    cnj=(str(r[CNJ]).strip() if len(r) > CNJ and r[CNJ] else None),
-                    uf=(str(r[UF]).strip() if len(r) > UF and r[UF] else None),
-                )
+            yield (
+                int(r[ID]) if len(r) > ID and isinstance(r[ID], (int, float)) else None,
+                pid,
+                _txt(r, CUMPRIU),
+                _txt(r, ENV),
+                _txt(r, ESC),
+                _txt(r, TIPO),
+                _txt(r, SUBTIPO),
+                status,
+                _aware(r[CONCL]) if len(r) > CONCL else None,
+                _aware(r[CAD]) if len(r) > CAD else None,
+                _aware(r[PRAZO]) if len(r) > PRAZO else None,
+                _txt(r, PASTA),
+                _txt(r, CNJ),
+                _txt(r, UF),
             )
+    finally:
+        wb.close()
+
+
+def _is_postgres(db) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def _copy_rows(db, table_name: str, rows, cols=_TAREFA_COLS) -> int:
+    """COPY das tuplas pra `table_name` dentro da transação da sessão. O CSV é
+    montado num spool (memória até 32 MB, depois disco), não em lista."""
+    n = 0
+    with tempfile.SpooledTemporaryFile(
+        max_size=_COPY_SPOOL_BYTES, mode="w+", newline="", encoding="utf-8"
+    ) as buf:
+        writer = csv.writer(buf)
+        for row in rows:
+            writer.writerow(row)
             n += 1
-            if len(batch) >= 2000:
-                db.bulk_save_objects(batch)  # insere DENTRO da transação (sem commit)
-                batch = []
-        if batch:
-            db.bulk_save_objects(batch)
-        db.commit()  # único commit: delete + todos os inserts juntos (atômico)
+        buf.seek(0)
+        cursor = db.connection().connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY {table_name} ({', '.join(cols)}) FROM STDIN WITH (FORMAT csv)",
+                buf,
+            )
+        finally:
+            cursor.close()
+    return n
+
+
+def _insert_rows(db, table, rows, cols=_TAREFA_COLS) -> int:
+    """Fallback sem COPY (SQLite nos testes): Core insert em lotes."""
+    n = 0
+    for chunk in iter(lambda: list(itertools.islice(rows, _INSERT_BATCH)), []):
+        db.execute(insert(table), [dict(zip(cols, r)) for r in chunk])
+        n += len(chunk)
+    return n
+
+
+def _load_rows(db, table, rows, cols=_TAREFA_COLS) -> int:
+    if _is_postgres(db):
+        return _copy_rows(db, table.name, rows, cols)
+    return _insert_rows(db, table, rows, cols)
+
+
+def seed_tarefas(db, name_to_id: dict, agenda_path: str = AGENDA_XLSX, *, delta: bool = False) -> int:
+    """Regrava perf_l1_tarefa a partir do "Agenda Analytics". Retorna o nº de
+    tarefas do relatório (do roster).
+
+    Replace total ATÔMICO: se cair no meio (container morto por redeploy, erro
+    de parse), faz rollback e mantém os dados ANTIGOS completos — em vez de
+    deixar a tabela parcial. (Já aconteceu: redeploy no meio do ingest =
+    snapshot truncado com 78k de ~224k linhas e last_sync não gravado.)
+
+    No Postgres o relatório vai por COPY pra uma tabela-sombra e entra no lugar
+    da viva por rename, na mesma transação: o dashboard segue lendo a versão
+    anterior durante a carga inteira e só espera o instante da troca.
+
+    `delta=True` não troca a tabela: aplica só a diferença linha a linha
+    (update do que mudou, insert do novo, delete do que saiu do relatório —
+    chave em `_seed_tarefas_delta`). Os dois modos gravam as mesmas linhas:
+    uma por linha do relatório.
+    """
+    rows = iter_tarefas(agenda_path, name_to_id)
+    try:
+        if delta:
+            n = _seed_tarefas_delta(db, rows)
+        elif _is_postgres(db):
+            n = _seed_tarefas_swap(db, rows)
+        else:
+            db.execute(delete(PerfTarefa))
+            n = _insert_rows(db, PerfTarefa.__table__, rows)
+        db.commit()  # único commit: carga + troca/diferença juntas (atômico)
     except Exception:
         db.rollback()
         raise
     return n
 
 
+def _seed_tarefas_swap(db, rows) -> int:
+    """Carga na tabela-sombra + troca por rename (Postgres)."""
+    conn = db.connection()
+    conn.execute(text(f"DROP TABLE IF EXISTS {_SHADOW_TABLE}"))
+    # Sem índices na carga (COPY bem mais rápido); recriados depois com o
+    # mesmo DDL da viva, com sufixo, e renomeados na troca.
+    conn.execute(text(f"CREATE TABLE {_SHADOW_TABLE} (LIKE {_TAREFA_TABLE} INCLUDING DEFAULTS)"))
+    n = _copy_rows(db, _SHADOW_TABLE, rows)
+
+    constraints = conn.execute(
+        text(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = CAST(:t AS regclass) AND contype IN ('p', 'u', 'f')"
+        ),
+        {"t": _TAREFA_TABLE},
+    ).fetchall()
+    indexes = conn.execute(
+        text(
+            "SELECT indexname, indexdef FROM pg_indexes "
+            "WHERE schemaname = current_schema() AND tablename = :t"
+        ),
+        {"t": _TAREFA_TABLE},
+    ).fetchall()
+    constraint_names = {name for name, _ in constraints}
+
+    for name, definition in constraints:
+        conn.execute(
+            text(f'ALTER TABLE {_SHADOW_TABLE} ADD CONSTRAINT "{name}{_SHADOW_SUFFIX}" {definition}')
+        )
+    plain_indexes = [name for name, _ in indexes if name not in constraint_names]
+    for name, definition in indexes:
+        if name in constraint_names:
+            continue
+        ddl = re.sub(
+            rf"^(CREATE (?:UNIQUE )?INDEX )\"?{re.escape(name)}\"?( ON (?:\S+\.)?){_TAREFA_TABLE}\b",
+            rf'\1"{name}{_SHADOW_SUFFIX}"\2{_SHADOW_TABLE}',
+            definition,
+        )
+        conn.execute(text(ddl))
+    conn.execute(text(f"ANALYZE {_SHADOW_TABLE}"))
+
+    # Troca: só aqui a viva é travada (ACCESS EXCLUSIVE até o commit).
+    conn.execute(text("SET LOCAL lock_timeout = '30s'"))
+    seq = conn.execute(text("SELECT pg_get_serial_sequence(:t, 'id')"), {"t": _TAREFA_TABLE}).scalar()
+    if seq:
+        # A sequence do id pertence à viva: sem isso o DROP leva ela junto.
+        conn.execute(text(f"ALTER SEQUENCE {seq} OWNED BY {_SHADOW_TABLE}.id"))
+    conn.execute(text(f"DROP TABLE {_TAREFA_TABLE}"))
+    conn.execute(text(f"ALTER TABLE {_SHADOW_TABLE} RENAME TO {_TAREFA_TABLE}"))
+    for name in constraint_names:
+        conn.execute(
+            text(f'ALTER TABLE {_TAREFA_TABLE} RENAME CONSTRAINT "{name}{_SHADOW_SUFFIX}" TO "{name}"')
+        )
+    for name in plain_indexes:
+        conn.execute(text(f'ALTER INDEX "{name}{_SHADOW_SUFFIX}" RENAME TO "{name}"'))
+    return n
+
+
+# Chave de casamento do delta: a mesma tarefa aparece uma vez por envolvido
+# (Cumprido com N envolvidos = N linhas do executor), e `ordem` numera as
+# linhas repetidas na chave inteira — nenhuma linha do relatório se perde.
+_DELTA_KEY = ("l1_task_id", "pessoa_id", "envolvido_nome")
+_DELTA_COLS = _TAREFA_COLS + ("ordem",)
+
+
+def _delta_stage() -> Table:
+    cols = PerfTarefa.__table__.c
+    return Table(
+        _DELTA_TABLE,
+        MetaData(),
+        *(Column(c, cols[c].type) for c in _TAREFA_COLS),
+        Column("ordem", Integer),
+        prefixes=["TEMPORARY"],
+    )
+
+
+def _with_ordem(rows):
+    """Acrescenta a cada tupla a ordem da linha entre as de mesma chave
+    (`_DELTA_KEY`), a partir de 1. Sem l1_task_id não há chave: ordem nula."""
+    idx = [_TAREFA_COLS.index(c) for c in _DELTA_KEY]
+    seen: dict = {}
+    for row in rows:
+        if row[0] is None:
+            yield (*row, None)
+            continue
+        key = tuple(row[i] for i in idx)
+        seen[key] = seen.get(key, 0) + 1
+        yield (*row, seen[key])
+
+
+def _seed_tarefas_delta(db, rows) -> int:
+    """Aplica só a diferença do relatório, linha a linha.
+
+    A linha é identificada por (l1_task_id, pessoa_id, envolvido_nome) + a
+    ordem entre as repetidas — no relatório pela posição, na tabela viva pelo
+    id. Tarefas sem l1_task_id não têm chave: são substituídas em bloco.
+    """
+    live = PerfTarefa.__table__
+    stage = _delta_stage()
+    conn = db.connection()
+    stage.drop(conn, checkfirst=True)
+    stage.create(conn)
+    n = _load_rows(db, stage, _with_ordem(rows), _DELTA_COLS)
+    if _is_postgres(db):
+        conn.execute(text(f"ANALYZE {_DELTA_TABLE}"))
+
+    def _live_key():
+        # Recalculada a cada statement: o delete só tira as maiores ordens de
+        # cada chave, então a numeração das que ficam não muda.
+        return (
+            select(
+                live.c.id,
+                *(live.c[c] for c in _DELTA_KEY),
+                func.row_number()
+                .over(partition_by=[live.c[c] for c in _DELTA_KEY], order_by=live.c.id)
+                .label("ordem"),
+            )
+            .where(live.c.l1_task_id.isnot(None))
+            .subquery()
+        )
+
+    def _mesma_linha(key):
+        return and_(
+            stage.c.l1_task_id == key.c.l1_task_id,
+            stage.c.pessoa_id.is_not_distinct_from(key.c.pessoa_id),
+            stage.c.envolvido_nome.is_not_distinct_from(key.c.envolvido_nome),
+            stage.c.ordem == key.c.ordem,
+        )
+
+    cols = [c for c in _TAREFA_COLS if c not in _DELTA_KEY]
+    key = _live_key()
+    removidas = db.execute(
+        delete(live).where(
+            live.c.id.in_(select(key.c.id).where(~exists().where(_mesma_linha(key))))
+        )
+    ).rowcount
+    key = _live_key()
+    alteradas = db.execute(
+        update(live)
+        .where(
+            live.c.id == key.c.id,
+            _mesma_linha(key),
+            or_(*(live.c[c].is_distinct_from(stage.c[c]) for c in cols)),
+        )
+        .values({**{c: stage.c[c] for c in cols}, "ingested_at": func.now()})
+    ).rowcount
+    db.execute(delete(live).where(live.c.l1_task_id.is_(None)))
+    key = _live_key()
+    novas = db.execute(
+        insert(live).from_select(
+            list(_TAREFA_COLS),
+            select(*(stage.c[c] for c in _TAREFA_COLS)).where(
+                or_(stage.c.l1_task_id.is_(None), ~exists().where(_mesma_linha(key)))
+            ),
+        )
+    ).rowcount
+    stage.drop(conn)
+    logger.info(
+        "perf_l1_tarefa delta: %s no relatório, %s novas, %s alteradas, %s removidas.",
+        n, novas, alteradas, removidas,
+    )
+    return n
+
+
 def classify_subtipos(db) -> None:
-    rows = db.execute(
+    """Natureza de cada subtipo, recalculada num INSERT ... SELECT só.
+
+    ruído: < 40 cumpridas; operacional: densidade (cumpridas por pessoa-dia)
+    >= 6; profundo: o resto.
+    """
+    db.execute(delete(PerfSubtipoCategoria))
+    db.execute(
         text(
             """
+            INSERT INTO perf_subtipo_categoria (subtipo, categoria, volume, densidade)
             SELECT subtipo,
-                   COUNT(*) FILTER (WHERE status='Cumprido') AS vol,
-                   COUNT(DISTINCT (pessoa_id::text || ':' ||
-                         (date(concluido_em AT TIME ZONE 'America/Sao_Paulo'))::text))
-                     FILTER (WHERE status='Cumprido') AS pdias
-            FROM perf_l1_tarefa
-            WHERE subtipo IS NOT NULL
-            GROUP BY subtipo
+                   CASE
+                       WHEN vol < 40 THEN :ruido
+                       WHEN pdias > 0 AND vol::numeric / pdias >= 6.0 THEN :operacional
+                       ELSE :profundo
+                   END,
+                   vol,
+                   CASE WHEN pdias > 0 THEN round(vol::numeric / pdias, 2) ELSE 0 END
+            FROM (
+                SELECT subtipo,
+                       COUNT(*) FILTER (WHERE status='Cumprido') AS vol,
+                       COUNT(DISTINCT (pessoa_id::text || ':' ||
+                             (date(concluido_em AT TIME ZONE 'America/Sao_Paulo'))::text))
+                         FILTER (WHERE status='Cumprido') AS pdias
+                FROM perf_l1_tarefa
+                WHERE subtipo IS NOT NULL
+                GROUP BY subtipo
+            ) agg
             """
-        )
-    ).fetchall()
-    db.query(PerfSubtipoCategoria).delete()
-    db.commit()
-    for subtipo, vol, pdias in rows:
-        vol = vol or 0
-        pdias = pdias or 0
-        dens = (vol / pdias) if pdias else 0.0
-        if vol < 40:
-            cat = CAT_RUIDO
-        elif dens >= 6.0:
-            cat = CAT_OPERACIONAL
-        else:
-            cat = CAT_PROFUNDO
-        db.add(
-            PerfSubtipoCategoria(subtipo=subtipo, categoria=cat, volume=vol, densidade=round(dens, 2))
-        )
+        ),
+        {"ruido": CAT_RUIDO, "operacional": CAT_OPERACIONAL, "profundo": CAT_PROFUNDO},
+    )
     db.commit()
 
 
 def run() -> None:
+    from app.services.performance.rollups import refresh_rollups
+
     db = SessionLocal()
     try:
         ids = seed_pessoas(db)
@@ -275,6 +556,7 @@ def run() -> None:
         n = seed_tarefas(db, ids)
         print("perf_l1_tarefa:", n)
         classify_subtipos(db)
+        refresh_rollups(db)
         cats = db.execute(
             text("SELECT categoria, count(*) FROM perf_subtipo_categoria GROUP BY categoria")
         ).fetchall()
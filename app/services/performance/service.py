@@ -5,6 +5,10 @@ Lê de perf_l1_tarefa / perf_pessoa / perf_subtipo_categoria e devolve:
 - pessoa_detalhe(id, days) — mix de tarefas por subtipo + ritmo/ócio operacional.
 - tipos(days)              — mapa de impacto: volume/cycle/natureza por subtipo.
 - cargos()                 — cargos distintos (filtro).
+- setor_resumo(days)       — vazão/pool/top tipos do setor (relatório PDF).
+
+`equipe` e `setor_resumo` leem os rollups diários (perf_rollup_*, refeitos no
+ingest — ver rollups.py); as telas de detalhe seguem na perf_l1_tarefa.
 
 Filosofia (ver docs/performance-equipes-plano.md): cadência/ócio só são confiáveis
 no segmento operacional (tarefas back-to-back); trabalho profundo mede-se por
@@ -20,6 +24,7 @@ from sqlalchemy import text
 from sqlalchemy.orm import Session
 
 from app.models.performance import PerfPessoa, PerfTarefa
+from app.services.performance.rollups import mediana_ciclo, remover_pessoa
 
 try:
     from zoneinfo import ZoneInfo
@@ -45,8 +50,9 @@ class PerformanceService:
 
     # ── equipe ────────────────────────────────────────────────────────────
     def equipe(self, days: int = 30, cargo: str | None = None, team: str | None = None) -> dict:
+        """Lê dos rollups diários (perf_rollup_*), não da perf_l1_tarefa crua."""
         start, now = self._period(days)
-        params = {"start": start, "end": now}
+        params = {"inicio": start.date(), "hoje": now.date()}
         cargo_clause = ""
         if cargo:
             cargo_clause = "AND p.cargo = :cargo"
@@ -60,20 +66,17 @@ class PerformanceService:
             text(
                 f"""
                 SELECT p.id, p.nome, p.cargo, p.squad, p.posicao,
-                  COUNT(t.id) AS concluido,
-                  COUNT(DISTINCT date(t.concluido_em AT TIME ZONE 'America/Sao_Paulo')) AS dias_ativos,
-                  COUNT(*) FILTER (WHERE t.prazo_previsto IS NOT NULL AND t.concluido_em <= t.prazo_previsto) AS no_prazo,
-                  COUNT(*) FILTER (WHERE t.prazo_previsto IS NOT NULL) AS com_prazo,
-                  percentile_cont(0.5) WITHIN GROUP (ORDER BY EXTRACT(EPOCH FROM (t.concluido_em - t.cadastrado_em)))
-                    FILTER (WHERE t.cadastrado_em IS NOT NULL) AS cycle_seg,
-                  COUNT(*) FILTER (WHERE c.categoria = 'operacional') AS oper_n,
-                  COUNT(*) FILTER (WHERE c.categoria = 'profundo') AS prof_n,
-                  COUNT(*) FILTER (WHERE c.categoria = 'ruido') AS ruido_n
+                  COALESCE(SUM(r.concluido), 0) AS concluido,
+                  COUNT(DISTINCT r.dia) AS dias_ativos,
+                  COALESCE(SUM(r.no_prazo), 0) AS no_prazo,
+                  COALESCE(SUM(r.com_prazo), 0) AS com_prazo,
+                  COALESCE(SUM(CASE WHEN c.categoria = 'operacional' THEN r.concluido END), 0) AS oper_n,
+                  COALESCE(SUM(CASE WHEN c.categoria = 'profundo' THEN r.concluido END), 0) AS prof_n,
+                  COALESCE(SUM(CASE WHEN c.categoria = 'ruido' THEN r.concluido END), 0) AS ruido_n
                 FROM perf_pessoa p
-                LEFT JOIN perf_l1_tarefa t
-                  ON t.pessoa_id = p.id AND t.status = 'Cumprido'
-                  AND t.concluido_em >= :start AND t.concluido_em <= :end
-                LEFT JOIN perf_subtipo_categoria c ON c.subtipo = t.subtipo
+                LEFT JOIN perf_rollup_conclusao r
+                  ON r.pessoa_id = p.id AND r.dia >= :inicio AND r.dia <= :hoje
+                LEFT JOIN perf_subtipo_categoria c ON c.subtipo = r.subtipo
                 WHERE p.ativo {team_clause} {cargo_clause}
                 GROUP BY p.id, p.nome, p.cargo, p.squad, p.posicao
                 ORDER BY concluido DESC, p.nome
@@ -82,10 +85,23 @@ class PerformanceService:
             params,
         ).fetchall()
 
+        hist = defaultdict(list)
+        for pid, bucket, n in self.db.execute(
+            text(
+                """
+                SELECT pessoa_id, bucket, SUM(n) FROM perf_rollup_ciclo
+                WHERE dia >= :inicio AND dia <= :hoje
+                GROUP BY pessoa_id, bucket
+                """
+            ),
+            params,
+        ).fetchall():
+            hist[pid].append((bucket, n))
+
         backlog = {
             pid: n
             for pid, n in self.db.execute(
-                text("SELECT pessoa_id, COUNT(*) FROM perf_l1_tarefa WHERE status='Pendente' GROUP BY pessoa_id")
+                text("SELECT pessoa_id, SUM(pendente) FROM perf_rollup_backlog GROUP BY pessoa_id")
             ).fetchall()
         }
 
@@ -93,6 +109,7 @@ class PerformanceService:
         for r in rows:
             concluido = r.concluido or 0
             dias = r.dias_ativos or 0
+            cycle_seg = mediana_ciclo(hist.get(r.id, ()))
             pessoas.append(
                 {
                     "id": r.id,
@@ -104,7 +121,7 @@ class PerformanceService:
                     "dias_ativos": dias,
                     "throughput_dia": round(concluido / dias, 1) if dias else 0.0,
                     "no_prazo_pct": round(100.0 * r.no_prazo / r.com_prazo) if r.com_prazo else None,
-                    "cycle_dias": round(r.cycle_seg / 86400.0, 1) if r.cycle_seg is not None else None,
+                    "cycle_dias": round(cycle_seg / 86400.0, 1) if cycle_seg is not None else None,
                     "backlog": int(backlog.get(r.id, 0)),
                     "operacional_n": r.oper_n or 0,
                     "profundo_n": r.prof_n or 0,
@@ -517,7 +534,23 @@ class PerformanceService:
             }
             for r in rows
         }
-        # Board curado por time (perf_board_tarefa); sem curadoria → top-12 por volume.
+        top_list, board_curado = self._top_tipos(by_sub, team)
+
+        return {
+            "periodo_dias": days,
+            "kpis": {
+                "atrasado_total": sum(b["atrasado"] for b in backlog),
+                "backlog_total": sum(b["backlog"] for b in backlog),
+            },
+            "vazao": vazao,
+            "backlog": backlog,
+            "jornada": jornada,
+            "top_tipos": top_list,
+            "board_curado": board_curado,
+        }
+
+    def _top_tipos(self, by_sub: dict, team: str | None) -> tuple[list, bool]:
+        """Board curado por time (perf_board_tarefa); sem curadoria → top-12 por volume."""
         board_cfg: list = []
         if team:
             board_cfg = [
@@ -534,7 +567,100 @@ class PerformanceService:
             ]
         else:
             top_list = sorted(by_sub.values(), key=lambda d: -d["volume"])[:12]
+        return top_list, bool(board_cfg)
+
+    def setor_resumo(self, days: int = 30, team: str | None = None) -> dict:
+        """Vazão, pool pendente/atrasado e top tipos do setor a partir dos
+        rollups — o que o relatório PDF usa do `dashboard`, sem a jornada (que
+        precisa dos horários de cada conclusão). Atrasado = prazo em dia
+        anterior a hoje (BRT)."""
+        start, now = self._period(days)
+        params = {"inicio": start.date(), "hoje": now.date()}
+        team_where = ""
+        if team:
+            team_where = "AND p.equipe = :team"
+            params["team"] = team
+
+        pessoas = self.db.execute(
+            text(
+                f"""
+                SELECT p.id, p.nome, p.cargo,
+                  COALESCE(SUM(r.concluido), 0) AS concluido,
+                  COUNT(DISTINCT r.dia) AS dias
+                FROM perf_pessoa p
+                LEFT JOIN perf_rollup_conclusao r
+                  ON r.pessoa_id = p.id AND r.dia >= :inicio AND r.dia <= :hoje
+                WHERE p.ativo {team_where}
+                GROUP BY p.id, p.nome, p.cargo
+                """
+            ),
+            params,
+        ).fetchall()
+        backlog_map = {
+            r.pessoa_id: (r.pend, r.atr)
+            for r in self.db.execute(
+                text(
+                    f"""
+                    SELECT b.pessoa_id, SUM(b.pendente) AS pend,
+                      COALESCE(SUM(CASE WHEN b.prazo_dia < :hoje THEN b.pendente END), 0) AS atr
+                    FROM perf_rollup_backlog b
+                    JOIN perf_pessoa p ON p.id = b.pessoa_id
+                    WHERE p.ativo {team_where}
+                    GROUP BY b.pessoa_id
+                    """
+                ),
+                params,
+            ).fetchall()
+        }
 
+        vazao, backlog = [], []
+        for p in pessoas:
+            pend, atr = backlog_map.get(p.id, (0, 0))
+            backlog.append(
+                {"id": p.id, "nome": p.nome, "cargo": p.cargo, "backlog": int(pend), "atrasado": int(atr)}
+            )
+            if p.concluido:
+                vazao.append(
+                    {
+                        "id": p.id, "nome": p.nome, "cargo": p.cargo, "concluido": int(p.concluido),
+                        "throughput_dia": round(p.concluido / p.dias, 1) if p.dias else 0.0,
+                    }
+                )
+        vazao.sort(key=lambda x: -x["concluido"])
+        backlog.sort(key=lambda x: (-x["atrasado"], -x["backlog"]))
+
+        team_pid = "AND pessoa_id IN (SELECT id FROM perf_pessoa WHERE equipe = :team)" if team else ""
+        rows = self.db.execute(
+            text(
+                f"""
+                SELECT s.subtipo, COALESCE(c.categoria, 'profundo') AS categoria,
+                  SUM(s.vol) AS vol, SUM(s.pendente) AS pendente, SUM(s.atrasado) AS atrasado
+                FROM (
+                  SELECT subtipo, concluido AS vol, 0 AS pendente, 0 AS atrasado
+                  FROM perf_rollup_conclusao
+                  WHERE subtipo IS NOT NULL AND dia >= :inicio AND dia <= :hoje {team_pid}
+                  UNION ALL
+                  SELECT subtipo, 0, pendente, CASE WHEN prazo_dia < :hoje THEN pendente ELSE 0 END
+                  FROM perf_rollup_backlog
+                  WHERE subtipo IS NOT NULL {team_pid}
+                ) s
+                LEFT JOIN perf_subtipo_categoria c ON c.subtipo = s.subtipo
+                GROUP BY s.subtipo, c.categoria
+                """
+            ),
+            params,
+        ).fetchall()
+        by_sub = {
+            r.subtipo: {
+                "subtipo": r.subtipo,
+                "categoria": r.categoria,
+                "volume": int(r.vol or 0),
+                "pendente": int(r.pendente or 0),
+                "atrasado": int(r.atrasado or 0),
+            }
+            for r in rows
+        }
+        top_list, board_curado = self._top_tipos(by_sub, team)
         return {
             "periodo_dias": days,
             "kpis": {
@@ -543,9 +669,8 @@ class PerformanceService:
             },
             "vazao": vazao,
             "backlog": backlog,
-            "jornada": jornada,
             "top_tipos": top_list,
-            "board_curado": bool(board_cfg),
+            "board_curado": board_curado,
         }
 
     # ── detalhe de UM subtipo do board (capacity) ──
@@ -976,6 +1101,8 @@ class PerformanceService:
         self.db.query(PerfTarefa).filter(PerfTarefa.pessoa_id == pessoa_id).update(
             {PerfTarefa.pessoa_id: None}, synchronize_session=False
         )
+        # Equipe/setor/balanceador leem os rollups: a carga sai junto.
+        remover_pessoa(self.db, pessoa_id)
         self.db.delete(p)
         self.db.commit()
         return {"id": pessoa_id, "excluido": True}
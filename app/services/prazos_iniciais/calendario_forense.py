@@ -0,0 +1,109 @@
+"""
+Calendários forenses por tribunal/comarca — `BusinessCalendar` montado a
+partir da tabela `calendario_forense_suspensao`.
+
+Calendário de um processo = feriados nacionais (no próprio
+`prazo_calculator`) + linhas nacionais (tribunal NULL) + linhas do
+tribunal (comarca NULL) + linhas da comarca. O tribunal sai do J.TR do
+CNJ e a comarca do código de origem (OOOO).
+
+Cada combinação fica em memória por `prazos_calendario_cache_seconds`:
+classificar um lote inteiro do mesmo tribunal consulta a tabela 1x e
+reusa o índice de dias úteis já montado.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from datetime import date, timedelta
+from typing import Optional
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.calendario_forense import CalendarioForenseSuspensao
+from app.services.prazos_iniciais.pdf_extractor.tribunais import tribunal_from_cnj
+from app.services.prazos_iniciais.prazo_calculator import BusinessCalendar, calendario
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_cache: dict[tuple[Optional[str], Optional[str]], tuple[float, BusinessCalendar]] = {}
+
+
+def comarca_from_cnj(cnj: Optional[str]) -> Optional[str]:
+    """Código da unidade de origem (OOOO, últimos 4 dígitos do CNJ)."""
+    digits = "".join(c for c in (cnj or "") if c.isdigit())
+    return digits[16:20] if len(digits) == 20 else None
+
+
+def calendario_do_processo(db: Session, cnj: Optional[str]) -> BusinessCalendar:
+    """Calendário do tribunal/comarca do processo (nacional se o CNJ não mapear)."""
+    tribunal = tribunal_from_cnj(cnj) if cnj else None
+    return calendario_para(db, tribunal, comarca_from_cnj(cnj) if tribunal else None)
+
+
+def calendario_para(
+    db: Session,
+    tribunal: Optional[str] = None,
+    comarca: Optional[str] = None,
+) -> BusinessCalendar:
+    key = (tribunal, comarca if tribunal else None)
+    now = time.monotonic()
+    with _lock:
+        hit = _cache.get(key)
+    if hit is not None and hit[0] > now:
+        return hit[1]
+
+    try:
+        datas = _datas_sem_expediente(db, *key)
+    except Exception as exc:  # noqa: BLE001
+        # Tabela ausente (migration pendente) ou banco fora: segue com o
+        # calendário nacional, sem cachear o erro.
+        logger.warning("calendario_forense: falha lendo %s/%s: %s", *key, exc)
+        return calendario()
+
+    cal = calendario(datas)
+    with _lock:
+        _cache[key] = (now + settings.prazos_calendario_cache_seconds, cal)
+    return cal
+
+
+def invalidate_cache() -> None:
+    """Descarta os calendários em memória (após editar a tabela)."""
+    with _lock:
+        _cache.clear()
+
+
+def _datas_sem_expediente(
+    db: Session, tribunal: Optional[str], comarca: Optional[str],
+) -> frozenset[date]:
+    escopo = [CalendarioForenseSuspensao.tribunal.is_(None)]
+    if tribunal:
+        escopo.append(and_(
+            CalendarioForenseSuspensao.tribunal == tribunal,
+            or_(
+                CalendarioForenseSuspensao.comarca.is_(None),
+                CalendarioForenseSuspensao.comarca == comarca,
+            ),
+        ))
+    # Savepoint: falha aqui não pode abortar a transação do chamador.
+    with db.begin_nested():
+        rows = (
+            db.query(
+                CalendarioForenseSuspensao.data_inicio,
+                CalendarioForenseSuspensao.data_fim,
+            )
+            .filter(CalendarioForenseSuspensao.ativo.is_(True), or_(*escopo))
+            .all()
+        )
+    datas: set[date] = set()
+    for inicio, fim in rows:
+        d = inicio
+        while d <= fim:
+            datas.add(d)
+            d += timedelta(days=1)
+    return frozenset(datas)
@@ -19,8 +19,11 @@ preservado indefinidamente — o disparo precisa do arquivo pra subir
 no GED do L1 (e futuramente no AJUS), e perder isso forçaria
 reenvio manual pelo originador.
 
-Registrado no APScheduler em `main.py` — rodando uma vez por dia de
-madrugada (quando o operador não está mexendo).
+Roda como política de retenção do GC do blob store
+(`app/services/blob_store/gc_worker.py`), uma vez por dia de madrugada
+(quando o operador não está mexendo): o `delete_pdf` daqui solta a
+referência e o GC apaga o blob quando nenhum outro módulo (cópia AJUS,
+GED LegalOne) aponta mais pro mesmo conteúdo.
 """
 
 from __future__ import annotations
@@ -31,7 +34,6 @@ from datetime import datetime, timedelta, timezone
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
-from app.db.session import SessionLocal
 from app.models.prazo_inicial import (
     INTAKE_SOURCE_EXTERNAL_API,
     PrazoInicialIntake,
@@ -160,41 +162,3 @@ def cleanup_local_pdfs(db: Session) -> dict[str, int]:
     if any(v > 0 for v in stats.values()):
         db.commit()
     return stats
-
-
-def _tick() -> None:
-    """Wrapper que o APScheduler chama. Cria sessão própria por execução."""
-    db: Session = SessionLocal()
-    try:
-        logger.info("pdf_cleanup.tick.start")
-        stats = cleanup_local_pdfs(db)
-        logger.info(
-            "pdf_cleanup.tick.finish ged_cleaned=%d ged_promoted=%d "
-            "retention_cleaned=%d retention_skipped=%d failures=%d",
-            stats["ged_uploaded_cleaned"],
-            stats["ged_uploaded_promoted"],
-            stats["retention_expired_cleaned"],
-            stats["retention_expired_skipped"],
-            stats["failures"],
-        )
-    except Exception:
-        logger.exception("pdf_cleanup.tick.error")
-    finally:
-        db.close()
-
-
-def register_pdf_cleanup_job(scheduler) -> None:
-    """
-    Registra o job no APScheduler. Roda 1x por dia às 03:15 UTC
-    (horário baixo de uso pra evitar disputar com o operador).
-    """
-    scheduler.add_job(
-        _tick,
-        trigger="cron",
-        hour=3,
-        minute=15,
-        id="prazos_iniciais.pdf_cleanup",
-        replace_existing=True,
-        misfire_grace_time=3600,  # aceita execução atrasada até 1h
-    )
-    logger.info("pdf_cleanup worker registrado (diário 03:15 UTC).")
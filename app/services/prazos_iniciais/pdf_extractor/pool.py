@@ -0,0 +1,236 @@
+"""
+Extração mecânica num pool de processos — fora do event loop.
+
+`extract()` é CPU puro (pdfplumber + regex) e segura o GIL: chamado
+direto de um `async def`, um PDF de 300 páginas do eSAJ trava todas as
+outras requests daquele worker Uvicorn por segundos. Aqui ele roda num
+`ProcessPoolExecutor` compartilhado pelo processo:
+
+- workers: `prazos_iniciais_extract_workers`; 0 = CPUs do host divididas
+  pelos workers do Uvicorn (`UVICORN_WORKERS`, ver
+  scripts/docker-api-start.sh), mínimo 1.
+- backpressure: no máximo workers + `prazos_iniciais_extract_queue_max`
+  PDFs em voo por processo. Acima disso levanta `ExtractionPoolSaturated`
+  (endpoint devolve 503 + Retry-After) em vez de enfileirar sem limite.
+- timeout por PDF (`prazos_iniciais_extract_timeout_seconds`), contado a
+  partir do início da extração — só é submetido pro pool quem tem worker
+  livre, então a espera na fila não conta. Processo não dá pra cancelar
+  no meio: o pool é derrubado (terminate) e recriado. Um PDF que estava
+  em outro worker do pool derrubado é resubmetido 1x.
+
+Workers sobem com `spawn` (não `fork`): o processo do Uvicorn tem
+threads (APScheduler, pools do SQLAlchemy) e o filho só importa o pacote
+`pdf_extractor`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+from app.core.config import settings
+from app.services.prazos_iniciais.pdf_extractor import ExtractionResult, extract
+
+logger = logging.getLogger(__name__)
+
+
+class ExtractionPoolSaturated(RuntimeError):
+    """Fila de extração cheia — cliente deve tentar de novo depois."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(
+            "Muitos PDFs sendo processados no momento. Tente novamente em "
+            f"{retry_after}s."
+        )
+        self.retry_after = retry_after
+
+
+class ExtractionTimeout(RuntimeError):
+    """Extração passou do limite por PDF (worker foi encerrado)."""
+
+
+_lock = threading.Lock()
+_executor: Optional[ProcessPoolExecutor] = None
+_in_flight = 0
+# Só entra no pool quem tem worker livre (ver docstring do módulo).
+_run_slots: Optional[threading.BoundedSemaphore] = None
+
+
+def cpus_per_uvicorn_worker() -> int:
+    """CPUs do processo (cpuset do container) / UVICORN_WORKERS, mínimo 1."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except (AttributeError, OSError):
+        cpus = os.cpu_count() or 1
+    try:
+        uvicorn_workers = max(1, int(os.environ.get("UVICORN_WORKERS", "1")))
+    except ValueError:
+        uvicorn_workers = 1
+    return max(1, cpus // uvicorn_workers)
+
+
+def worker_count() -> int:
+    """Processos de extração deste worker Uvicorn."""
+    configured = settings.prazos_iniciais_extract_workers
+    if configured > 0:
+        return configured
+    return cpus_per_uvicorn_worker()
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor, _run_slots
+    with _lock:
+        if _executor is None:
+            workers = worker_count()
+            _executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            if _run_slots is None:
+                _run_slots = threading.BoundedSemaphore(workers)
+            logger.info("pdf_extractor.pool: %d workers", workers)
+        return _executor
+
+
+def _discard_executor(executor: ProcessPoolExecutor) -> None:
+    """Derruba o pool (mata os workers) — o próximo uso cria outro."""
+    global _executor
+    with _lock:
+        if _executor is executor:
+            _executor = None
+    # `_processes` é privado, mas é o único jeito de matar um worker
+    # travado: shutdown(wait=False) não interrompe quem está rodando.
+    for proc in list((getattr(executor, "_processes", None) or {}).values()):
+        try:
+            proc.terminate()
+        except Exception:  # noqa: BLE001
+            pass
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _acquire_admission() -> None:
+    global _in_flight
+    limit = worker_count() + max(0, settings.prazos_iniciais_extract_queue_max)
+    with _lock:
+        if _in_flight >= limit:
+            raise ExtractionPoolSaturated(
+                settings.prazos_iniciais_extract_retry_after_seconds
+            )
+        _in_flight += 1
+
+
+def _release_admission() -> None:
+    global _in_flight
+    with _lock:
+        _in_flight -= 1
+
+
+def _run_once(pdf_bytes: bytes, timeout: float) -> ExtractionResult:
+    executor = _get_executor()
+    try:
+        future = executor.submit(extract, pdf_bytes)
+        return future.result(timeout=timeout)
+    except FuturesTimeoutError:
+        logger.warning(
+            "pdf_extractor.pool: extração passou de %ss — reiniciando o pool",
+            timeout,
+        )
+        _discard_executor(executor)
+        raise ExtractionTimeout(
+            f"A extração do PDF passou de {timeout:.0f}s e foi interrompida."
+        ) from None
+    except BrokenProcessPool:
+        _discard_executor(executor)
+        raise
+
+
+def extract_in_pool(
+    pdf_bytes: bytes,
+    *,
+    timeout: Optional[float] = None,
+    backpressure: bool = True,
+) -> ExtractionResult:
+    """`extract(pdf_bytes)` num processo do pool (bloqueia a thread atual).
+
+    Levanta `ExtractionPoolSaturated` se a fila estiver cheia e
+    `ExtractionTimeout` se passar do limite. Worker que morre (OOM em PDF
+    gigante) vira `success=False`, como um PDF que o pdfplumber não abre.
+
+    `backpressure=False` (workers em background, ex.: motor dormente do
+    Classificador): não conta na fila do HTTP nem recebe 503 — espera
+    worker livre.
+    """
+    timeout = timeout or settings.prazos_iniciais_extract_timeout_seconds
+    if backpressure:
+        _acquire_admission()
+    try:
+        _get_executor()
+        assert _run_slots is not None
+        with _run_slots:
+            try:
+                return _run_once(pdf_bytes, timeout)
+            except BrokenProcessPool:
+                # Outro PDF estourou o timeout e levou o pool junto — tenta
+                # 1x num pool novo.
+                pass
+            try:
+                return _run_once(pdf_bytes, timeout)
+            except BrokenProcessPool:
+                logger.exception("pdf_extractor.pool: worker morreu 2x no mesmo PDF")
+                return ExtractionResult(
+                    success=False,
+                    extractor_used=None,
+                    confidence=None,
+                    error_message=(
+                        "O processo de extração foi encerrado ao ler este PDF "
+                        "(arquivo grande ou corrompido)."
+                    ),
+                )
+    finally:
+        if backpressure:
+            _release_admission()
+
+
+async def extract_async(
+    pdf_bytes: bytes, *, timeout: Optional[float] = None,
+) -> ExtractionResult:
+    """Versão pra `async def`: espera o pool numa thread, sem travar o loop.
+
+    A admissão roda no próprio loop, antes do `to_thread`: o executor padrão
+    do loop tem menos threads que workers + fila em hosts pequenos, e quem
+    ficasse esperando thread nele não contaria na fila nem levaria 503.
+    """
+    _acquire_admission()
+    try:
+        return await asyncio.to_thread(
+            extract_in_pool, pdf_bytes, timeout=timeout, backpressure=False,
+        )
+    finally:
+        _release_admission()
+
+
+def shutdown_pool() -> None:
+    """Encerra o pool (lifespan do app)."""
+    global _executor
+    with _lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+__all__ = [
+    "ExtractionPoolSaturated",
+    "ExtractionTimeout",
+    "cpus_per_uvicorn_worker",
+    "extract_async",
+    "extract_in_pool",
+    "shutdown_pool",
+    "worker_count",
+]
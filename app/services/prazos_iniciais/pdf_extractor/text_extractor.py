@@ -1,13 +1,49 @@
-"""Wrapper fino sobre pdfplumber pra extrair texto por página."""
+"""Texto por página — PyMuPDF no caminho rápido, pdfplumber como referência.
+
+Os extractors (capa, timeline, cleaner) foram todos calibrados em cima da
+saída do `pdfplumber.extract_text()`: quebra de linha por `top`, palavras
+por distância entre caracteres, barra lateral do eSAJ lida invertida etc.
+O gargalo do pdfplumber não é essa montagem — é o parse do content stream
+pelo pdfminer, em Python puro. Então:
+
+1. PyMuPDF (`fitz`, em C) lê os caracteres com posição (`rawdict`);
+2. os caracteres vão pro MESMO montador do pdfplumber
+   (`chars_to_textmap`) — a saída bate com a do pdfplumber;
+3. página com texto rotacionado (barra lateral do eSAJ, que o detector de
+   template lê invertida) ou com glifo sem mapeamento Unicode (o pdfplumber
+   escreve `(cid:N)`) volta pro pdfplumber, só ela.
+
+Texto por página fica num cache em disco endereçado pelo SHA-256 do PDF +
+`EXTRACTOR_VERSION`: o mesmo PDF volta aqui no validador da habilitação,
+na re-subida, no reingest do Classificador — do 2º em diante é leitura de
+arquivo. Ver `scripts/bench_pdf_text_engine.py`. O cache é podado pelo GC
+do blob store (idade/tamanho, menos usados primeiro — hit toca o mtime).
+"""
 
 from __future__ import annotations
 
+import gzip
+import hashlib
 import io
+import json
 import logging
-from typing import List
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Optional
+
+from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Sobe quando muda o que sai daqui (montagem, critério de fallback) —
+# invalida o cache inteiro. Versões de pdfplumber/PyMuPDF entram na chave
+# sozinhas (`_version_tag`).
+EXTRACTOR_VERSION = "1"
+
+# Glifo sem ToUnicode: fitz devolve controle/U+FFFD, pdfplumber `(cid:N)`.
+_GARBLED = frozenset(chr(c) for c in range(32) if chr(c) not in "\t\n\r") | {"�"}
+
 
 class PdfTextExtractionError(Exception):
     """PDF inválido, criptografado ou corrompido."""
@@ -24,6 +60,30 @@ def extract_text_pages(pdf_bytes: bytes) -> List[str]:
     if not pdf_bytes:
         raise PdfTextExtractionError("PDF vazio.")
 
+    engine = settings.prazos_iniciais_text_engine
+    cache_file = _cache_file(pdf_bytes, engine)
+    if cache_file is not None:
+        cached = _cache_read(cache_file)
+        if cached is not None:
+            return cached
+
+    if engine == "pdfplumber":
+        pages = _pdfplumber_pages(pdf_bytes)
+    else:
+        pages = _fitz_pages(pdf_bytes)
+
+    if cache_file is not None:
+        _cache_write(cache_file, pages)
+    return pages
+
+
+# ─── Motores ──────────────────────────────────────────────────────────
+
+
+def _pdfplumber_pages(
+    pdf_bytes: bytes, only: Optional[List[int]] = None,
+) -> List[str]:
+    """Texto via pdfplumber — todas as páginas ou só os índices em `only`."""
     try:
         import pdfplumber
     except ImportError as exc:
@@ -33,7 +93,10 @@ def extract_text_pages(pdf_bytes: bytes) -> List[str]:
 
     pages: List[str] = []
     try:
-        with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
+        with pdfplumber.open(
+            io.BytesIO(pdf_bytes),
+            pages=[i + 1 for i in only] if only is not None else None,
+        ) as pdf:
             for page in pdf.pages:
                 try:
                     text = page.extract_text() or ""
@@ -51,3 +114,156 @@ def extract_text_pages(pdf_bytes: bytes) -> List[str]:
         ) from exc
 
     return pages
+
+
+def _fitz_pages(pdf_bytes: bytes) -> List[str]:
+    """PyMuPDF + montador do pdfplumber; páginas duvidosas via pdfplumber."""
+    try:
+        import fitz  # PyMuPDF
+        from pdfplumber.utils.text import chars_to_textmap
+    except ImportError:
+        return _pdfplumber_pages(pdf_bytes)
+
+    try:
+        doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+    except Exception:  # noqa: BLE001
+        # Deixa o pdfplumber decidir (e formatar a mensagem de erro).
+        return _pdfplumber_pages(pdf_bytes)
+
+    # Sem TEXT_PRESERVE_IMAGES (não precisa dos bytes das imagens) e sem
+    # TEXT_CID_FOR_UNKNOWN_UNICODE (glifo sem Unicode tem que aparecer
+    # como tal pra cair no pdfplumber).
+    flags = (
+        fitz.TEXT_PRESERVE_LIGATURES
+        | fitz.TEXT_PRESERVE_WHITESPACE
+        | fitz.TEXT_MEDIABOX_CLIP
+    )
+    pages: List[Optional[str]] = []
+    fallback: List[int] = []
+    try:
+        if doc.needs_pass:
+            return _pdfplumber_pages(pdf_bytes)
+        for idx, page in enumerate(doc):
+            try:
+                chars = _fitz_chars(page, flags)
+            except Exception:  # noqa: BLE001
+                chars = None
+            if chars is None:
+                pages.append(None)
+                fallback.append(idx)
+            elif not chars:
+                pages.append("")
+            else:
+                r = page.rect
+                pages.append(chars_to_textmap(
+                    chars,
+                    layout_bbox=(r.x0, r.y0, r.x1, r.y1),
+                    layout_width=r.width,
+                    layout_height=r.height,
+                ).as_string)
+    finally:
+        doc.close()
+
+    if fallback:
+        for idx, text in zip(fallback, _pdfplumber_pages(pdf_bytes, only=fallback)):
+            pages[idx] = text
+    return [p or "" for p in pages]
+
+
+def _fitz_chars(page, flags: int) -> Optional[list[dict]]:
+    """Caracteres da página no formato do pdfplumber (x0/x1/top/bottom).
+
+    `top` segue o pdfminer: baseline - (size + descent). Só a posição
+    relativa importa pro agrupamento em linhas. Devolve None quando a
+    página precisa do pdfplumber (texto rotacionado / glifo sem Unicode).
+    """
+    out: list[dict] = []
+    for block in page.get_text("rawdict", flags=flags)["blocks"]:
+        for line in block.get("lines", ()):
+            if line["dir"][0] < 0.999:
+                return None
+            for span in line["spans"]:
+                size = span["size"]
+                offset = size + span["descender"] * size
+                for ch in span["chars"]:
+                    c = ch["c"]
+                    if c in _GARBLED:
+                        return None
+                    x0, _, x1, _ = ch["bbox"]
+                    # Ligadura ("fi") vem como 2 chars, o 2º com largura 0
+                    # no fim do 1º — o pdfminer entrega 1 char "fi".
+                    if x1 == x0 and out and out[-1]["x1"] == x0:
+                        out[-1]["text"] += c
+                        continue
+                    top = ch["origin"][1] - offset
+                    out.append({
+                        "text": c,
+                        "x0": x0,
+                        "x1": x1,
+                        "top": top,
+                        "bottom": top + size,
+                        "doctop": top,
+                        "upright": True,
+                        "size": size,
+                    })
+    return out
+
+
+# ─── Cache por SHA-256 ────────────────────────────────────────────────
+
+
+@lru_cache(maxsize=None)
+def _version_tag(engine: str) -> str:
+    from importlib.metadata import PackageNotFoundError, version
+
+    tag = f"{engine}-v{EXTRACTOR_VERSION}"
+    for dist in ("pdfplumber", "pymupdf"):
+        try:
+            tag += f"-{dist}{version(dist)}"
+        except PackageNotFoundError:
+            pass
+    return tag
+
+
+def text_cache_root() -> Path:
+    return Path(
+        settings.prazos_iniciais_text_cache_path
+        or Path(settings.prazos_iniciais_storage_path) / "text_cache"
+    )
+
+
+def _cache_file(pdf_bytes: bytes, engine: str) -> Optional[Path]:
+    if not settings.prazos_iniciais_text_cache_enabled:
+        return None
+    sha = hashlib.sha256(pdf_bytes).hexdigest()
+    return text_cache_root() / _version_tag(engine) / sha[:2] / f"{sha}.json.gz"
+
+
+def _cache_read(path: Path) -> Optional[List[str]]:
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as fh:
+            pages = json.load(fh)
+    except FileNotFoundError:
+        return None
+    except Exception as exc:  # noqa: BLE001
+        logger.warning("text_extractor: cache ilegível %s: %s", path, exc)
+        return None
+    if not isinstance(pages, list):
+        return None
+    try:
+        os.utime(path)  # hit: o GC poda os menos usados primeiro
+    except OSError:
+        pass
+    return pages
+
+
+def _cache_write(path: Path, pages: List[str]) -> None:
+    """Best-effort — sem volume gravável, só não cacheia."""
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with gzip.open(tmp, "wt", encoding="utf-8", compresslevel=5) as fh:
+            json.dump(pages, fh, ensure_ascii=False)
+        os.replace(tmp, path)
+    except OSError as exc:
+        logger.warning("text_extractor: não gravou cache %s: %s", path, exc)
@@ -2,9 +2,16 @@
 Calculadora de prazos processuais — útil/corrido com feriados nacionais.
 
 Esta calculadora cobre os feriados nacionais brasileiros (Lei 10.607/2002 e
-Lei 14.759/2023, que estabeleceu o Dia da Consciência Negra). Feriados
-estaduais e municipais NÃO entram aqui — se for necessário cobrir o
-recesso forense por tribunal, o cálculo deve ser refinado depois.
+Lei 14.759/2023, que estabeleceu o Dia da Consciência Negra). Recessos,
+suspensões e feriados locais entram como `extra_holidays` ou num
+`BusinessCalendar` montado a partir da tabela `calendario_forense_suspensao`
+(nacional / por tribunal / por comarca — ver `calendario_forense.py`).
+
+Motor: cada `BusinessCalendar` guarda a lista ORDENADA dos ordinais dos
+dias úteis (`date.toordinal()`) de uma faixa de anos, estendida sob
+demanda. "N dias úteis depois de X" vira um `bisect` + indexação, em vez
+de andar dia a dia testando feriado. Calendários são cacheados pelo
+conjunto de datas extras, então a lista é montada 1x por calendário.
 
 Regras aplicadas (CPC):
   - Art. 219: prazos em dias contam apenas dias úteis (a menos que a lei
@@ -21,9 +28,11 @@ Uso típico:
 
 from __future__ import annotations
 
-from datetime import date, timedelta
+import threading
+from bisect import bisect_left, bisect_right
+from datetime import MAXYEAR, MINYEAR, date, timedelta
 from functools import lru_cache
-from typing import Iterable, Literal, Optional
+from typing import Iterable, Literal, Optional, Sequence, Union
 
 PrazoTipo = Literal["util", "corrido"]
 
@@ -103,6 +112,201 @@ def feriados_nacionais(year: int) -> frozenset[date]:
     return frozenset(holidays)
 
 
+# ─── Índice de dias úteis ────────────────────────────────────────────
+
+# Faixa inicial: ano corrente ± isso. Fora dela, estende em blocos.
+_SPAN_YEARS = 10
+_EXTEND_YEARS = 5
+
+
+class BusinessCalendar:
+    """
+    Dias úteis de um calendário: fora sábado, domingo, feriado nacional e
+    as datas de `non_working` (recesso/suspensão/feriado local).
+
+    Imutável do ponto de vista de quem usa; por dentro a faixa de anos
+    indexada cresce quando uma consulta cai fora dela (troca atômica da
+    tupla `_index`, então leitores concorrentes não veem lista parcial).
+    """
+
+    def __init__(self, non_working: Iterable[date] = ()):
+        self.non_working = frozenset(non_working)
+        self._lock = threading.Lock()
+        hoje = date.today().year
+        self._index: tuple[int, int, list[int]] = self._build(
+            hoje - _SPAN_YEARS, hoje + _SPAN_YEARS,
+        )
+
+    # ── montagem ──
+
+    def _build(self, lo_year: int, hi_year: int) -> tuple[int, int, list[int]]:
+        lo_year = max(MINYEAR, lo_year)
+        hi_year = min(MAXYEAR, hi_year)
+        lo = date(lo_year, 1, 1).toordinal()
+        hi = date(hi_year, 12, 31).toordinal()
+        bloqueados = {d.toordinal() for d in self.non_working}
+        for year in range(lo_year, hi_year + 1):
+            bloqueados.update(d.toordinal() for d in feriados_nacionais(year))
+        # Ordinal 1 (01/01/0001) é segunda-feira: weekday = (o - 1) % 7.
+        ords = [
+            o for o in range(lo, hi + 1)
+            if (o - 1) % 7 < 5 and o not in bloqueados
+        ]
+        return lo, hi, ords
+
+    def _extend(self, lo_ord: int, hi_ord: int) -> None:
+        """Garante a faixa [lo_ord, hi_ord] indexada."""
+        with self._lock:
+            lo, hi, _ = self._index
+            if lo <= lo_ord and hi_ord <= hi:
+                return  # outra thread já estendeu
+            first, last = date.min.toordinal(), date.max.toordinal()
+            if (lo_ord < lo and lo == first) or (hi_ord > hi and hi == last):
+                raise OverflowError("data fora da faixa suportada")
+            lo_year = date.fromordinal(lo).year
+            hi_year = date.fromordinal(hi).year
+            if lo_ord < lo:
+                lo_year = min(lo_year - _EXTEND_YEARS, date.fromordinal(max(first, lo_ord)).year)
+            if hi_ord > hi:
+                hi_year = max(hi_year + _EXTEND_YEARS, date.fromordinal(min(last, hi_ord)).year)
+            self._index = self._build(lo_year, hi_year)
+
+    def _at(self, o: int, side, offset: int) -> date:
+        """`ords[side(ords, o) + offset]`, estendendo a faixa se preciso."""
+        while True:
+            lo, hi, ords = self._index
+            if o < lo or o > hi:
+                self._extend(min(o, lo), max(o, hi))
+                continue
+            j = side(ords, o) + offset
+            if j < 0:
+                self._extend(lo - 366 * _EXTEND_YEARS, hi)
+                continue
+            if j >= len(ords):
+                self._extend(lo, hi + 366 * _EXTEND_YEARS)
+                continue
+            return date.fromordinal(ords[j])
+
+    # ── consultas ──
+
+    def is_business_day(self, d: date) -> bool:
+        return (
+            d.weekday() < 5
+            and d not in feriados_nacionais(d.year)
+            and d not in self.non_working
+        )
+
+    def proximo_dia_util(self, d: date) -> date:
+        return self._at(d.toordinal(), bisect_left, 0)
+
+    def add_business_days(self, base: date, n: int) -> date:
+        if n == 0:
+            return base
+        if n > 0:
+            # bisect_right = nº de dias úteis <= base; o n-ésimo depois.
+            return self._at(base.toordinal(), bisect_right, n - 1)
+        # bisect_left = nº de dias úteis < base; o |n|-ésimo antes.
+        return self._at(base.toordinal(), bisect_left, n)
+
+    def prazo_final(self, data_base: date, prazo_dias: int, prazo_tipo: PrazoTipo) -> date:
+        """Mesma regra de `calcular_prazo_final` (sem validação)."""
+        if prazo_tipo == "corrido":
+            return self._at(data_base.toordinal() + prazo_dias, bisect_left, 0)
+        # 1º dia útil > data_base conta como dia 1.
+        return self._at(data_base.toordinal(), bisect_right, prazo_dias - 1)
+
+    # ── em lote ──
+
+    def add_business_days_many(
+        self, bases: Sequence[date], n: Union[int, Sequence[int]],
+    ) -> list[date]:
+        """`add_business_days` pra cada base (n único ou um por base)."""
+        ns = [n] * len(bases) if isinstance(n, int) else list(n)
+        if len(ns) != len(bases):
+            raise ValueError("bases e n com tamanhos diferentes")
+        if not bases:
+            return []
+        self._cover(min(bases), max(bases))
+        _, _, ords = self._index
+        size = len(ords)
+        fromordinal = date.fromordinal
+        out: list[date] = []
+        for base, k in zip(bases, ns):
+            o = base.toordinal()
+            if k == 0:
+                out.append(base)
+                continue
+            j = bisect_right(ords, o) + k - 1 if k > 0 else bisect_left(ords, o) + k
+            if 0 <= j < size:
+                out.append(fromordinal(ords[j]))
+            else:
+                out.append(self.add_business_days(base, k))
+        return out
+
+    def prazos_finais(
+        self, itens: Iterable[tuple[Optional[date], Optional[int], Optional[str]]],
+    ) -> list[Optional[date]]:
+        """`calcular_prazo_seguro` pra cada (data_base, prazo_dias, prazo_tipo)."""
+        itens = list(itens)
+        validos = [
+            it for it in itens
+            if it[0] and isinstance(it[1], int) and it[1] >= 1 and it[2] in ("util", "corrido")
+        ]
+        if not validos:
+            return [None] * len(itens)
+        self._cover(min(it[0] for it in validos), max(it[0] for it in validos))
+        _, _, ords = self._index
+        size = len(ords)
+        fromordinal = date.fromordinal
+        out: list[Optional[date]] = []
+        for data_base, prazo_dias, prazo_tipo in itens:
+            if not (
+                data_base and isinstance(prazo_dias, int) and prazo_dias >= 1
+                and prazo_tipo in ("util", "corrido")
+            ):
+                out.append(None)
+                continue
+            o = data_base.toordinal()
+            if prazo_tipo == "corrido":
+                j = bisect_left(ords, o + prazo_dias)
+            else:
+                j = bisect_right(ords, o) + prazo_dias - 1
+            if j < size:
+                out.append(fromordinal(ords[j]))
+            else:
+                out.append(self.prazo_final(data_base, prazo_dias, prazo_tipo))
+        return out
+
+    def _cover(self, first: date, last: date) -> None:
+        lo, hi, _ = self._index
+        if first.toordinal() < lo or last.toordinal() > hi:
+            self._extend(min(first.toordinal(), lo), max(last.toordinal(), hi))
+
+
+@lru_cache(maxsize=128)
+def _calendario_cache(non_working: frozenset[date]) -> BusinessCalendar:
+    return BusinessCalendar(non_working)
+
+
+def calendario(
+    extra_holidays: Optional[Iterable[date]] = None,
+    *,
+    calendar: Optional[BusinessCalendar] = None,
+) -> BusinessCalendar:
+    """
+    Calendário (cacheado) com os feriados nacionais + `extra_holidays`
+    (+ as datas de `calendar`, se vier um — ex.: recesso do tribunal).
+    """
+    if not extra_holidays:
+        return calendar or _calendario_cache(frozenset())
+    extras = frozenset(extra_holidays)
+    if calendar is not None:
+        if extras <= calendar.non_working:
+            return calendar
+        extras |= calendar.non_working
+    return _calendario_cache(extras)
+
+
 # ─── Helpers de dia útil ─────────────────────────────────────────────
 
 
@@ -116,26 +320,29 @@ def is_business_day(d: date, extra_holidays: Optional[Iterable[date]] = None) ->
         return False
     if d in feriados_nacionais(d.year):
         return False
-    if extra_holidays and d in set(extra_holidays):
+    if extra_holidays and d in calendario(extra_holidays).non_working:
         return False
     return True
 
 
-def proximo_dia_util(d: date, extra_holidays: Optional[Iterable[date]] = None) -> date:
+def proximo_dia_util(
+    d: date,
+    extra_holidays: Optional[Iterable[date]] = None,
+    *,
+    calendar: Optional[BusinessCalendar] = None,
+) -> date:
     """
     Retorna `d` se for dia útil; senão, avança até o próximo dia útil.
-    Iterativo (no pior caso, ~5 saltos: feriado prolongado).
     """
-    cur = d
-    while not is_business_day(cur, extra_holidays):
-        cur += timedelta(days=1)
-    return cur
+    return calendario(extra_holidays, calendar=calendar).proximo_dia_util(d)
 
 
 def add_business_days(
     base: date,
     n: int,
     extra_holidays: Optional[Iterable[date]] = None,
+    *,
+    calendar: Optional[BusinessCalendar] = None,
 ) -> date:
     """
     Soma `n` dias úteis a `base`, pulando fim de semana e feriados.
@@ -158,21 +365,24 @@ def add_business_days(
         base: data de referência (ex.: data da publicação).
         n: quantidade de dias úteis (positivo ou negativo).
         extra_holidays: feriados extras (recessos de tribunal, etc.).
+        calendar: calendário pronto (ex.: `calendario_forense.calendario_do_processo`).
 
     Returns:
         date resultante. Se `n == 0`, devolve `base` mesmo se cair em
         fim de semana/feriado (caller decide se quer prorrogar).
     """
-    if n == 0:
-        return base
-    step = 1 if n > 0 else -1
-    remaining = abs(n)
-    cur = base
-    while remaining > 0:
-        cur += timedelta(days=step)
-        if is_business_day(cur, extra_holidays):
-            remaining -= 1
-    return cur
+    return calendario(extra_holidays, calendar=calendar).add_business_days(base, n)
+
+
+def add_business_days_bulk(
+    bases: Sequence[date],
+    n: Union[int, Sequence[int]],
+    *,
+    extra_holidays: Optional[Iterable[date]] = None,
+    calendar: Optional[BusinessCalendar] = None,
+) -> list[date]:
+    """`add_business_days` em lote — um índice, um `bisect` por item."""
+    return calendario(extra_holidays, calendar=calendar).add_business_days_many(bases, n)
 
 
 # ─── Cálculo principal ───────────────────────────────────────────────
@@ -184,6 +394,7 @@ def calcular_prazo_final(
     prazo_tipo: PrazoTipo,
     *,
     extra_holidays: Optional[Iterable[date]] = None,
+    calendar: Optional[BusinessCalendar] = None,
 ) -> date:
     """
     Calcula a data final de um prazo processual.
@@ -197,6 +408,7 @@ def calcular_prazo_final(
                     materiais).
         extra_holidays: feriados extras a considerar (recessos por tribunal,
                         pontos facultativos relevantes).
+        calendar: calendário pronto (nacional + recessos do tribunal/comarca).
 
     Returns:
         date final calculada. Se o vencimento cair em dia sem expediente
@@ -210,21 +422,9 @@ def calcular_prazo_final(
     if prazo_tipo not in ("util", "corrido"):
         raise ValueError(f"prazo_tipo inválido: {prazo_tipo}")
 
-    if prazo_tipo == "corrido":
-        vencimento = data_base + timedelta(days=prazo_dias)
-        # Art. 224 §1: prorroga se cair em dia sem expediente.
-        return proximo_dia_util(vencimento, extra_holidays)
-
-    # Útil: começa no primeiro dia útil seguinte ao termo inicial.
-    primeiro_dia_util = proximo_dia_util(data_base + timedelta(days=1), extra_holidays)
-    # Já contamos esse primeiro dia útil; faltam (prazo_dias - 1) dias úteis.
-    cur = primeiro_dia_util
-    restantes = prazo_dias - 1
-    while restantes > 0:
-        cur += timedelta(days=1)
-        if is_business_day(cur, extra_holidays):
-            restantes -= 1
-    return cur
+    return calendario(extra_holidays, calendar=calendar).prazo_final(
+        data_base, prazo_dias, prazo_tipo,
+    )
 
 
 def calcular_prazo_seguro(
@@ -233,6 +433,7 @@ def calcular_prazo_seguro(
     prazo_tipo: Optional[str],
     *,
     extra_holidays: Optional[Iterable[date]] = None,
+    calendar: Optional[BusinessCalendar] = None,
 ) -> Optional[date]:
     """
     Wrapper tolerante a entradas faltantes — útil pra rodar sobre
@@ -243,7 +444,21 @@ def calcular_prazo_seguro(
         return None
     try:
         return calcular_prazo_final(
-            data_base, prazo_dias, prazo_tipo, extra_holidays=extra_holidays
+            data_base, prazo_dias, prazo_tipo,
+            extra_holidays=extra_holidays, calendar=calendar,
         )
-    except (ValueError, TypeError):
+    except (ValueError, TypeError, OverflowError):
         return None
+
+
+def calcular_prazos_finais(
+    itens: Iterable[tuple[Optional[date], Optional[int], Optional[str]]],
+    *,
+    extra_holidays: Optional[Iterable[date]] = None,
+    calendar: Optional[BusinessCalendar] = None,
+) -> list[Optional[date]]:
+    """
+    `calcular_prazo_seguro` em lote: milhares de (data_base, prazo_dias,
+    prazo_tipo) contra o mesmo índice. Item inválido vira None.
+    """
+    return calendario(extra_holidays, calendar=calendar).prazos_finais(itens)
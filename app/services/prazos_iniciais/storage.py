@@ -16,6 +16,10 @@ Layout de diretórios:
 O caminho gravado em `PrazoInicialIntake.pdf_path` é **relativo** à raiz
 (`2026/04/20/{uuid}.pdf`) — isso permite mover o volume sem reescrever
 a coluna.
+
+Desde o blob store, o conteúdo é gravado 1x em
+`{BLOB_STORE_PATH}/sha256/aa/bb/<hash>` e o path acima é um hard link
+pra ele (ver `app/services/blob_store`) — o layout e as colunas não mudam.
 """
 
 from __future__ import annotations
@@ -28,6 +32,7 @@ from datetime import datetime, timezone
 from pathlib import Path
 
 from app.core.config import settings
+from app.services import blob_store
 
 logger = logging.getLogger(__name__)
 
@@ -98,16 +103,15 @@ def save_pdf(pdf_bytes: bytes, *, now: datetime | None = None) -> StoredPdf:
         f"{timestamp:%d}",
         f"{uuid.uuid4().hex}.pdf",
     )
-    absolute = _root() / relative
-    absolute.parent.mkdir(parents=True, exist_ok=True)
-
-    # Grava primeiro num arquivo temporário e faz rename atômico — evita
-    # que um crash a meio caminho deixe arquivos truncados no volume.
-    tmp = absolute.with_suffix(".pdf.tmp")
-    tmp.write_bytes(pdf_bytes)
-    tmp.replace(absolute)
-
     sha256 = hashlib.sha256(pdf_bytes).hexdigest()
+    # Blob + hard link, os dois com rename atômico — crash a meio caminho
+    # não deixa arquivo truncado no volume.
+    absolute = blob_store.store_bytes(
+        blob_store.NAMESPACE_PRAZOS_INICIAIS,
+        relative.as_posix(),
+        pdf_bytes,
+        sha256=sha256,
+    )
     logger.info(
         "PDF gravado: %s (%d bytes, sha256=%s…)",
         relative.as_posix(),
@@ -139,7 +143,8 @@ def resolve_pdf_path(relative_path: str) -> Path:
 def delete_pdf(relative_path: str) -> bool:
     """
     Remove o PDF do volume. Retorna True se apagou, False se o arquivo
-    não existia (no-op seguro).
+    não existia (no-op seguro). Solta a referência no blob store — o
+    conteúdo some do disco quando o GC vê que ninguém mais aponta pra ele.
     """
     try:
         path = resolve_pdf_path(relative_path)
@@ -148,9 +153,11 @@ def delete_pdf(relative_path: str) -> bool:
         return False
 
     if not path.exists():
+        blob_store.release(blob_store.NAMESPACE_PRAZOS_INICIAIS, relative_path)
         return False
 
     path.unlink()
+    blob_store.release(blob_store.NAMESPACE_PRAZOS_INICIAIS, relative_path)
     # Best-effort: tenta limpar diretórios vazios subindo a árvore.
     parent = path.parent
     root = _root().resolve()
@@ -11,6 +11,7 @@ from .contracts import (
 from .correlation_service import ProcessCorrelationService
 from .datajud_client import DataJudClient
 from .enums import EvidenceSource, ProcessAnalyticalStatus
+from .incremental_sync import DataJudIncrementalSync
 from .monitoring_service import ProcessMonitoringService
 from .scoring_service import ProcessScoringService
 
@@ -18,6 +19,7 @@ __all__ = [
     "ComunicaClient",
     "ComunicaPublicationRecord",
     "DataJudClient",
+    "DataJudIncrementalSync",
     "DataJudProcessSnapshot",
     "EvidenceSource",
     "MonitoringEvaluation",
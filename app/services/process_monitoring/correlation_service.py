@@ -1,7 +1,7 @@
-import unicodedata
 from datetime import datetime, timedelta, timezone
 
 from app.core.config import settings
+from app.services.keyword_matcher import KeywordMatcher, fold_text
 
 from .contracts import ComunicaPublicationRecord, DataJudProcessSnapshot, DetectedEvidence, ProcessEvidenceBundle
 from .enums import EvidenceSource
@@ -18,6 +18,17 @@ class ProcessCorrelationService:
         "BAIXA DEFINITIVA",
         "PROCESSO BAIXADO",
     )
+    CERTIFICATE_KEYWORDS = ("CERTIDAO",)
+    # Todas as listas acima num matcher só: cada texto é dobrado e varrido
+    # uma vez; as categorias consultam o conjunto de termos encontrados.
+    _MATCHER = KeywordMatcher(
+        DECISION_KEYWORDS
+        + RECURSAL_KEYWORDS
+        + TRANSIT_KEYWORDS
+        + CLOSURE_SIGNAL_KEYWORDS
+        + CLOSURE_CONFIRMED_KEYWORDS
+        + CERTIFICATE_KEYWORDS
+    )
 
     def __init__(self, recency_window_days: int | None = None) -> None:
         self.recency_window_days = recency_window_days or settings.process_monitoring_recency_window_days
@@ -42,10 +53,10 @@ class ProcessCorrelationService:
         recent_cutoff = now - timedelta(days=self.recency_window_days)
 
         for movement in snapshot.movements:
-            normalized_name = self._normalize_text(movement.name)
+            found_in_name = self._keywords_in(movement.name)
             latest_movement_at = self._latest_date(latest_movement_at, movement.occurred_at)
 
-            if self._contains_any(normalized_name, self.DECISION_KEYWORDS):
+            if self._contains_any(found_in_name, self.DECISION_KEYWORDS):
                 bundle.decision_events.append(
                     self._build_movement_evidence(
                         event_type="DECISION_EVENT",
@@ -56,7 +67,7 @@ class ProcessCorrelationService:
                     )
                 )
 
-            if self._contains_any(normalized_name, self.RECURSAL_KEYWORDS):
+            if self._contains_any(found_in_name, self.RECURSAL_KEYWORDS):
                 bundle.recursal_signals.append(
                     self._build_movement_evidence(
                         event_type="RECURSAL_SIGNAL",
@@ -67,7 +78,7 @@ class ProcessCorrelationService:
                     )
                 )
 
-            if self._contains_any(normalized_name, self.TRANSIT_KEYWORDS):
+            if self._contains_any(found_in_name, self.TRANSIT_KEYWORDS):
                 bundle.explicit_transit_events.append(
                     self._build_movement_evidence(
                         event_type="EXPLICIT_TRANSIT",
@@ -78,7 +89,7 @@ class ProcessCorrelationService:
                     )
                 )
 
-            closure_keyword = self._matched_keyword(normalized_name, self.CLOSURE_SIGNAL_KEYWORDS)
+            closure_keyword = self._matched_keyword(found_in_name, self.CLOSURE_SIGNAL_KEYWORDS)
             if closure_keyword:
                 bundle.closure_events.append(
                     self._build_movement_evidence(
@@ -90,7 +101,7 @@ class ProcessCorrelationService:
                         metadata={
                             "matched_keyword": closure_keyword,
                             "closure_confirmed": self._contains_any(
-                                normalized_name,
+                                found_in_name,
                                 self.CLOSURE_CONFIRMED_KEYWORDS,
                             ),
                         },
@@ -109,11 +120,11 @@ class ProcessCorrelationService:
                 )
 
         for publication in publications:
-            combined_text = self._normalize_text(" ".join(filter(None, [publication.title, publication.text])))
+            found_in_publication = self._keywords_in(" ".join(filter(None, [publication.title, publication.text])))
             publication_source = EvidenceSource.DJEN if publication.medium else EvidenceSource.COMUNICA
             occurred_at = publication.publication_datetime
 
-            if self._contains_any(combined_text, self.DECISION_KEYWORDS):
+            if self._contains_any(found_in_publication, self.DECISION_KEYWORDS):
                 bundle.publication_events.append(
                     DetectedEvidence(
                         source=publication_source,
@@ -126,7 +137,7 @@ class ProcessCorrelationService:
                     )
                 )
 
-            if "CERTIDAO" in combined_text or publication.certificate_url:
+            if self._contains_any(found_in_publication, self.CERTIFICATE_KEYWORDS) or publication.certificate_url:
                 bundle.certificate_events.append(
                     DetectedEvidence(
                         source=publication_source,
@@ -142,7 +153,7 @@ class ProcessCorrelationService:
                     )
                 )
 
-            if self._contains_any(combined_text, self.RECURSAL_KEYWORDS):
+            if self._contains_any(found_in_publication, self.RECURSAL_KEYWORDS):
                 bundle.recursal_signals.append(
                     DetectedEvidence(
                         source=publication_source,
@@ -155,7 +166,7 @@ class ProcessCorrelationService:
                     )
                 )
 
-            if self._contains_any(combined_text, self.TRANSIT_KEYWORDS):
+            if self._contains_any(found_in_publication, self.TRANSIT_KEYWORDS):
                 bundle.explicit_transit_events.append(
                     DetectedEvidence(
                         source=publication_source,
@@ -168,7 +179,7 @@ class ProcessCorrelationService:
                     )
                 )
 
-            closure_keyword = self._matched_keyword(combined_text, self.CLOSURE_SIGNAL_KEYWORDS)
+            closure_keyword = self._matched_keyword(found_in_publication, self.CLOSURE_SIGNAL_KEYWORDS)
             if closure_keyword:
                 bundle.closure_events.append(
                     DetectedEvidence(
@@ -182,7 +193,7 @@ class ProcessCorrelationService:
                             **publication.raw_payload,
                             "matched_keyword": closure_keyword,
                             "closure_confirmed": self._contains_any(
-                                combined_text,
+                                found_in_publication,
                                 self.CLOSURE_CONFIRMED_KEYWORDS,
                             ),
                         },
@@ -213,19 +224,15 @@ class ProcessCorrelationService:
             metadata=metadata or {},
         )
 
-    def _normalize_text(self, value: str | None) -> str:
-        if not value:
-            return ""
-        normalized = unicodedata.normalize("NFKD", value)
-        ascii_only = normalized.encode("ascii", "ignore").decode("ascii")
-        return " ".join(ascii_only.upper().split())
+    def _keywords_in(self, value: str | None) -> frozenset[str]:
+        return frozenset(self._MATCHER.find(fold_text(value)))
 
-    def _contains_any(self, haystack: str, needles: tuple[str, ...]) -> bool:
-        return any(needle in haystack for needle in needles)
+    def _contains_any(self, found: frozenset[str], needles: tuple[str, ...]) -> bool:
+        return not found.isdisjoint(needles)
 
-    def _matched_keyword(self, haystack: str, needles: tuple[str, ...]) -> str | None:
+    def _matched_keyword(self, found: frozenset[str], needles: tuple[str, ...]) -> str | None:
         for needle in needles:
-            if needle in haystack:
+            if needle in found:
                 return needle
         return None
 
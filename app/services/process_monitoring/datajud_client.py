@@ -14,10 +14,14 @@ class DataJudClient:
         base_url: str | None = None,
         api_key: str | None = None,
         timeout_seconds: int | None = None,
+        http_client: httpx.Client | None = None,
     ) -> None:
         self.base_url = (base_url or settings.datajud_base_url).rstrip("/")
         self.api_key = api_key or settings.datajud_api_key
         self.timeout_seconds = timeout_seconds or settings.datajud_timeout_seconds
+        # Pool compartilhado (varreduras com muitas páginas); sem ele, cada
+        # consulta abre e fecha a própria conexão.
+        self.http_client = http_client
 
     def _headers(self) -> dict[str, str]:
         if not self.api_key:
@@ -61,6 +65,10 @@ class DataJudClient:
 
     def search_processes(self, tribunal_alias: str, payload: dict[str, Any]) -> dict[str, Any]:
         endpoint = f"{self.base_url}/{tribunal_alias}/_search"
+        if self.http_client is not None:
+            response = self.http_client.post(endpoint, headers=self._headers(), json=payload)
+            response.raise_for_status()
+            return response.json()
         with httpx.Client(timeout=self.timeout_seconds) as client:
             response = client.post(endpoint, headers=self._headers(), json=payload)
             response.raise_for_status()
@@ -72,7 +80,7 @@ class DataJudClient:
         hits = response.get("hits", {}).get("hits", [])
         if not hits:
             return None
-        return self._hit_to_snapshot(tribunal_alias=tribunal_alias, hit=hits[0])
+        return self.hit_to_snapshot(tribunal_alias=tribunal_alias, hit=hits[0])
 
     def fetch_incremental_batch(
         self,
@@ -81,14 +89,31 @@ class DataJudClient:
         search_after: list[Any] | None = None,
         size: int | None = None,
     ) -> tuple[list[DataJudProcessSnapshot], list[Any] | None, dict[str, Any]]:
+        hits, next_cursor, response = self.fetch_incremental_hits(
+            tribunal_alias, query=query, search_after=search_after, size=size
+        )
+        snapshots = [self.hit_to_snapshot(tribunal_alias=tribunal_alias, hit=hit) for hit in hits]
+        return snapshots, next_cursor, response
+
+    def fetch_incremental_hits(
+        self,
+        tribunal_alias: str,
+        query: dict[str, Any] | None = None,
+        search_after: list[Any] | None = None,
+        size: int | None = None,
+        source_fields: list[str] | None = None,
+    ) -> tuple[list[dict[str, Any]], list[Any] | None, dict[str, Any]]:
+        """Página crua (hits sem virar snapshot) + cursor `search_after` da próxima."""
         payload = self.build_incremental_sync_query(query=query, search_after=search_after, size=size)
+        if source_fields is not None:
+            payload["_source"] = source_fields
         response = self.search_processes(tribunal_alias=tribunal_alias, payload=payload)
         hits = response.get("hits", {}).get("hits", [])
-        snapshots = [self._hit_to_snapshot(tribunal_alias=tribunal_alias, hit=hit) for hit in hits]
         next_cursor = hits[-1].get("sort") if hits else None
-        return snapshots, next_cursor, response
+        return hits, next_cursor, response
 
-    def _hit_to_snapshot(self, tribunal_alias: str, hit: dict[str, Any]) -> DataJudProcessSnapshot:
+    def hit_to_snapshot(self, tribunal_alias: str, hit: dict[str, Any]) -> DataJudProcessSnapshot:
+        """Documento do DataJud (hit com `_source` completo) -> snapshot normalizado."""
         source = hit.get("_source", {})
         movements = [
             NormalizedMovement(
@@ -0,0 +1,384 @@
+"""
+Sync incremental do DataJud para a carteira monitorada.
+
+Em vez de uma consulta por processo, percorre por tribunal os documentos
+reindexados desde a última rodada (`@timestamp` asc + `search_after`), com
+`_source` enxuto (só CNJ e datas). Cada hit é filtrado contra o conjunto de
+CNJs da carteira daquele tribunal (set em memória, lookup O(1)); só os que
+são nossos E mudaram desde a última avaliação têm o documento completo
+buscado, viram `DataJudProcessSnapshot` e passam pelo
+`ProcessMonitoringService.evaluate_process`.
+
+O cursor (`sort` do último hit) fica em `integration_sync_cursors` e é
+gravado a cada página, então uma rodada interrompida retoma de onde parou.
+Cada rodada por tribunal deixa um `integration_sync_runs`.
+"""
+
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+import httpx
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.process_monitoring import (
+    IntegrationSyncCursor,
+    IntegrationSyncRun,
+    MonitoredProcess,
+    MonitoringPortfolio,
+    ProcessPublication,
+)
+from app.services.citacoes_bm.tribunal_alias import cnj_digits, resolve_tribunal_alias
+
+from .contracts import ComunicaPublicationRecord, MonitoringEvaluation
+from .datajud_client import DataJudClient
+from .monitoring_service import ProcessMonitoringService
+
+logger = logging.getLogger(__name__)
+
+SYNC_SOURCE = "DATAJUD"
+SYNC_SCOPE = "incremental"
+CURSOR_KEY = "incremental_timestamp"
+
+# Campos da página de varredura: o suficiente pra filtrar pela carteira e
+# decidir se mudou. Os movimentos (grosso do payload) só vêm no fetch
+# completo dos processos que interessam.
+_SCAN_SOURCE_FIELDS = ["numeroProcesso", "dataHoraUltimaAtualizacao", "@timestamp"]
+# Um CNJ pode ter mais de um documento no mesmo índice (um por grau).
+_DOCS_PER_PROCESS = 5
+_EPOCH = datetime.min.replace(tzinfo=timezone.utc)
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _parse_ts(value: Any) -> datetime | None:
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        parsed = value
+    else:
+        try:
+            parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    # SQLite devolve naive; DataJud às vezes manda sem offset. Ambos são UTC.
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _hit_digits(hit: dict[str, Any]) -> str | None:
+    return cnj_digits((hit.get("_source") or {}).get("numeroProcesso"))
+
+
+def _hit_updated_at(hit: dict[str, Any]) -> datetime | None:
+    source = hit.get("_source") or {}
+    return _parse_ts(source.get("dataHoraUltimaAtualizacao") or source.get("@timestamp"))
+
+
+def _is_truncated(response: dict[str, Any], hits: list[dict[str, Any]], size: int) -> bool:
+    """A busca deixou documentos de fora: página cheia ou `hits.total` maior."""
+    if len(hits) >= size:
+        return True
+    total = response.get("hits", {}).get("total")
+    if isinstance(total, dict):
+        total = total.get("value")
+    return isinstance(total, int) and total > len(hits)
+
+
+def _publication_record(row: ProcessPublication) -> ComunicaPublicationRecord:
+    return ComunicaPublicationRecord(
+        hash=row.communication_hash,
+        numeroProcesso=row.process_number,
+        siglaTribunal=row.tribunal,
+        dataDisponibilizacao=row.publication_date,
+        dataPublicacao=row.publication_datetime,
+        meio=row.medium,
+        titulo=row.title,
+        texto=row.publication_text,
+        certificate_url=row.certificate_url,
+        raw_payload=row.publication_metadata or {},
+    )
+
+
+class DataJudIncrementalSync:
+    def __init__(
+        self,
+        db: Session,
+        client: DataJudClient | None = None,
+        monitoring_service: ProcessMonitoringService | None = None,
+    ) -> None:
+        self.db = db
+        self.client = client
+        self.monitoring_service = monitoring_service or ProcessMonitoringService()
+
+    # ── carteira ────────────────────────────────────────────────────────
+
+    def load_portfolio_index(self) -> dict[str, dict[str, list[int]]]:
+        """alias -> {dígitos do CNJ -> ids de MonitoredProcess} dos portfólios ativos."""
+        rows = (
+            self.db.query(
+                MonitoredProcess.id,
+                MonitoredProcess.normalized_process_number,
+                MonitoredProcess.process_number,
+                MonitoredProcess.tribunal_alias,
+            )
+            .join(MonitoringPortfolio, MonitoringPortfolio.id == MonitoredProcess.portfolio_id)
+            .filter(MonitoringPortfolio.is_active.is_(True))
+        )
+        index: dict[str, dict[str, list[int]]] = {}
+        for process_id, normalized, raw, alias in rows:
+            digits = cnj_digits(normalized or raw)
+            alias = alias or resolve_tribunal_alias(digits)
+            if not digits or not alias:
+                continue
+            index.setdefault(alias, {}).setdefault(digits, []).append(process_id)
+        return index
+
+    # ── driver ──────────────────────────────────────────────────────────
+
+    def run(self, aliases: list[str] | None = None, max_pages: int | None = None) -> dict[str, dict[str, Any]]:
+        """Sincroniza todos os tribunais da carteira (ou só `aliases`)."""
+        index = self.load_portfolio_index()
+        if aliases is not None:
+            index = {alias: index[alias] for alias in aliases if alias in index}
+        if not index:
+            return {}
+
+        if self.client is not None:
+            return {alias: self.sync_tribunal(alias, cnjs, max_pages) for alias, cnjs in index.items()}
+
+        # Um pool HTTP para a rodada inteira (keep-alive entre as páginas).
+        with httpx.Client(timeout=settings.datajud_timeout_seconds) as http_client:
+            self.client = DataJudClient(http_client=http_client)
+            try:
+                return {alias: self.sync_tribunal(alias, cnjs, max_pages) for alias, cnjs in index.items()}
+            finally:
+                self.client = None
+
+    def sync_tribunal(
+        self,
+        tribunal_alias: str,
+        portfolio: dict[str, list[int]],
+        max_pages: int | None = None,
+    ) -> dict[str, Any]:
+        page_size = settings.datajud_incremental_page_size
+        max_pages = max_pages or settings.datajud_incremental_max_pages
+        cursor = self._get_or_create_cursor(tribunal_alias)
+        since = cursor.cursor_metadata["since"]
+        query = {"range": {"@timestamp": {"gte": since}}}
+
+        sync_run = IntegrationSyncRun(
+            source=SYNC_SOURCE,
+            tribunal=tribunal_alias,
+            scope=SYNC_SCOPE,
+            status="RUNNING",
+            request_payload={"since": since, "search_after": cursor.cursor_value or None},
+        )
+        self.db.add(sync_run)
+        self.db.commit()
+
+        stats = {"pages": 0, "hits": 0, "matched": 0, "evaluated": 0, "exhausted": False}
+        try:
+            while stats["pages"] < max_pages:
+                hits, next_cursor, _ = self.client.fetch_incremental_hits(
+                    tribunal_alias,
+                    query=query,
+                    search_after=cursor.cursor_value or None,
+                    size=page_size,
+                    source_fields=_SCAN_SOURCE_FIELDS,
+                )
+                stats["pages"] += 1
+                stats["hits"] += len(hits)
+                if hits:
+                    matched, evaluated = self._process_page(tribunal_alias, portfolio, hits)
+                    stats["matched"] += matched
+                    stats["evaluated"] += evaluated
+                    cursor.cursor_value = next_cursor
+                cursor.last_synced_at = _now()
+                self.db.commit()
+                if len(hits) < page_size:
+                    stats["exhausted"] = True
+                    break
+        except Exception as exc:
+            self.db.rollback()
+            logger.warning("Sync incremental DataJud falhou [%s]: %s", tribunal_alias, exc)
+            sync_run.status = "ERROR"
+            sync_run.error_message = str(exc)[:2000]
+        else:
+            sync_run.status = "SUCCESS"
+        sync_run.response_metadata = stats
+        sync_run.finished_at = _now()
+        self.db.commit()
+        return {"status": sync_run.status, **stats}
+
+    def _get_or_create_cursor(self, tribunal_alias: str) -> IntegrationSyncCursor:
+        cursor = (
+            self.db.query(IntegrationSyncCursor)
+            .filter(
+                IntegrationSyncCursor.source == SYNC_SOURCE,
+                IntegrationSyncCursor.tribunal == tribunal_alias,
+                IntegrationSyncCursor.cursor_key == CURSOR_KEY,
+            )
+            .one_or_none()
+        )
+        if cursor is None:
+            since = _now() - timedelta(days=settings.datajud_incremental_initial_lookback_days)
+            cursor = IntegrationSyncCursor(
+                source=SYNC_SOURCE,
+                tribunal=tribunal_alias,
+                cursor_key=CURSOR_KEY,
+                cursor_value=[],
+                cursor_metadata={"since": since.isoformat()},
+            )
+            self.db.add(cursor)
+            self.db.flush()
+        return cursor
+
+    # ── página ──────────────────────────────────────────────────────────
+
+    def _process_page(
+        self,
+        tribunal_alias: str,
+        portfolio: dict[str, list[int]],
+        hits: list[dict[str, Any]],
+    ) -> tuple[int, int]:
+        """Filtra a página pela carteira e avalia os processos que mudaram."""
+        latest: dict[str, datetime | None] = {}
+        for hit in hits:
+            digits = _hit_digits(hit)
+            if digits not in portfolio:
+                continue
+            updated_at = _hit_updated_at(hit)
+            if digits not in latest or (updated_at or _EPOCH) > (latest[digits] or _EPOCH):
+                latest[digits] = updated_at
+        if not latest:
+            return 0, 0
+
+        process_ids = [pid for digits in latest for pid in portfolio[digits]]
+        processes = {
+            p.id: p for p in self.db.query(MonitoredProcess).filter(MonitoredProcess.id.in_(process_ids))
+        }
+        changed = [
+            digits
+            for digits, updated_at in latest.items()
+            if any(self._is_newer(processes.get(pid), updated_at) for pid in portfolio[digits])
+        ]
+        if not changed:
+            return len(latest), 0
+
+        documents = self._fetch_documents(tribunal_alias, changed)
+        changed_ids = [pid for digits in changed if digits in documents for pid in portfolio[digits]]
+        publications = self._load_publications(changed_ids)
+
+        evaluated = 0
+        for digits in changed:
+            hit = documents.get(digits)
+            if hit is None:
+                continue
+            snapshot = self.client.hit_to_snapshot(tribunal_alias=tribunal_alias, hit=hit)
+            for pid in portfolio[digits]:
+                process = processes.get(pid)
+                if process is None:
+                    continue
+                evaluation = self.monitoring_service.evaluate_process(snapshot, publications.get(pid, []))
+                self._apply_evaluation(process, evaluation)
+                evaluated += 1
+        return len(latest), evaluated
+
+    @staticmethod
+    def _is_newer(process: MonitoredProcess | None, updated_at: datetime | None) -> bool:
+        if process is None:
+            return False
+        previous = _parse_ts(process.last_datajud_update_at)
+        return previous is None or updated_at is None or updated_at > previous
+
+    def _fetch_documents(self, tribunal_alias: str, digits_list: list[str]) -> dict[str, dict[str, Any]]:
+        """Documento completo (com movimentos) dos CNJs alterados, o mais recente por CNJ."""
+        documents: dict[str, dict[str, Any]] = {}
+        for hit in self._search_documents(tribunal_alias, digits_list):
+            digits = _hit_digits(hit)
+            if not digits:
+                continue
+            current = documents.get(digits)
+            if current is None or (_hit_updated_at(hit) or _EPOCH) > (_hit_updated_at(current) or _EPOCH):
+                documents[digits] = hit
+        return documents
+
+    def _search_documents(self, tribunal_alias: str, digits_list: list[str]) -> list[dict[str, Any]]:
+        """Todos os documentos dos CNJs, sem truncar.
+
+        Se a resposta encher o `size` ou o `hits.total` passar do que veio
+        (algum CNJ com mais graus/docs que o previsto), o lote é dividido ao
+        meio e refeito; um CNJ sozinho que ainda não cabe é paginado por
+        `search_after`.
+        """
+        query = {
+            "bool": {
+                "should": [{"match": {"numeroProcesso": digits}} for digits in digits_list],
+                "minimum_should_match": 1,
+            }
+        }
+        size = len(digits_list) * _DOCS_PER_PROCESS
+        response = self.client.search_processes(
+            tribunal_alias=tribunal_alias, payload={"query": query, "size": size}
+        )
+        hits = response.get("hits", {}).get("hits", [])
+        if not _is_truncated(response, hits, size):
+            return hits
+        if len(digits_list) > 1:
+            middle = len(digits_list) // 2
+            return self._search_documents(tribunal_alias, digits_list[:middle]) + self._search_documents(
+                tribunal_alias, digits_list[middle:]
+            )
+
+        hits, search_after = [], None
+        while True:
+            page, search_after, _ = self.client.fetch_incremental_hits(
+                tribunal_alias, query=query, search_after=search_after, size=size
+            )
+            hits.extend(page)
+            if len(page) < size:
+                return hits
+
+    def _load_publications(self, process_ids: list[int]) -> dict[int, list[ComunicaPublicationRecord]]:
+        if not process_ids:
+            return {}
+        grouped: dict[int, list[ComunicaPublicationRecord]] = {}
+        rows = self.db.query(ProcessPublication).filter(ProcessPublication.monitored_process_id.in_(process_ids))
+        for row in rows:
+            grouped.setdefault(row.monitored_process_id, []).append(_publication_record(row))
+        return grouped
+
+    def _apply_evaluation(self, process: MonitoredProcess, evaluation: MonitoringEvaluation) -> None:
+        snapshot = evaluation.snapshot
+        assessment = evaluation.assessment
+        now = _now()
+
+        process.tribunal = snapshot.tribunal or process.tribunal
+        process.tribunal_alias = snapshot.tribunal_alias or process.tribunal_alias
+        process.instance_level = snapshot.instance_level or process.instance_level
+        process.procedural_class = snapshot.procedural_class or process.procedural_class
+        process.judging_body = snapshot.judging_body or process.judging_body
+        process.system_name = snapshot.system_name or process.system_name
+        process.secrecy_level = snapshot.secrecy_level
+        if snapshot.filed_at:
+            process.filed_at = snapshot.filed_at.date()
+        process.last_datajud_update_at = snapshot.last_update_at or snapshot.indexed_at
+        process.indexed_at = snapshot.indexed_at
+        process.last_datajud_sync_at = now
+        process.last_classified_at = now
+        process.analytical_status = assessment.status.value
+        process.maturity_level = assessment.maturity_level
+        process.current_score = assessment.score
+        process.queue_name = evaluation.operational_queue.queue_name
+        process.monitoring_metadata = {
+            **(process.monitoring_metadata or {}),
+            "last_evaluation": {
+                "suggested_action": assessment.suggested_action,
+                "confidence": assessment.confidence,
+                "triggered_rules": assessment.triggered_rules,
+                "priority": evaluation.operational_queue.priority,
+            },
+        }
@@ -52,10 +52,9 @@ from app.services.classifier.ai_client import (
 )
 from app.services.classifier.prompts import (
     SYSTEM_PROMPT,
-    build_feedback_examples,
     build_system_prompt_for_office,
     build_user_message,
-    load_office_overrides,
+    get_system_prompt_for_office,
 )
 from app.services.classifier.taxonomy import validate_classification, repair_classification
 from app.services.classifier.response_schema import (
@@ -274,7 +273,6 @@ class PublicationBatchClassifier:
         # Pré-carrega prompts customizados por escritório (com overrides + feedback).
         # Cache key = (office_id, is_unlinked) pra não misturar prompts.
         office_prompts: dict[tuple, str] = {}
-        feedback_cache: dict[int, str] = {}
         office_ids = {rec.linked_office_id for rec in records if rec.linked_office_id}
         # Polo configurado por escritorio (Admin > Polo dos Escritorios).
         # 'ativo'/'passivo' travam a arvore da IA no polo certo; 'ambos' ou
@@ -299,35 +297,22 @@ class PublicationBatchClassifier:
             except Exception as exc:  # noqa: BLE001
                 logger.warning("Falha ao carregar polo dos escritorios: %s", exc)
 
-        def _feedback_for(oid: int) -> str:
-            if oid not in feedback_cache:
-                try:
-                    feedback_cache[oid] = build_feedback_examples(
-                        self.db, oid if oid else None,
-                        office_polo=office_polo_by_id.get(oid),
-                    )
-                except Exception as exc:
-                    logger.warning("Falha ao carregar feedbacks do escritório %s: %s", oid, exc)
-                    feedback_cache[oid] = ""
-            return feedback_cache[oid]
-
         for oid in office_ids:
             try:
-                excluded, custom = load_office_overrides(self.db, oid)
-                fb = _feedback_for(oid)
                 for unlinked in (False, True):
                     # Modo arvore enxuta (fase 13): sempre passamos oid
                     # pra build_system_prompt_for_office filtrar a arvore
                     # pelos templates do escritorio. Mesmo sem overrides
                     # explicitos, o filtro template-driven entra em acao
                     # quando o setting esta ativo (default true desde
-                    # tax009).
-                    office_prompts[(oid, unlinked)] = build_system_prompt_for_office(
-                        excluded or None, custom or None,
+                    # tax009). Vem do LRU de prompts — o mesmo texto que a
+                    # classificacao sincrona usa, entao o prompt caching
+                    # da Anthropic acerta entre os dois caminhos.
+                    office_prompts[(oid, unlinked)] = get_system_prompt_for_office(
+                        self.db,
+                        oid,
                         is_unlinked=unlinked,
-                        feedback_examples=fb,
                         polo_scope=office_polo_by_id.get(oid),
-                        office_external_id=oid,
                     )
             except Exception as exc:
                 # Log de ERRO (nao warning) com stack trace pra rastrear
@@ -342,12 +327,9 @@ class PublicationBatchClassifier:
                     oid, exc, exc_info=True,
                 )
         # Prompt base para publicações sem escritório
-        fb_global = _feedback_for(0)
-        office_prompts[(0, False)] = build_system_prompt_for_office(
-            feedback_examples=fb_global,
-        ) if fb_global else SYSTEM_PROMPT
-        office_prompts[(0, True)] = build_system_prompt_for_office(
-            is_unlinked=True, feedback_examples=fb_global,
+        office_prompts[(0, False)] = get_system_prompt_for_office(self.db, None)
+        office_prompts[(0, True)] = get_system_prompt_for_office(
+            self.db, None, is_unlinked=True,
         )
 
         # Monta as requisições do batch
@@ -246,6 +246,65 @@ class PublicationSearchService:
         except Exception:
             self.db.rollback()
 
+    # ──────────────────────────────────────────────
+    # Dedup (sondagem limitada aos ids da rodada)
+    # ──────────────────────────────────────────────
+
+    # Ids por IN: longe do limite de parâmetros e ainda 1 round-trip por
+    # milhar de publicações.
+    _DEDUP_PROBE_CHUNK = 1000
+
+    @staticmethod
+    def _distinct_ints(values) -> list[int]:
+        out: dict[int, None] = {}
+        for value in values:
+            if value in (None, ""):
+                continue
+            try:
+                out[int(value)] = None
+            except (TypeError, ValueError):
+                continue
+        return list(out)
+
+    def _probe_existing_update_ids(self, update_ids) -> set[int]:
+        """legal_one_update_id já persistidos, entre os ids informados."""
+        ids = self._distinct_ints(update_ids)
+        found: set[int] = set()
+        for i in range(0, len(ids), self._DEDUP_PROBE_CHUNK):
+            chunk = ids[i : i + self._DEDUP_PROBE_CHUNK]
+            found.update(
+                row[0]
+                for row in self.db.query(PublicationRecord.legal_one_update_id)
+                .filter(PublicationRecord.legal_one_update_id.in_(chunk))
+                .all()
+            )
+        return found
+
+    def _probe_live_lawsuit_date_keys(self, lawsuit_ids) -> set[tuple]:
+        """
+        Pares (linked_lawsuit_id, publication_date) de registros vivos —
+        mesmo universo do índice parcial uq_pub_lawsuit_date — restritos aos
+        processos informados.
+        """
+        ids = self._distinct_ints(lawsuit_ids)
+        keys: set[tuple] = set()
+        for i in range(0, len(ids), self._DEDUP_PROBE_CHUNK):
+            chunk = ids[i : i + self._DEDUP_PROBE_CHUNK]
+            keys.update(
+                (row[0], row[1])
+                for row in self.db.query(
+                    PublicationRecord.linked_lawsuit_id,
+                    PublicationRecord.publication_date,
+                )
+                .filter(PublicationRecord.linked_lawsuit_id.in_(chunk))
+                .filter(PublicationRecord.publication_date.isnot(None))
+                .filter(PublicationRecord.publication_date != "")
+                .filter(PublicationRecord.status != RECORD_STATUS_DISCARDED_DUPLICATE)
+                .filter(PublicationRecord.is_duplicate == False)  # noqa: E712
+                .all()
+            )
+        return keys
+
     # ──────────────────────────────────────────────
     # Disparo de busca
     # ──────────────────────────────────────────────
@@ -270,6 +329,12 @@ class PublicationSearchService:
             origin_type=origin_type,
         )
 
+    # Tamanho do bloco quando a lista vem pré-buscada do scheduler — mesma
+    # ordem de grandeza de uma janela de páginas do L1 (fan-out × 4 × 30).
+    STREAM_CHUNK_SIZE = 720
+    # Retomadas automáticas (watchdog) antes de desistir e marcar FALHA.
+    MAX_RESUME_ATTEMPTS = 3
+
     def create_and_run_search(
         self,
         date_from: str,
@@ -290,9 +355,13 @@ class PublicationSearchService:
         unifica em `_office_ids: list[int]` (vazia = sem filtro).
 
         `prefetched_publications`: quando passado (modo batch do scheduler),
-        pula a chamada L1 e usa essa lista. CADA chamada faz uma cópia
-        rasa dos dicts pra evitar contaminação entre offices (linha ~370
+        pula a chamada L1 e usa essa lista. CADA bloco faz uma cópia
+        rasa dos dicts pra evitar contaminação entre offices (o pré-filtro
         muta `_responsible_office_id` no dict).
+
+        A janela é processada em streaming (ver `_run_search_pipeline`):
+        cada bloco de páginas do L1 passa por pré-filtro, enrich, dedup e
+        persist e é commitado antes do próximo ser buscado.
         """
         # Normaliza pra list[int]. Filtra zeros/duplicados.
         _office_ids: list[int] = []
@@ -301,7 +370,6 @@ class PublicationSearchService:
         if responsible_office_id:
             _office_ids.append(int(responsible_office_id))
         _office_ids = list(dict.fromkeys(_office_ids))  # unique preserva ordem
-        _office_ids_set: set[int] = set(_office_ids)
 
         search = PublicationSearch(
             status=SEARCH_STATUS_RUNNING,
@@ -312,443 +380,194 @@ class PublicationSearchService:
                 ",".join(str(x) for x in _office_ids) if _office_ids else None
             ),
             requested_by_email=requested_by,
+            only_unlinked=only_unlinked,
+            # Lista pré-buscada não tem $skip pra retomar.
+            resume_skip=None if prefetched_publications is not None else 0,
+            heartbeat_at=datetime.now(timezone.utc),
         )
         self.db.add(search)
         self.db.commit()
         self.db.refresh(search)
 
+        return self._run_search_pipeline(
+            search,
+            _office_ids,
+            only_unlinked=only_unlinked,
+            prefetched_publications=prefetched_publications,
+        )
+
+    def resume_search(self, search_id: int) -> dict[str, Any]:
+        """
+        Retoma uma busca interrompida a partir do último $skip commitado
+        (chamado pelo watchdog). Os blocos já persistidos não são refeitos;
+        o que reaparecer por deslocamento de página cai no dedup.
+        """
+        search = (
+            self.db.query(PublicationSearch)
+            .filter(PublicationSearch.id == search_id)
+            .one()
+        )
+        logger.warning(
+            "Busca #%s: retomando do $skip=%s (tentativa %s).",
+            search.id, search.resume_skip, search.resume_attempts,
+        )
+        return self._run_search_pipeline(
+            search,
+            _parse_csv_ints(search.office_filter),
+            only_unlinked=bool(search.only_unlinked),
+            start_skip=search.resume_skip or 0,
+        )
+
+    def _run_search_pipeline(
+        self,
+        search: PublicationSearch,
+        office_ids: list[int],
+        only_unlinked: bool = False,
+        prefetched_publications: Optional[list[dict]] = None,
+        start_skip: int = 0,
+    ) -> dict[str, Any]:
+        """
+        Pipeline em streaming: fetch → pré-filtro → enrich → filtro →
+        dedup/persist, um bloco por vez. Cada bloco commitado avança
+        `resume_skip`/`heartbeat_at` e o progresso reflete linhas realmente
+        gravadas. Memória fica limitada ao bloco, não à janela inteira.
+        """
+        office_ids_set: set[int] = set(office_ids)
+        # Totais já commitados por uma execução anterior (retomada).
+        base_found = search.total_found or 0
+        base_new = search.total_new or 0
+        base_duplicate = search.total_duplicate or 0
+        counts = {"fetched": start_skip, "new": 0, "dup": 0, "discarded": 0, "obsolete": 0}
+        # Diagnóstico agregado da distribuição de responsibleOfficeId.
+        from collections import Counter
+        office_counter: Counter = Counter()
+        diag = {"sem_processo": 0, "sem_office": 0, "before_office_filter": 0}
+
+        def _apply_totals() -> None:
+            # `total_found` = registros que ESTA busca efetivamente vinculou
+            # ao sistema (novos + descartados + obsoletas).
+            search.total_found = base_found + counts["new"] + counts["discarded"] + counts["obsolete"]
+            search.total_new = base_new + counts["new"]
+            # total_duplicate agrega: duplicata por update_id +
+            # descartadas pelo dedup (lawsuit_id, publication_date) + obsoletas.
+            search.total_duplicate = (
+                base_duplicate + counts["dup"] + counts["discarded"] + counts["obsolete"]
+            )
+
         try:
-            # 1) Busca TODAS as publicações (paginação automática) ou usa
-            # lista pré-fetched do scheduler (modo batch — 1 chamada L1
-            # compartilhada entre offices da rodada).
+            # 1.5) Pré-filtro por escritório (otimização): índice persistente
+            # carregado UMA vez e aplicado a cada bloco.
+            prefilter = self._load_office_prefilter(office_ids) if office_ids else None
+
             if prefetched_publications is not None:
-                # Cópia rasa por publicação: o pré-filtro mais abaixo muta
-                # `_responsible_office_id` no dict, então cada office
-                # precisa do seu próprio dicionário pra não contaminar os
-                # outros calls da rodada.
-                publications = [dict(p) for p in prefetched_publications]
                 self._update_search_progress(
                     search, "FETCH",
-                    f"{len(publications)} publicações recebidas do scheduler (sem chamada L1)",
-                    15,
+                    f"{len(prefetched_publications)} publicações recebidas do scheduler (sem chamada L1)",
+                    5,
                 )
             else:
                 self._update_search_progress(search, "FETCH", "Buscando publicações na API Legal One...", 5)
-                publications = self.client.fetch_all_publications(
-                    date_from=date_from,
-                    date_to=date_to,
-                    origin_type=origin_type,
-                )
-                self._update_search_progress(
-                    search, "FETCH",
-                    f"{len(publications)} publicações encontradas na API",
-                    15,
-                )
 
-            # 1.5) Pré-filtro por escritório (otimização):
-            # Usa o índice persistente (office_lawsuit_index). Quando há
-            # múltiplos escritórios selecionados, faz a UNIÃO dos índices —
-            # ou seja, pré-filtra tudo que pertence a QUALQUER um deles.
-            # Se algum índice estiver stale, sync é disparado pra esse
-            # escritório e o pré-filtro segue com os índices disponíveis.
-            if _office_ids:
-                merged_ids: set[int] = set()
-                lid_to_office: dict[int, int] = {}
-                any_index_filled = False
-                for off_id in _office_ids:
-                    try:
-                        from app.services.office_lawsuit_index_service import (
-                            OfficeLawsuitIndexService,
-                        )
-                        idx_svc = OfficeLawsuitIndexService(self.db, self.client)
-                        idx_svc.ensure_sync(off_id)
-                        ids = idx_svc.get_lawsuit_ids(off_id)
-                        if ids:
-                            any_index_filled = True
-                            for lid in ids:
-                                merged_ids.add(lid)
-                                # 1ª associação ganha — operador raramente tem
-                                # o mesmo processo em 2 escritórios.
-                                lid_to_office.setdefault(lid, off_id)
-                            logger.info(
-                                "Índice persistente: %s processos pro escritório %s.",
-                                len(ids), off_id,
-                            )
-                        else:
-                            logger.info(
-                                "Índice vazio/em construção pro escritório %s — "
-                                "pulando pré-filtro pra esse.",
-                                off_id,
-                            )
-                    except Exception as exc:
-                        logger.warning(
-                            "Pré-filtro por escritório %s falhou: %s",
-                            off_id, exc,
-                        )
+            total_reported = 0
+            for next_skip, publications, total_reported in self._iter_publication_chunks(
+                search, prefetched_publications, start_skip,
+            ):
+                counts["fetched"] += len(publications)
+
+                if prefilter is not None:
+                    publications = self._apply_office_prefilter(publications, prefilter, office_ids)
 
-                if any_index_filled and merged_ids:
-                    before_prefilter = len(publications)
-                    kept = []
+                # 2) Enriquece com responsibleOfficeId via lookup de processos
+                publications = self._enrich_with_lawsuit_data(publications)
+
+                # 3) Filtra por escritório responsável (se especificado)
+                if office_ids_set:
+                    diag["before_office_filter"] += len(publications)
                     for _p in publications:
-                        rels = _p.get("relationships") or []
-                        lit = next(
-                            (r for r in rels if r.get("linkType") == "Litigation"),
-                            None,
-                        )
-                        if not lit:
-                            # sem processo vinculado — mantém pra não perder
-                            # publicações "avulsas" do período; serão descartadas
-                            # no filtro posterior se não baterem
-                            kept.append(_p)
+                        relationships = _p.get("relationships") or []
+                        if not any(r.get("linkType") == "Litigation" for r in relationships):
+                            diag["sem_processo"] += 1
                             continue
-                        try:
-                            lid = int(lit.get("linkId"))
-                        except (TypeError, ValueError):
+                        oid = _p.get("_responsible_office_id")
+                        if oid is None:
+                            diag["sem_office"] += 1
                             continue
-                        if lid in merged_ids:
-                            # já sabemos o escritório — grava e evita lookup depois
-                            _p["_responsible_office_id"] = lid_to_office.get(lid)
-                            kept.append(_p)
-                    logger.info(
-                        "Pré-filtro escritórios %s: %s → %s publicações.",
-                        _office_ids, before_prefilter, len(kept),
-                    )
-                    publications = kept
-
-            # 2) Enriquece com responsibleOfficeId via lookup de processos
-            self._update_search_progress(
-                search, "ENRICH",
-                f"Enriquecendo {len(publications)} publicações com dados de processos...",
-                25,
-            )
-            publications = self._enrich_with_lawsuit_data(publications)
-            self._update_search_progress(
-                search, "FILTER",
-                f"Filtrando {len(publications)} publicações...",
-                40,
-            )
+                        office_counter[oid] += 1
+                    publications = [
+                        p for p in publications
+                        if p.get("_responsible_office_id") in office_ids_set
+                    ]
+
+                # 3.5) Filtra apenas publicações sem processo vinculado (se solicitado)
+                if only_unlinked:
+                    publications = [
+                        p for p in publications
+                        if not any(
+                            r.get("linkType") == "Litigation"
+                            for r in (p.get("relationships") or [])
+                        )
+                    ]
 
-            # 3) Filtra por escritório responsável (se especificado)
-            if _office_ids_set:
-                before = len(publications)
-
-                # Diagnóstico: distribuição de responsibleOfficeId nos processos
-                # vinculados, para descobrir qual ID realmente bate com o
-                # escritório selecionado no frontend.
-                from collections import Counter
-                office_counter: Counter = Counter()
-                sem_processo = 0
-                sem_office = 0
-                for _p in publications:
-                    relationships = _p.get("relationships") or []
-                    has_lit = any(r.get("linkType") == "Litigation" for r in relationships)
-                    if not has_lit:
-                        sem_processo += 1
-                        continue
-                    oid = _p.get("_responsible_office_id")
-                    if oid is None:
-                        sem_office += 1
-                        continue
-                    office_counter[oid] += 1
-
-                top = office_counter.most_common(20)
-                logger.info(
-                    "Diagnóstico escritórios (procurados=%s) | total=%s | sem processo vinculado=%s | processo sem responsibleOfficeId=%s | top responsibleOfficeId: %s",
-                    _office_ids, before, sem_processo, sem_office, top,
+                # 4) Deduplica e persiste o bloco
+                new_records, duplicate_records, obsolete_records = self._persist_publication_chunk(
+                    search, publications, counts,
                 )
 
-                publications = [
-                    p for p in publications
-                    if p.get("_responsible_office_id") in _office_ids_set
-                ]
-                logger.info(
-                    "Filtro por escritórios %s: %s → %s publicações.",
-                    _office_ids, before, len(publications),
+                # Cancelamento cooperativo: cancel_search() roda em outra
+                # session (request do endpoint) e apenas seta status=
+                # CANCELADO no DB. Checado 1x por bloco, antes do commit.
+                current_status = (
+                    self.db.query(PublicationSearch.status)
+                    .filter(PublicationSearch.id == search.id)
+                    .scalar()
                 )
-
-            # 3.5) Filtra apenas publicações sem processo vinculado (se solicitado)
-            if only_unlinked:
-                before_unlinked = len(publications)
-                publications = [
-                    p for p in publications
-                    if not any(
-                        r.get("linkType") == "Litigation"
-                        for r in (p.get("relationships") or [])
+                if current_status == SEARCH_STATUS_CANCELLED:
+                    self.db.rollback()  # descarta o bloco pendente
+                    logger.warning(
+                        "Busca #%s cancelada pelo usuário no PERSIST "
+                        "(%d publicações lidas, %d novas commitadas).",
+                        search.id, counts["fetched"], search.total_new or 0,
                     )
-                ]
-                logger.info(
-                    "Filtro only_unlinked: %s → %s publicações.",
-                    before_unlinked, len(publications),
+                    self.db.refresh(search)
+                    return self._search_to_dict(search)
+
+                _apply_totals()
+                search.resume_skip = next_skip
+                search.heartbeat_at = datetime.now(timezone.utc)
+                search.progress_step = "PERSIST"
+                search.progress_detail = (
+                    f"Persistindo... {counts['fetched']}/{total_reported} lidas "
+                    f"({search.total_new} novas, {counts['discarded']} duplicatas, "
+                    f"{counts['obsolete']} obsoletas)"
                 )
-
-            # 4) Deduplica e persiste os novos
-            self._update_search_progress(
-                search, "PERSIST",
-                f"Deduplicando e persistindo {len(publications)} publicações...",
-                50,
-            )
-            #
-            # Dedup em duas camadas:
-            #   (a) legal_one_update_id (id único do Legal One) → duplicata exata
-            #   (b) (linked_lawsuit_id, publication_date) → mesma publicação de um
-            #       mesmo processo no mesmo dia é tratada uma única vez,
-            #       economizando tokens de classificação e chamadas à API do L1.
-            existing_ids = set(
-                row[0]
-                for row in self.db.query(PublicationRecord.legal_one_update_id).all()
-            )
-
-            # Chaves (lawsuit_id, publication_date) já presentes em registros
-            # "vivos" (não descartados). Mesmo conjunto coberto pelo índice
-            # único parcial uq_pub_lawsuit_date.
-            existing_keys = set(
-                (row[0], row[1])
-                for row in self.db.query(
-                    PublicationRecord.linked_lawsuit_id,
-                    PublicationRecord.publication_date,
-                )
-                .filter(PublicationRecord.linked_lawsuit_id.isnot(None))
-                .filter(PublicationRecord.publication_date.isnot(None))
-                .filter(PublicationRecord.publication_date != "")
-                .filter(PublicationRecord.status != RECORD_STATUS_DISCARDED_DUPLICATE)
-                .filter(PublicationRecord.is_duplicate == False)  # noqa: E712
-                .all()
-            )
-
-            new_records: List[PublicationRecord] = []
-            duplicate_records: List[PublicationRecord] = []
-            obsolete_records: List[PublicationRecord] = []
-            new_count = 0
-            dup_count = 0
-            discarded_count = 0
-            obsolete_count = 0
-
-            # Commit em lote: evita perder TODO o trabalho se o worker uvicorn
-            # for killed (OOM/restart) no meio do PERSIST. Também dá progresso
-            # visível na UI via total_new/total_duplicate incrementais e
-            # permite o watchdog distinguir "rodando lento" de "morta" pelo
-            # MAX(created_at) em publicacao_registros.
-            #
-            # 500 ≈ sweet spot: inserts agrupados suficientes pra ser rápido
-            # e granular o bastante pra não perder muito em caso de crash.
-            PERSIST_BATCH_SIZE = 500
-            pending_in_batch = 0
-            total_processed = 0
-            total_pubs = len(publications)
-
-            for pub in publications:
-                update_id = pub.get("id")
-                if not update_id:
-                    continue
-
-                if update_id in existing_ids:
-                    dup_count += 1
-                    continue
-
-                relationships = pub.get("relationships") or []
-                lawsuit_rel = next(
-                    (r for r in relationships if r.get("linkType") == "Litigation"),
-                    None,
-                )
-                lawsuit_id = lawsuit_rel.get("linkId") if lawsuit_rel else None
-                publication_date = pub.get("date")
-
-                # Guarda (lawsuit_id, publication_date): se já temos uma
-                # publicação viva do mesmo processo no mesmo dia, descartamos
-                # — insere marcada para rastreabilidade sem consumir recursos
-                # de classificação nem colidir com o índice único parcial.
-                dedup_key = (
-                    (lawsuit_id, publication_date)
-                    if lawsuit_id and publication_date
-                    else None
-                )
-                is_lawsuit_date_duplicate = (
-                    dedup_key is not None and dedup_key in existing_keys
+                search.progress_pct = 5 + min(
+                    80, int(80 * counts["fetched"] / max(total_reported, 1))
                 )
-
-                # ── Detecção de publicação obsoleta ─────────────────
-                # Se a data da publicação é anterior à data de criação
-                # da pasta do processo no Legal One, a publicação já
-                # foi auditada na esteira de admissão → obsoleta.
-                is_obsolete = False
-                if not is_lawsuit_date_duplicate and publication_date:
-                    lawsuit_creation = pub.get("_lawsuit_creation_date")
-                    if lawsuit_creation:
-                        try:
-                            # Datas podem vir como ISO completo ou só "YYYY-MM-DD"
-                            pub_dt = publication_date[:10]
-                            law_dt = lawsuit_creation[:10]
-                            if pub_dt < law_dt:
-                                is_obsolete = True
-                        except (TypeError, IndexError):
-                            pass
-
-                # Decide o status final do registro
-                if is_lawsuit_date_duplicate:
-                    record_status = RECORD_STATUS_DISCARDED_DUPLICATE
-                elif is_obsolete:
-                    record_status = RECORD_STATUS_OBSOLETE
-                else:
-                    record_status = RECORD_STATUS_NEW
-
-                cnj = pub.get("_cnj")
-                # Fallback: se não veio processo vinculado pelo L1, tenta extrair
-                # o CNJ direto do texto da publicação (cabeçalho ou corpo).
-                if not cnj:
-                    fallback_cnj = extract_cnj_from_text(
-                        (pub.get("description") or "")
-                        + "\n"
-                        + (pub.get("notes") or "")
-                    )
-                    if fallback_cnj:
-                        cnj = fallback_cnj
-                        logger.debug(
-                            "CNJ extraído do texto (publicação #%s): %s",
-                            update_id, cnj,
-                        )
-                record = PublicationRecord(
-                    search_id=search.id,
-                    legal_one_update_id=update_id,
-                    origin_type=pub.get("originType"),
-                    update_type_id=pub.get("typeId"),
-                    description=pub.get("description"),
-                    notes=pub.get("notes"),
-                    publication_date=publication_date,
-                    creation_date=pub.get("creationDate"),
-                    linked_lawsuit_id=lawsuit_id,
-                    linked_lawsuit_cnj=cnj,
-                    linked_office_id=pub.get("_responsible_office_id"),
-                    raw_relationships=relationships,
-                    status=record_status,
-                    is_duplicate=is_lawsuit_date_duplicate,
-                    uf=uf_from_cnj(cnj),
+                self.db.commit()
+                logger.info(
+                    "Busca #%s: bloco persistido (%d/%d lidas, %d novas)",
+                    search.id, counts["fetched"], total_reported, search.total_new,
                 )
-                self.db.add(record)
-                existing_ids.add(update_id)
-
-                # Atualiza existing_keys ASSIM QUE registramos a primeira
-                # publicação com esse par (lawsuit_id, publication_date) —
-                # independente do status final (NOVO, OBSOLETA, etc.). Sem
-                # isso, duas publicações diferentes com o mesmo par dentro
-                # do MESMO batch geravam UniqueViolation no índice parcial
-                # uq_pub_lawsuit_date. Foi a causa real do travamento das
-                # Buscas #2 e #3 em 22/04/2026 (a #2 ficou órfã porque o
-                # except subsequente não conseguia commitar a marca de FALHA
-                # com a session em estado "transaction rolled back").
-                if dedup_key is not None and not is_lawsuit_date_duplicate:
-                    existing_keys.add(dedup_key)
-
-                if is_lawsuit_date_duplicate:
-                    discarded_count += 1
-                    duplicate_records.append(record)
-                elif is_obsolete:
-                    obsolete_count += 1
-                    obsolete_records.append(record)
-                else:
-                    new_records.append(record)
-                    new_count += 1
-
-                pending_in_batch += 1
-                total_processed += 1
-
-                # Commit parcial: sobrevive a OOM/SIGKILL e dá progresso real
-                # pra UI. Progress vai de 50 → 70% proporcional ao processado.
-                if pending_in_batch >= PERSIST_BATCH_SIZE:
-                    # Cancelamento cooperativo: cancel_search() roda em outra
-                    # session (request do endpoint) e apenas seta status=
-                    # CANCELADO no DB. O loop aqui não vê essa mudança sem
-                    # consultar. Granularidade de 500 registros (~segundos)
-                    # é aceitável e evita hit a cada publicação.
-                    current_status = (
-                        self.db.query(PublicationSearch.status)
-                        .filter(PublicationSearch.id == search.id)
-                        .scalar()
-                    )
-                    if current_status == SEARCH_STATUS_CANCELLED:
-                        self.db.rollback()  # descarta o lote pendente
-                        logger.warning(
-                            "Busca #%s cancelada pelo usuário no PERSIST "
-                            "(%d/%d processados antes do cancelamento, %d novas commitadas).",
-                            search.id, total_processed, total_pubs, new_count,
-                        )
-                        self.db.refresh(search)
-                        return self._search_to_dict(search)
-
-                    search.total_found = new_count + discarded_count + obsolete_count
-                    search.total_new = new_count
-                    search.total_duplicate = dup_count + discarded_count + obsolete_count
-                    search.progress_step = "PERSIST"
-                    search.progress_detail = (
-                        f"Persistindo... {total_processed}/{total_pubs} "
-                        f"({new_count} novas, {discarded_count} duplicatas, "
-                        f"{obsolete_count} obsoletas)"
-                    )
-                    search.progress_pct = 50 + min(
-                        20, int(20 * total_processed / max(total_pubs, 1))
-                    )
-                    self.db.commit()
-                    logger.info(
-                        "Busca #%s: lote persistido (%d/%d processados, %d novas)",
-                        search.id, total_processed, total_pubs, new_count,
-                    )
-                    pending_in_batch = 0
 
-            # Commit final: pega o resto do último lote (<500 registros).
-            self.db.commit()
+                # 6) Propostas de tarefa e 7) fila do RPA, por bloco.
+                self._post_persist_chunk(search, new_records, duplicate_records, obsolete_records)
 
-            self._update_search_progress(
-                search, "PERSIST",
-                f"{new_count} novas, {dup_count} duplicatas, {discarded_count} descartadas, {obsolete_count} obsoletas",
-                70,
-            )
+            if office_ids_set:
+                logger.info(
+                    "Diagnóstico escritórios (procurados=%s) | total=%s | sem processo vinculado=%s | processo sem responsibleOfficeId=%s | top responsibleOfficeId: %s",
+                    office_ids, diag["before_office_filter"], diag["sem_processo"],
+                    diag["sem_office"], office_counter.most_common(20),
+                )
 
             # 5) Classificação agora é EXCLUSIVAMENTE via Batch API
             # (mais barato, sem rate limit). A busca apenas persiste os registros.
             # O operador envia o lote manualmente via painel de classificação em lote.
 
-            # 6) Tenta construir proposta de tarefa para cada publicação classificada
-            if new_records:
-                self._update_search_progress(
-                    search, "PROPOSALS",
-                    f"Montando propostas de tarefa para {len(new_records)} publicações...",
-                    80,
-                )
-                self._build_task_proposals(new_records)
-
-            # 7) Duplicatas e obsoletas vão direto pra fila do RPA
-            # com target_status="sem providência": o RPA só marca a
-            # publicação como tratada no Legal One.
-            rpa_records = duplicate_records + obsolete_records
-            if rpa_records:
-                try:
-                    from app.services.publication_treatment_service import (
-                        PublicationTreatmentService,
-                    )
-                    treatment_service = PublicationTreatmentService(self.db)
-                    for rec in rpa_records:
-                        treatment_service.sync_item_from_record(rec, commit=False)
-                    self.db.commit()
-                    logger.info(
-                        "Busca #%s: %s duplicatas + %s obsoletas enfileiradas pro RPA (sem providência).",
-                        search.id, len(duplicate_records), len(obsolete_records),
-                    )
-                except Exception as exc:
-                    logger.exception(
-                        "Falha ao enfileirar duplicatas/obsoletas da busca #%s: %s",
-                        search.id, exc,
-                    )
-                    self.db.rollback()
-
-            # `total_found` = registros que ESTA busca efetivamente vinculou
-            # ao sistema (novos + descartados + obsoletas).
-            search.total_found = new_count + discarded_count + obsolete_count
-            search.total_new = new_count
-            # total_duplicate agrega: duplicata por update_id +
-            # descartadas pelo dedup (lawsuit_id, publication_date) + obsoletas.
-            search.total_duplicate = dup_count + discarded_count + obsolete_count
+            _apply_totals()
             search.status = SEARCH_STATUS_COMPLETED
+            search.resume_skip = None
             search.progress_step = "DONE"
-            search.progress_detail = f"Concluída — {new_count} novas publicações"
+            search.progress_detail = f"Concluída — {search.total_new} novas publicações"
             search.progress_pct = 100
             search.finished_at = datetime.now(timezone.utc)
             self.db.commit()
@@ -756,9 +575,9 @@ class PublicationSearchService:
             logger.info(
                 "Busca #%s concluida: %s api-total, %s vinculadas, %s novas, "
                 "%s dup update_id, %s descartadas (processo/data), %s obsoletas",
-                search.id, len(publications),
-                new_count + discarded_count + obsolete_count,
-                new_count, dup_count, discarded_count, obsolete_count,
+                search.id, counts["fetched"],
+                counts["new"] + counts["discarded"] + counts["obsolete"],
+                counts["new"], counts["dup"], counts["discarded"], counts["obsolete"],
             )
 
             return self._search_to_dict(search)
@@ -798,6 +617,309 @@ class PublicationSearchService:
                     pass
             raise
 
+    def _iter_publication_chunks(
+        self,
+        search: PublicationSearch,
+        prefetched_publications: Optional[list[dict]],
+        start_skip: int,
+    ):
+        """Blocos `(next_skip, publicações, total)` da lista pré-buscada ou do L1."""
+        if prefetched_publications is not None:
+            total = len(prefetched_publications)
+            for i in range(0, total, self.STREAM_CHUNK_SIZE):
+                # Cópia rasa por publicação: o pré-filtro muta
+                # `_responsible_office_id` no dict, então cada office
+                # precisa do seu próprio dicionário pra não contaminar os
+                # outros calls da rodada.
+                chunk = [dict(p) for p in prefetched_publications[i : i + self.STREAM_CHUNK_SIZE]]
+                yield None, chunk, total
+            return
+
+        yield from self.client.iter_publication_pages(
+            date_from=search.date_from,
+            date_to=search.date_to,
+            origin_type=search.origin_type,
+            start_skip=start_skip,
+        )
+
+    def _load_office_prefilter(
+        self, office_ids: list[int]
+    ) -> Optional[tuple[set[int], dict[int, int]]]:
+        """
+        Usa o índice persistente (office_lawsuit_index). Quando há
+        múltiplos escritórios selecionados, faz a UNIÃO dos índices —
+        ou seja, pré-filtra tudo que pertence a QUALQUER um deles.
+        Se algum índice estiver stale, sync é disparado pra esse
+        escritório e o pré-filtro segue com os índices disponíveis.
+        Retorna None quando nenhum índice tem dados (sem pré-filtro).
+        """
+        merged_ids: set[int] = set()
+        lid_to_office: dict[int, int] = {}
+        any_index_filled = False
+        for off_id in office_ids:
+            try:
+                from app.services.office_lawsuit_index_service import (
+                    OfficeLawsuitIndexService,
+                )
+                idx_svc = OfficeLawsuitIndexService(self.db, self.client)
+                idx_svc.ensure_sync(off_id)
+                ids = idx_svc.get_lawsuit_ids(off_id)
+                if ids:
+                    any_index_filled = True
+                    for lid in ids:
+                        merged_ids.add(lid)
+                        # 1ª associação ganha — operador raramente tem
+                        # o mesmo processo em 2 escritórios.
+                        lid_to_office.setdefault(lid, off_id)
+                    logger.info(
+                        "Índice persistente: %s processos pro escritório %s.",
+                        len(ids), off_id,
+                    )
+                else:
+                    logger.info(
+                        "Índice vazio/em construção pro escritório %s — "
+                        "pulando pré-filtro pra esse.",
+                        off_id,
+                    )
+            except Exception as exc:
+                logger.warning(
+                    "Pré-filtro por escritório %s falhou: %s",
+                    off_id, exc,
+                )
+
+        if any_index_filled and merged_ids:
+            return merged_ids, lid_to_office
+        return None
+
+    @staticmethod
+    def _apply_office_prefilter(
+        publications: list[dict],
+        prefilter: tuple[set[int], dict[int, int]],
+        office_ids: list[int],
+    ) -> list[dict]:
+        merged_ids, lid_to_office = prefilter
+        before_prefilter = len(publications)
+        kept = []
+        for _p in publications:
+            rels = _p.get("relationships") or []
+            lit = next(
+                (r for r in rels if r.get("linkType") == "Litigation"),
+                None,
+            )
+            if not lit:
+                # sem processo vinculado — mantém pra não perder
+                # publicações "avulsas" do período; serão descartadas
+                # no filtro posterior se não baterem
+                kept.append(_p)
+                continue
+            try:
+                lid = int(lit.get("linkId"))
+            except (TypeError, ValueError):
+                continue
+            if lid in merged_ids:
+                # já sabemos o escritório — grava e evita lookup depois
+                _p["_responsible_office_id"] = lid_to_office.get(lid)
+                kept.append(_p)
+        logger.debug(
+            "Pré-filtro escritórios %s: %s → %s publicações.",
+            office_ids, before_prefilter, len(kept),
+        )
+        return kept
+
+    def _persist_publication_chunk(
+        self,
+        search: PublicationSearch,
+        publications: list[dict],
+        counts: dict[str, int],
+    ) -> tuple[list[PublicationRecord], list[PublicationRecord], list[PublicationRecord]]:
+        """
+        Deduplica e adiciona à session os registros de UM bloco (sem commit).
+
+        Dedup em duas camadas:
+          (a) legal_one_update_id (id único do Legal One) → duplicata exata
+          (b) (linked_lawsuit_id, publication_date) → mesma publicação de um
+              mesmo processo no mesmo dia é tratada uma única vez,
+              economizando tokens de classificação e chamadas à API do L1.
+
+        Os dois conjuntos são sondados no banco SÓ pros ids deste bloco (IN
+        em chunks, via índices de legal_one_update_id e linked_lawsuit_id).
+        Blocos anteriores já estão commitados, então a sondagem os enxerga.
+        """
+        existing_ids = self._probe_existing_update_ids(
+            pub.get("id") for pub in publications
+        )
+
+        # Chaves (lawsuit_id, publication_date) já presentes em registros
+        # "vivos" (não descartados). Mesmo conjunto coberto pelo índice
+        # único parcial uq_pub_lawsuit_date.
+        existing_keys = self._probe_live_lawsuit_date_keys(
+            (
+                next(
+                    (
+                        r.get("linkId")
+                        for r in (pub.get("relationships") or [])
+                        if r.get("linkType") == "Litigation"
+                    ),
+                    None,
+                )
+                for pub in publications
+            )
+        )
+
+        new_records: List[PublicationRecord] = []
+        duplicate_records: List[PublicationRecord] = []
+        obsolete_records: List[PublicationRecord] = []
+
+        for pub in publications:
+            update_id = pub.get("id")
+            if not update_id:
+                continue
+
+            if update_id in existing_ids:
+                counts["dup"] += 1
+                continue
+
+            relationships = pub.get("relationships") or []
+            lawsuit_rel = next(
+                (r for r in relationships if r.get("linkType") == "Litigation"),
+                None,
+            )
+            lawsuit_id = lawsuit_rel.get("linkId") if lawsuit_rel else None
+            publication_date = pub.get("date")
+
+            # Guarda (lawsuit_id, publication_date): se já temos uma
+            # publicação viva do mesmo processo no mesmo dia, descartamos
+            # — insere marcada para rastreabilidade sem consumir recursos
+            # de classificação nem colidir com o índice único parcial.
+            dedup_key = (
+                (lawsuit_id, publication_date)
+                if lawsuit_id and publication_date
+                else None
+            )
+            is_lawsuit_date_duplicate = (
+                dedup_key is not None and dedup_key in existing_keys
+            )
+
+            # ── Detecção de publicação obsoleta ─────────────────
+            # Se a data da publicação é anterior à data de criação
+            # da pasta do processo no Legal One, a publicação já
+            # foi auditada na esteira de admissão → obsoleta.
+            is_obsolete = False
+            if not is_lawsuit_date_duplicate and publication_date:
+                lawsuit_creation = pub.get("_lawsuit_creation_date")
+                if lawsuit_creation:
+                    try:
+                        # Datas podem vir como ISO completo ou só "YYYY-MM-DD"
+                        pub_dt = publication_date[:10]
+                        law_dt = lawsuit_creation[:10]
+                        if pub_dt < law_dt:
+                            is_obsolete = True
+                    except (TypeError, IndexError):
+                        pass
+
+            # Decide o status final do registro
+            if is_lawsuit_date_duplicate:
+                record_status = RECORD_STATUS_DISCARDED_DUPLICATE
+            elif is_obsolete:
+                record_status = RECORD_STATUS_OBSOLETE
+            else:
+                record_status = RECORD_STATUS_NEW
+
+            cnj = pub.get("_cnj")
+            # Fallback: se não veio processo vinculado pelo L1, tenta extrair
+            # o CNJ direto do texto da publicação (cabeçalho ou corpo).
+            if not cnj:
+                fallback_cnj = extract_cnj_from_text(
+                    (pub.get("description") or "")
+                    + "\n"
+                    + (pub.get("notes") or "")
+                )
+                if fallback_cnj:
+                    cnj = fallback_cnj
+                    logger.debug(
+                        "CNJ extraído do texto (publicação #%s): %s",
+                        update_id, cnj,
+                    )
+            record = PublicationRecord(
+                search_id=search.id,
+                legal_one_update_id=update_id,
+                origin_type=pub.get("originType"),
+                update_type_id=pub.get("typeId"),
+                description=pub.get("description"),
+                notes=pub.get("notes"),
+                publication_date=publication_date,
+                creation_date=pub.get("creationDate"),
+                linked_lawsuit_id=lawsuit_id,
+                linked_lawsuit_cnj=cnj,
+                linked_office_id=pub.get("_responsible_office_id"),
+                raw_relationships=relationships,
+                status=record_status,
+                is_duplicate=is_lawsuit_date_duplicate,
+                uf=uf_from_cnj(cnj),
+            )
+            self.db.add(record)
+            existing_ids.add(update_id)
+
+            # Atualiza existing_keys ASSIM QUE registramos a primeira
+            # publicação com esse par (lawsuit_id, publication_date) —
+            # independente do status final (NOVO, OBSOLETA, etc.). Sem
+            # isso, duas publicações diferentes com o mesmo par dentro
+            # do MESMO bloco geravam UniqueViolation no índice parcial
+            # uq_pub_lawsuit_date. Foi a causa real do travamento das
+            # Buscas #2 e #3 em 22/04/2026 (a #2 ficou órfã porque o
+            # except subsequente não conseguia commitar a marca de FALHA
+            # com a session em estado "transaction rolled back").
+            if dedup_key is not None and not is_lawsuit_date_duplicate:
+                existing_keys.add(dedup_key)
+
+            if is_lawsuit_date_duplicate:
+                counts["discarded"] += 1
+                duplicate_records.append(record)
+            elif is_obsolete:
+                counts["obsolete"] += 1
+                obsolete_records.append(record)
+            else:
+                new_records.append(record)
+                counts["new"] += 1
+
+        return new_records, duplicate_records, obsolete_records
+
+    def _post_persist_chunk(
+        self,
+        search: PublicationSearch,
+        new_records: list[PublicationRecord],
+        duplicate_records: list[PublicationRecord],
+        obsolete_records: list[PublicationRecord],
+    ) -> None:
+        """Propostas de tarefa dos novos + fila do RPA pras duplicatas/obsoletas de um bloco já commitado."""
+        # 6) Tenta construir proposta de tarefa para cada publicação classificada
+        if new_records:
+            self._build_task_proposals(new_records)
+
+        # 7) Duplicatas e obsoletas vão direto pra fila do RPA
+        # com target_status="sem providência": o RPA só marca a
+        # publicação como tratada no Legal One.
+        rpa_records = duplicate_records + obsolete_records
+        if rpa_records:
+            try:
+                from app.services.publication_treatment_service import (
+                    PublicationTreatmentService,
+                )
+                treatment_service = PublicationTreatmentService(self.db)
+                for rec in rpa_records:
+                    treatment_service.sync_item_from_record(rec, commit=False)
+                self.db.commit()
+                logger.info(
+                    "Busca #%s: %s duplicatas + %s obsoletas enfileiradas pro RPA (sem providência).",
+                    search.id, len(duplicate_records), len(obsolete_records),
+                )
+            except Exception as exc:
+                logger.exception(
+                    "Falha ao enfileirar duplicatas/obsoletas da busca #%s: %s",
+                    search.id, exc,
+                )
+                self.db.rollback()
+
     # ──────────────────────────────────────────────
     # Enriquecimento via lookup de processos
     # ──────────────────────────────────────────────
@@ -855,8 +977,11 @@ class PublicationSearchService:
         """
         Classifica cada publicação nova via IA (Claude).
 
-        Limita a concorrência com Semaphore para não extrapolar os rate limits
-        da Anthropic API (requests e tokens por minuto).
+        As chamadas rodam em paralelo até `classifier_max_concurrent`; o ritmo
+        real é ditado pelo limiter adaptativo do `AnthropicClassifierClient`
+        (RPM/TPM lidos dos headers da própria API). A cada
+        `classifier_commit_every` registros concluídos faz commit, então um
+        crash no meio da rodada preserva o que já foi classificado.
         """
         try:
             from app.services.classifier.ai_client import AnthropicClassifierClient
@@ -865,7 +990,7 @@ class PublicationSearchService:
                 build_feedback_examples,
                 build_system_prompt_for_office,
                 build_user_message,
-                load_office_overrides,
+                get_system_prompt_for_office,
             )
             from app.services.classifier.taxonomy import validate_classification, repair_classification
             from app.services.classifier.response_schema import (
@@ -891,12 +1016,14 @@ class PublicationSearchService:
             logger.info("Nenhum registro novo com texto para classificar.")
             return
 
-        logger.info("Classificando %d registros via IA (sequencial, 12s delay)...", len(to_classify))
+        from app.core.config import settings
 
-        # SEQUENCIAL: máximo 1 chamada por vez
-        # 60 segundos ÷ 12 segundos = 5 requests/minuto (exatamente o limite)
-        # Garante que NUNCA peguemos 429 por RPM ou token limit
-        CONCURRENCY = 1
+        CONCURRENCY = max(1, settings.classifier_max_concurrent)
+        COMMIT_EVERY = max(1, settings.classifier_commit_every)
+        logger.info(
+            "Classificando %d registros via IA (até %d em paralelo, commit a cada %d)...",
+            len(to_classify), CONCURRENCY, COMMIT_EVERY,
+        )
 
         # Cache de prompts por escritório (evita recarregar overrides a cada chamada)
         office_prompts: dict[int, str] = {}
@@ -924,27 +1051,23 @@ class PublicationSearchService:
             cache_key = (oid or 0, is_unlinked)
             if cache_key not in office_prompts:
                 try:
-                    if oid:
-                        excluded, custom = load_office_overrides(self.db, oid)
-                    else:
-                        excluded, custom = set(), []
-                    office_prompts[cache_key] = build_system_prompt_for_office(
-                        excluded or None,
-                        custom or None,
+                    # LRU de prompts (classifier/prompts.py): overrides +
+                    # feedbacks + árvore enxuta do escritório, reaproveitado
+                    # entre rodadas e byte-idêntico pro prompt caching.
+                    # Modo arvore enxuta (fase 13): quando o setting
+                    # template_driven_taxonomy esta on, a arvore so inclui
+                    # cats com template ativo do escritorio (ou global). Pra
+                    # publicacoes sem escritorio (oid=None) cai na arvore
+                    # global completa.
+                    office_prompts[cache_key] = get_system_prompt_for_office(
+                        self.db,
+                        oid,
                         is_unlinked=is_unlinked,
-                        feedback_examples=_feedback_for(oid),
                         # Polo do escritorio (Admin > Polo dos Escritorios):
                         # trava a arvore da IA no polo certo (ativo/passivo).
                         # Sem isso a IA via os dois polos e podia gravar a
                         # categoria do lado errado (ver _resolve_office_polo).
                         polo_scope=self._resolve_office_polo(oid),
-                        # Modo arvore enxuta (fase 13): quando o setting
-                        # template_driven_taxonomy esta on, build_taxonomy_text
-                        # filtra a arvore pra so incluir cats com template
-                        # ativo do escritorio (ou global). Pra publicacoes
-                        # sem escritorio (oid=None) nao passamos office —
-                        # caem na arvore global completa.
-                        office_external_id=oid,
                     )
                 except Exception as exc:
                     logger.warning("Falha ao carregar overrides do escritório %s: %s", oid, exc)
@@ -956,6 +1079,24 @@ class PublicationSearchService:
                     )
             return office_prompts[cache_key]
 
+        done = 0
+
+        def _checkpoint() -> None:
+            # Roda no thread do loop, entre awaits — nenhuma outra coroutine
+            # mexe na session durante o commit.
+            nonlocal done
+            done += 1
+            if done % COMMIT_EVERY:
+                return
+            try:
+                self.db.commit()
+            except Exception as exc:
+                logger.warning(
+                    "Checkpoint da classificação falhou (%d/%d): %s",
+                    done, len(to_classify), exc,
+                )
+                self.db.rollback()
+
         async def _classify_all():
             sem = asyncio.Semaphore(CONCURRENCY)
 
@@ -983,9 +1124,9 @@ class PublicationSearchService:
                             )
                             # `_one` é função (não loop) — usa return pra
                             # abortar este registro. asyncio.gather segue
-                            # processando os irmãos. O sleep de 12s lá
-                            # embaixo é skipado, OK — só impacta um
-                            # registro abortado.
+                            # processando os irmãos. O checkpoint lá
+                            # embaixo é skipado, OK — só atrasa o próximo
+                            # commit em um registro.
                             return
 
                         if clean.warnings:
@@ -1033,13 +1174,12 @@ class PublicationSearchService:
                             )
                     except Exception as exc:
                         logger.warning("Falha ao classificar publicação #%s: %s", rec.id, exc)
-                    # Aguarda 12 segundos entre requisições (garante limite de 5 RPM)
-                    # Combinado com CONCURRENCY=1, isso respeita perfeitamente:
-                    # - 5 requests/minuto (RPM)
-                    # - 10,000 tokens/minuto (TPM)
-                    await asyncio.sleep(12.0)
+                    _checkpoint()
 
-            await asyncio.gather(*[_one(r) for r in to_classify], return_exceptions=True)
+            try:
+                await asyncio.gather(*[_one(r) for r in to_classify], return_exceptions=True)
+            finally:
+                await ai.aclose()
 
         # Executa no loop correto (compatível com background thread e async context)
         try:
@@ -1563,7 +1703,7 @@ class PublicationSearchService:
             desc = desc[: self._DESCRIPTION_MAX_CHARS - 1].rstrip() + "…"
         payload["description"] = desc
 
-    def _ensure_endtime_in_future(self, payload: dict) -> None:
+    def _ensure_endtime_in_future(self, payload: dict, cnj: Optional[str] = None) -> None:
         """
         Fallback: garante que `endDateTime` (e `startDateTime` quando
         relevante) não fique no passado, o que faria o L1 retornar 400
@@ -1577,7 +1717,8 @@ class PublicationSearchService:
         do MDR.
 
         Estratégia: se o `endDateTime` do payload já passou, ajusta
-        ambos (start/end) pro fim do **próximo dia útil** (BRT, 23:59:59).
+        ambos (start/end) pro fim do **próximo dia útil** (BRT, 23:59:59)
+        no calendário do tribunal/comarca do `cnj` (nacional sem ele).
         Logamos warning pra rastreabilidade. Modifica o `payload` in-place.
         """
         end_iso = payload.get("endDateTime")
@@ -1598,6 +1739,9 @@ class PublicationSearchService:
             return  # ainda no futuro, OK
 
         # Calcula próximo dia útil em BRT
+        from app.services.prazos_iniciais.calendario_forense import (
+            calendario_do_processo,
+        )
         from app.services.prazos_iniciais.prazo_calculator import add_business_days
         try:
             br_tz = ZoneInfo("America/Sao_Paulo")
@@ -1605,7 +1749,9 @@ class PublicationSearchService:
             from datetime import timezone as _tz, timedelta as _td
             br_tz = _tz(_td(hours=-3))  # fallback simples
         today_brt = datetime.now(br_tz).date()
-        next_busday = add_business_days(today_brt, 1)
+        next_busday = add_business_days(
+            today_brt, 1, calendar=calendario_do_processo(self.db, cnj),
+        )
         local_dt = datetime(
             next_busday.year, next_busday.month, next_busday.day,
             23, 59, 59, tzinfo=br_tz,
@@ -1674,6 +1820,9 @@ class PublicationSearchService:
         posterior do operador).
         """
         from app.models.task_template import TaskTemplate
+        from app.services.prazos_iniciais.calendario_forense import (
+            calendario_do_processo,
+        )
         from app.services.prazos_iniciais.prazo_calculator import add_business_days
         from datetime import date as date_cls
         from sqlalchemy.orm.attributes import flag_modified
@@ -1742,7 +1891,10 @@ class PublicationSearchService:
                 pl = prop.get("payload")
                 if not isinstance(pl, dict):
                     continue
-                due_date = add_business_days(today, tmpl.due_business_days or 5)
+                due_date = add_business_days(
+                    today, tmpl.due_business_days or 5,
+                    calendar=calendario_do_processo(self.db, rec.linked_lawsuit_cnj),
+                )
                 due_iso = _brt_to_utc_z(due_date.isoformat(), "23:59:59")
                 if pl.get("startDateTime") != due_iso or pl.get("endDateTime") != due_iso:
                     pl["startDateTime"] = due_iso
@@ -2150,13 +2302,20 @@ class PublicationSearchService:
             # sábados, domingos e feriados nacionais não incrementam o
             # contador. Antes usávamos `timedelta(days=N)` (dias corridos),
             # o que dava vencimentos no fim de semana e era processualmente
-            # incorreto.
+            # incorreto. Recessos/feriados locais vêm do calendário do
+            # tribunal/comarca do processo.
+            from app.services.prazos_iniciais.calendario_forense import (
+                calendario_do_processo,
+            )
             from app.services.prazos_iniciais.prazo_calculator import (
                 add_business_days,
             )
             due_ref = getattr(tmpl, "due_date_reference", "publication") or "publication"
             due_base = date_cls.today() if due_ref == "today" else base_date
-            due_date = add_business_days(due_base, tmpl.due_business_days or 5)
+            due_date = add_business_days(
+                due_base, tmpl.due_business_days or 5,
+                calendar=calendario_do_processo(self.db, rec.linked_lawsuit_cnj),
+            )
             due_iso = _brt_to_utc_z(due_date.isoformat(), "23:59:59")
 
         publish_iso = _brt_to_utc_z(base_date.isoformat(), "00:00:00")
@@ -3079,6 +3238,7 @@ class PublicationSearchService:
 
         # Captura feedback implícito: se a classificação mudou, registra
         from app.models.classification_feedback import ClassificationFeedback
+        feedback_offices: set[Optional[int]] = set()
         for rec in records:
             if rec.category and rec.category != category or (rec.subcategory or None) != subcategory:
                 excerpt = (rec.description or "")[:500]
@@ -3095,6 +3255,7 @@ class PublicationSearchService:
                         office_external_id=rec.linked_office_id,
                     )
                     self.db.add(fb)
+                    feedback_offices.add(rec.linked_office_id)
 
         for rec in records:
             rec.category = category
@@ -3129,6 +3290,16 @@ class PublicationSearchService:
 
         self.db.commit()
 
+        # Feedback novo entra nos exemplos do prompt: descarta os prompts
+        # cacheados dos escritórios afetados (sem escritório = global, todos).
+        if feedback_offices:
+            from app.services.classifier.prompts import invalidate_system_prompt_cache
+            if None in feedback_offices:
+                invalidate_system_prompt_cache()
+            else:
+                for office_external_id in feedback_offices:
+                    invalidate_system_prompt_cache(office_external_id)
+
         # Reconstrói a proposta de tarefa com o template correspondente à
         # nova classificação (se houver template cadastrado).
         self._build_task_proposals(records)
@@ -3462,13 +3633,19 @@ class PublicationSearchService:
             next(iter(office_candidates)) if len(office_candidates) == 1 else None
         )
 
+        # CNJ do grupo: define o calendário (recessos do tribunal/comarca)
+        # do fallback de data no passado.
+        group_cnj = next(
+            (r.linked_lawsuit_cnj for r in records if r.linked_lawsuit_cnj), None,
+        )
+
         created_task_ids: list[int] = []
         for payload in payloads:
             self._enforce_description_limit(payload)
             self._apply_required_task_defaults(
                 payload, fallback_office_id=fallback_office_id,
             )
-            self._ensure_endtime_in_future(payload)
+            self._ensure_endtime_in_future(payload, cnj=group_cnj)
             created = self.client.create_task(payload)
             if not created or not created.get("id"):
                 # Se o client conseguiu extrair o que o L1 reclamou, usa
@@ -3574,13 +3751,19 @@ class PublicationSearchService:
             next(iter(office_candidates)) if len(office_candidates) == 1 else None
         )
 
+        # CNJ do grupo: define o calendário (recessos do tribunal/comarca)
+        # do fallback de data no passado.
+        group_cnj = next(
+            (r.linked_lawsuit_cnj for r in records if r.linked_lawsuit_cnj), None,
+        )
+
         created_task_ids: list[int] = []
         for payload in payloads:
             self._enforce_description_limit(payload)
             self._apply_required_task_defaults(
                 payload, fallback_office_id=fallback_office_id,
             )
-            self._ensure_endtime_in_future(payload)
+            self._ensure_endtime_in_future(payload, cnj=group_cnj)
             created = self.client.create_task(payload)
             if not created or not created.get("id"):
                 # Se o client conseguiu extrair o que o L1 reclamou, usa
@@ -18,14 +18,24 @@ Duas atuações:
     2. `register_publication_search_watchdog_job()` — registra um job periódico
        no APScheduler (a cada 5 min) que faz a mesma varredura em runtime, pra
        pegar casos onde um worker específico morre sem o container reiniciar.
+
+Retomada:
+    Desde o pipeline em streaming, cada bloco commitado grava `heartbeat_at`
+    e `resume_skip` (o $skip da próxima página do L1). "Órfã" passa a ser
+    "sem heartbeat há ORPHAN_TIMEOUT_MINUTES" — não mais "criada há 30 min",
+    o que matava buscas longas porém vivas. Uma órfã com `resume_skip` é
+    retomada (até `MAX_RESUME_ATTEMPTS`) em vez de marcada FALHA; a retomada
+    é reivindicada num UPDATE condicional, então só 1 worker a executa.
 """
 
 from __future__ import annotations
 
 import logging
+import threading
 from datetime import datetime, timedelta, timezone
 
 from apscheduler.schedulers.base import BaseScheduler
+from sqlalchemy import func, update
 
 from app.db.session import SessionLocal
 from app.models.publication_search import (
@@ -36,9 +46,9 @@ from app.models.publication_search import (
 
 logger = logging.getLogger(__name__)
 
-# Uma busca sem progresso há mais de ORPHAN_TIMEOUT_MINUTES é considerada morta.
-# Escolhido conservador: uma busca real de Diário Oficial (até 5k publicações
-# + lookup de lawsuits + classificação opcional) deve caber nesse intervalo.
+# Uma busca sem heartbeat há mais de ORPHAN_TIMEOUT_MINUTES é considerada morta.
+# O heartbeat avança a cada bloco commitado; buscas sem heartbeat (anteriores
+# ao streaming) usam created_at.
 ORPHAN_TIMEOUT_MINUTES = 30
 
 # Intervalo do job periódico — 5 min é suficiente pra UI não ficar travada
@@ -46,28 +56,83 @@ ORPHAN_TIMEOUT_MINUTES = 30
 WATCHDOG_INTERVAL_MINUTES = 5
 
 
+def _claim_resume(db, search_id: int, threshold: datetime) -> bool:
+    """
+    Reivindica a retomada de forma atômica: só um worker (cada um roda este
+    job no seu APScheduler) consegue mover o heartbeat de uma órfã.
+    """
+    heartbeat = func.coalesce(PublicationSearch.heartbeat_at, PublicationSearch.created_at)
+    result = db.execute(
+        update(PublicationSearch)
+        .where(PublicationSearch.id == search_id)
+        .where(PublicationSearch.status == SEARCH_STATUS_RUNNING)
+        .where(heartbeat < threshold)
+        .values(
+            resume_attempts=func.coalesce(PublicationSearch.resume_attempts, 0) + 1,
+            heartbeat_at=datetime.now(timezone.utc),
+            progress_detail="Retomando após interrupção do worker...",
+        )
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount == 1
+
+
+def _resume_in_background(search_id: int) -> None:
+    """Retoma a busca numa thread daemon com Session e client próprios."""
+
+    def _run() -> None:
+        from app.services.legal_one_client import LegalOneApiClient
+        from app.services.publication_search_service import PublicationSearchService
+
+        db = SessionLocal()
+        try:
+            PublicationSearchService(db, LegalOneApiClient()).resume_search(search_id)
+        except Exception:
+            # O pipeline já marcou FALHA no próprio except.
+            logger.exception("Retomada da busca #%s falhou.", search_id)
+        finally:
+            db.close()
+
+    threading.Thread(
+        target=_run, name=f"publication-search-resume-{search_id}", daemon=True,
+    ).start()
+
+
 def _reap_orphans(reason: str) -> int:
     """
-    Marca como FALHA toda PublicationSearch presa em EXECUTANDO há mais de
-    ORPHAN_TIMEOUT_MINUTES. Retorna o número de registros reapados.
+    Trata toda PublicationSearch presa em EXECUTANDO sem heartbeat há mais de
+    ORPHAN_TIMEOUT_MINUTES: retoma as que têm `resume_skip` e tentativas
+    sobrando, marca as demais como FALHA. Retorna o número de registros
+    tratados.
 
     Abre sua própria Session — seguro de chamar do startup ou de um job
     APScheduler (threads separadas da request loop do FastAPI).
     """
+    from app.services.publication_search_service import PublicationSearchService
+
     threshold = datetime.now(timezone.utc) - timedelta(minutes=ORPHAN_TIMEOUT_MINUTES)
+    heartbeat = func.coalesce(PublicationSearch.heartbeat_at, PublicationSearch.created_at)
 
     db = SessionLocal()
     try:
         orphans = (
             db.query(PublicationSearch)
             .filter(PublicationSearch.status == SEARCH_STATUS_RUNNING)
-            .filter(PublicationSearch.created_at < threshold)
+            .filter(heartbeat < threshold)
             .all()
         )
         if not orphans:
             return 0
 
-        for search in orphans:
+        resumable = [
+            s.id for s in orphans
+            if s.resume_skip is not None
+            and (s.resume_attempts or 0) < PublicationSearchService.MAX_RESUME_ATTEMPTS
+        ]
+        failed = [s for s in orphans if s.id not in resumable]
+
+        for search in failed:
             search.status = SEARCH_STATUS_FAILED
             search.error_message = (
                 f"Busca órfã detectada ({reason}). "
@@ -77,13 +142,25 @@ def _reap_orphans(reason: str) -> int:
             search.finished_at = datetime.now(timezone.utc)
             search.progress_step = "ORPHANED"
             search.progress_detail = "Execução interrompida — marcada como falha pelo watchdog."
-
         db.commit()
-        logger.warning(
-            "Watchdog de publicações reapou %d busca(s) órfã(s): ids=%s",
-            len(orphans), [s.id for s in orphans],
-        )
-        return len(orphans)
+
+        resumed = []
+        for search_id in resumable:
+            if _claim_resume(db, search_id, threshold):
+                _resume_in_background(search_id)
+                resumed.append(search_id)
+
+        if failed:
+            logger.warning(
+                "Watchdog de publicações reapou %d busca(s) órfã(s): ids=%s",
+                len(failed), [s.id for s in failed],
+            )
+        if resumed:
+            logger.warning(
+                "Watchdog de publicações retomou %d busca(s) interrompida(s): ids=%s",
+                len(resumed), resumed,
+            )
+        return len(failed) + len(resumed)
     except Exception:
         db.rollback()
         logger.exception("Falha ao reapear buscas de publicações órfãs.")
@@ -297,9 +297,15 @@ class RecursalBatchClassifier:
         an.valor_condenacao = verdict.valor_condenacao
         an.data_intimacao = verdict.data_intimacao
         # Prazo fatal DETERMINÍSTICO: +N dias úteis a partir da intimação
-        # (10 recurso inominado; 15 demais recursos cíveis).
+        # (10 recurso inominado; 15 demais recursos cíveis), no calendário
+        # do tribunal/comarca do processo (recessos, feriados locais).
+        from app.services.prazos_iniciais.calendario_forense import (
+            calendario_do_processo,
+        )
+
         an.prazo_fatal = self._calc_prazo_fatal(
-            verdict.data_intimacao, verdict.tipo_recurso, verdict.prazo_fatal
+            verdict.data_intimacao, verdict.tipo_recurso, verdict.prazo_fatal,
+            calendar=calendario_do_processo(self.db, an.cnj_number),
         )
         an.confianca = verdict.confianca
         an.pontos_de_atencao = verdict.pontos_de_atencao or None
@@ -324,9 +330,10 @@ class RecursalBatchClassifier:
     # ── Helpers ───────────────────────────────────────────────────────
 
     @staticmethod
-    def _calc_prazo_fatal(data_intimacao, tipo_recurso, fallback):
-        """+N dias úteis a partir da intimação (feriados nacionais). Sem
-        intimação, cai no que a IA achou pronto (fallback)."""
+    def _calc_prazo_fatal(data_intimacao, tipo_recurso, fallback, *, calendar=None):
+        """+N dias úteis a partir da intimação, no `calendar` do processo
+        (nacional se None). Sem intimação, cai no que a IA achou pronto
+        (fallback)."""
         if data_intimacao is None:
             return fallback
         from app.services.prazos_iniciais.prazo_calculator import add_business_days
@@ -334,7 +341,7 @@ class RecursalBatchClassifier:
         # Recurso inominado (JEC) = 10 dias; demais recursos cíveis = 15.
         dias = 10 if tipo_recurso == "RECURSO_INOMINADO" else 15
         try:
-            return add_business_days(data_intimacao, dias)
+            return add_business_days(data_intimacao, dias, calendar=calendar)
         except Exception:
             return fallback
 
@@ -9,13 +9,31 @@ upload nem token. Tesseract é local (grátis, sem taxa por página).
 Degradação graciosa: se pymupdf/pytesseract/o binário tesseract não estiverem
 disponíveis (imagem Docker ainda não reconstruída), retorna [] e o fluxo
 segue com o manifesto de documentos.
+
+Páginas em paralelo: cada página-imagem (render + tesseract) vai pra um
+`ProcessPoolExecutor` (spawn) de `recursal_ocr_workers` processos; os
+resultados são consumidos NA ORDEM DAS PÁGINAS, então os caps dão
+exatamente o mesmo recorte do caminho serial. O pixmap vai direto pro PIL
+(`Image.frombytes`, sem passar por PNG) e o texto fica num cache em disco
+por (hash da imagem da página, idioma, dpi) — reanálise do mesmo PDF não
+chama o tesseract de novo. O cache é podado pelo GC do blob store.
 """
 
 from __future__ import annotations
 
-import io
+import hashlib
 import logging
-from typing import List
+import multiprocessing
+import os
+import tempfile
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +45,15 @@ _MAX_TEXT_FOR_IMAGE = 600
 _MIN_IMAGE_COVER = 0.40   # maior imagem cobre >40% da página
 # Resolução de render pro OCR (equilíbrio qualidade x tempo).
 _DPI = 220
+_LANG = "por"
+# Páginas submetidas à frente do consumidor, por worker: mantém o pool
+# ocupado sem renderizar o PDF inteiro quando o cap corta cedo.
+_WINDOW_PER_WORKER = 2
+
+_MODES = {1: "L", 3: "RGB", 4: "RGBA"}
+
+_lock = threading.Lock()
+_executor: Optional[ProcessPoolExecutor] = None
 
 
 def _maior_cobertura_imagem(page) -> float:
@@ -62,8 +89,8 @@ def ocr_paginas_imagem(
     """
     try:
         import fitz  # PyMuPDF
-        import pytesseract
-        from PIL import Image
+        import pytesseract  # noqa: F401
+        from PIL import Image  # noqa: F401
     except Exception as exc:  # noqa: BLE001
         logger.info("OCR indisponível (dependências ausentes): %s", exc)
         return []
@@ -74,35 +101,240 @@ def ocr_paginas_imagem(
         logger.warning("OCR: falha ao abrir PDF: %s", exc)
         return []
 
-    out: List[dict] = []
-    total = 0
+    # Seleção é barata (texto + bbox das imagens) e fica serial.
+    paginas: List[int] = []
     try:
         for i in range(doc.page_count):
-            if len(out) >= max_pages or total >= max_chars:
-                break
             page = doc.load_page(i)
             texto = (page.get_text() or "").strip()
             if len(texto) >= _MAX_TEXT_FOR_IMAGE:
                 continue  # página com texto de verdade — pdfplumber já pegou
             if _maior_cobertura_imagem(page) < _MIN_IMAGE_COVER:
                 continue  # sem imagem grande = texto esparso ou página em branco
-            try:
-                pix = page.get_pixmap(dpi=_DPI)
-                img = Image.open(io.BytesIO(pix.tobytes("png")))
-                ocr = (pytesseract.image_to_string(img, lang="por") or "").strip()
-            except Exception as exc:  # noqa: BLE001
-                logger.warning("OCR falhou na página %d: %s", i + 1, exc)
-                continue
+            paginas.append(i)
+    finally:
+        doc.close()
+
+    out: List[dict] = []
+    total = 0
+    resultados = _ocr_em_ordem(pdf_bytes, paginas)
+    try:
+        for i, ocr in resultados:
+            if len(out) >= max_pages or total >= max_chars:
+                break
+            ocr = (ocr or "").strip()
             if not ocr:
                 continue
             ocr = ocr[: max(0, max_chars - total)]
             out.append({"pagina": i + 1, "texto": ocr})
             total += len(ocr)
     finally:
-        doc.close()
+        resultados.close()
 
     logger.info(
         "OCR recursal: %d página(s)-imagem recuperada(s) (%d chars).",
         len(out), total,
     )
     return out
+
+
+# ─── Execução por página ──────────────────────────────────────────────
+
+
+def _worker_count() -> int:
+    configured = settings.recursal_ocr_workers
+    if configured > 0:
+        return configured
+    from app.services.prazos_iniciais.pdf_extractor.pool import (
+        cpus_per_uvicorn_worker,
+    )
+
+    return cpus_per_uvicorn_worker()
+
+
+def ocr_cache_root() -> Path:
+    return Path(
+        settings.recursal_ocr_cache_path
+        or Path(settings.prazos_iniciais_storage_path) / "ocr_cache"
+    )
+
+
+def _cache_dir() -> Optional[str]:
+    if not settings.recursal_ocr_cache_enabled:
+        return None
+    return str(ocr_cache_root())
+
+
+def _ocr_em_ordem(
+    pdf_bytes: bytes, paginas: List[int],
+) -> Iterator[Tuple[int, Optional[str]]]:
+    """(índice, texto) de cada página, na ordem de `paginas`.
+
+    Texto None = OCR falhou naquela página (já logado). Fechar o gerador
+    (cap atingido) cancela o que ainda não começou.
+    """
+    cache_dir = _cache_dir()
+    workers = min(_worker_count(), len(paginas))
+    if workers <= 1:
+        yield from _ocr_inline(pdf_bytes, paginas, cache_dir)
+        return
+
+    # Worker abre o PDF pelo caminho — não serializa os bytes a cada página.
+    fd, path = tempfile.mkstemp(prefix="recursal-ocr-", suffix=".pdf")
+    pendentes: deque = deque()
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(pdf_bytes)
+        executor = _get_executor()
+        fila = iter(paginas)
+
+        def _submete() -> None:
+            i = next(fila, None)
+            if i is not None:
+                pendentes.append((i, executor.submit(
+                    _ocr_pagina, path, i, _LANG, _DPI, cache_dir,
+                )))
+
+        for _ in range(workers * _WINDOW_PER_WORKER):
+            _submete()
+        while pendentes:
+            i, future = pendentes.popleft()
+            try:
+                texto: Optional[str] = future.result()
+            except BrokenProcessPool:
+                logger.exception("OCR: pool de páginas caiu — parando na página %d", i + 1)
+                _discard_executor(executor)
+                return
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("OCR falhou na página %d: %s", i + 1, exc)
+                texto = None
+            _submete()
+            yield i, texto
+    finally:
+        for _, future in pendentes:
+            future.cancel()
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+
+def _ocr_inline(
+    pdf_bytes: bytes, paginas: List[int], cache_dir: Optional[str],
+) -> Iterator[Tuple[int, Optional[str]]]:
+    import fitz
+
+    doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+    try:
+        for i in paginas:
+            try:
+                texto: Optional[str] = _render_e_ocr(
+                    doc.load_page(i), _LANG, _DPI, cache_dir,
+                )
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("OCR falhou na página %d: %s", i + 1, exc)
+                texto = None
+            yield i, texto
+    finally:
+        doc.close()
+
+
+def _render_e_ocr(page, lang: str, dpi: int, cache_dir: Optional[str]) -> str:
+    """Render da página + tesseract, com cache pela imagem renderizada."""
+    import pytesseract
+    from PIL import Image
+
+    pix = page.get_pixmap(dpi=dpi)
+    samples = pix.samples
+    cache_file = None
+    if cache_dir:
+        h = hashlib.sha256(f"{pix.width}x{pix.height}x{pix.n}:".encode())
+        h.update(samples)
+        sha = h.hexdigest()
+        cache_file = Path(cache_dir) / f"{lang}-{dpi}" / sha[:2] / f"{sha}.txt"
+        try:
+            texto = cache_file.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            pass
+        except OSError as exc:
+            logger.warning("OCR: cache ilegível %s: %s", cache_file, exc)
+        else:
+            try:
+                os.utime(cache_file)  # hit: o GC poda os menos usados primeiro
+            except OSError:
+                pass
+            return texto
+
+    img = Image.frombytes(_MODES[pix.n], (pix.width, pix.height), samples)
+    texto = pytesseract.image_to_string(img, lang=lang) or ""
+
+    if cache_file is not None:
+        # Vazio também vai pro cache: página em branco não volta pro tesseract.
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+            tmp.write_text(texto, encoding="utf-8")
+            os.replace(tmp, cache_file)
+        except OSError as exc:
+            logger.warning("OCR: não gravou cache %s: %s", cache_file, exc)
+    return texto
+
+
+# ─── Pool de processos ────────────────────────────────────────────────
+
+# Documento aberto no processo worker: páginas seguidas do mesmo PDF não
+# reabrem (e reparseiam o xref) a cada tarefa.
+_worker_doc: Tuple[Optional[str], object] = (None, None)
+
+
+def _init_worker() -> None:
+    # Paralelismo é por página: cada tesseract usa 1 thread, senão N
+    # processos x N threads do OpenMP disputam os mesmos núcleos.
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+
+
+def _ocr_pagina(
+    path: str, index: int, lang: str, dpi: int, cache_dir: Optional[str],
+) -> str:
+    """Roda no processo worker."""
+    global _worker_doc
+    import fitz
+
+    aberto, doc = _worker_doc
+    if aberto != path:
+        if doc is not None:
+            doc.close()
+        doc = fitz.open(path)
+        _worker_doc = (path, doc)
+    return _render_e_ocr(doc.load_page(index), lang, dpi, cache_dir)
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _lock:
+        if _executor is None:
+            workers = _worker_count()
+            _executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+            )
+            logger.info("recursal.ocr: pool de %d workers", workers)
+        return _executor
+
+
+def _discard_executor(executor: ProcessPoolExecutor) -> None:
+    global _executor
+    with _lock:
+        if _executor is executor:
+            _executor = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown_ocr_pool() -> None:
+    """Encerra o pool de OCR (lifespan do app)."""
+    global _executor
+    with _lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
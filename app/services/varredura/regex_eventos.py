@@ -6,6 +6,13 @@ andamento pode disparar varios achados (ex.: texto que fala em
 
 Lista pt-BR explicita, case-insensitive, sem dependencia de LLM.
 Operador ajusta aqui conforme ve falsos positivos/negativos.
+
+Cada padrao declara `gatilhos`: palavras (sem acento, minusculas) que
+OBRIGATORIAMENTE aparecem em qualquer texto que a regex casa. O texto e'
+dobrado uma vez e passa pelo `KeywordMatcher` compartilhado; so' os
+padroes com gatilho presente rodam a regex (a maioria dos andamentos —
+juntadas, conclusos, publicacoes — nao roda nenhuma). Ao mexer numa
+regex, mantenha os gatilhos coerentes.
 """
 
 from __future__ import annotations
@@ -21,12 +28,14 @@ from app.models.varredura import (
     EVENTO_SENTENCA,
     EVENTO_TRANSITO_JULGADO,
 )
+from app.services.keyword_matcher import KeywordMatcher, fold_text
 
 
 class Pattern(NamedTuple):
     tipo: str
     label: str
     regex: re.Pattern
+    gatilhos: tuple[str, ...]
 
 
 # Ordem importa apenas pra prioridade de exibicao no log — todos os
@@ -39,6 +48,7 @@ PATTERNS: tuple[Pattern, ...] = (
             r"audi[êe]ncia[^.]*(designad[ao]|marcad[ao])",
             re.IGNORECASE,
         ),
+        gatilhos=("audiencia",),
     ),
     Pattern(
         tipo=EVENTO_AUDIENCIA_CANCELADA,
@@ -47,30 +57,38 @@ PATTERNS: tuple[Pattern, ...] = (
             r"audi[êe]ncia[^.]*(cancelad[ao]|adiad[ao]|redesignad[ao])",
             re.IGNORECASE,
         ),
+        gatilhos=("audiencia",),
     ),
     Pattern(
         tipo=EVENTO_SENTENCA,
         label="Sentenca",
         regex=re.compile(r"senten[çc]a", re.IGNORECASE),
+        gatilhos=("sentenca",),
     ),
     Pattern(
         tipo=EVENTO_REVELIA,
         label="Revelia",
         regex=re.compile(r"revel(?:ia|izad[ao])", re.IGNORECASE),
+        gatilhos=("revel",),
     ),
     Pattern(
         tipo=EVENTO_TRANSITO_JULGADO,
         label="Transito em julgado",
         regex=re.compile(r"tr[âa]nsito\s+em\s+julgado", re.IGNORECASE),
+        gatilhos=("transito",),
     ),
     Pattern(
         tipo=EVENTO_ARQUIVAMENTO,
         label="Arquivamento",
         regex=re.compile(r"arquivad[ao]|arquivamento", re.IGNORECASE),
+        gatilhos=("arquivad", "arquivamento"),
     ),
 )
 
 
+_GATILHOS = KeywordMatcher(g for p in PATTERNS for g in p.gatilhos)
+
+
 class Detection(NamedTuple):
     tipo: str
     matched_text: str
@@ -81,8 +99,13 @@ def detect_eventos(texto: str) -> list[Detection]:
     que matchou (mesmo texto pode gerar varios)."""
     if not texto:
         return []
+    presentes = set(_GATILHOS.find(fold_text(texto)))
+    if not presentes:
+        return []
     out: list[Detection] = []
     for p in PATTERNS:
+        if presentes.isdisjoint(p.gatilhos):
+            continue
         m = p.regex.search(texto)
         if m:
             out.append(Detection(tipo=p.tipo, matched_text=m.group(0)))
@@ -5,11 +5,15 @@ Fluxo:
   2. Service resolve lawsuit_ids via OfficeLawsuitIndexService + cache da
      API L1. Une os ids dos varios offices.
   3. Cria 1 VarreduraProcessado PENDENTE pra cada lawsuit.
-  4. Dispara subprocess Node em thread daemon — runner abre browser,
-     loga no OnePass, navega DetailsAndamentos de cada processo, raspa
-     andamentos dos ultimos N dias, escreve status.json incrementalmente.
-  5. Thread polla status.json a cada 5s e sincroniza banco. Quando o
-     subprocess termina, sincronizacao final + marca run DONE/FAILED.
+  4. Thread daemon divide os itens em N shards (`varredura_runner_shards`)
+     e sobe 1 subprocess Node por shard — cada runner abre um browser,
+     navega DetailsAndamentos de cada processo e raspa andamentos dos
+     ultimos N dias. So' o 1º shard loga no OnePass; os demais reusam o
+     cookie da sessao (storage state gravado por ele).
+  5. Cada runner acrescenta 1 linha por processo num progress-<k>.jsonl.
+     A thread le a cada 5s so' o que foi acrescentado desde o ultimo
+     offset e aplica no banco em lote. Quando todos terminam, sync final
+     + marca run DONE/FAILED.
 """
 
 from __future__ import annotations
@@ -25,9 +29,10 @@ from datetime import date, datetime, timedelta, timezone
 from pathlib import Path
 from typing import Any, Optional
 
-from sqlalchemy import case, func
+from sqlalchemy import case, func, insert
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.db.session import SessionLocal
 from app.models.legal_one import LegalOneOffice
 from app.models.varredura import (
@@ -729,6 +734,8 @@ class VarreduraService:
 
 _POLL_INTERVAL_SECONDS = 5.0
 _SUBPROCESS_TIMEOUT_HOURS = 4  # safety cap
+# Abaixo disso por shard, o custo de subir mais um browser nao compensa.
+_MIN_ITEMS_POR_SHARD = 25
 
 
 def _run_subprocess_worker(run_id: int) -> None:
@@ -785,10 +792,6 @@ def _run_subprocess_worker_impl(db: Session, run_id: int) -> None:
 
     run_dir = _run_dir(run_id)
     run_dir.mkdir(parents=True, exist_ok=True)
-    input_path = run_dir / "input.json"
-    output_path = run_dir / "status.json"
-    log_path = run_dir / "runner.log"
-    err_path = run_dir / "runner.err.log"
 
     # Marca items como PROCESSANDO em bloco.
     now = _utcnow()
@@ -808,83 +811,158 @@ def _run_subprocess_worker_impl(db: Session, run_id: int) -> None:
     )
     db.commit()
 
-    # Input pro runner.
-    payload_items = []
-    for it in items:
-        payload_items.append(
+    # Divide em shards (round-robin) — 1 processo Node/browser por shard.
+    n_shards = max(
+        1,
+        min(settings.varredura_runner_shards, len(items) // _MIN_ITEMS_POR_SHARD),
+    )
+    payload_items = [
+        {
+            "processadoId": it.id,
+            "lawsuitId": it.lawsuit_id,
+            "cnjNumber": it.cnj_number or "",
+        }
+        for it in items
+    ]
+    storage_state = run_dir / "session-state.json"
+    storage_state.unlink(missing_ok=True)
+    shards = []
+    for k in range(n_shards):
+        input_path = run_dir / f"input-{k}.json"
+        input_path.write_text(
+            json.dumps(
+                {
+                    "windowDays": run.window_days,
+                    "items": payload_items[k::n_shards],
+                },
+                ensure_ascii=False,
+            ),
+            encoding="utf-8",
+        )
+        shards.append(
             {
-                "processadoId": it.id,
-                "lawsuitId": it.lawsuit_id,
-                "cnjNumber": it.cnj_number or "",
+                "k": k,
+                "input": input_path,
+                "progress": run_dir / f"progress-{k}.jsonl",
+                "offset": 0,
+                "proc": None,
             }
         )
-    input_path.write_text(
-        json.dumps(
-            {
-                "windowDays": run.window_days,
-                "items": payload_items,
-            },
-            ensure_ascii=False,
-        ),
-        encoding="utf-8",
-    )
 
-    # Subprocess Node.
     node = resolve_node_binary()
     script = _runner_script()
-    cmd = [
-        node,
-        str(script),
-        "--input",
-        str(input_path),
-        "--output",
-        str(output_path),
-        "--max-attempts",
-        "2",
-    ]
     creds = resolve_web_credentials()
     env = {**os.environ, **creds}
-
     creation_flags = getattr(subprocess, "CREATE_NO_WINDOW", 0)
-    proc = subprocess.Popen(  # noqa: S603
-        cmd,
-        cwd=str(script.parent),
-        env=env,
-        stdout=log_path.open("ab"),
-        stderr=err_path.open("ab"),
-        creationflags=creation_flags,
-    )
-    logger.info(
-        "varredura.worker.subprocess.started run=%s pid=%s items=%s",
-        run_id, proc.pid, len(items),
-    )
+    log_files = []
+
+    def _spawn(shard: dict[str, Any]) -> None:
+        shard["progress"].unlink(missing_ok=True)
+        cmd = [
+            node,
+            str(script),
+            "--input",
+            str(shard["input"]),
+            "--output",
+            str(run_dir / f"status-{shard['k']}.json"),
+            "--progress",
+            str(shard["progress"]),
+            "--storage-state",
+            str(storage_state),
+            "--max-attempts",
+            "2",
+        ]
+        stdout = (run_dir / f"runner-{shard['k']}.log").open("ab")
+        stderr = (run_dir / f"runner-{shard['k']}.err.log").open("ab")
+        log_files.extend([stdout, stderr])
+        shard["proc"] = subprocess.Popen(  # noqa: S603
+            cmd,
+            cwd=str(script.parent),
+            env=env,
+            stdout=stdout,
+            stderr=stderr,
+            creationflags=creation_flags,
+        )
+        logger.info(
+            "varredura.worker.subprocess.started run=%s shard=%s/%s pid=%s",
+            run_id, shard["k"], n_shards, shard["proc"].pid,
+        )
+
+    def _sync() -> None:
+        for shard in shards:
+            if shard["proc"] is not None:
+                records, shard["offset"] = _tail_progress(
+                    shard["progress"], shard["offset"],
+                )
+                if records:
+                    _apply_outcomes(db, run_id, records)
 
-    # Poll loop: enquanto subprocess vivo, sync periodico com banco.
     deadline = time.monotonic() + _SUBPROCESS_TIMEOUT_HOURS * 3600
-    last_synced = -1
-    while True:
-        ret = proc.poll()
-        if ret is not None:
-            break
-        if time.monotonic() > deadline:
-            logger.warning(
-                "varredura.worker.subprocess.timeout run=%s pid=%s",
-                run_id, proc.pid,
-            )
-            proc.terminate()
-            try:
-                proc.wait(timeout=10)
-            except subprocess.TimeoutExpired:
-                proc.kill()
-            break
-        # Sync intermediario do status.json (best-effort)
-        last_synced = _sync_from_status_file(
-            db, run_id, output_path, last_synced
-        )
-        time.sleep(_POLL_INTERVAL_SECONDS)
+    try:
+        # 1º shard loga no OnePass e grava o cookie; os demais sobem
+        # depois, reaproveitando a sessao (evita N logins simultaneos).
+        _spawn(shards[0])
+        if n_shards > 1:
+            login_deadline = time.monotonic() + settings.varredura_login_wait_seconds
+            while (
+                not storage_state.exists()
+                and shards[0]["proc"].poll() is None
+                and time.monotonic() < login_deadline
+            ):
+                time.sleep(1.0)
+            for shard in shards[1:]:
+                _spawn(shard)
+
+        # Poll loop: enquanto algum shard vivo, le o que foi acrescentado
+        # nos JSONL desde o ultimo offset e aplica no banco.
+        while any(sh["proc"].poll() is None for sh in shards):
+            if time.monotonic() > deadline:
+                logger.warning(
+                    "varredura.worker.subprocess.timeout run=%s", run_id,
+                )
+                for sh in shards:
+                    if sh["proc"].poll() is None:
+                        sh["proc"].terminate()
+                for sh in shards:
+                    try:
+                        sh["proc"].wait(timeout=10)
+                    except subprocess.TimeoutExpired:
+                        sh["proc"].kill()
+                break
+            _sync()
+            time.sleep(_POLL_INTERVAL_SECONDS)
+
+        # Sync final.
+        _sync()
+    finally:
+        for fh in log_files:
+            fh.close()
+        storage_state.unlink(missing_ok=True)
 
-    # Sync final.
-    _sync_from_status_file(db, run_id, output_path, last_synced, final=True)
+    # Items sem linha no JSONL (shard morreu/timeout) nao foram varridos.
+    (
+        db.query(VarreduraProcessado)
+        .filter(
+            VarreduraProcessado.run_id == run_id,
+            VarreduraProcessado.queue_status == QUEUE_STATUS_PROCESSING,
+        )
+        .update(
+            {
+                "queue_status": QUEUE_STATUS_FAILED,
+                "last_reason": "runner_no_result",
+                "last_error": "Runner terminou sem devolver resultado pro processo.",
+                "completed_at": _utcnow(),
+                "updated_at": _utcnow(),
+            },
+            synchronize_session=False,
+        )
+    )
+    db.commit()
+    failed_shards = [
+        (sh["k"], sh["proc"].returncode)
+        for sh in shards
+        if sh["proc"].returncode != 0
+    ]
 
     # Resumo: marca run como DONE se tudo OK, FAILED se algum erro.
     run = db.query(VarreduraRun).filter(VarreduraRun.id == run_id).first()
@@ -928,16 +1006,14 @@ def _run_subprocess_worker_impl(db: Session, run_id: int) -> None:
     )
     run.total_falhas = int(processados_fail or 0)
     run.total_achados = int(total_achados or 0)
-    if proc.returncode == 0 and run.total_falhas == 0:
-        run.status = RUN_STATUS_DONE
-    elif proc.returncode == 0:
-        run.status = RUN_STATUS_DONE  # com falhas parciais
+    if not failed_shards:
+        run.status = RUN_STATUS_DONE  # possivelmente com falhas parciais
     else:
         run.status = RUN_STATUS_FAILED
         if not run.error_message:
             run.error_message = (
-                f"Subprocess Node terminou com returncode={proc.returncode}. "
-                f"Veja {err_path}."
+                "Subprocess Node terminou com erro (shard, returncode): "
+                f"{failed_shards}. Veja {run_dir}/runner-<shard>.err.log."
             )
     run.completed_at = _utcnow()
     db.commit()
@@ -951,116 +1027,148 @@ def _run_subprocess_worker_impl(db: Session, run_id: int) -> None:
     )
 
 
-def _sync_from_status_file(
-    db: Session,
-    run_id: int,
-    status_path: Path,
-    last_synced_index: int,
-    *,
-    final: bool = False,
-) -> int:
-    """Le o status.json escrito pelo runner Node e atualiza items+achados.
-
-    Retorna o ultimo indice sincronizado.
-    """
-    if not status_path.exists():
-        return last_synced_index
+def _tail_progress(
+    progress_path: Path, offset: int,
+) -> tuple[list[dict[str, Any]], int]:
+    """Le as linhas completas acrescentadas ao JSONL do runner desde
+    `offset`. Linha ainda sendo escrita (sem "\\n") fica pro proximo tick.
 
+    Retorna (registros, novo offset).
+    """
     try:
-        data = json.loads(status_path.read_text(encoding="utf-8"))
-    except (OSError, ValueError):
-        return last_synced_index
-
-    items: list[dict[str, Any]] = data.get("items") or []
-    new_last = last_synced_index
-    for idx, it in enumerate(items):
-        if idx <= last_synced_index and not final:
-            continue
-        status = (it.get("status") or "").lower()
-        if status not in {"ok", "error", "pending"}:
+        with progress_path.open("rb") as fh:
+            fh.seek(offset)
+            chunk = fh.read()
+    except OSError:
+        return [], offset
+    end = chunk.rfind(b"\n")
+    if end < 0:
+        return [], offset
+    records = []
+    for line in chunk[: end + 1].splitlines():
+        if not line.strip():
             continue
-        processado_id = it.get("processadoId")
-        if not processado_id:
-            continue
-        if status == "pending" and not final:
-            # ainda em processamento — skip
+        try:
+            records.append(json.loads(line))
+        except ValueError:
+            logger.warning("varredura.progress.linha_invalida path=%s", progress_path)
+    return records, offset + end + 1
+
+
+def read_run_items(run_dir: Path) -> list[dict[str, Any]]:
+    """Resultado por processo de uma run, no formato de `items[]` do
+    status.json do runner (processadoId, lawsuitId, cnjNumber, status,
+    andamentos, error).
+
+    Runs em shards nao tem mais `items` no status.json: parte dos
+    input-<k>.json (tudo "pending") e aplica por cima as linhas dos
+    progress-<k>.jsonl. Runs antigas, de runner unico, leem o status.json.
+    """
+    status_path = run_dir / "status.json"
+    if status_path.exists():
+        try:
+            data = json.loads(status_path.read_text(encoding="utf-8"))
+        except ValueError:
+            data = {}
+        if data.get("items"):
+            return data["items"]
+
+    items: dict[Any, dict[str, Any]] = {}
+    for input_path in sorted(run_dir.glob("input-*.json")):
+        try:
+            data = json.loads(input_path.read_text(encoding="utf-8"))
+        except ValueError:
             continue
-        _apply_item_outcome(db, run_id, processado_id, it)
-        new_last = idx
-    return new_last
+        for it in data.get("items") or []:
+            items[it.get("processadoId")] = {
+                **it,
+                "status": "pending",
+                "andamentos": [],
+                "error": None,
+            }
+    for progress_path in sorted(run_dir.glob("progress-*.jsonl")):
+        records, _ = _tail_progress(progress_path, 0)
+        for rec in records:
+            items[rec.get("processadoId")] = rec
+    return list(items.values())
 
 
-def _apply_item_outcome(
+def _apply_outcomes(
     db: Session,
     run_id: int,
-    processado_id: int,
-    item: dict[str, Any],
+    records: list[dict[str, Any]],
 ) -> None:
-    """Persiste resultado de 1 processo (status + andamentos -> achados)."""
-    p = (
+    """Persiste o resultado de um lote de processos (status + andamentos ->
+    achados): 1 SELECT dos processados, achados num INSERT em lote e 1
+    commit por lote.
+    """
+    by_id = {
+        r.get("processadoId"): r
+        for r in records
+        if r.get("processadoId")
+        and (r.get("status") or "").lower() in {"ok", "error"}
+    }
+    if not by_id:
+        return
+    processados = (
         db.query(VarreduraProcessado)
         .filter(
-            VarreduraProcessado.id == processado_id,
             VarreduraProcessado.run_id == run_id,
+            VarreduraProcessado.id.in_(list(by_id)),
         )
-        .first()
+        .all()
     )
-    if p is None:
-        return
-    if p.queue_status in {QUEUE_STATUS_COMPLETED, QUEUE_STATUS_FAILED}:
-        return  # idempotente
-
-    status = (item.get("status") or "").lower()
-    andamentos = item.get("andamentos") or []
-    error = item.get("error")
 
     now = _utcnow()
-    if status == "error":
-        p.queue_status = QUEUE_STATUS_FAILED
-        p.last_error = (str(error) if error else "Erro desconhecido")[:1000]
-        p.last_reason = "runner_error"
-        p.completed_at = now
+    achados: list[dict[str, Any]] = []
+    for p in processados:
+        if p.queue_status in {QUEUE_STATUS_COMPLETED, QUEUE_STATUS_FAILED}:
+            continue  # idempotente
+        item = by_id[p.id]
         p.updated_at = now
-        db.commit()
-        return
-
-    # status == "ok"
-    p.total_andamentos_lidos = len(andamentos)
-
-    # Aplica regex em cada andamento e cria achados
-    achados_criados = 0
-    for and_ in andamentos:
-        texto = (and_.get("texto") or "").strip()
-        if not texto:
-            continue
-        detections = detect_eventos(texto)
-        if not detections:
+        p.completed_at = now
+        if (item.get("status") or "").lower() == "error":
+            error = item.get("error")
+            p.queue_status = QUEUE_STATUS_FAILED
+            p.last_error = (str(error) if error else "Erro desconhecido")[:1000]
+            p.last_reason = "runner_error"
             continue
-        d = _parse_pt_date(and_.get("data"))
-        for det in detections:
-            db.add(
-                VarreduraAchado(
-                    run_id=run_id,
-                    processado_id=p.id,
-                    lawsuit_id=p.lawsuit_id,
-                    cnj_number=p.cnj_number,
-                    andamento_data=d,
-                    andamento_hora=(and_.get("hora") or "")[:8] or None,
-                    andamento_tipo=(and_.get("tipo") or "")[:64] or None,
-                    andamento_texto=texto,
-                    andamento_movimentado_por=(
-                        (and_.get("movimentadoPor") or "")[:255] or None
-                    ),
-                    tipo_evento=det.tipo,
-                    regex_matched=det.matched_text[:500],
+
+        # status == "ok": aplica regex em cada andamento e cria achados.
+        andamentos = item.get("andamentos") or []
+        p.total_andamentos_lidos = len(andamentos)
+        antes = len(achados)
+        for and_ in andamentos:
+            texto = (and_.get("texto") or "").strip()
+            if not texto:
+                continue
+            detections = detect_eventos(texto)
+            if not detections:
+                continue
+            d = _parse_pt_date(and_.get("data"))
+            for det in detections:
+                achados.append(
+                    {
+                        "run_id": run_id,
+                        "processado_id": p.id,
+                        "lawsuit_id": p.lawsuit_id,
+                        "cnj_number": p.cnj_number,
+                        "andamento_data": d,
+                        "andamento_hora": (and_.get("hora") or "")[:8] or None,
+                        "andamento_tipo": (and_.get("tipo") or "")[:64] or None,
+                        "andamento_texto": texto,
+                        "andamento_movimentado_por": (
+                            (and_.get("movimentadoPor") or "")[:255] or None
+                        ),
+                        "tipo_evento": det.tipo,
+                        "regex_matched": det.matched_text[:500],
+                    }
                 )
-            )
-            achados_criados += 1
-
-    p.total_achados = achados_criados
-    p.queue_status = QUEUE_STATUS_COMPLETED
-    p.completed_at = now
-    p.last_reason = "ok" if achados_criados > 0 else "no_matches"
-    p.last_error = None
-    p.updated_at = now
+        p.total_achados = len(achados) - antes
+        p.queue_status = QUEUE_STATUS_COMPLETED
+        p.last_reason = "ok" if p.total_achados > 0 else "no_matches"
+        p.last_error = None
+
+    if achados:
+        db.execute(insert(VarreduraAchado), achados)
     db.commit()
@@ -0,0 +1,150 @@
+"""
+Exportação XLSX em streaming (openpyxl write-only), compartilhada pelos módulos.
+
+Os exports montavam a lista inteira de linhas (às vezes dicts completos) e um
+`Workbook()` normal — que guarda cada célula como objeto em memória até o
+`save`. Pra snapshot da carteira (~200k processos) isso passava de 1 GB.
+
+Aqui as linhas vêm de um iterável (tipicamente `query.yield_per(...)`, que no
+Postgres vira cursor server-side) e vão direto pro XML da planilha: o
+write-only do openpyxl serializa linha a linha num arquivo temporário por
+aba, então a memória fica constante no tamanho do resultado. O arquivo final
+vai pra disco (`save`/`to_tempfile`) e o endpoint serve com
+`xlsx_file_response`, que apaga o temporário depois de enviar.
+
+Uso:
+    writer = StreamingXlsxWriter()
+    writer.add_sheet("DMIs", headers, (linha(r) for r in q.yield_per(1000)))
+    path = writer.to_tempfile()
+"""
+
+from __future__ import annotations
+
+import itertools
+import os
+import tempfile
+from typing import Any, Iterable, Optional, Sequence
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Font, PatternFill
+from openpyxl.utils import get_column_letter
+from starlette.background import BackgroundTask
+from starlette.responses import FileResponse
+
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+# Largura automática: amostra das primeiras linhas (o write-only exige as
+# larguras antes da 1ª linha), limitada a 8..60 caracteres.
+_AUTO_WIDTH_SAMPLE = 200
+_AUTO_WIDTH_MIN = 8
+_AUTO_WIDTH_MAX = 60
+
+
+class StreamingXlsxWriter:
+    """Workbook write-only: cada `add_sheet` consome o iterável uma única vez."""
+
+    def __init__(
+        self,
+        header_font: Optional[Font] = None,
+        header_fill: Optional[PatternFill] = None,
+    ):
+        self._wb = Workbook(write_only=True)
+        self._header_font = header_font or Font(bold=True)
+        self._header_fill = header_fill
+        self._saved = False
+
+    def add_sheet(
+        self,
+        title: str,
+        headers: Sequence[str],
+        rows: Iterable[Sequence[Any]],
+        *,
+        widths: Optional[Sequence[float]] = None,
+        freeze_header: bool = False,
+    ) -> int:
+        """Escreve header estilizado + linhas. Retorna o nº de linhas de dados.
+
+        `widths=None` calcula a largura pelas primeiras linhas (bufferiza só
+        essa amostra).
+        """
+        ws = self._wb.create_sheet(title=title[:31])
+        rows = iter(rows)
+        sample: list[Sequence[Any]] = []
+        if widths is None:
+            sample = list(itertools.islice(rows, _AUTO_WIDTH_SAMPLE))
+            widths = _auto_widths(headers, sample)
+        for col, width in enumerate(widths, start=1):
+            ws.column_dimensions[get_column_letter(col)].width = width
+        if freeze_header:
+            ws.freeze_panes = "A2"
+
+        ws.append([self._header_cell(ws, h) for h in headers])
+        total = 0
+        for row in itertools.chain(sample, rows):
+            ws.append(row)
+            total += 1
+        return total
+
+    def _header_cell(self, ws, value: str) -> WriteOnlyCell:
+        cell = WriteOnlyCell(ws, value=value)
+        cell.font = self._header_font
+        if self._header_fill is not None:
+            cell.fill = self._header_fill
+        cell.alignment = Alignment(horizontal="left", vertical="center")
+        return cell
+
+    def save(self, path: str) -> int:
+        """Grava em `path` (via arquivo temporário + rename). Retorna o tamanho em bytes."""
+        if self._saved:
+            raise RuntimeError("StreamingXlsxWriter já foi salvo.")
+        if not self._wb.worksheets:
+            self._wb.create_sheet()  # xlsx sem aba não abre no Excel
+        partial = f"{path}.partial"
+        try:
+            self._wb.save(partial)
+            os.replace(partial, path)
+        finally:
+            self._saved = True
+            if os.path.exists(partial):
+                os.unlink(partial)
+        return os.path.getsize(path)
+
+    def to_tempfile(self, prefix: str = "export-") -> str:
+        """Grava num arquivo temporário e devolve o caminho (quem chama apaga)."""
+        fd, path = tempfile.mkstemp(prefix=prefix, suffix=".xlsx")
+        os.close(fd)
+        try:
+            self.save(path)
+        except BaseException:
+            os.unlink(path)
+            raise
+        return path
+
+
+def _auto_widths(headers: Sequence[str], sample: Sequence[Sequence[Any]]) -> list[float]:
+    widths = []
+    for col, header in enumerate(headers):
+        longest = len(str(header))
+        for row in sample:
+            if col < len(row) and row[col] is not None:
+                longest = max(longest, len(str(row[col])))
+        widths.append(min(_AUTO_WIDTH_MAX, max(_AUTO_WIDTH_MIN, longest) + 2))
+    return widths
+
+
+def _unlink_quietly(path: str) -> None:
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+def xlsx_file_response(path: str, filename: str, *, delete_after: bool = True) -> FileResponse:
+    """Serve o XLSX do disco em chunks; por padrão apaga o arquivo depois do envio."""
+    return FileResponse(
+        path,
+        media_type=XLSX_MEDIA_TYPE,
+        filename=filename,
+        background=BackgroundTask(_unlink_quietly, path) if delete_after else None,
+    )
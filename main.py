@@ -273,19 +273,17 @@ async def lifespan(_: FastAPI):
             "Falha ao registrar worker de Contatos LegalOne no startup."
         )
 
-    # Cron diário de cleanup dos PDFs da habilitação (Onda 3).
-    # Pega resíduos: intakes já uplodados pro GED mas com pdf_path != None,
-    # e também arquivos antigos (retenção) de intakes que travaram fora
-    # do fluxo crítico.
+    # GC diário do blob store. Roda antes as políticas de retenção dos
+    # módulos (cleanup dos PDFs da habilitação — Onda 3: intakes já
+    # uplodados pro GED mas com pdf_path != None e retenção de descartes)
+    # e depois apaga os blobs que ninguém mais referencia.
     try:
-        from app.services.prazos_iniciais.pdf_cleanup_worker import (
-            register_pdf_cleanup_job,
-        )
+        from app.services.blob_store.gc_worker import register_blob_gc_job
 
-        register_pdf_cleanup_job(scheduler)
+        register_blob_gc_job(scheduler)
     except Exception:
         logger.exception(
-            "Falha ao registrar worker de cleanup de PDFs de prazos iniciais no startup."
+            "Falha ao registrar o GC do blob store no startup."
         )
 
     # Job diário do módulo Citações BM — puxa processos novos do L1
@@ -364,6 +362,11 @@ async def lifespan(_: FastAPI):
     finally:
         batch_worker.stop()
         scheduler.shutdown()
+        from app.services.prazos_iniciais.pdf_extractor.pool import shutdown_pool
+        from app.services.recursal.ocr import shutdown_ocr_pool
+
+        shutdown_pool()
+        shutdown_ocr_pool()
         logger.info("APScheduler stopped")
 
 
@@ -0,0 +1,137 @@
+"""Benchmark do upload de Base Processual numa planilha sintetica.
+
+Gera um XLSX no layout da Listagem de Acoes Judiciais do L1 (todas as
+colunas de COLUMN_ALIASES) e roda `process_upload` tres vezes:
+
+1. carga inicial — todas as linhas ENTROU;
+2. dry-run da 2a planilha — 10% dos valores mudam, 5% somem, 5% novas;
+3. commit da 2a planilha.
+
+Imprime tempo de parse+classificacao e de escrita por etapa. Por padrao usa
+um sqlite temporario; aponte DATABASE_URL pro Postgres de dev pra medir o
+caminho real (INSERT multi-linha com RETURNING). NUNCA aponte pra producao:
+o script cria e apaga as tabelas base_processual_*.
+
+Uso:
+    python scripts/bench_base_processual_upload.py --rows 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import openpyxl  # noqa: E402
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.models.base_processual import (  # noqa: E402
+    BaseProcessualEvento,
+    BaseProcessualProcesso,
+    BaseProcessualSnapshot,
+    BaseProcessualUpload,
+)
+from app.services.base_processual.upload_processor import process_upload  # noqa: E402
+from app.services.base_processual.xlsx_reader import COLUMN_ALIASES  # noqa: E402
+
+_TABLES = (
+    BaseProcessualUpload,
+    BaseProcessualProcesso,
+    BaseProcessualSnapshot,
+    BaseProcessualEvento,
+)
+_COLUMNS = list(COLUMN_ALIASES)
+_UFS = ("SP", "RJ", "MG", "BA", "PR", "RS")
+
+
+def _row(i: int, valor_delta: int = 0) -> list:
+    values = {
+        "cod_ajus": f"AJ{i:08d}",
+        "numero_processo_mascarado": f"{i % 9999999:07d}-{i % 97:02d}.2024.8.26.{i % 9999:04d}",
+        "empresa": "banco_master",
+        "situacao_processo": "Ativo",
+        "acao_principal": "Acao de cobranca",
+        "materia": "Civel",
+        "polo": "Passivo" if i % 3 else "Ativo",
+        "comarca": f"Comarca {i % 300}",
+        "uf": _UFS[i % len(_UFS)],
+        "usuario_responsavel": f"Advogado {i % 40}",
+        "valor_causa": f"{1000 + (i % 5000) + valor_delta},00",
+        "ult_andamento": f"Andamento {i % 17}",
+        "dias_ult_atualizacao": i % 90,
+        "autores_raw": f"Fulano {i} - 000.000.000-{i % 100:02d}",
+        "reus_raw": "Banco Master S.A. - 33.923.798/0001-00",
+    }
+    return [values.get(c) for c in _COLUMNS]
+
+
+def build_workbook(rows: int, *, second: bool = False) -> bytes:
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append([COLUMN_ALIASES[c][0] for c in _COLUMNS])
+    for i in range(rows):
+        if second and i % 20 == 0:
+            continue  # 5% saem
+        ws.append(_row(i, valor_delta=1 if second and i % 10 == 1 else 0))
+    if second:
+        for i in range(rows, rows + rows // 20):
+            ws.append(_row(i))  # 5% entram
+    buf = io.BytesIO()
+    wb.save(buf)
+    return buf.getvalue()
+
+
+def _timed(label: str, fn):
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    print(
+        f"{label:<28} {elapsed:8.2f}s  novos={result.summary_novos} "
+        f"atualizados={result.summary_atualizados} inalterados={result.summary_inalterados} "
+        f"removidos={result.summary_removidos} status={result.status}"
+    )
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp(prefix="bench_bp_")
+    url = os.environ.get("DATABASE_URL") or f"sqlite:///{tmpdir}/bench.db"
+    engine = create_engine(url)
+    for model in reversed(_TABLES):
+        model.__table__.drop(bind=engine, checkfirst=True)
+    for model in _TABLES:
+        model.__table__.create(bind=engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    start = time.perf_counter()
+    first = build_workbook(args.rows)
+    second = build_workbook(args.rows, second=True)
+    print(f"{'gerar planilhas':<28} {time.perf_counter() - start:8.2f}s  ({len(first) / 1e6:.1f} MB)")
+
+    def run(content: bytes, dry_run: bool = False):
+        with Session() as db:
+            return process_upload(
+                db, filename="bench.xlsx", content=content, uploaded_by_user_id=None, dry_run=dry_run
+            )
+
+    _timed("carga inicial", lambda: run(first))
+    _timed("2a planilha (dry-run)", lambda: run(second, dry_run=True))
+    _timed("2a planilha (commit)", lambda: run(second))
+
+    for model in reversed(_TABLES):
+        model.__table__.drop(bind=engine, checkfirst=True)
+
+
+if __name__ == "__main__":
+    main()
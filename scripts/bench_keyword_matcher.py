@@ -0,0 +1,184 @@
+"""Benchmark do `KeywordMatcher` compartilhado contra as varreduras antigas.
+
+Gera N andamentos (default 300k) no formato dos que chegam da varredura do
+L1 / DataJud — nome do movimento + complemento livre, com acento, caixa
+misturada e quebras de linha — e mede, pra cada consumidor:
+
+- varredura: as 6 regexes IGNORECASE em todo texto (legado) vs
+  `detect_eventos` (dobra 1x + gatilhos + regex só nos candidatos);
+- citacoes_bm: NFKD + filtro de combining por caractere + 3 `in` (legado)
+  vs `avaliar_candidato`;
+- correlação: NFKD/upper + ~20 `in` por categoria (legado) vs 1 `find`
+  no matcher combinado.
+
+Também confere que os resultados batem 1:1 com o legado e mede as
+alternativas descartadas (alternation única e lookahead sobre o texto
+dobrado), pra registrar por que o matcher não usa regex.
+
+Uso:
+    python scripts/bench_keyword_matcher.py --n 300000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import re
+import sys
+import time
+import unicodedata
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.citacoes_bm.heuristic import TERMOS_CITACAO, avaliar_candidato  # noqa: E402
+from app.services.keyword_matcher import fold_text  # noqa: E402
+from app.services.process_monitoring.correlation_service import ProcessCorrelationService  # noqa: E402
+from app.services.varredura.regex_eventos import PATTERNS, detect_eventos  # noqa: E402
+
+_MOVIMENTOS = (
+    "Juntada de Petição de manifestação",
+    "Conclusos para despacho",
+    "Conclusos para decisão",
+    "Publicado Intimação em {data}",
+    "Disponibilizado no DJ Eletrônico em {data}",
+    "Expedição de Mandado de Citação",
+    "Expedida/certificada - Citação",
+    "Decorrido prazo de BANCO MASTER S.A. em {data}",
+    "Remetidos os Autos (em grau de recurso) para Instância Superior",
+    "Recebidos os autos",
+    "Mero expediente",
+    "Certidão expedida",
+    "Ato ordinatório praticado",
+    "Audiência de conciliação designada para {data} às 10:00. Local: CEJUSC",
+    "Audiência de instrução redesignada",
+    "Julgado procedente o pedido - Sentença",
+    "Decisão interlocutória - deferida a liminar",
+    "Interposição de Apelação",
+    "Embargos de Declaração opostos",
+    "Decretada a revelia",
+    "Trânsito em Julgado em {data}",
+    "Arquivado Definitivamente",
+    "Baixa Definitiva",
+    "Edital de citação publicado",
+)
+_COMPLEMENTOS = (
+    "",
+    "Prazo: 15 dias.",
+    "Documento assinado eletronicamente por SERVIDOR(A) DA SECRETARIA",
+    "Tipo de documento: Petição intermediária\nAutor: MDR ADVOCACIA",
+    "Vistos etc. Intime-se a parte ré para, querendo, manifestar-se.",
+    "Referente ao evento {n}: INTIMAÇÃO ELETRÔNICA - EXPEDIDA/CERTIFICADA",
+    # Teor de despacho/decisão colado no andamento (comum no L1): longo,
+    # com várias frases — é onde os `[^.]*` das regexes pesam.
+    "Vistos. Trata-se de ação de procedimento comum ajuizada em face do "
+    "réu, em que a parte autora alega cobrança indevida de tarifas "
+    "bancárias e pleiteia a repetição do indébito em dobro, além de "
+    "indenização por danos morais. Citado, o réu apresentou contestação "
+    "arguindo preliminares de ilegitimidade e prescrição. Houve réplica. "
+    "As partes foram intimadas a especificar provas e requereram o "
+    "julgamento antecipado. Defiro a gratuidade requerida. Intimem-se as "
+    "partes para, no prazo comum de 15 dias, manifestarem interesse na "
+    "produção de outras provas, sob pena de preclusão. Cumpra-se.",
+)
+
+
+def _corpus(n: int, seed: int = 42) -> list[str]:
+    rnd = random.Random(seed)
+    out = []
+    for i in range(n):
+        data = f"{rnd.randint(1, 28):02d}/{rnd.randint(1, 12):02d}/2026"
+        mov = rnd.choice(_MOVIMENTOS).format(data=data)
+        comp = rnd.choice(_COMPLEMENTOS).format(n=i % 97)
+        texto = f"{mov}. {comp}" if comp else mov
+        out.append(texto.upper() if rnd.random() < 0.2 else texto)
+    return out
+
+
+# ── Implementações antigas (cópia do que cada módulo fazia) ───────────
+
+
+def _legacy_detect(texto):
+    out = []
+    for p in PATTERNS:
+        m = p.regex.search(texto)
+        if m:
+            out.append((p.tipo, m.group(0)))
+    return out
+
+
+def _legacy_citacao(texto):
+    s = unicodedata.normalize("NFKD", texto)
+    s = "".join(c for c in s if not unicodedata.combining(c)).lower()
+    for termo in TERMOS_CITACAO:
+        if termo in s:
+            return True, termo
+    return False, None
+
+
+_CORR = ProcessCorrelationService
+_CORR_CATEGORIAS = (
+    _CORR.DECISION_KEYWORDS,
+    _CORR.RECURSAL_KEYWORDS,
+    _CORR.TRANSIT_KEYWORDS,
+    _CORR.CLOSURE_SIGNAL_KEYWORDS,
+    _CORR.CLOSURE_CONFIRMED_KEYWORDS,
+    _CORR.CERTIFICATE_KEYWORDS,
+)
+
+
+def _legacy_correlacao(texto):
+    s = unicodedata.normalize("NFKD", texto).encode("ascii", "ignore").decode("ascii")
+    s = " ".join(s.upper().split())
+    return tuple(any(k in s for k in cat) for cat in _CORR_CATEGORIAS)
+
+
+def _nova_correlacao(texto):
+    found = frozenset(_CORR._MATCHER.find(fold_text(texto)))
+    return tuple(not found.isdisjoint(cat) for cat in _CORR_CATEGORIAS)
+
+
+def _timed(label, fn, corpus):
+    t0 = time.perf_counter()
+    res = [fn(t) for t in corpus]
+    dt = time.perf_counter() - t0
+    print(f"  {label:<34} {dt:7.2f}s  {1e6 * dt / len(corpus):6.2f} µs/texto")
+    return res
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--n", type=int, default=300_000)
+    args = parser.parse_args()
+
+    corpus = _corpus(args.n)
+    print(f"corpus: {len(corpus)} andamentos")
+
+    print("varredura (regex_eventos):")
+    antigo = _timed("legado: 6 regexes IGNORECASE", _legacy_detect, corpus)
+    novo = _timed("detect_eventos", lambda t: [tuple(d) for d in detect_eventos(t)], corpus)
+    assert antigo == novo, "detect_eventos divergiu do legado"
+
+    print("citacoes_bm (heuristic):")
+    antigo = _timed("legado: filtro de combining", _legacy_citacao, corpus)
+    novo = _timed("avaliar_candidato", lambda t: avaliar_candidato(t, None), corpus)
+    assert antigo == novo, "avaliar_candidato divergiu do legado"
+
+    print("process_monitoring (correlação):")
+    antigo = _timed("legado: upper + in por categoria", _legacy_correlacao, corpus)
+    novo = _timed("KeywordMatcher combinado", _nova_correlacao, corpus)
+    assert antigo == novo, "correlação divergiu do legado"
+
+    print("alternativas descartadas (texto já dobrado):")
+    dobrados = [fold_text(t) for t in corpus]
+    termos = sorted({fold_text(k) for cat in _CORR_CATEGORIAS for k in cat}, key=len, reverse=True)
+    alternation = re.compile("|".join(map(re.escape, termos)))
+    lookahead = re.compile("(?=(%s))" % "|".join(map(re.escape, termos)))
+    _timed("alternation única (findall)", lambda t: set(alternation.findall(t)), dobrados)
+    _timed("lookahead (sobreposições)", lambda t: {m.group(1) for m in lookahead.finditer(t)}, dobrados)
+    _timed("KeywordMatcher.find", _CORR._MATCHER.find, dobrados)
+    print("resultados idênticos ao legado nos 3 consumidores.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""Latência de endpoints não relacionados durante uploads de PDFs grandes.
+
+Monta um app FastAPI mínimo com:
+- `GET /ping` — endpoint "qualquer" (o que os outros operadores estão
+  usando enquanto alguém sobe um processo);
+- `POST /extract` — chama a extração do jeito antigo (`extract` direto no
+  `async def`) ou pelo pool (`await extract_async`), conforme o modo.
+
+Pra cada modo, dispara N uploads concorrentes (default 10) de um PDF
+grande e, ao mesmo tempo, pinga `/ping` a cada 20ms; reporta p50/p99/max
+do ping e o tempo total dos uploads. Tudo no mesmo event loop via
+`httpx.ASGITransport` — é exatamente o loop do worker Uvicorn.
+
+O PDF grande é montado repetindo as páginas do PDF de `test-data/` até
+`--pages` páginas (pikepdf), ou passe um PDF real com `--pdf`.
+
+Uso:
+    python scripts/bench_pdf_extract_latency.py --uploads 10 --pages 300
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import io
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import httpx  # noqa: E402
+import pikepdf  # noqa: E402
+from fastapi import FastAPI, Request  # noqa: E402
+
+from app.services.prazos_iniciais.pdf_extractor import extract  # noqa: E402
+from app.services.prazos_iniciais.pdf_extractor import pool  # noqa: E402
+
+_ROOT = Path(__file__).resolve().parent.parent
+
+
+def _pdf_grande(path: Path | None, pages: int) -> bytes:
+    src = path or next((_ROOT / "test-data").glob("*.pdf"))
+    if path is not None:
+        return path.read_bytes()
+    with pikepdf.open(src) as base:
+        out = pikepdf.new()
+        n = len(base.pages)
+        for i in range(pages):
+            out.pages.append(base.pages[i % n])
+        buf = io.BytesIO()
+        out.save(buf)
+        return buf.getvalue()
+
+
+def _app(modo: str) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    @app.post("/extract")
+    async def upload(request: Request):
+        body = await request.body()
+        if modo == "inline":
+            result = extract(body)
+        else:
+            try:
+                result = await pool.extract_async(body)
+            except pool.ExtractionPoolSaturated:
+                return {"status": 503}
+        return {"status": 200, "cnj": result.cnj_number}
+
+    return app
+
+
+def _pct(values: list[float], p: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+
+async def _rodar(modo: str, pdf: bytes, aquecimento: bytes, uploads: int) -> None:
+    transport = httpx.ASGITransport(app=_app(modo))
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Aquece (import do pdfplumber / spawn dos workers fora da medição).
+        await client.post("/extract", content=aquecimento)
+
+        latencias: list[float] = []
+        fim = asyncio.Event()
+
+        async def pinger():
+            # Latência medida contra o horário AGENDADO do ping (a cada
+            # 20ms): se o loop travou, o atraso pra disparar também conta —
+            # senão o travamento some da amostra (coordinated omission).
+            agendado = time.perf_counter()
+            while not fim.is_set():
+                agendado += 0.02
+                espera = agendado - time.perf_counter()
+                if espera > 0:
+                    await asyncio.sleep(espera)
+                await client.get("/ping")
+                latencias.append((time.perf_counter() - agendado) * 1000)
+
+        task = asyncio.create_task(pinger())
+        await asyncio.sleep(0.2)
+        t0 = time.perf_counter()
+        respostas = await asyncio.gather(
+            *(client.post("/extract", content=pdf, timeout=None) for _ in range(uploads))
+        )
+        total = time.perf_counter() - t0
+        fim.set()
+        await task
+
+    codigos = [r.json()["status"] for r in respostas]
+    print(
+        f"  {modo:<7} uploads={total:6.1f}s (200={codigos.count(200)} 503={codigos.count(503)})  "
+        f"ping n={len(latencias):4d} p50={statistics.median(latencias):7.1f}ms "
+        f"p99={_pct(latencias, 99):8.1f}ms max={max(latencias):8.1f}ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--uploads", type=int, default=10)
+    parser.add_argument("--pages", type=int, default=300)
+    parser.add_argument("--pdf", type=Path, default=None)
+    parser.add_argument("--workers", type=int, default=0, help="0 = auto (pool.worker_count)")
+    args = parser.parse_args()
+
+    from app.core.config import settings
+
+    if args.workers:
+        settings.prazos_iniciais_extract_workers = args.workers
+    # Benchmark mede latência, não rejeição: fila comporta todos os uploads.
+    settings.prazos_iniciais_extract_queue_max = args.uploads
+
+    pdf = _pdf_grande(args.pdf, args.pages)
+    aquecimento = _pdf_grande(None, 1)
+    print(
+        f"PDF: {len(pdf) / 1024 / 1024:.1f} MB, {args.uploads} uploads concorrentes, "
+        f"pool={pool.worker_count()} workers"
+    )
+    try:
+        for modo in ("inline", "pool"):
+            asyncio.run(_rodar(modo, pdf, aquecimento, args.uploads))
+    finally:
+        pool.shutdown_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Benchmark + diff do motor de texto do pdf_extractor (PyMuPDF x pdfplumber).
+
+Pra cada PDF do corpus roda os dois motores de `text_extractor` com o cache
+desligado e:
+- mede o tempo de cada um (e o de uma leitura do cache em disco);
+- compara página a página com a saída atual (pdfplumber) e lista as que
+  divergirem (diff unificado das primeiras linhas);
+- agrupa por template detectado (PJe, eSAJ, eproc, PROJUDI, fallback) pra
+  mostrar o ganho por sistema — o eSAJ, por exemplo, tende a cair mais no
+  fallback por causa da barra lateral rotacionada.
+
+Corpus: `--corpus DIR` (PDFs em qualquer subpasta). Sem corpus, usa os
+PDFs de `test-data/` e um sintético de `--pages` páginas montado a partir
+deles (pikepdf).
+
+Uso:
+    python scripts/bench_pdf_text_engine.py --corpus /caminho/amostras
+"""
+
+from __future__ import annotations
+
+import argparse
+import difflib
+import io
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.config import settings  # noqa: E402
+from app.services.prazos_iniciais.pdf_extractor import text_extractor as te  # noqa: E402
+from app.services.prazos_iniciais.pdf_extractor.template_detector import (  # noqa: E402
+    detect_template,
+)
+
+_ROOT = Path(__file__).resolve().parent.parent
+
+
+def _corpus(args) -> list[tuple[str, bytes]]:
+    if args.corpus:
+        return [(str(p.relative_to(args.corpus)), p.read_bytes())
+                for p in sorted(Path(args.corpus).rglob("*.pdf"))]
+    import pikepdf
+
+    amostras = sorted((_ROOT / "test-data").glob("*.pdf"))
+    out = [(p.name, p.read_bytes()) for p in amostras]
+    with pikepdf.open(amostras[0]) as base:
+        sint = pikepdf.new()
+        for i in range(args.pages):
+            sint.pages.append(base.pages[i % len(base.pages)])
+        buf = io.BytesIO()
+        sint.save(buf)
+    out.append((f"sintetico-{args.pages}p.pdf", buf.getvalue()))
+    return out
+
+
+def _timed(fn, *a):
+    t0 = time.perf_counter()
+    res = fn(*a)
+    return res, time.perf_counter() - t0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpus", type=Path, default=None)
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--diff-lines", type=int, default=8)
+    args = parser.parse_args()
+
+    por_template: dict[str, list[float]] = defaultdict(lambda: [0, 0.0, 0.0, 0, 0])
+    divergentes = 0
+    for nome, pdf in _corpus(args):
+        try:
+            ref, t_ref = _timed(te._pdfplumber_pages, pdf)
+        except te.PdfTextExtractionError as exc:
+            print(f"{nome}: ilegível ({exc})")
+            continue
+        novo, t_novo = _timed(te._fitz_pages, pdf)
+        template = detect_template(ref).name
+
+        iguais = sum(a == b for a, b in zip(ref, novo))
+        acc = por_template[template]
+        acc[0] += 1
+        acc[1] += t_ref
+        acc[2] += t_novo
+        acc[3] += len(ref)
+        acc[4] += iguais
+        print(
+            f"{nome}: {template} {len(ref)}p  pdfplumber={t_ref:.2f}s "
+            f"auto={t_novo:.2f}s ({t_ref / max(t_novo, 1e-9):.1f}x)  "
+            f"páginas iguais={iguais}/{len(ref)}"
+        )
+        for i, (a, b) in enumerate(zip(ref, novo)):
+            if a != b:
+                divergentes += 1
+                diff = list(difflib.unified_diff(
+                    a.splitlines(), b.splitlines(), f"pdfplumber p{i + 1}", f"auto p{i + 1}",
+                    lineterm="", n=0,
+                ))
+                for linha in diff[: args.diff_lines]:
+                    print(f"    {linha}")
+
+    print("\npor template:")
+    for template, (n, t_ref, t_novo, paginas, iguais) in sorted(por_template.items()):
+        print(
+            f"  {template:<22} pdfs={n:3d} páginas={paginas:5d}  "
+            f"pdfplumber={paginas / max(t_ref, 1e-9):7.1f} p/s  "
+            f"auto={paginas / max(t_novo, 1e-9):7.1f} p/s  iguais={iguais}/{paginas}"
+        )
+
+    # Cache: 2ª extração do mesmo PDF.
+    with tempfile.TemporaryDirectory() as tmp:
+        settings.prazos_iniciais_text_cache_enabled = True
+        settings.prazos_iniciais_text_cache_path = tmp
+        _, pdf = _corpus(args)[-1]
+        _, t_miss = _timed(te.extract_text_pages, pdf)
+        _, t_hit = _timed(te.extract_text_pages, pdf)
+        print(f"\ncache: 1ª extração={t_miss:.3f}s  2ª (hit)={t_hit * 1000:.1f}ms")
+    print(f"páginas divergentes: {divergentes}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Benchmark do índice de dias úteis do `prazo_calculator` contra o laço antigo.
+
+Gera N prazos (default 20k) no formato que o Classificador e a fila AJUS
+calculam — data base espalhada em ±2 anos, 5/15/30 dias úteis ou
+corridos — e mede:
+
+- legado: laço dia a dia (`weekday` + set de feriados por dia);
+- índice, chamada a chamada (`calcular_prazo_final`);
+- índice em lote (`calcular_prazos_finais`: cobre a faixa 1x e só bisecta).
+
+Cada cenário roda com o calendário nacional puro e com o recesso de fim
+de ano (art. 220 CPC) de 6 anos + feriados locais, que é o caso em que
+o laço antigo mais pesa. Confere também que os 3 caminhos dão o mesmo
+resultado.
+
+Uso:
+    python scripts/bench_prazo_calculator.py --n 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.prazos_iniciais import prazo_calculator as pc  # noqa: E402
+
+
+# ── Implementação antiga (cópia do que o módulo fazia) ────────────────
+
+
+def _legacy_util(d, extra):
+    if d.weekday() >= 5:
+        return False
+    if d in pc.feriados_nacionais(d.year):
+        return False
+    return d not in set(extra or [])
+
+
+def _legacy_proximo(d, extra):
+    while not _legacy_util(d, extra):
+        d += timedelta(days=1)
+    return d
+
+
+def _legacy_prazo(base, dias, tipo, extra):
+    if tipo == "corrido":
+        return _legacy_proximo(base + timedelta(days=dias), extra)
+    cur = _legacy_proximo(base + timedelta(days=1), extra)
+    restantes = dias - 1
+    while restantes > 0:
+        cur += timedelta(days=1)
+        if _legacy_util(cur, extra):
+            restantes -= 1
+    return cur
+
+
+def _recesso() -> list[date]:
+    datas = []
+    for ano in range(2024, 2030):
+        inicio = date(ano, 12, 20)
+        datas += [inicio + timedelta(days=i) for i in range(32)]
+    datas += [date(2026, 6, 24), date(2026, 7, 2), date(2027, 6, 24), date(2027, 7, 2)]
+    return datas
+
+
+def _itens(n: int, seed: int = 42):
+    rnd = random.Random(seed)
+    hoje = date(2026, 10, 17)
+    return [
+        (
+            hoje + timedelta(days=rnd.randint(-730, 730)),
+            rnd.choice((5, 15, 15, 30)),
+            rnd.choice(("util", "util", "corrido")),
+        )
+        for _ in range(n)
+    ]
+
+
+def _timed(label, fn, n):
+    t0 = time.perf_counter()
+    res = fn()
+    dt = time.perf_counter() - t0
+    print(f"  {label:<30} {dt:7.3f}s  {1e6 * dt / n:7.2f} µs/prazo")
+    return res
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--n", type=int, default=20_000)
+    args = parser.parse_args()
+
+    itens = _itens(args.n)
+    print(f"{len(itens)} prazos")
+    for nome, extra in (("nacional", None), ("com recesso", _recesso())):
+        cal = pc.calendario(extra)
+        print(f"{nome} ({len(cal.non_working)} datas extras):")
+        antigo = _timed(
+            "legado: laço dia a dia",
+            lambda: [_legacy_prazo(b, d, t, extra) for b, d, t in itens],
+            len(itens),
+        )
+        novo = _timed(
+            "índice: calcular_prazo_final",
+            lambda: [pc.calcular_prazo_final(b, d, t, calendar=cal) for b, d, t in itens],
+            len(itens),
+        )
+        lote = _timed(
+            "índice: calcular_prazos_finais",
+            lambda: pc.calcular_prazos_finais(itens, calendar=cal),
+            len(itens),
+        )
+        assert antigo == novo == lote, "índice divergiu do laço antigo"
+    print("resultados idênticos ao legado.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""Benchmark de memoria/latencia do export "snapshot completo" da Base Processual.
+
+Popula N processos (default 200k) e gera o template snapshot_completo de
+duas formas:
+
+- legado: lista com todas as linhas + `openpyxl.Workbook()` normal salvo em
+  memoria (o que o exporter fazia antes);
+- streaming: `dispatch_template` com o `StreamingXlsxWriter` (write-only,
+  `yield_per`) gravando direto em disco.
+
+Cada modo roda num subprocesso proprio e reporta tempo + pico de RSS
+(`ru_maxrss`), sem o overhead do tracemalloc. Por padrao usa um sqlite
+temporario; aponte DATABASE_URL pro Postgres de dev pra medir com cursor
+server-side. NUNCA aponte pra producao: o script cria e apaga as tabelas
+base_processual_*.
+
+Uso:
+    python scripts/bench_xlsx_export.py --rows 200000
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import openpyxl  # noqa: E402
+from sqlalchemy import create_engine, insert  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.models.base_processual import (  # noqa: E402
+    BaseProcessualEvento,
+    BaseProcessualProcesso,
+    BaseProcessualSnapshot,
+    BaseProcessualUpload,
+    EXPORT_TPL_SNAPSHOT_COMPLETO,
+    PRESENCA_ATIVO,
+)
+from app.services.base_processual.exporter import (  # noqa: E402
+    dispatch_template,
+    gen_snapshot_completo,
+)
+
+_TABLES = (
+    BaseProcessualUpload,
+    BaseProcessualProcesso,
+    BaseProcessualSnapshot,
+    BaseProcessualEvento,
+)
+_UFS = ("SP", "RJ", "MG", "BA", "PR", "RS")
+
+
+class _LegacyWriter:
+    """Reproduz o caminho antigo: materializa as linhas e um Workbook normal."""
+
+    def __init__(self):
+        self.wb = openpyxl.Workbook()
+        self.wb.remove(self.wb.active)
+
+    def add_sheet(self, title, headers, rows, **_kwargs) -> int:
+        rows = list(rows)
+        ws = self.wb.create_sheet(title=title[:31])
+        ws.append(headers)
+        for r in rows:
+            ws.append(r)
+        return len(rows)
+
+    def to_bytes(self) -> bytes:
+        out = io.BytesIO()
+        self.wb.save(out)
+        return out.getvalue()
+
+
+def _seed(Session, rows: int) -> None:
+    batch = []
+    with Session() as db:
+        for i in range(rows):
+            batch.append({
+                "cod_ajus": f"AJ{i:08d}",
+                "numero_processo_mascarado": f"{i % 9999999:07d}-{i % 97:02d}.2024.8.26.{i % 9999:04d}",
+                "empresa": "banco_master",
+                "situacao_processo": "Ativo",
+                "acao_principal": "Acao de cobranca",
+                "materia": "Civel",
+                "comarca": f"Comarca {i % 300}",
+                "uf": _UFS[i % len(_UFS)],
+                "usuario_responsavel": f"Advogado {i % 40}",
+                "valor_causa": 1000 + (i % 5000),
+                "ult_andamento": f"Andamento {i % 17}",
+                "autores_json": [{"nome": f"Fulano {i}"}],
+                "reus_json": [{"nome": "Banco Master S.A."}],
+                "presenca_status": PRESENCA_ATIVO,
+            })
+            if len(batch) == 5000:
+                db.execute(insert(BaseProcessualProcesso), batch)
+                batch = []
+        if batch:
+            db.execute(insert(BaseProcessualProcesso), batch)
+        db.commit()
+
+
+def _measure(label: str, fn) -> None:
+    start = time.perf_counter()
+    total, size = fn()
+    elapsed = time.perf_counter() - start
+    # Linux: ru_maxrss em KB.
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(
+        f"{label:<12} {elapsed:8.2f}s  pico RSS={peak_mb:8.1f} MB  "
+        f"linhas={total}  arquivo={size / 1e6:.1f} MB",
+        flush=True,
+    )
+
+
+def _run_mode(mode: str, url: str, tmpdir: str) -> None:
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=create_engine(url))
+
+    def legado():
+        with Session() as db:
+            writer = _LegacyWriter()
+            total, _params = gen_snapshot_completo(db, {}, writer)
+            return total, len(writer.to_bytes())
+
+    def streaming():
+        target = os.path.join(tmpdir, "snapshot.xlsx")
+        with Session() as db:
+            size, total, _params = dispatch_template(EXPORT_TPL_SNAPSHOT_COMPLETO, db, {}, target)
+        os.unlink(target)
+        return total, size
+
+    _measure(mode, legado if mode == "legado" else streaming)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--only", choices=("legado", "streaming"))
+    parser.add_argument("--url", help=argparse.SUPPRESS)
+    parser.add_argument("--tmpdir", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.only:  # subprocesso: banco ja populado pelo pai
+        _run_mode(args.only, args.url, args.tmpdir)
+        return
+
+    tmpdir = tempfile.mkdtemp(prefix="bench_xlsx_")
+    url = os.environ.get("DATABASE_URL") or f"sqlite:///{tmpdir}/bench.db"
+    engine = create_engine(url)
+    for model in reversed(_TABLES):
+        model.__table__.drop(bind=engine, checkfirst=True)
+    for model in _TABLES:
+        model.__table__.create(bind=engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    start = time.perf_counter()
+    _seed(Session, args.rows)
+    print(f"{'popular':<12} {time.perf_counter() - start:8.2f}s  ({args.rows} processos)", flush=True)
+
+    for mode in ("legado", "streaming"):
+        subprocess.run(
+            [sys.executable, __file__, "--only", mode, "--url", url, "--tmpdir", tmpdir],
+            check=True,
+        )
+
+    for model in reversed(_TABLES):
+        model.__table__.drop(bind=engine, checkfirst=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Migração dos volumes existentes pro blob store (dedup por conteúdo).
+
+Percorre os storages legados — prazos iniciais (inclui o Classificador),
+cópias AJUS e GED LegalOne — e, pra cada arquivo:
+  - calcula o SHA-256;
+  - se ainda não há blob daquele conteúdo, o próprio arquivo vira o blob
+    (hard link, sem cópia);
+  - se já há, troca o arquivo por um hard link pro blob (o espaço da
+    cópia volta pro volume);
+  - registra a referência (namespace, path relativo) em `blob_ref`.
+
+Os paths gravados nas colunas (`pdf_path`, `file_path`...) não mudam.
+Pula os caches de texto/OCR e arquivos `.tmp`. Idempotente: arquivo que
+já é o blob só confirma a referência.
+
+Uso:
+    # dry-run: quanto seria liberado, sem tocar em nada
+    python scripts/blob_dedup.py --dry-run
+
+    # migra de verdade
+    python scripts/blob_dedup.py --commit
+
+    # só um namespace
+    python scripts/blob_dedup.py --commit --namespace ajus
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import sys
+from collections import Counter
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from app.services import blob_store  # noqa: E402
+
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger("blob_dedup")
+
+# Diretórios de cache dentro do storage do PI — não são documentos.
+_SKIP_DIRS = {"text_cache", "ocr_cache"}
+
+
+def _arquivos(root: Path):
+    """Paths relativos (posix) dos arquivos do storage legado."""
+    blobs = blob_store.blob_root().resolve()
+    for dirpath, dirnames, filenames in os.walk(root):
+        here = Path(dirpath)
+        dirnames[:] = sorted(
+            d for d in dirnames
+            if not (here == root and d in _SKIP_DIRS)
+            and (here / d).resolve() != blobs
+        )
+        for name in sorted(filenames):
+            if name.endswith(".tmp"):
+                continue
+            yield (here / name).relative_to(root).as_posix()
+
+
+def _fmt(n: int) -> str:
+    return f"{n / 1024 / 1024:,.1f} MB"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--dry-run", action="store_true", help="Só calcula.")
+    parser.add_argument("--commit", action="store_true", help="Migra (write).")
+    parser.add_argument(
+        "--namespace",
+        choices=sorted(blob_store.namespace_roots()),
+        action="append",
+        help="Restringe a um namespace (repetível). Default: todos.",
+    )
+    args = parser.parse_args()
+    if args.dry_run == args.commit:
+        parser.error("use exatamente um de --dry-run / --commit")
+
+    roots = blob_store.namespace_roots()
+    totais: Counter = Counter()
+    # sha → (dev, inode) do arquivo que é (ou vai ser) o blob.
+    canonico: dict[str, tuple[int, int]] = {}
+    for namespace in args.namespace or sorted(roots):
+        root = roots[namespace]
+        if not root.is_dir():
+            logger.info("%s: %s não existe — pulando", namespace, root)
+            continue
+        ns: Counter = Counter()
+        for rel in _arquivos(root):
+            path = root / rel
+            try:
+                st = path.stat()
+                if args.commit:
+                    sha, freed = blob_store.adopt(namespace, rel)
+                else:
+                    sha = blob_store.sha256_file(path)
+                    freed = _freed_dry_run(sha, path, st, canonico)
+            except OSError as exc:
+                logger.warning("%s/%s: %s", namespace, rel, exc)
+                ns["erros"] += 1
+                continue
+            ns["arquivos"] += 1
+            ns["bytes"] += st.st_size
+            ns["liberados"] += freed
+            ns["duplicados"] += bool(freed)
+        logger.info(
+            "%s: %d arquivos (%s), %d duplicados, %s liberados, %d erros",
+            namespace, ns["arquivos"], _fmt(ns["bytes"]), ns["duplicados"],
+            _fmt(ns["liberados"]), ns["erros"],
+        )
+        totais.update(ns)
+
+    logger.info(
+        "%s: %d arquivos (%s) → %s liberados (%.1f%%), %d erros",
+        "DRY-RUN" if args.dry_run else "TOTAL",
+        totais["arquivos"], _fmt(totais["bytes"]), _fmt(totais["liberados"]),
+        100 * totais["liberados"] / max(totais["bytes"], 1), totais["erros"],
+    )
+    return 1 if totais["erros"] else 0
+
+
+def _freed_dry_run(sha: str, path: Path, st: os.stat_result, canonico: dict) -> int:
+    """O que `adopt` liberaria, sem mexer no disco."""
+    if sha not in canonico:
+        blob = blob_store.blob_path(sha)
+        if not blob.exists():
+            canonico[sha] = (st.st_dev, st.st_ino)
+            return 0
+        bst = blob.stat()
+        canonico[sha] = (bst.st_dev, bst.st_ino)
+    if canonico[sha] == (st.st_dev, st.st_ino) or st.st_nlink > 1:
+        return 0
+    return st.st_size
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
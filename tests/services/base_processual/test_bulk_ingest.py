@@ -0,0 +1,127 @@
+"""Tests do pipeline set-based do upload (bulk_ingest via process_upload)."""
+
+import io
+
+import openpyxl
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models.base_processual import (
+    BaseProcessualEvento,
+    BaseProcessualProcesso,
+    BaseProcessualSnapshot,
+    BaseProcessualUpload,
+    PRESENCA_ATIVO,
+    PRESENCA_REMOVIDO,
+    UPLOAD_STATUS_CONCLUIDO,
+    UPLOAD_STATUS_DRY_RUN,
+    UPLOAD_STATUS_FALHOU,
+)
+from app.services.base_processual.upload_processor import process_upload
+from app.services.base_processual.xlsx_reader import COLUMN_ALIASES
+
+# O leitor exige >= 20 colunas conhecidas no header: usa todas.
+_COLUMNS = list(COLUMN_ALIASES)
+
+
+def _xlsx(rows):
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.append([COLUMN_ALIASES[c][0] for c in _COLUMNS])
+    for cod, valor in rows:
+        values = {
+            "cod_ajus": cod,
+            "numero_processo_mascarado": "0000001-02.2024.8.26.0100",
+            "empresa": "banco_master",
+            "situacao_processo": "Ativo",
+            "valor_causa": valor,
+        }
+        ws.append([values.get(c) for c in _COLUMNS])
+    buf = io.BytesIO()
+    wb.save(buf)
+    return buf.getvalue()
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    for model in (
+        BaseProcessualUpload,
+        BaseProcessualProcesso,
+        BaseProcessualSnapshot,
+        BaseProcessualEvento,
+    ):
+        model.__table__.create(bind=engine)
+    session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    yield session
+    session.close()
+
+
+def _upload(db, rows, **kwargs):
+    return process_upload(
+        db, filename="base.xlsx", content=_xlsx(rows), uploaded_by_user_id=None, **kwargs
+    )
+
+
+def _eventos(db, upload_id):
+    return sorted(
+        (e.cod_ajus, e.tipo_evento, e.changed_fields)
+        for e in db.query(BaseProcessualEvento).filter_by(upload_id=upload_id)
+    )
+
+
+def test_entrou_atualizado_inalterado_saiu_ressurgido(db):
+    first = _upload(db, [("A", "100,00"), ("B", "200,00"), ("C", "300,00")])
+    assert first.status == UPLOAD_STATUS_CONCLUIDO
+    assert (first.summary_novos, first.summary_inalterados) == (3, 0)
+    assert db.query(BaseProcessualSnapshot).count() == 3
+
+    second = _upload(db, [("A", "100,00"), ("B", "250,00"), ("D", "400,00")])
+    assert (
+        second.summary_novos,
+        second.summary_atualizados,
+        second.summary_inalterados,
+        second.summary_removidos,
+    ) == (1, 1, 1, 1)
+    assert _eventos(db, second.upload_id) == [
+        ("B", "ATUALIZADO", {"valor_causa": {"de": "200.00", "para": "250.00"}}),
+        ("C", "SAIU", None),
+        ("D", "ENTROU", None),
+    ]
+    procs = {p.cod_ajus: p for p in db.query(BaseProcessualProcesso)}
+    assert procs["C"].presenca_status == PRESENCA_REMOVIDO
+    assert procs["C"].removed_at_upload_id == second.upload_id
+    assert procs["A"].last_seen_upload_id == second.upload_id
+    b_snapshot = db.get(BaseProcessualSnapshot, procs["B"].current_snapshot_id)
+    assert b_snapshot.upload_id == second.upload_id
+    assert str(procs["B"].valor_causa) == "250.00"
+
+    third = _upload(db, [("A", "100,00"), ("B", "250,00"), ("C", "300,00"), ("D", "400,00")])
+    assert (third.summary_novos, third.summary_inalterados) == (1, 3)
+    assert _eventos(db, third.upload_id) == [("C", "ENTROU", {"_ressurgimento": True})]
+    db.expire_all()
+    c = db.query(BaseProcessualProcesso).filter_by(cod_ajus="C").one()
+    assert c.presenca_status == PRESENCA_ATIVO and c.removed_at_upload_id is None
+
+
+def test_dry_run_previews_without_writing(db):
+    _upload(db, [("A", "100,00"), ("B", "200,00")])
+    snapshots_before = db.query(BaseProcessualSnapshot).count()
+
+    dry = _upload(db, [("A", "150,00"), ("C", "1,00")], dry_run=True)
+
+    assert dry.status == UPLOAD_STATUS_DRY_RUN
+    assert (dry.summary_novos, dry.summary_atualizados, dry.summary_removidos) == (1, 1, 1)
+    assert [e["tipo"] for e in dry.eventos_preview] == ["ATUALIZADO", "ENTROU", "SAIU"]
+    assert db.query(BaseProcessualSnapshot).count() == snapshots_before
+    assert db.query(BaseProcessualProcesso).filter_by(cod_ajus="C").count() == 0
+
+
+def test_repeated_cod_in_file(db):
+    same = _upload(db, [("A", "100,00"), ("A", "100,00")])
+    assert (same.summary_novos, same.summary_inalterados) == (1, 1)
+    assert db.query(BaseProcessualProcesso).count() == 1
+
+    divergent = _upload(db, [("B", "1,00"), ("B", "2,00")])
+    assert divergent.status == UPLOAD_STATUS_FALHOU
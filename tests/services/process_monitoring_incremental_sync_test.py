@@ -0,0 +1,160 @@
+"""
+Sync incremental do DataJud: varredura por `search_after` com `_source`
+enxuto, filtro pela carteira em memória, documento completo só dos processos
+alterados e cursor persistido entre rodadas.
+"""
+import json
+from datetime import datetime, timezone
+
+import httpx
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.models.process_monitoring import (
+    IntegrationSyncCursor,
+    IntegrationSyncRun,
+    MonitoredProcess,
+    MonitoringPortfolio,
+    ProcessPublication,
+)
+from app.services.process_monitoring import DataJudClient, DataJudIncrementalSync
+
+ALIAS = "api_publica_tjce"
+NOSSO = "00012345620248060001"
+OUTRO = "00099995620248060001"
+NOSSO_2 = "00055556620248060001"
+
+
+def _make_session():
+    engine = create_engine("sqlite:///:memory:")
+    for model in (MonitoringPortfolio, MonitoredProcess, ProcessPublication, IntegrationSyncCursor, IntegrationSyncRun):
+        model.__table__.create(bind=engine)
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+
+
+def _doc(cnj, seq, updated_at):
+    return {
+        "_id": f"{cnj}-{seq}",
+        "sort": [seq, f"{cnj}-{seq}"],
+        "_source": {
+            "numeroProcesso": cnj,
+            "tribunal": "TJCE",
+            "grau": "G1",
+            "dataHoraUltimaAtualizacao": updated_at,
+            "@timestamp": updated_at,
+            "movimentos": [
+                {"codigo": 848, "nome": "Transito em julgado", "dataHora": "2026-01-02T10:00:00Z"},
+            ],
+        },
+    }
+
+
+def _fake_datajud(docs, calls):
+    def handler(request: httpx.Request) -> httpx.Response:
+        payload = json.loads(request.content)
+        calls.append(payload)
+        if "bool" in payload["query"]:
+            wanted = {c["match"]["numeroProcesso"] for c in payload["query"]["bool"]["should"]}
+            matching = sorted(
+                (d for d in docs if d["_source"]["numeroProcesso"] in wanted), key=lambda d: d["sort"][0]
+            )
+            after = (payload.get("search_after") or [-1])[0]
+            page = [d for d in matching if d["sort"][0] > after][: payload["size"]]
+            return httpx.Response(
+                200, json={"hits": {"total": {"value": len(matching), "relation": "eq"}, "hits": page}}
+            )
+        after = (payload.get("search_after") or [-1])[0]
+        page = [d for d in docs if d["sort"][0] > after][: payload["size"]]
+        lite = [
+            {**d, "_source": {k: v for k, v in d["_source"].items() if k in payload["_source"]}}
+            for d in page
+        ]
+        return httpx.Response(200, json={"hits": {"hits": lite}})
+
+    return handler
+
+
+def test_sync_pagina_filtra_pela_carteira_e_retoma_do_cursor(monkeypatch):
+    db = _make_session()
+    portfolio = MonitoringPortfolio(name="Carteira", client_name="Cliente")
+    db.add(portfolio)
+    db.flush()
+    db.add(
+        MonitoredProcess(
+            portfolio_id=portfolio.id,
+            process_number=NOSSO,
+            normalized_process_number="0001234-56.2024.8.06.0001",
+        )
+    )
+    db.commit()
+
+    docs = [_doc(OUTRO, i, "2026-01-05T10:00:00Z") for i in range(5)]
+    docs.insert(3, _doc(NOSSO, 2.5, "2026-01-05T10:00:00Z"))
+    calls = []
+    http_client = httpx.Client(transport=httpx.MockTransport(_fake_datajud(docs, calls)))
+    client = DataJudClient(base_url="https://datajud.test", api_key="k", http_client=http_client)
+    monkeypatch.setattr(settings, "datajud_incremental_page_size", 2)
+
+    result = DataJudIncrementalSync(db, client=client).run()
+
+    assert result[ALIAS]["status"] == "SUCCESS"
+    assert result[ALIAS]["hits"] == 6 and result[ALIAS]["evaluated"] == 1
+    scans = [c for c in calls if "range" in c["query"]]
+    fulls = [c for c in calls if "bool" in c["query"]]
+    # 6 docs em páginas de 2 = 4 páginas (a última vazia fecha a varredura) e 1 fetch completo.
+    assert len(scans) == 4 and len(fulls) == 1
+    assert all(c["_source"] == ["numeroProcesso", "dataHoraUltimaAtualizacao", "@timestamp"] for c in scans)
+
+    process = db.query(MonitoredProcess).one()
+    assert process.analytical_status == "ELIGIBLE_FOR_OPERATIONAL_CLOSURE"
+    assert process.queue_name == "VALIDACAO_BAIXA"
+    assert process.last_datajud_update_at.replace(tzinfo=timezone.utc) == datetime(2026, 1, 5, 10, tzinfo=timezone.utc)
+    cursor = db.query(IntegrationSyncCursor).one()
+    assert cursor.tribunal == ALIAS and cursor.cursor_value == [4, f"{OUTRO}-4"]
+
+    # Segunda rodada: retoma do cursor, nada novo, nenhum fetch completo.
+    calls.clear()
+    again = DataJudIncrementalSync(db, client=client).run()
+    assert again[ALIAS]["hits"] == 0 and again[ALIAS]["evaluated"] == 0
+    assert calls[0]["search_after"] == [4, f"{OUTRO}-4"]
+    assert db.query(IntegrationSyncRun).count() == 2
+
+    # Documento reindexado sem mudança em dataHoraUltimaAtualizacao: casa, mas não reavalia.
+    docs.append(_doc(NOSSO, 9, "2026-01-05T10:00:00Z"))
+    calls.clear()
+    third = DataJudIncrementalSync(db, client=client).run()
+    assert third[ALIAS]["matched"] == 1 and third[ALIAS]["evaluated"] == 0
+    assert not any("bool" in c["query"] for c in calls)
+
+
+def test_fetch_completo_nao_trunca_cnj_com_muitos_documentos(monkeypatch):
+    db = _make_session()
+    portfolio = MonitoringPortfolio(name="Carteira", client_name="Cliente")
+    db.add(portfolio)
+    db.flush()
+    for cnj, formatted in ((NOSSO, "0001234-56.2024.8.06.0001"), (NOSSO_2, "0005555-66.2024.8.06.0001")):
+        db.add(MonitoredProcess(portfolio_id=portfolio.id, process_number=cnj, normalized_process_number=formatted))
+    db.commit()
+
+    # NOSSO tem 12 documentos (mais que os 5 por processo previstos no lote)
+    # e o mais recente está depois da 1ª página.
+    docs = [_doc(NOSSO, i, f"2026-01-{5 + (i == 10):02d}T10:00:00Z") for i in range(12)]
+    docs.append(_doc(NOSSO_2, 20, "2026-01-05T10:00:00Z"))
+    calls = []
+    http_client = httpx.Client(transport=httpx.MockTransport(_fake_datajud(docs, calls)))
+    client = DataJudClient(base_url="https://datajud.test", api_key="k", http_client=http_client)
+    monkeypatch.setattr(settings, "datajud_incremental_page_size", 50)
+
+    result = DataJudIncrementalSync(db, client=client).run()
+
+    assert result[ALIAS]["status"] == "SUCCESS"
+    assert result[ALIAS]["matched"] == 2 and result[ALIAS]["evaluated"] == 2
+    fulls = [c for c in calls if "bool" in c["query"]]
+    # Lote (10) cheio -> dividido; NOSSO sozinho (5) ainda cheio -> 3 páginas por search_after.
+    assert [len(c["query"]["bool"]["should"]) for c in fulls] == [2, 1, 1, 1, 1, 1]
+    assert [c.get("search_after") for c in fulls if "sort" in c][1:] == [[4, f"{NOSSO}-4"], [9, f"{NOSSO}-9"]]
+    processes = {p.process_number: p for p in db.query(MonitoredProcess)}
+    assert processes[NOSSO].last_datajud_update_at.replace(tzinfo=timezone.utc) == datetime(
+        2026, 1, 6, 10, tzinfo=timezone.utc
+    )
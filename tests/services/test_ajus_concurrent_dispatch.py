@@ -0,0 +1,150 @@
+"""
+Dispatch concorrente da fila AJUS: claim dos pendentes, várias requests de
+20 em paralelo (limitadas), body JSON com o base64 dos PDFs gerado em
+streaming do disco e devoluções avançadas num UPDATE só.
+"""
+import base64
+import json
+import threading
+import time
+from datetime import date
+
+import requests
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.models.ajus import (
+    AJUS_QUEUE_ERRO,
+    AJUS_QUEUE_PENDENTE,
+    AJUS_QUEUE_SUCESSO,
+    AjusAndamentoQueue,
+    AjusClassificationBlocklist,
+    AjusCodAndamento,
+)
+from app.models.prazo_inicial import (
+    INTAKE_STATUS_DEVOLUCAO_PENDING,
+    INTAKE_STATUS_DEVOLUCAO_SENT,
+    PrazoInicialIntake,
+)
+from app.services.ajus import queue_service
+from app.services.ajus.queue_service import AjusQueueService
+
+
+def _make_session():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+    for model in (PrazoInicialIntake, AjusCodAndamento, AjusClassificationBlocklist, AjusAndamentoQueue):
+        model.__table__.create(bind=engine)
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+
+
+def _seed(db, storage, n):
+    cod = AjusCodAndamento(codigo="HAB", label="Habilitação", situacao="A", informacao_template="x")
+    db.add(cod)
+    db.flush()
+    for i in range(n):
+        cnj = f"{i:07d}1220268050001"
+        rel = f"2026/05/01/{i}.pdf"
+        (storage / rel).parent.mkdir(parents=True, exist_ok=True)
+        # Item 7 tem um HTML de erro no lugar do PDF.
+        (storage / rel).write_bytes(b"<html>erro" if i == 7 else b"%PDF-1.4 " + bytes([i]) * (1000 + i))
+        intake = PrazoInicialIntake(
+            external_id=f"ext-{i}",
+            cnj_number=cnj,
+            capa_json={},
+            integra_json={},
+            status=INTAKE_STATUS_DEVOLUCAO_PENDING if i % 2 else "RECEBIDO",
+        )
+        db.add(intake)
+        db.flush()
+        db.add(
+            AjusAndamentoQueue(
+                intake_id=intake.id,
+                cnj_number=cnj,
+                cod_andamento_id=cod.id,
+                situacao="A",
+                data_evento=date(2026, 5, 1),
+                data_agendamento=date(2026, 5, 4),
+                data_fatal=date(2026, 5, 20),
+                informacao=f"Habilitação {i}",
+                pdf_path=rel,
+                status=AJUS_QUEUE_PENDENTE,
+            )
+        )
+    db.commit()
+
+
+def test_dispatch_concorrente_em_lotes_de_20(monkeypatch, tmp_path):
+    db = _make_session()
+    _seed(db, tmp_path, 45)
+    for key, value in (
+        ("ajus_storage_path", str(tmp_path)),
+        ("ajus_bearer_token", "t"),
+        ("ajus_cliente", "c"),
+        ("ajus_login", "l"),
+        ("ajus_senha", "s"),
+    ):
+        monkeypatch.setattr(settings, key, value)
+
+    bodies = []
+    lock = threading.Lock()
+    em_voo = {"agora": 0, "max": 0}
+
+    def fake_send(self, request, **kwargs):
+        raw = b"".join(request.body)
+        assert int(request.headers["Content-Length"]) == len(raw)
+        assert "Transfer-Encoding" not in request.headers
+        with lock:
+            em_voo["agora"] += 1
+            em_voo["max"] = max(em_voo["max"], em_voo["agora"])
+        time.sleep(0.05)
+        with lock:
+            em_voo["agora"] -= 1
+            payload = json.loads(raw)
+            bodies.append(payload)
+        out = []
+        for p in payload["prazos"]:
+            numero = p["identificadorAcao"]["numeroProcesso"]
+            rejeita = numero.startswith("0000003")
+            out.append({
+                "inserido": not rejeita,
+                "codInformacaoJudicial": None if rejeita else f"COD-{numero}",
+                "msg": "duplicado" if rejeita else None,
+                "identificadorAcao": p["identificadorAcao"],
+            })
+        response = requests.Response()
+        response.status_code = 200
+        response._content = json.dumps(out).encode()
+        response.headers["Content-Type"] = "application/json"
+        response.request = request
+        return response
+
+    monkeypatch.setattr(queue_service.HTTPAdapter, "send", fake_send)
+
+    result = AjusQueueService(db).dispatch_pending_concurrent(max_concurrent=2)
+
+    # 45 itens - 1 reprovado no pre-flight = 44 → 20 + 20 + 4.
+    assert result["requests"] == 3
+    assert sorted(len(b["prazos"]) for b in bodies) == [4, 20, 20]
+    assert 1 <= em_voo["max"] <= 2
+    assert (result["candidates"], result["success_count"], result["error_count"]) == (45, 43, 2)
+
+    enviado = next(p for b in bodies for p in b["prazos"] if p["informacao"] == "Habilitação 5")
+    assert base64.b64decode(enviado["arquivos"][0]["base64"]) == b"%PDF-1.4 " + bytes([5]) * 1005
+    assert enviado["dataFatal"] == "20/05/2026" and bodies[0]["login"] == "l"
+
+    itens = {i.informacao: i for i in db.query(AjusAndamentoQueue)}
+    assert itens["Habilitação 7"].status == AJUS_QUEUE_ERRO
+    assert "magic bytes" in itens["Habilitação 7"].error_message
+    assert itens["Habilitação 3"].status == AJUS_QUEUE_ERRO
+    assert itens["Habilitação 3"].error_message == "duplicado"
+    assert itens["Habilitação 1"].status == AJUS_QUEUE_SUCESSO
+
+    status = {i.external_id: i.status for i in db.query(PrazoInicialIntake)}
+    assert status["ext-1"] == INTAKE_STATUS_DEVOLUCAO_SENT
+    # Rejeitados (3) e reprovados no pre-flight (7) não avançam.
+    assert status["ext-3"] == status["ext-7"] == INTAKE_STATUS_DEVOLUCAO_PENDING
+    assert status["ext-2"] == "RECEBIDO"
+
+    # Nada mais pendente: segunda chamada não dispara request.
+    assert AjusQueueService(db).dispatch_pending_concurrent()["requests"] == 0
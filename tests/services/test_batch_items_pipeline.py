@@ -0,0 +1,394 @@
+"""
+Pipeline de itens do lote: lanes em paralelo com session própria,
+contadores em memória e fingerprint reservado enquanto o item está em voo.
+"""
+import asyncio
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.models.batch_execution import (
+    BATCH_PROCESSOR_SPREADSHEET_INTERACTIVE,
+    BATCH_PROCESSOR_SPREADSHEET_UPLOAD,
+    BATCH_STATUS_COMPLETED,
+    BATCH_STATUS_COMPLETED_WITH_ERRORS,
+    BATCH_STATUS_PENDING,
+    BATCH_STATUS_PROCESSING,
+    BatchExecution,
+    BatchExecutionItem,
+)
+from app.services.batch_task_creation_service import BatchTaskCreationService
+from app.services.batch_utils import InFlightFingerprints
+
+
+def _make_session(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'batch.db'}",
+        connect_args={"check_same_thread": False},
+    )
+    for model in (BatchExecution, BatchExecutionItem):
+        model.__table__.create(bind=engine)
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+
+
+def test_items_run_concurrently_and_counts_match(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "batch_item_concurrency", 3)
+    db = _make_session(tmp_path)
+    execution = BatchExecution(
+        source="Planilha",
+        status=BATCH_STATUS_PROCESSING,
+        start_time=datetime.now(timezone.utc),
+        total_items=6,
+        worker_id="w1",
+    )
+    db.add(execution)
+    db.flush()
+    for idx in range(6):
+        # Linhas 0 e 1 são a mesma tarefa: só uma pode ser criada.
+        fingerprint = "dup" if idx < 2 else f"fp-{idx}"
+        db.add(BatchExecutionItem(
+            execution_id=execution.id,
+            process_number=str(idx),
+            status="PENDENTE",
+            input_data={"fp": fingerprint, "fail": idx == 5},
+        ))
+    db.commit()
+
+    fingerprints = InFlightFingerprints()
+    in_flight = {"now": 0, "max": 0}
+    lock = threading.Lock()
+
+    async def make_lane_handler(lane_db):
+        async def handle(item):
+            with lock:
+                in_flight["now"] += 1
+                in_flight["max"] = max(in_flight["max"], in_flight["now"])
+            try:
+                fp = item.input_data["fp"]
+                if fp in fingerprints or item.input_data["fail"]:
+                    item.status = "FALHA"
+                else:
+                    time.sleep(0.05)  # chamada bloqueante ao L1
+                    item.status = "SUCESSO"
+                    fingerprints.add(fp)
+                lane_db.commit()
+            finally:
+                with lock:
+                    in_flight["now"] -= 1
+        return handle
+
+    service = BatchTaskCreationService(db, client=None)
+    asyncio.run(service._process_items_loop(
+        execution.id,
+        "w1",
+        item_handler=None,
+        handler_factory=make_lane_handler,
+        fingerprints=fingerprints,
+    ))
+
+    db.expire_all()
+    execution = db.get(BatchExecution, execution.id)
+    assert in_flight["max"] > 1
+    assert execution.status == BATCH_STATUS_COMPLETED_WITH_ERRORS
+    assert (execution.success_count, execution.failure_count) == (4, 2)
+
+
+def test_chunk_claim_prefers_execution_without_items_in_flight(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "batch_item_concurrency", 1)
+    db = _make_session(tmp_path)
+    now = datetime.now(timezone.utc)
+    big = BatchExecution(
+        source="Planilha grande", processor_type=BATCH_PROCESSOR_SPREADSHEET_UPLOAD,
+        status=BATCH_STATUS_PENDING, start_time=now - timedelta(hours=1), total_items=6,
+    )
+    small = BatchExecution(
+        source="Planilha pequena", processor_type=BATCH_PROCESSOR_SPREADSHEET_INTERACTIVE,
+        status=BATCH_STATUS_PENDING, start_time=now, total_items=2,
+    )
+    db.add_all([big, small])
+    db.flush()
+    for execution, count in ((big, 6), (small, 2)):
+        for idx in range(count):
+            db.add(BatchExecutionItem(
+                execution_id=execution.id, process_number=str(idx), status="PENDENTE",
+            ))
+    db.commit()
+
+    service = BatchTaskCreationService(db, client=None)
+    # Lote mais antigo primeiro; o bloco respeita o tamanho.
+    execution_id, first_chunk = service.claim_next_item_chunk("w1", chunk_size=4)
+    assert execution_id == big.id and len(first_chunk) == 4
+    # Com o grande já em voo, o próximo worker vai pro pequeno.
+    execution_id, second_chunk = service.claim_next_item_chunk("w2", chunk_size=4)
+    assert execution_id == small.id and len(second_chunk) == 2
+    # Depois, o restante do grande — sem repetir itens do bloco de w1.
+    execution_id, third_chunk = service.claim_next_item_chunk("w3", chunk_size=4)
+    assert execution_id == big.id and set(third_chunk).isdisjoint(first_chunk)
+    assert service.claim_next_item_chunk("w4", chunk_size=4) is None
+
+    async def handle(item):
+        item.status = "SUCESSO"
+        db.commit()
+
+    # w1 termina seu bloco, mas w3 ainda tem itens: o lote não fecha.
+    asyncio.run(service._process_items_loop(
+        big.id, "w1", item_handler=handle, item_ids=first_chunk,
+    ))
+    db.expire_all()
+    assert db.get(BatchExecution, big.id).status == BATCH_STATUS_PROCESSING
+    assert db.get(BatchExecution, big.id).success_count == 4
+
+    asyncio.run(service._process_items_loop(
+        big.id, "w3", item_handler=handle, item_ids=third_chunk,
+    ))
+    db.expire_all()
+    assert db.get(BatchExecution, big.id).status == BATCH_STATUS_COMPLETED
+    assert db.get(BatchExecution, big.id).success_count == 6
+
+
+def test_fingerprint_dedup_probes_only_current_candidates(tmp_path, monkeypatch):
+    from collections import OrderedDict
+
+    from app.services import batch_utils
+
+    monkeypatch.setattr(batch_utils, "_recent_successes", OrderedDict())
+    db = _make_session(tmp_path)
+    execution = BatchExecution(
+        source="Planilha", status=BATCH_STATUS_PROCESSING,
+        start_time=datetime.now(timezone.utc), total_items=3,
+    )
+    db.add(execution)
+    db.flush()
+    for fingerprint, status in (("ja-criada", "SUCESSO"), ("falhou", "FALHA"), ("outra", "SUCESSO")):
+        db.add(BatchExecutionItem(
+            execution_id=execution.id, process_number="1", status=status, fingerprint=fingerprint,
+        ))
+    db.commit()
+
+    probe = batch_utils.make_fingerprint_probe(db.get_bind())
+    calls = []
+
+    def counting_probe(fingerprints):
+        calls.append(sorted(fingerprints))
+        return probe(fingerprints)
+
+    fingerprints = InFlightFingerprints(probe=counting_probe)
+    fingerprints.prime(["ja-criada", "falhou", "nova"])
+    # Uma sonda pro bloco inteiro, só com os candidatos do lote.
+    assert calls == [["falhou", "ja-criada", "nova"]]
+    assert "ja-criada" in fingerprints
+    assert "falhou" not in fingerprints
+    assert "nova" not in fingerprints
+    assert len(calls) == 1
+    # Fora do bloco sondado: consulta avulsa.
+    assert "outra" in fingerprints
+    assert calls[-1] == ["outra"]
+    # Sucessos ficam lembrados no processo e pulam o banco.
+    assert batch_utils.probe_successful_fingerprints(db, ["ja-criada", "x"]) == {"ja-criada"}
+
+
+def test_fingerprint_reservation_spans_chunks_of_different_workers(tmp_path):
+    from app.services.batch_utils import FingerprintReservations
+
+    db = _make_session(tmp_path)
+    execution = BatchExecution(
+        source="Planilha", status=BATCH_STATUS_PROCESSING,
+        start_time=datetime.now(timezone.utc), total_items=3,
+    )
+    db.add(execution)
+    db.flush()
+    items = [
+        BatchExecutionItem(execution_id=execution.id, process_number="1", status="PENDENTE")
+        for _ in range(3)
+    ]
+    db.add_all(items)
+    db.commit()
+    first, second, third = (item.id for item in items)
+
+    # Um InFlightFingerprints por bloco/worker; só o banco é compartilhado.
+    reservations = FingerprintReservations(db.get_bind())
+    worker_a = InFlightFingerprints(reservations=reservations)
+    worker_b = InFlightFingerprints(reservations=reservations)
+
+    worker_a.bind_item(first)
+    assert "dup" not in worker_a  # reservou
+    worker_b.bind_item(second)
+    assert "dup" in worker_b  # em voo no bloco do outro worker: duplicada
+    worker_b.release_pending()
+
+    # Item de A falha: a reserva volta e uma linha igual posterior tenta.
+    db.query(BatchExecutionItem).filter_by(id=first).update({"status": "FALHA"})
+    db.commit()
+    worker_a.release_pending()
+    worker_b.bind_item(third)
+    assert "dup" not in worker_b
+    db.query(BatchExecutionItem).filter_by(id=third).update({"status": "SUCESSO"})
+    db.commit()
+    worker_b.add("dup")
+    worker_b.release_pending()
+
+    db.expire_all()
+    assert db.get(BatchExecutionItem, third).fingerprint_claim == "dup"
+    assert db.get(BatchExecutionItem, first).fingerprint_claim is None
+    # Reentrante: o dono da reserva (reprocessado após lease vencido) passa.
+    assert reservations.reserve(third, "dup")
+    assert not reservations.reserve(first, "dup")
+
+
+def test_chunks_of_same_execution_reuse_caches_and_lawsuit_lookups(tmp_path, monkeypatch):
+    import app.models  # noqa: F401  (mappers com todos os relacionamentos)
+    from app.models.legal_one import (
+        LegalOneOffice,
+        LegalOneTaskSubType,
+        LegalOneTaskType,
+        LegalOneUser,
+    )
+    from app.services import batch_task_creation_service as svc
+    from app.services.batch_strategies.spreadsheet_strategy import SpreadsheetStrategy
+
+    db = _make_session(tmp_path)
+    for model in (LegalOneOffice, LegalOneTaskType, LegalOneTaskSubType, LegalOneUser):
+        model.__table__.create(bind=db.get_bind())
+    db.add_all([
+        LegalOneOffice(external_id=11, name="Centro", path="Escritorio Centro"),
+        LegalOneUser(external_id=22, name="Maria", email="m@x"),
+        LegalOneTaskType(external_id=33, name="Prazo"),
+    ])
+    db.flush()
+    db.add(LegalOneTaskSubType(external_id=44, name="Contestar", parent_type_external_id=33))
+    db.commit()
+
+    loads = []
+    original_load = SpreadsheetStrategy._load_caches
+
+    async def counting_load(self):
+        loads.append(self.db)
+        return await original_load(self)
+
+    monkeypatch.setattr(SpreadsheetStrategy, "_load_caches", counting_load)
+
+    class _Client:
+        searched = []
+
+        def search_lawsuits_by_cnj_numbers(self, numbers):
+            self.searched.append(sorted(numbers))
+            return {n: {"id": 1} for n in numbers}
+
+    execution = BatchExecution(
+        source="Planilha", status=BATCH_STATUS_PROCESSING,
+        start_time=datetime.now(timezone.utc), total_items=3, worker_id="w1",
+    )
+    db.add(execution)
+    db.commit()
+    service = BatchTaskCreationService(db, client=_Client())
+    monkeypatch.setattr(service, "heartbeat_execution", lambda *a, **k: True)
+
+    first, second = "0000001-00.2026.8.26.0001", "0000002-00.2026.8.26.0001"
+    for chunk in ([first, second], [second], [first, second]):
+        prefetch = svc._execution_prefetch(execution.id)
+        caches = asyncio.run(service._spreadsheet_caches(prefetch))
+        lookup, prefetched, stop = service._preload_execution_lawsuits(
+            prefetch, chunk, execution.id, "w1",
+        )
+        assert stop is None and set(chunk) <= prefetched
+
+    assert len(loads) == 1 and loads[0] is not db
+    assert _Client.searched == [sorted([first, second])]
+    # Destacados: legíveis depois de commits em outras sessions, sem lazy load.
+    db.commit()
+    subtype = caches["subtypes"]["contestar"]
+    assert subtype.parent_type.external_id == 33
+    assert caches["users"]["maria"].external_id == 22
+
+    service._finalize_execution(execution)
+    assert execution.id not in svc._prefetch_by_execution
+
+
+def test_chunk_error_fails_only_that_chunk_while_other_worker_runs(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "batch_item_concurrency", 1)
+    db = _make_session(tmp_path)
+    execution = BatchExecution(
+        source="Planilha", processor_type=BATCH_PROCESSOR_SPREADSHEET_INTERACTIVE,
+        status=BATCH_STATUS_PENDING, start_time=datetime.now(timezone.utc), total_items=4,
+    )
+    db.add(execution)
+    db.flush()
+    for idx in range(4):
+        db.add(BatchExecutionItem(
+            execution_id=execution.id, process_number=str(idx), status="PENDENTE", input_data={},
+        ))
+    db.commit()
+
+    service = BatchTaskCreationService(db, client=None)
+    _, chunk_w1 = service.claim_next_item_chunk("w1", chunk_size=2)
+    _, chunk_w2 = service.claim_next_item_chunk("w2", chunk_size=2)
+
+    def preload(prefetch, cnjs, execution_id, worker_id):
+        if worker_id == "w1":
+            raise RuntimeError("L1 fora do ar")
+        return {}, set(), None
+
+    async def handle(item, **kwargs):
+        item.status = "SUCESSO"
+        db.commit()
+
+    monkeypatch.setattr(service, "_preload_execution_lawsuits", preload)
+    monkeypatch.setattr(service, "_process_interactive_item", handle)
+
+    # O bloco de w1 quebra: só os itens dele falham, o lote segue com w2.
+    asyncio.run(service.process_claimed_execution(execution.id, "w1", chunk_w1))
+    db.expire_all()
+    assert db.get(BatchExecution, execution.id).status == BATCH_STATUS_PROCESSING
+    assert {db.get(BatchExecutionItem, i).status for i in chunk_w1} == {"FALHA"}
+    assert {db.get(BatchExecutionItem, i).status for i in chunk_w2} == {"PENDENTE"}
+
+    asyncio.run(service.process_claimed_execution(execution.id, "w2", chunk_w2))
+    db.expire_all()
+    finished = db.get(BatchExecution, execution.id)
+    assert finished.status == BATCH_STATUS_COMPLETED_WITH_ERRORS
+    assert (finished.success_count, finished.failure_count) == (2, 2)
+
+
+def test_claim_finalizes_executions_with_nothing_left_to_claim(tmp_path):
+    db = _make_session(tmp_path)
+    now = datetime.now(timezone.utc)
+    # Upload com todas as linhas filtradas: nenhum item.
+    empty = BatchExecution(
+        source="Planilha", processor_type=BATCH_PROCESSOR_SPREADSHEET_UPLOAD,
+        status=BATCH_STATUS_PENDING, start_time=now, total_items=0,
+    )
+    # Worker morreu depois do último bloco, antes de finalizar.
+    orphan = BatchExecution(
+        source="Planilha", processor_type=BATCH_PROCESSOR_SPREADSHEET_UPLOAD,
+        status=BATCH_STATUS_PROCESSING, start_time=now, total_items=2,
+        worker_id="morto", lease_expires_at=now - timedelta(minutes=5),
+    )
+    # Worker vivo finalizando o próprio lote: não é tocado.
+    live = BatchExecution(
+        source="Planilha", processor_type=BATCH_PROCESSOR_SPREADSHEET_UPLOAD,
+        status=BATCH_STATUS_PROCESSING, start_time=now, total_items=1,
+        worker_id="vivo", lease_expires_at=now + timedelta(minutes=5),
+    )
+    db.add_all([empty, orphan, live])
+    db.flush()
+    db.add_all([
+        BatchExecutionItem(execution_id=orphan.id, process_number="1", status="SUCESSO"),
+        BatchExecutionItem(execution_id=orphan.id, process_number="2", status="FALHA"),
+        BatchExecutionItem(execution_id=live.id, process_number="3", status="SUCESSO"),
+    ])
+    db.commit()
+
+    service = BatchTaskCreationService(db, client=None)
+    assert service.claim_next_item_chunk("w1") is None
+
+    db.expire_all()
+    assert db.get(BatchExecution, empty.id).status == BATCH_STATUS_COMPLETED
+    finished = db.get(BatchExecution, orphan.id)
+    assert finished.status == BATCH_STATUS_COMPLETED_WITH_ERRORS
+    assert (finished.success_count, finished.failure_count) == (1, 1)
+    assert finished.end_time is not None
+    assert db.get(BatchExecution, live.id).status == BATCH_STATUS_PROCESSING
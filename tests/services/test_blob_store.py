@@ -0,0 +1,137 @@
+"""
+Blob store: o mesmo conteúdo subido em prazos iniciais, AJUS e GED
+LegalOne ocupa um blob só (paths legados = hard links), referências
+contadas no banco e GC que só apaga o blob quando ninguém mais aponta.
+"""
+import os
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.config import settings
+from app.models.blob_store import BlobObject, BlobRef
+from app.services import blob_store
+from app.services.blob_store import gc_worker, store
+from app.services.ged_legalone import storage as ged_storage
+from app.services.prazos_iniciais import storage as pin_storage
+
+_PDF = b"%PDF-1.4\n" + b"peticao inicial " * 512
+
+
+@pytest.fixture
+def Session(monkeypatch, tmp_path):
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    BlobObject.__table__.create(engine)
+    BlobRef.__table__.create(engine)
+    factory = sessionmaker(bind=engine, autoflush=False)
+    monkeypatch.setattr(store, "SessionLocal", factory)
+    for key, sub in (
+        ("prazos_iniciais_storage_path", "pin"),
+        ("ajus_storage_path", "ajus"),
+        ("ged_legalone_storage_path", "ged"),
+        ("blob_store_path", "blobs"),
+    ):
+        monkeypatch.setattr(settings, key, str(tmp_path / sub))
+    monkeypatch.setattr(settings, "blob_store_enabled", True)
+    return factory
+
+
+def _ref_count(Session, sha):
+    with Session() as db:
+        obj = db.get(BlobObject, sha)
+        return None if obj is None else obj.ref_count
+
+
+def test_mesmo_conteudo_em_tres_modulos_ocupa_um_blob(Session):
+    pin = pin_storage.save_pdf(_PDF)
+    ged = ged_storage.save_file(_PDF, ext="pdf")
+    ajus = blob_store.store_copy(blob_store.NAMESPACE_AJUS, "2026/10/17/a.pdf", pin.absolute_path)
+
+    blob = blob_store.blob_path(pin.sha256)
+    assert blob.relative_to(blob_store.blob_root()).parts[:3] == (
+        "sha256", pin.sha256[:2], pin.sha256[2:4],
+    )
+    for path in (pin.absolute_path, ged.absolute_path, ajus):
+        assert os.path.samefile(path, blob)
+        assert path.read_bytes() == _PDF
+    assert _ref_count(Session, pin.sha256) == 3
+
+    # Apagar pelo módulo solta a ref; o blob fica enquanto alguém aponta.
+    assert pin_storage.delete_pdf(pin.relative_path)
+    assert ged_storage.delete_file(ged.relative_path)
+    assert _ref_count(Session, pin.sha256) == 1
+    with Session() as db:
+        depois = datetime.now(timezone.utc) + timedelta(days=2)
+        assert gc_worker.collect_garbage(db, now=depois)["blobs_deleted"] == 0
+    assert blob.exists()
+
+    # Última ref: só sai depois da carência.
+    ajus.unlink()
+    assert blob_store.release(blob_store.NAMESPACE_AJUS, "2026/10/17/a.pdf")
+    with Session() as db:
+        assert gc_worker.collect_garbage(db)["blobs_deleted"] == 0
+        stats = gc_worker.collect_garbage(db, now=depois)
+    assert stats["blobs_deleted"] == 1 and stats["bytes_freed"] == len(_PDF)
+    assert not blob.exists()
+    assert _ref_count(Session, pin.sha256) is None
+
+
+def test_adopt_dedup_de_volume_legado_e_refs_orfas(Session, tmp_path):
+    roots = blob_store.namespace_roots()
+    for ns, rel in (("prazos_iniciais", "2026/01/02/x.pdf"), ("ged_legalone", "2026/01/03/y.pdf")):
+        path = roots[ns] / rel
+        path.parent.mkdir(parents=True)
+        path.write_bytes(_PDF)
+
+    sha, freed = blob_store.adopt("prazos_iniciais", "2026/01/02/x.pdf")
+    assert freed == 0  # 1º vira o blob (link, sem cópia)
+    assert blob_store.adopt("ged_legalone", "2026/01/03/y.pdf") == (sha, len(_PDF))
+    assert blob_store.adopt("ged_legalone", "2026/01/03/y.pdf") == (sha, 0)  # idempotente
+    assert os.path.samefile(roots["ged_legalone"] / "2026/01/03/y.pdf", blob_store.blob_path(sha))
+    assert _ref_count(Session, sha) == 2
+
+    # Path legado apagado por fora do delete_* do módulo.
+    (roots["prazos_iniciais"] / "2026/01/02/x.pdf").unlink()
+    with Session() as db:
+        assert gc_worker.collect_garbage(db)["refs_dangling"] == 1
+    assert _ref_count(Session, sha) == 1
+
+
+def test_blob_sem_linha_no_banco_e_store_desligado(Session, monkeypatch):
+    orfao = blob_store.blob_path("ab" * 32)
+    orfao.parent.mkdir(parents=True)
+    orfao.write_bytes(b"crash antes do registro")
+    with Session() as db:
+        assert gc_worker.collect_garbage(db)["untracked_deleted"] == 0
+        velho = (datetime.now(timezone.utc) - timedelta(days=3)).timestamp()
+        os.utime(orfao, (velho, velho))
+        assert gc_worker.collect_garbage(db)["untracked_deleted"] == 1
+    assert not orfao.exists()
+
+    monkeypatch.setattr(settings, "blob_store_enabled", False)
+    stored = pin_storage.save_pdf(_PDF)
+    assert stored.absolute_path.read_bytes() == _PDF
+    assert stored.absolute_path.stat().st_nlink == 1
+    assert not blob_store.blob_path(stored.sha256).exists()
+
+
+def test_prune_cache_dir_por_tamanho_tira_os_menos_usados(tmp_path):
+    cache = tmp_path / "cache" / "v1" / "ab"
+    cache.mkdir(parents=True)
+    agora = datetime.now(timezone.utc).timestamp()
+    for idx in range(3):
+        path = cache / f"{idx}.txt"
+        path.write_bytes(b"x" * 600 * 1024)
+        os.utime(path, (agora - 3600 * (3 - idx), agora - 3600 * (3 - idx)))
+
+    stats = gc_worker.prune_cache_dir(tmp_path / "cache", max_age_days=0, max_mb=1)
+    assert stats == {"files_deleted": 2, "bytes_freed": 2 * 600 * 1024}
+    assert [p.name for p in cache.iterdir()] == ["2.txt"]
+    assert gc_worker.prune_cache_dir(tmp_path / "nao-existe", max_age_days=1, max_mb=1)["files_deleted"] == 0
@@ -0,0 +1,94 @@
+"""
+Varredura em lote do Citações BM: CNJs agrupados por tribunal num `_search`
+só, movimentos novos inseridos em lote e reexecução idempotente.
+"""
+import json
+
+import httpx
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.models.citacoes_bm import (
+    SCAN_OK,
+    SCAN_SEM_HITS,
+    CitacaoBMMovimento,
+    CitacaoBMProcesso,
+)
+from app.services.citacoes_bm import service as service_module
+from app.services.citacoes_bm.datajud import AsyncDataJudScanner
+from app.services.citacoes_bm.service import CitacoesBMService
+
+# J=8 (Estadual): TR 25 = SP, TR 05 = BA.
+_SP = ["0000001" + "12" + "2024" + "8" + "25" + f"{n:04d}" for n in range(3)]
+_BA = "0000009" + "12" + "2024" + "8" + "05" + "0001"
+
+
+def _make_session():
+    engine = create_engine("sqlite:///:memory:")
+    for model in (CitacaoBMProcesso, CitacaoBMMovimento):
+        model.__table__.create(bind=engine)
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+
+
+def _hit(cnj, grau, movimentos):
+    return {"_source": {"numeroProcesso": cnj, "grau": grau, "classe": {"nome": "Procedimento Comum"}, "movimentos": movimentos}}
+
+
+def _fake_datajud(calls):
+    base = {
+        _SP[0]: [_hit(_SP[0], "G1", [{"codigo": 12266, "nome": "Citação", "dataHora": "2026-01-05T10:00:00Z"}])],
+        _SP[1]: [
+            _hit(_SP[1], "G1", [{"codigo": 26, "nome": "Distribuído", "dataHora": "2026-01-02T10:00:00Z"}]),
+            _hit(_SP[1], "G2", [{"codigo": 11, "nome": "Recebido", "dataHora": "2026-01-03T10:00:00Z"}]),
+        ],
+    }
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        alias = request.url.path.strip("/").split("/")[0]
+        payload = json.loads(request.content)
+        cnjs = [c["match"]["numeroProcesso"] for c in payload["query"]["bool"]["should"]]
+        calls.append((alias, cnjs))
+        hits = [h for c in cnjs for h in base.get(c, [])]
+        return httpx.Response(200, json={"hits": {"hits": hits}})
+
+    return handler
+
+
+def test_scan_all_agrupa_por_tribunal_e_insere_em_lote(monkeypatch):
+    db = _make_session()
+    for cnj in _SP + [_BA]:
+        db.add(CitacaoBMProcesso(cnj=cnj, monitoramento_ativo=True))
+    db.commit()
+
+    calls = []
+    transport = httpx.MockTransport(_fake_datajud(calls))
+    monkeypatch.setattr(settings, "datajud_scan_batch_size", 2)
+    monkeypatch.setattr(
+        service_module,
+        "AsyncDataJudScanner",
+        lambda: AsyncDataJudScanner(alias_interval_seconds=0, transport=transport),
+    )
+    service = CitacoesBMService(db=db)
+
+    res = service.scan_all()
+
+    assert res == {"processos": 4, "ok": 2, "sem_hits": 2, "erro": 0, "novos_movimentos": 3}
+    # 3 CNJs de SP em lotes de 2 + 1 da BA = 3 consultas (antes: 4).
+    assert sorted((a, len(c)) for a, c in calls) == [
+        ("api_publica_tjba", 1),
+        ("api_publica_tjsp", 1),
+        ("api_publica_tjsp", 2),
+    ]
+    procs = {p.cnj: p for p in db.query(CitacaoBMProcesso)}
+    assert procs[_SP[0]].last_scan_status == SCAN_OK
+    assert procs[_SP[0]].tem_candidato_citacao is True
+    assert procs[_SP[1]].total_movimentos == 2
+    assert procs[_SP[1]].novos_movimentos == 2
+    assert procs[_SP[2]].last_scan_status == SCAN_SEM_HITS
+    assert procs[_BA].tribunal_alias == "api_publica_tjba"
+
+    # Reexecução: fingerprints já conhecidos, nada novo.
+    again = service.scan_all()
+    assert again["novos_movimentos"] == 0
+    assert db.query(CitacaoBMMovimento).count() == 3
@@ -0,0 +1,225 @@
+"""
+Motor dormente do Classificador: tick por agregado, claim em chunks de
+batch_size (SKIP LOCKED no Postgres), pool de ingest dimensionado pelo host
+e métricas de throughput.
+"""
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.config import settings
+from app.models.classificador import (
+    ClassificadorLote,
+    ClassificadorPdfPending,
+    ClassificadorProcesso,
+    PENDING_STATUS_ALOCADO,
+    PENDING_STATUS_ERRO,
+    PENDING_STATUS_PENDENTE,
+    PENDING_STATUS_PROCESSADO,
+)
+from app.services.classificador import pending_worker as pw
+
+
+def _make_factory():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool,
+    )
+    for model in (ClassificadorLote, ClassificadorProcesso, ClassificadorPdfPending):
+        model.__table__.create(bind=engine)
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def _pending(cliente, received_at, status=PENDING_STATUS_PENDENTE, **kw):
+    return ClassificadorPdfPending(
+        pdf_path="x.pdf", pdf_sha256="0" * 64, pdf_bytes=10, cliente_nome=cliente,
+        source="PDF_ROBOT_API", status=status, received_at=received_at, **kw,
+    )
+
+
+def test_tick_reivindica_chunks_por_cliente(monkeypatch):
+    factory = _make_factory()
+    now = datetime.now(timezone.utc)
+    db = factory()
+    db.add_all([_pending("ACME", now) for _ in range(5)])
+    db.add(_pending("Recente", now))
+    db.add_all([_pending(None, now - timedelta(hours=2)), _pending("", now - timedelta(hours=1))])
+    db.commit()
+    db.close()
+
+    processados = []
+    monkeypatch.setattr(pw, "SessionLocal", factory)
+    monkeypatch.setattr(pw, "_process_one_pdf", lambda pid, lote_id: processados.append(pid) or True)
+    monkeypatch.setattr(settings, "classificador_pending_worker_enabled", True)
+    monkeypatch.setattr(settings, "classificador_pending_auto_classify", False)
+    monkeypatch.setattr(settings, "classificador_batch_size", 2)
+    monkeypatch.setattr(settings, "classificador_batch_timeout_minutes", 30)
+
+    pw._tick()
+
+    db = factory()
+    rows = db.query(ClassificadorPdfPending).order_by(ClassificadorPdfPending.id).all()
+    acme = [r for r in rows if r.cliente_nome == "ACME"]
+    # 2 chunks cheios; a sobra (1 < batch_size, recente) espera o próximo tick.
+    assert [r.status for r in acme] == [PENDING_STATUS_ALOCADO] * 4 + [PENDING_STATUS_PENDENTE]
+    assert len({r.lote_id for r in acme[:4]}) == 2
+    # None e "" são o mesmo grupo; passou do timeout → 1 lote com os dois.
+    sem_cliente = [r for r in rows if not r.cliente_nome]
+    assert len({r.lote_id for r in sem_cliente}) == 1 and sem_cliente[0].lote_id
+    assert [r.status for r in rows if r.cliente_nome == "Recente"] == [PENDING_STATUS_PENDENTE]
+    assert sorted(processados) == sorted(r.id for r in rows if r.lote_id)
+    assert db.query(ClassificadorLote).count() == 3
+
+    # Tick seguinte não realoca o que já saiu de PENDENTE.
+    processados.clear()
+    pw._tick()
+    assert processados == []
+    db.close()
+
+
+def test_tick_nao_fecha_lote_parcial_quando_outro_processo_leva_o_grupo(monkeypatch):
+    factory = _make_factory()
+    now = datetime.now(timezone.utc)
+    db = factory()
+    db.add_all([_pending("ACME", now) for _ in range(3)])
+    db.commit()
+    db.close()
+
+    processados = []
+    monkeypatch.setattr(pw, "SessionLocal", factory)
+    monkeypatch.setattr(pw, "_process_one_pdf", lambda pid, lote_id: processados.append(pid) or True)
+    monkeypatch.setattr(settings, "classificador_pending_worker_enabled", True)
+    monkeypatch.setattr(settings, "classificador_pending_auto_classify", False)
+    monkeypatch.setattr(settings, "classificador_batch_size", 2)
+    monkeypatch.setattr(settings, "classificador_batch_timeout_minutes", 30)
+
+    # Entre o agregado (3 >= batch_size) e o claim, o tick de outro processo
+    # leva os 2 mais antigos: só sobra 1 recente pra este.
+    original_claim = pw._claim_group
+
+    def claim_depois_do_outro_processo(db, key, batch_size):
+        outro = factory()
+        for p in original_claim(outro, key, batch_size):
+            p.status = PENDING_STATUS_ALOCADO
+        outro.commit()
+        outro.close()
+        return original_claim(db, key, batch_size)
+
+    monkeypatch.setattr(pw, "_claim_group", claim_depois_do_outro_processo)
+
+    pw._tick()
+
+    db = factory()
+    statuses = [r.status for r in db.query(ClassificadorPdfPending).order_by(ClassificadorPdfPending.id)]
+    # A sobra (1 < batch_size, antes do timeout) volta pra fila sem lote.
+    assert statuses == [PENDING_STATUS_ALOCADO] * 2 + [PENDING_STATUS_PENDENTE]
+    assert db.query(ClassificadorLote).count() == 0
+    assert processados == []
+    db.close()
+
+
+def test_concorrencia_de_ingest_pelo_host(monkeypatch):
+    monkeypatch.setattr(settings, "classificador_pending_worker_concurrency", 6)
+    assert pw._ingest_concurrency() == 6
+
+    monkeypatch.setattr(settings, "classificador_pending_worker_concurrency", 0)
+    monkeypatch.setattr(settings, "classificador_pending_worker_max_concurrency", 3)
+    monkeypatch.setattr(pw.os, "sched_getaffinity", lambda pid: set(range(16)), raising=False)
+    assert pw._ingest_concurrency() == 3
+    monkeypatch.setattr(pw.os, "sched_getaffinity", lambda pid: {0, 1}, raising=False)
+    assert pw._ingest_concurrency() == 2
+
+
+def test_ingest_throughput(monkeypatch):
+    monkeypatch.setattr(settings, "classificador_pending_worker_concurrency", 4)
+    db = _make_factory()()
+    now = datetime.now(timezone.utc)
+    lote = ClassificadorLote(nome="L", status="RASCUNHO", source_summary={})
+    db.add(lote)
+    db.flush()
+    p1 = ClassificadorProcesso(lote_id=lote.id, source="PDF_ROBOT_API", metadata_json={
+        "compression": {"original_size": 1000, "compressed_size": 600, "tool": "pikepdf"},
+        "timings": {"compress_seconds": 1.0, "save_seconds": 0.5, "extract_seconds": 2.5},
+    })
+    p2 = ClassificadorProcesso(lote_id=lote.id, source="PDF_ROBOT_API", metadata_json={
+        "dedup_history": [{"incoming_lote_id": lote.id,
+                           "compression": {"original_size": 500, "compressed_size": 500,
+                                           "tool": "skipped_small"}}],
+    })
+    db.add_all([p1, p2])
+    db.flush()
+    db.add_all([
+        _pending("A", now, status=PENDING_STATUS_PROCESSADO, processo_id=p1.id,
+                 allocated_at=now - timedelta(minutes=5, seconds=10), processed_at=now - timedelta(minutes=5)),
+        _pending("A", now, status=PENDING_STATUS_PROCESSADO, processo_id=p2.id, lote_id=lote.id,
+                 allocated_at=now - timedelta(minutes=3, seconds=30), processed_at=now - timedelta(minutes=3)),
+        _pending("A", now, status=PENDING_STATUS_ERRO,
+                 allocated_at=now - timedelta(minutes=2), processed_at=now - timedelta(minutes=1, seconds=40)),
+        # Fora da janela.
+        _pending("A", now, status=PENDING_STATUS_PROCESSADO, processo_id=p1.id,
+                 allocated_at=now - timedelta(hours=3), processed_at=now - timedelta(hours=2)),
+    ])
+    db.commit()
+
+    m = pw.ingest_throughput(db, window_minutes=10)
+    assert (m["pdfs_finalizados"], m["pdfs_processados"], m["pdfs_erro"]) == (3, 2, 1)
+    assert m["pdfs_por_minuto"] == 0.3
+    assert m["ingest_medio_segundos"] == 4.0
+    assert m["alocado_para_processado_medio_segundos"] == 20.0
+    assert m["compressao"] == {
+        "pdfs_comprimidos": 1,
+        "bytes_originais": 1500,
+        "bytes_finais": 1100,
+        "bytes_economizados": 400,
+        "economia_pct": 26.67,
+    }
+    assert m["concorrencia_ingest"] == 4
+
+
+def test_ingest_throughput_por_pending_no_dedup_por_cnj():
+    """Processo reaproveitado pelo dedup por CNJ: topo = 1o ingest, cada PDF
+    seguinte = sua entrada em dedup_history. Conta um por pending."""
+    db = _make_factory()()
+    now = datetime.now(timezone.utc)
+    lote1 = ClassificadorLote(nome="L1", status="RASCUNHO", source_summary={})
+    lote2 = ClassificadorLote(nome="L2", status="RASCUNHO", source_summary={})
+    db.add_all([lote1, lote2])
+    db.flush()
+    feito = dict(status=PENDING_STATUS_PROCESSADO, allocated_at=now - timedelta(minutes=2),
+                 processed_at=now - timedelta(minutes=1))
+    primeiro = _pending("A", now, lote_id=lote1.id, **feito)
+    antigo = _pending("A", now, lote_id=lote2.id, **feito)  # entrada sem pending_id
+    novo = _pending("A", now, lote_id=lote2.id, **feito)
+    db.add_all([primeiro, antigo, novo])
+    db.flush()
+    proc = ClassificadorProcesso(lote_id=lote1.id, source="PDF_ROBOT_API", metadata_json={
+        "pending_id": primeiro.id,
+        "compression": {"original_size": 1000, "compressed_size": 600, "tool": "pikepdf"},
+        "timings": {"compress_seconds": 1.0, "save_seconds": 0.5, "extract_seconds": 2.5},
+        "dedup_history": [
+            {"incoming_lote_id": lote2.id,
+             "compression": {"original_size": 300, "compressed_size": 300,
+                             "tool": "skipped_small"}},
+            {"incoming_lote_id": lote2.id, "pending_id": novo.id,
+             "compression": {"original_size": 2000, "compressed_size": 1000, "tool": "pikepdf"},
+             "timings": {"compress_seconds": 3.0, "save_seconds": 1.0, "extract_seconds": 4.0}},
+        ],
+    })
+    db.add(proc)
+    db.flush()
+    for p in (primeiro, antigo, novo):
+        p.processo_id = proc.id
+    db.commit()
+
+    m = pw.ingest_throughput(db, window_minutes=10)
+    assert m["pdfs_processados"] == 3
+    # 4s (topo) e 8s (entrada do `novo`); `antigo` não tem timings gravados.
+    assert m["ingest_medio_segundos"] == 6.0
+    assert m["compressao"] == {
+        "pdfs_comprimidos": 2,
+        "bytes_originais": 3300,
+        "bytes_finais": 1900,
+        "bytes_economizados": 1400,
+        "economia_pct": 42.42,
+    }
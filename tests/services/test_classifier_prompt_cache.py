@@ -0,0 +1,112 @@
+from types import SimpleNamespace
+
+from app.services.classifier import prompts
+from app.services.classifier.ai_client import AnthropicClassifierClient
+from app.services.classifier.prompts import (
+    SystemPrompt,
+    get_system_prompt_for_office,
+    invalidate_system_prompt_cache,
+)
+from app.services.classifier.taxonomy import invalidate_taxonomy_cache
+
+
+def _count_builds(monkeypatch):
+    calls = []
+
+    def _fake_build(*args, **kwargs):
+        calls.append(kwargs.get("office_external_id"))
+        return SystemPrompt("base", f"-{kwargs.get('office_external_id')}")
+
+    monkeypatch.setattr(prompts, "build_system_prompt_for_office", _fake_build)
+    monkeypatch.setattr(prompts, "load_office_overrides", lambda db, oid: (set(), []))
+    monkeypatch.setattr(prompts, "build_feedback_examples", lambda *a, **k: "")
+    invalidate_system_prompt_cache()
+    return calls
+
+
+def test_prompt_lru_reuses_until_office_invalidated(monkeypatch):
+    calls = _count_builds(monkeypatch)
+
+    first = get_system_prompt_for_office(None, 7, polo_scope="passivo")
+    assert get_system_prompt_for_office(None, 7, polo_scope="passivo") is first
+    get_system_prompt_for_office(None, 8)
+    assert calls == [7, 8]
+
+    invalidate_system_prompt_cache(7)
+    get_system_prompt_for_office(None, 7, polo_scope="passivo")
+    get_system_prompt_for_office(None, 8)
+    assert calls == [7, 8, 7]
+
+
+def test_taxonomy_invalidation_drops_built_prompts(monkeypatch):
+    calls = _count_builds(monkeypatch)
+
+    get_system_prompt_for_office(None, 7)
+    invalidate_taxonomy_cache()
+    get_system_prompt_for_office(None, 7)
+
+    assert calls == [7, 7]
+
+
+class _FakeDB:
+    def __init__(self, records):
+        self.records, self.added = records, []
+
+    def query(self, *a):
+        return self
+
+    def filter(self, *a):
+        return self
+
+    def all(self):
+        return self.records
+
+    def add(self, obj):
+        self.added.append(obj)
+
+    def commit(self):
+        pass
+
+
+def _record(rec_id, office):
+    return SimpleNamespace(
+        id=rec_id, category="Intimação", subcategory=None, polo="passivo",
+        description="texto da publicação", linked_office_id=office,
+        classifications=[], status="CLASSIFICADO", audiencia_data=None,
+        audiencia_hora=None, audiencia_link=None,
+    )
+
+
+def test_implicit_feedback_drops_only_affected_offices(monkeypatch):
+    from app.services.publication_search_service import PublicationSearchService
+
+    calls = _count_builds(monkeypatch)
+    for office in (7, 8):
+        get_system_prompt_for_office(None, office)
+
+    service = PublicationSearchService(_FakeDB([_record(1, 7)]), client=None)
+    monkeypatch.setattr(service, "_build_task_proposals", lambda records: None)
+    service.reclassify_records([1], "Sentença")
+    assert len(service.db.added) == 1
+
+    get_system_prompt_for_office(None, 7)
+    get_system_prompt_for_office(None, 8)
+    assert calls == [7, 8, 7]
+
+    # Feedback sem escritório é global: vale pro prompt de todos.
+    service = PublicationSearchService(_FakeDB([_record(2, None)]), client=None)
+    monkeypatch.setattr(service, "_build_task_proposals", lambda records: None)
+    service.reclassify_records([2], "Sentença")
+    get_system_prompt_for_office(None, 8)
+    assert calls == [7, 8, 7, 8]
+
+
+def test_system_payload_marks_each_prompt_block_for_caching():
+    prompt = SystemPrompt("instrucoes + taxonomia", "feedbacks do escritorio")
+
+    payload = AnthropicClassifierClient._system_payload(prompt)
+
+    assert [b["text"] for b in payload] == ["instrucoes + taxonomia", "feedbacks do escritorio"]
+    assert all(b["cache_control"] == {"type": "ephemeral"} for b in payload)
+    # Concatenação perde os blocos: vira um bloco único, ainda cacheável.
+    assert len(AnthropicClassifierClient._system_payload(prompt + "x")) == 1
@@ -0,0 +1,86 @@
+from datetime import datetime, timedelta, timezone
+
+from app.services.classifier.rate_limit import AdaptiveRateLimiter
+
+
+def test_concurrency_cap_blocks_until_release():
+    limiter = AdaptiveRateLimiter(max_concurrency=2, initial_rpm=100, initial_tpm=100_000)
+
+    assert limiter.try_reserve(10) == 0
+    assert limiter.try_reserve(10) == 0
+    assert limiter.try_reserve(10) > 0
+
+    limiter.release()
+    assert limiter.try_reserve(10) == 0
+
+
+def test_headers_shrink_budget_until_reset():
+    limiter = AdaptiveRateLimiter(max_concurrency=10, initial_rpm=100, initial_tpm=100_000)
+    reset = (datetime.now(timezone.utc) + timedelta(seconds=30)).isoformat()
+
+    limiter.observe({
+        "anthropic-ratelimit-requests-limit": "50",
+        "anthropic-ratelimit-requests-remaining": "1",
+        "anthropic-ratelimit-requests-reset": reset,
+        "anthropic-ratelimit-input-tokens-limit": "20000",
+        "anthropic-ratelimit-input-tokens-remaining": "20000",
+        "anthropic-ratelimit-input-tokens-reset": reset,
+    })
+
+    assert limiter.try_reserve(100) == 0
+    # Última request da janela consumida: espera até o reset informado.
+    assert 25 < limiter.try_reserve(100) <= 30
+
+
+def test_token_budget_and_pause():
+    limiter = AdaptiveRateLimiter(max_concurrency=10, initial_rpm=100, initial_tpm=1_000)
+
+    assert limiter.try_reserve(600) == 0
+    assert limiter.try_reserve(600) > 0  # só 400 tokens sobrando
+    assert limiter.try_reserve(300) == 0
+
+    limiter.pause(5)
+    assert limiter.try_reserve(1) > 4
+
+
+def test_process_batch_fecha_o_pool_http_do_client():
+    import asyncio
+
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import StaticPool
+
+    from app.models.classification import ClassificationBatch, ClassificationItem
+    from app.services.classifier.classification_service import ClassificationService
+
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool,
+    )
+    ClassificationBatch.__table__.create(engine)
+    ClassificationItem.__table__.create(engine)
+    db = sessionmaker(bind=engine)()
+    batch = ClassificationBatch(status="PROCESSANDO", total_items=1)
+    db.add(batch)
+    db.flush()
+    db.add(ClassificationItem(
+        batch_id=batch.id, row_index=2, process_number="1", publication_text="x",
+        status="PENDENTE",
+    ))
+    db.commit()
+
+    class _Client:
+        closed = 0
+
+        async def classify(self, system, user):
+            raise RuntimeError("api fora")
+
+        async def aclose(self):
+            self.closed += 1
+
+    service = ClassificationService.__new__(ClassificationService)
+    service.db = db
+    service.ai_client = _Client()
+    result = asyncio.run(service.process_batch(batch.id))
+
+    assert result["failed"] == 1
+    assert service.ai_client.closed == 1
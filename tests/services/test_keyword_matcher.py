@@ -0,0 +1,42 @@
+"""
+Matcher de palavras-chave compartilhado (varredura, citações BM e
+correlação do monitoramento): texto dobrado uma vez, termos agrupados por
+prefixo e regex só nos candidatos.
+"""
+from app.services.citacoes_bm.heuristic import avaliar_candidato
+from app.services.keyword_matcher import KeywordMatcher, fold_text
+from app.services.varredura.regex_eventos import detect_eventos
+
+
+def test_fold_text():
+    assert fold_text("  Trânsito   em\nJULGADO ") == "transito em julgado"
+    assert fold_text("Citação") == "citacao"
+    assert fold_text(None) == "" and fold_text("") == ""
+
+
+def test_find_agrupa_por_prefixo_e_mantem_ordem_de_declaracao():
+    m = KeywordMatcher(("ARQUIVAMENTO", "BAIXA", "ARQUIVADO", "ARQUIVAMENTO DEFINITIVO"))
+    texto = fold_text("Arquivamento definitivo - baixa")
+    assert m.find(texto) == ["ARQUIVAMENTO", "BAIXA", "ARQUIVAMENTO DEFINITIVO"]
+    assert m.first(texto) == "ARQUIVAMENTO"
+    # Prefixo do grupo ("arquiva") presente, mas nenhum termo completo.
+    assert m.find("arquivar") == [] and not m.any("arquivar")
+    assert m.any(fold_text("Processo arquivado"))
+
+
+def test_detect_eventos_so_roda_regex_com_gatilho():
+    texto = "AUDIÊNCIA de conciliação DESIGNADA. Sentença publicada; autos arquivados"
+    assert [(d.tipo, d.matched_text) for d in detect_eventos(texto)] == [
+        ("audiencia_designada", "AUDIÊNCIA de conciliação DESIGNADA"),
+        ("sentenca", "Sentença"),
+        ("arquivamento", "arquivado"),
+    ]
+    # Gatilho presente mas a regex não confirma (o ponto corta o `[^.]*`).
+    assert detect_eventos("Audiência realizada. Designado perito.") == []
+    assert detect_eventos("Juntada de petição") == []
+
+
+def test_heuristica_citacao_usa_o_matcher():
+    assert avaliar_candidato("Expedição de documento", [{"nome": "Citação"}]) == (True, "cita")
+    assert avaliar_candidato("Expedição de MANDADO", None) == (True, "mandado")
+    assert avaliar_candidato("Conclusos", [{"descricao": "despacho"}]) == (False, None)
@@ -0,0 +1,121 @@
+import logging
+
+from app.services.legal_one_client import LegalOneApiClient
+
+
+def _client_without_init():
+    client = LegalOneApiClient.__new__(LegalOneApiClient)
+    client.logger = logging.getLogger(__name__)
+    client.base_url = "https://l1.test/api"
+    return client
+
+
+def test_skip_page_urls_expands_remaining_pages_from_next_link():
+    urls = LegalOneApiClient._skip_page_urls(
+        "https://l1.test/api/Users?$select=id&$top=30&$skip=30", 30, 95
+    )
+
+    assert urls == [
+        "https://l1.test/api/Users?$select=id&$top=30&$skip=30",
+        "https://l1.test/api/Users?$select=id&$top=30&$skip=60",
+        "https://l1.test/api/Users?$select=id&$top=30&$skip=90",
+    ]
+
+
+def test_skip_page_urls_needs_count_and_matching_skip():
+    assert LegalOneApiClient._skip_page_urls("https://x/?$skip=30", 30, None) == []
+    assert LegalOneApiClient._skip_page_urls("https://x/?$skip=50", 30, 200) == []
+    assert LegalOneApiClient._skip_page_urls("https://x/?token=abc", 30, 200) == []
+    assert LegalOneApiClient._skip_page_urls(None, 30, 200) == []
+
+
+def test_fetch_all_publications_fans_out_remaining_pages_in_order(monkeypatch):
+    client = _client_without_init()
+    total = 75
+
+    monkeypatch.setattr(
+        client,
+        "fetch_publications",
+        lambda **kwargs: {
+            "value": [{"id": i} for i in range(30)],
+            "@odata.count": total,
+        },
+    )
+    requested = []
+
+    def fake_pages(urls):
+        requested.extend(urls)
+        pages = []
+        for url in urls:
+            skip = int(url.split("$skip=")[1].split("&")[0])
+            pages.append({"value": [{"id": i} for i in range(skip, min(skip + 30, total))]})
+        return pages
+
+    monkeypatch.setattr(client, "_fetch_json_pages", fake_pages)
+
+    result = client.fetch_all_publications("2026-01-01", "2026-01-02")
+
+    assert [item["id"] for item in result] == list(range(total))
+    assert len(requested) == 2
+    assert all("$count=true" not in url for url in requested)
+
+
+def test_fetch_json_pages_retries_failed_fanout_pages_serially(monkeypatch):
+    client = _client_without_init()
+
+    monkeypatch.setattr(
+        "app.services.legal_one_async.fetch_json_pages",
+        lambda _client, urls: [{"value": [1]}, RuntimeError("boom")],
+    )
+
+    class _Resp:
+        def json(self):
+            return {"value": [2]}
+
+    serial_calls = []
+
+    def fake_retry(method, url, **kwargs):
+        serial_calls.append(url)
+        return _Resp()
+
+    monkeypatch.setattr(client, "_request_with_retry", fake_retry)
+
+    pages = client._fetch_json_pages(["u1", "u2"])
+
+    assert pages == [{"value": [1]}, {"value": [2]}]
+    assert serial_calls == ["u2"]
+
+
+def test_office_full_sync_without_count_pages_serially_to_the_end(monkeypatch):
+    from types import SimpleNamespace
+
+    from app.services import office_lawsuit_index_service as svc
+
+    total = 75
+    requested_skips = []
+
+    def fake_page(_client, params, raise_on_400=False):
+        skip = params["$skip"]
+        requested_skips.append(skip)
+        # Resposta sem @odata.count (o L1 às vezes omite).
+        return {"value": [{"id": i} for i in range(skip, min(skip + 30, total))]}, "/Lawsuits"
+
+    upserted = {}
+    monkeypatch.setattr(svc, "_fetch_lawsuits_page_with_endpoint", fake_page)
+    monkeypatch.setattr(svc, "_update_full_sync_progress", lambda *a, **k: None)
+    monkeypatch.setattr(
+        svc, "_bulk_upsert_ids", lambda db, office_id, ids, now: upserted.update(ids=set(ids)),
+    )
+    monkeypatch.setattr(svc, "_prune_missing_ids", lambda *a: None)
+
+    class _Client:
+        def _fetch_json_pages(self, urls):
+            raise AssertionError("sem count não deve fazer fan-out")
+
+    state = SimpleNamespace(office_id=7)
+    db = SimpleNamespace(commit=lambda: None)
+    svc._do_full_sync(db, _Client(), state)
+
+    assert requested_skips == [0, 30, 60]
+    assert upserted["ids"] == set(range(total))
+    assert state.total_ids == total and state.last_sync_status == "success"
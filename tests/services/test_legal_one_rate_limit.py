@@ -0,0 +1,61 @@
+from app.services.legal_one_rate_limit import (
+    BACKEND_FILE,
+    BACKEND_MEMORY,
+    PRIORITY_BACKGROUND,
+    PRIORITY_INTERACTIVE,
+    LegalOneRateLimiter,
+    current_priority,
+    legal_one_priority,
+)
+
+
+def _limiter(**overrides):
+    params = {
+        "rate": 0.001,  # refill desprezível durante o teste
+        "capacity": 5.0,
+        "backend": BACKEND_MEMORY,
+        "interactive_reserve": 2.0,
+    }
+    params.update(overrides)
+    return LegalOneRateLimiter(**params)
+
+
+def test_background_lane_stops_at_interactive_reserve():
+    limiter = _limiter()
+
+    taken = 0
+    while limiter.try_acquire(PRIORITY_BACKGROUND) == 0:
+        taken += 1
+
+    # 5 de burst - 2 de reserva = 3 tokens pro background.
+    assert taken == 3
+    # A reserva continua disponível pras chamadas interativas.
+    assert limiter.try_acquire(PRIORITY_INTERACTIVE) == 0
+    assert limiter.try_acquire(PRIORITY_INTERACTIVE) == 0
+    assert limiter.try_acquire(PRIORITY_INTERACTIVE) > 0
+
+
+def test_priority_context_defaults_to_interactive_and_restores():
+    assert current_priority() == PRIORITY_INTERACTIVE
+    with legal_one_priority(PRIORITY_BACKGROUND):
+        assert current_priority() == PRIORITY_BACKGROUND
+    assert current_priority() == PRIORITY_INTERACTIVE
+
+
+def test_file_backend_shares_bucket_between_limiter_instances(tmp_path, monkeypatch):
+    from app.core.config import settings
+
+    monkeypatch.setattr(
+        settings, "legal_one_rate_limit_file", str(tmp_path / "bucket.json")
+    )
+    # Duas instâncias = dois "workers" lendo o mesmo arquivo.
+    first = _limiter(backend=BACKEND_FILE, interactive_reserve=0.0)
+    second = _limiter(backend=BACKEND_FILE, interactive_reserve=0.0)
+
+    results = [
+        (first if i % 2 == 0 else second).try_acquire(PRIORITY_INTERACTIVE)
+        for i in range(6)
+    ]
+
+    assert results[:5] == [0, 0, 0, 0, 0]
+    assert results[5] > 0
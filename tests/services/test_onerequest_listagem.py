@@ -0,0 +1,115 @@
+"""
+Listagem de DMIs: farol, KPIs, filtro `sem_anotacao` e ordem saem do banco
+(prazo_date + CASE/EXISTS) e a paginação keyset percorre o mesmo conjunto
+que o offset.
+"""
+import os
+from datetime import date, timedelta
+
+import openpyxl
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models.legal_one import LegalOneUser
+from app.models.onerequest import OnerequestAnotacao, OnerequestSolicitacao
+from app.services.onerequest.service import OnerequestService, _farol
+
+
+def _make_session():
+    engine = create_engine("sqlite:///:memory:")
+    for model in (LegalOneUser, OnerequestSolicitacao, OnerequestAnotacao):
+        model.__table__.create(bind=engine)
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+
+
+def _seed(db):
+    hoje = date.today()
+    prazos = [hoje + timedelta(days=d) for d in range(-3, 12)]
+    rows = [
+        OnerequestSolicitacao(numero_solicitacao=f"2026/{i:010d}", prazo=p.strftime("%d/%m/%Y"))
+        for i, p in enumerate(prazos)
+    ]
+    rows.append(OnerequestSolicitacao(numero_solicitacao="2026/sem-prazo", prazo=None))
+    rows.append(OnerequestSolicitacao(numero_solicitacao="2026/prazo-sujo", prazo="a definir"))
+    db.add_all(rows)
+    db.flush()
+    db.add(OnerequestAnotacao(solicitacao_id=rows[0].id, texto="aguardando cliente"))
+    db.commit()
+    return hoje, prazos
+
+
+def test_prazo_date_acompanha_prazo():
+    s = OnerequestSolicitacao(numero_solicitacao="2026/1", prazo="05/03/2026")
+    assert s.prazo_date == date(2026, 3, 5)
+    s.prazo = "invalido"
+    assert s.prazo_date is None
+
+
+def test_farol_e_kpis_em_sql_batem_com_a_regra_python():
+    db = _make_session()
+    hoje, prazos = _seed(db)
+    service = OnerequestService(db)
+
+    result = service.list_solicitacoes(status_sistema=None, limit=500)
+
+    esperados = [_farol(p, hoje) for p in prazos] + ["cinza", "cinza"]
+    assert sorted(i["farol"] for i in result["items"]) == sorted(esperados)
+    assert result["kpis"] == {
+        "atrasadas": esperados.count("atrasado"),
+        "hoje": esperados.count("vermelho"),
+        "amanha": esperados.count("amarelo"),
+        "fds": esperados.count("roxo"),
+        "futuras": esperados.count("verde"),
+        "sem_prazo": esperados.count("cinza"),
+    }
+    assert result["total"] == len(esperados)
+    # Prazo asc, sem prazo no fim.
+    assert [i["prazo"] for i in result["items"][: len(prazos)]] == [
+        p.strftime("%d/%m/%Y") for p in prazos
+    ]
+
+    atrasadas = service.list_solicitacoes(status_sistema=None, farol="atrasado", sem_anotacao=True)
+    assert atrasadas["total"] == 2
+    assert not any(i["tem_anotacao"] for i in atrasadas["items"])
+    # KPIs continuam sobre o conjunto inteiro (antes dos filtros de farol/anotação).
+    assert atrasadas["kpis"] == result["kpis"]
+
+
+def test_keyset_percorre_o_mesmo_conjunto_do_offset():
+    db = _make_session()
+    _seed(db)
+    service = OnerequestService(db)
+    por_offset = [
+        i["id"]
+        for off in range(0, 17, 4)
+        for i in service.list_solicitacoes(status_sistema=None, limit=4, offset=off)["items"]
+    ]
+
+    por_cursor, cursor = [], None
+    while True:
+        page = service.list_solicitacoes(status_sistema=None, limit=4, cursor=cursor)
+        por_cursor.extend(i["id"] for i in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert por_cursor == por_offset
+    assert len(por_cursor) == 17
+
+
+def test_export_xlsx_segue_filtros_e_ordem_da_listagem():
+    db = _make_session()
+    _seed(db)
+    service = OnerequestService(db)
+    listados = service.list_solicitacoes(status_sistema=None, farol="atrasado", limit=500)["items"]
+
+    path = service.export_xlsx(status_sistema=None, farol="atrasado", limit=10, offset=3)
+    try:
+        ws = openpyxl.load_workbook(path)["DMIs"]
+        assert ws.freeze_panes == "A2"
+        assert [r[0] for r in ws.iter_rows(min_row=2, values_only=True)] == [
+            i["numero_solicitacao"] for i in listados
+        ]
+        assert {r[7] for r in ws.iter_rows(min_row=2, values_only=True)} == {"Atrasada"}
+    finally:
+        os.unlink(path)
@@ -0,0 +1,78 @@
+"""
+Pool de processos da extração mecânica: mesmo resultado do `extract`
+direto, backpressure (503) com fila cheia e timeout por PDF que derruba
+e recria o pool.
+"""
+import asyncio
+import time
+from pathlib import Path
+
+import pytest
+
+from app.core.config import settings
+from app.services.prazos_iniciais.pdf_extractor import extract
+from app.services.prazos_iniciais.pdf_extractor import pool
+
+_PDF = next((Path(__file__).resolve().parents[2] / "test-data").glob("*.pdf"))
+
+
+@pytest.fixture(autouse=True)
+def _pool_isolado(monkeypatch):
+    monkeypatch.setattr(settings, "prazos_iniciais_extract_workers", 1)
+    monkeypatch.setattr(settings, "prazos_iniciais_extract_queue_max", 0)
+    monkeypatch.setattr(pool, "_run_slots", None)
+    yield
+    pool.shutdown_pool()
+
+
+def test_extract_async_igual_ao_direto():
+    pdf_bytes = _PDF.read_bytes()
+    assert asyncio.run(pool.extract_async(pdf_bytes)) == extract(pdf_bytes)
+
+
+def test_fila_cheia_levanta_saturated(monkeypatch):
+    monkeypatch.setattr(settings, "prazos_iniciais_extract_retry_after_seconds", 7)
+    monkeypatch.setattr(pool, "_in_flight", 1)  # 1 worker + fila 0 = cheio
+    with pytest.raises(pool.ExtractionPoolSaturated) as exc:
+        pool.extract_in_pool(b"%PDF-")
+    assert exc.value.retry_after == 7
+    assert pool._in_flight == 1
+    # Worker em background não passa pela fila do HTTP.
+    monkeypatch.setattr(pool, "extract", abs)
+    assert pool.extract_in_pool(-3, backpressure=False) == 3
+
+
+def test_extract_async_admite_no_loop_antes_da_thread(monkeypatch):
+    monkeypatch.setattr(pool, "extract", abs)
+    threads_pedidas = []
+    original_to_thread = asyncio.to_thread
+
+    async def to_thread(fn, *args, **kwargs):
+        threads_pedidas.append(fn)
+        return await original_to_thread(fn, *args, **kwargs)
+
+    monkeypatch.setattr(pool.asyncio, "to_thread", to_thread)
+
+    async def duas_ao_mesmo_tempo():
+        # 1 worker + fila 0: a 2ª é recusada já no loop, sem pedir thread.
+        primeira = asyncio.ensure_future(pool.extract_async(-2))
+        await asyncio.sleep(0)
+        with pytest.raises(pool.ExtractionPoolSaturated):
+            await pool.extract_async(-3)
+        return await primeira
+
+    assert asyncio.run(duas_ao_mesmo_tempo()) == 2
+    assert len(threads_pedidas) == 1
+    assert pool._in_flight == 0
+
+
+def test_timeout_derruba_e_recria_o_pool(monkeypatch):
+    monkeypatch.setattr(pool, "extract", time.sleep)
+    t0 = time.monotonic()
+    with pytest.raises(pool.ExtractionTimeout):
+        pool.extract_in_pool(60, timeout=3)
+    assert time.monotonic() - t0 < 30
+    assert pool._executor is None and pool._in_flight == 0
+
+    monkeypatch.setattr(pool, "extract", abs)
+    assert pool.extract_in_pool(-5) == 5
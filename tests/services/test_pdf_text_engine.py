@@ -0,0 +1,89 @@
+"""
+Motor de texto do pdf_extractor: PyMuPDF + montador do pdfplumber com a
+mesma saída do pdfplumber, fallback por página e cache por SHA-256.
+"""
+from pathlib import Path
+
+import fitz
+import pytest
+
+from app.core.config import settings
+from app.services.prazos_iniciais.pdf_extractor import text_extractor as te
+
+_PDF = next((Path(__file__).resolve().parents[2] / "test-data").glob("*.pdf"))
+
+
+@pytest.fixture(autouse=True)
+def _cache_tmp(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "prazos_iniciais_text_cache_path", str(tmp_path / "cache"))
+    monkeypatch.setattr(settings, "prazos_iniciais_text_cache_enabled", True)
+
+
+def _pdf_rotacionado() -> bytes:
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_text((72, 72), "Processo 0001234-56.2026.8.05.0001 - pagina normal")
+    page.insert_text((560, 700), "esaj.tjsp.jus.br/pastadigital", rotate=90)
+    return doc.tobytes()
+
+
+def test_fitz_igual_ao_pdfplumber_inclusive_paginas_de_fallback():
+    pdf_bytes = _PDF.read_bytes()
+    esperado = te._pdfplumber_pages(pdf_bytes)
+    assert te._fitz_pages(pdf_bytes) == esperado
+    # A página 4 da amostra tem fonte sem ToUnicode — quem responde é o
+    # pdfplumber, com os `(cid:N)` que o cleaner já conhece.
+    assert "(cid:" in esperado[3]
+
+    rot = _pdf_rotacionado()
+    with fitz.open(stream=rot, filetype="pdf") as doc:
+        assert te._fitz_chars(doc[0], 0) is None
+    assert te._fitz_pages(rot) == te._pdfplumber_pages(rot)
+
+
+def test_cache_por_sha_e_motor(monkeypatch, tmp_path):
+    pdf_bytes = _PDF.read_bytes()
+    chamadas = []
+    original = te._fitz_pages
+    monkeypatch.setattr(te, "_fitz_pages", lambda b: chamadas.append(1) or original(b))
+
+    primeira = te.extract_text_pages(pdf_bytes)
+    assert te.extract_text_pages(pdf_bytes) == primeira
+    assert len(chamadas) == 1
+    arquivos = list((tmp_path / "cache").rglob("*.json.gz"))
+    assert len(arquivos) == 1 and arquivos[0].parent.parent.name.startswith("auto-v")
+
+    # Outro motor = outra chave.
+    monkeypatch.setattr(settings, "prazos_iniciais_text_engine", "pdfplumber")
+    assert te.extract_text_pages(pdf_bytes) == primeira
+    assert len(list((tmp_path / "cache").rglob("*.json.gz"))) == 2
+
+
+def test_pdf_invalido_continua_levantando():
+    with pytest.raises(te.PdfTextExtractionError):
+        te.extract_text_pages(b"nao e pdf")
+    with pytest.raises(te.PdfTextExtractionError):
+        te.extract_text_pages(b"")
+
+
+def test_cache_podado_pelo_gc_por_idade_e_hit_renova(monkeypatch, tmp_path):
+    import os
+    import time
+
+    from app.services.blob_store import gc_worker
+
+    monkeypatch.setattr(settings, "prazos_iniciais_text_cache_max_age_days", 30)
+    pdf_bytes, rotacionado = _PDF.read_bytes(), _pdf_rotacionado()
+    te.extract_text_pages(pdf_bytes)
+    te.extract_text_pages(rotacionado)
+    usado, esquecido = te._cache_file(pdf_bytes, "auto"), te._cache_file(rotacionado, "auto")
+    velho = time.time() - 40 * 86400
+    for path in (usado, esquecido):
+        os.utime(path, (velho, velho))
+
+    # Hit renova o mtime: o PDF que ainda volta aqui fica.
+    te.extract_text_pages(pdf_bytes)
+
+    politicas = dict(gc_worker._retention_policies())
+    assert politicas["text_cache"](None)["files_deleted"] == 1
+    assert usado.exists() and not esquecido.exists()
@@ -0,0 +1,118 @@
+"""
+Rollups do Minha Equipe: `equipe`, `setor_resumo` e o diagnóstico do
+Balanceador leem os agregados diários (perf_rollup_*) em vez da perf_l1_tarefa.
+"""
+import datetime
+import math
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models.performance import (
+    CAT_OPERACIONAL,
+    CAT_PROFUNDO,
+    PerfBoardTarefa,
+    PerfPessoa,
+    PerfRollupBacklog,
+    PerfRollupCiclo,
+    PerfRollupConclusao,
+    PerfSubtipoCategoria,
+    PerfTarefa,
+)
+from app.services.performance.balanceador import BalanceadorService, _hoje_brt
+from app.services.performance.rollups import CICLO_BASE, mediana_ciclo
+from app.services.performance.service import PerformanceService
+
+
+def _make_session():
+    engine = create_engine("sqlite:///:memory:")
+    for model in (
+        PerfPessoa,
+        PerfSubtipoCategoria,
+        PerfBoardTarefa,
+        PerfTarefa,
+        PerfRollupConclusao,
+        PerfRollupCiclo,
+        PerfRollupBacklog,
+    ):
+        model.__table__.create(bind=engine)
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+
+
+def _seed(db):
+    hoje = _hoje_brt()
+    dia = datetime.timedelta(days=1)
+    db.add_all(
+        [
+            PerfPessoa(id=1, nome="Ana", nome_norm="ana", cargo="Advogado(a)", equipe="bb-reu", ativo=True, is_supervisor=False),
+            PerfPessoa(id=2, nome="Bia", nome_norm="bia", cargo="Assistente", equipe="bb-reu", ativo=True, is_supervisor=False),
+            PerfSubtipoCategoria(subtipo="Protocolo", categoria=CAT_OPERACIONAL),
+            PerfSubtipoCategoria(subtipo="Contestação", categoria=CAT_PROFUNDO),
+            PerfRollupConclusao(dia=hoje - dia, pessoa_id=1, subtipo="Protocolo", concluido=10, com_prazo=4, no_prazo=3),
+            PerfRollupConclusao(dia=hoje - dia, pessoa_id=1, subtipo="Contestação", concluido=2, com_prazo=2, no_prazo=2),
+            PerfRollupConclusao(dia=hoje - 2 * dia, pessoa_id=1, subtipo="Protocolo", concluido=6, com_prazo=0, no_prazo=0),
+            # Fora da janela de 7 dias.
+            PerfRollupConclusao(dia=hoje - 40 * dia, pessoa_id=2, subtipo="Protocolo", concluido=50, com_prazo=0, no_prazo=0),
+            PerfRollupCiclo(dia=hoje - dia, pessoa_id=1, bucket=200, n=3),
+            PerfRollupCiclo(dia=hoje - 2 * dia, pessoa_id=1, bucket=250, n=1),
+            PerfRollupBacklog(pessoa_id=1, subtipo="Contestação", prazo_dia=hoje - dia, pendente=4),
+            PerfRollupBacklog(pessoa_id=1, subtipo="Contestação", prazo_dia=hoje, pendente=1),
+            PerfRollupBacklog(pessoa_id=2, subtipo="Protocolo", prazo_dia=hoje + dia, pendente=2),
+            PerfRollupBacklog(pessoa_id=2, subtipo="Acompanhar Processo", prazo_dia=None, pendente=7),
+        ]
+    )
+    db.commit()
+
+
+def test_mediana_do_histograma():
+    assert mediana_ciclo([]) is None
+    assert mediana_ciclo([(10, 1), (20, 5), (30, 1)]) == math.pow(CICLO_BASE, 20.5)
+
+
+def test_equipe_le_dos_rollups():
+    db = _make_session()
+    _seed(db)
+
+    res = PerformanceService(db).equipe(days=7, team="bb-reu")
+
+    ana, bia = res["pessoas"]
+    assert (ana["nome"], ana["concluido"], ana["dias_ativos"], ana["throughput_dia"]) == ("Ana", 18, 2, 9.0)
+    assert ana["no_prazo_pct"] == round(100 * 5 / 6)
+    assert (ana["operacional_n"], ana["profundo_n"]) == (16, 2)
+    assert ana["cycle_dias"] == round(math.pow(CICLO_BASE, 200.5) / 86400, 1)
+    assert ana["backlog"] == 5
+    assert (bia["concluido"], bia["backlog"], bia["cycle_dias"]) == (0, 9, None)
+    assert res["kpis"] == {
+        "concluido": 18, "backlog": 14, "pessoas_ativas": 1, "pessoas_total": 2, "no_prazo_pct": 83,
+    }
+    assert PerformanceService(db).equipe(days=60)["kpis"]["concluido"] == 68
+
+
+def test_setor_resumo_e_diagnostico():
+    db = _make_session()
+    _seed(db)
+
+    resumo = PerformanceService(db).setor_resumo(days=7, team="bb-reu")
+    assert resumo["kpis"] == {"atrasado_total": 4, "backlog_total": 14}
+    assert [v["nome"] for v in resumo["vazao"]] == ["Ana"]
+    tipos = {t["subtipo"]: t for t in resumo["top_tipos"]}
+    assert (tipos["Protocolo"]["volume"], tipos["Protocolo"]["pendente"]) == (16, 2)
+    assert (tipos["Contestação"]["pendente"], tipos["Contestação"]["atrasado"]) == (5, 4)
+
+    diag = {d["nome"]: d for d in BalanceadorService(db).diagnostico("bb-reu")}
+    assert (diag["Ana"]["atrasado"], diag["Ana"]["fatal_hoje"], diag["Ana"]["total"]) == (4, 1, 5)
+    # "Acompanhar*" fica fora do pool redistribuível.
+    assert (diag["Bia"]["futuro"], diag["Bia"]["sem_prazo"], diag["Bia"]["total"]) == (2, 0, 2)
+
+
+def test_excluir_pessoa_tira_a_carga_dos_rollups_na_hora():
+    db = _make_session()
+    _seed(db)
+
+    assert PerformanceService(db).excluir_pessoa(2) == {"id": 2, "excluido": True}
+
+    res = PerformanceService(db).equipe(days=60, team="bb-reu")
+    assert [p["nome"] for p in res["pessoas"]] == ["Ana"]
+    assert (res["kpis"]["concluido"], res["kpis"]["backlog"]) == (18, 5)
+    assert db.query(PerfRollupBacklog).filter_by(pessoa_id=2).count() == 0
+    assert {d["nome"] for d in BalanceadorService(db).diagnostico("bb-reu")} == {"Ana"}
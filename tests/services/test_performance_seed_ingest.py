@@ -0,0 +1,142 @@
+"""
+Ingest do "Agenda Analytics" (Minha Equipe): parser linha a linha, replace
+total atômico e modo delta linha a linha (mesmas linhas nos dois modos).
+"""
+import datetime
+
+import openpyxl
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models.performance import PerfPessoa, PerfTarefa
+from app.services.performance.seed import iter_tarefas, seed_tarefas
+
+
+def _make_session():
+    engine = create_engine("sqlite:///:memory:")
+    for model in (PerfPessoa, PerfTarefa):
+        model.__table__.create(bind=engine)
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+
+
+def _linha(task_id, status, cumpriu, envolvido, subtipo):
+    r = [None] * 18
+    r[1], r[2], r[3], r[4], r[6] = "Escritório", envolvido, task_id, "Tarefa", status
+    r[7] = datetime.datetime(2026, 6, 1, 10, 0) if status == "Cumprido" else None
+    r[14], r[17] = cumpriu, subtipo
+    return r
+
+
+def _agenda(path, linhas):
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.append([f"col{i}" for i in range(18)])
+    for linha in linhas:
+        ws.append(linha)
+    wb.save(path)
+    return str(path)
+
+
+def test_parser_filtra_roster_e_status(tmp_path):
+    path = _agenda(
+        tmp_path / "agenda.xlsx",
+        [
+            _linha(1, "Cumprido", "Ana Sá", "Outro", "Protocolo"),
+            _linha(2, "Pendente", None, "Bruno", "Audiência"),
+            _linha(3, "Cancelado", "Ana Sá", "Ana Sá", "Protocolo"),
+            _linha(4, "Cumprido", "Fora do Roster", "Ana Sá", "Protocolo"),
+        ],
+    )
+    rows = list(iter_tarefas(path, {"ana sa": 10, "bruno": 20}))
+    assert [(r[0], r[1], r[6]) for r in rows] == [(1, 10, "Protocolo"), (2, 20, "Audiência")]
+
+
+def test_replace_e_delta_gravam_as_mesmas_linhas(tmp_path):
+    db = _make_session()
+    db.add_all([PerfPessoa(id=10, nome="Ana", nome_norm="ana"), PerfPessoa(id=20, nome="Bruno", nome_norm="bruno")])
+    db.commit()
+    roster = {"ana": 10, "bruno": 20}
+
+    primeira = _agenda(
+        tmp_path / "d1.xlsx",
+        [
+            _linha(1, "Cumprido", "Ana", "x", "Protocolo"),
+            _linha(2, "Pendente", None, "Bruno", "Audiência"),
+            _linha(3, "Pendente", None, "Ana", "Petição"),
+        ],
+    )
+    assert seed_tarefas(db, roster, agenda_path=primeira) == 3
+    ids = {t.l1_task_id: t.id for t in db.query(PerfTarefa)}
+
+    # 1 igual, 2 concluída (mudou), 3 saiu do relatório, 4 nova com dois
+    # envolvidos (uma linha por pessoa) + linha repetida da mesma pessoa,
+    # que também fica (uma linha por linha do relatório).
+    segunda = _agenda(
+        tmp_path / "d2.xlsx",
+        [
+            _linha(1, "Cumprido", "Ana", "x", "Protocolo"),
+            _linha(2, "Cumprido", "Bruno", "Bruno", "Audiência"),
+            _linha(4, "Pendente", None, "Bruno", "Recurso"),
+            _linha(4, "Pendente", None, "Ana", "Recurso"),
+            _linha(4, "Pendente", None, "Ana", "Recurso"),
+        ],
+    )
+    assert seed_tarefas(db, roster, agenda_path=segunda, delta=True) == 5
+
+    def _linhas():
+        return sorted(
+            (t.l1_task_id, t.pessoa_id, t.status, t.subtipo) for t in db.query(PerfTarefa)
+        )
+
+    por_delta = _linhas()
+    assert [(t, p) for t, p, _, _ in por_delta] == [(1, 10), (2, 20), (4, 10), (4, 10), (4, 20)]
+    tarefas = {t.l1_task_id: t for t in db.query(PerfTarefa).filter(PerfTarefa.l1_task_id < 4)}
+    # Linhas existentes mantêm o id (update in-place, sem delete+insert).
+    assert tarefas[1].id == ids[1] and tarefas[2].id == ids[2]
+    assert tarefas[2].status == "Cumprido"
+
+    # Delta de novo sobre o mesmo relatório não muda nada.
+    assert seed_tarefas(db, roster, agenda_path=segunda, delta=True) == 5
+    assert _linhas() == por_delta
+
+    # Replace total do mesmo relatório grava exatamente as mesmas linhas.
+    assert seed_tarefas(db, roster, agenda_path=segunda) == 5
+    assert _linhas() == por_delta
+
+    # E volta a refletir exatamente o relatório anterior.
+    assert seed_tarefas(db, roster, agenda_path=primeira) == 3
+    assert sorted(t.l1_task_id for t in db.query(PerfTarefa)) == [1, 2, 3]
+
+
+def test_cumprido_com_varios_envolvidos_conta_igual_nos_dois_modos(tmp_path):
+    db = _make_session()
+    db.add_all([PerfPessoa(id=10, nome="Ana", nome_norm="ana"), PerfPessoa(id=20, nome="Bruno", nome_norm="bruno")])
+    db.commit()
+    roster = {"ana": 10, "bruno": 20}
+
+    # Cumprido por Ana com três envolvidos: três linhas do executor.
+    agenda = _agenda(
+        tmp_path / "agenda.xlsx",
+        [
+            _linha(7, "Cumprido", "Ana", "Bruno", "Protocolo"),
+            _linha(7, "Cumprido", "Ana", "Carla", "Protocolo"),
+            _linha(7, "Cumprido", "Ana", "Davi", "Protocolo"),
+            _linha(8, "Pendente", None, "Bruno", "Audiência"),
+        ],
+    )
+
+    def _linhas():
+        return sorted((t.l1_task_id, t.pessoa_id, t.envolvido_nome) for t in db.query(PerfTarefa))
+
+    assert seed_tarefas(db, roster, agenda_path=agenda) == 4
+    por_replace = _linhas()
+    assert len(por_replace) == 4
+    assert [e for t, _, e in por_replace if t == 7] == ["Bruno", "Carla", "Davi"]
+
+    db.query(PerfTarefa).delete()
+    db.commit()
+    assert seed_tarefas(db, roster, agenda_path=agenda, delta=True) == 4
+    assert _linhas() == por_replace
+    # Delta sobre a própria carga não mexe em nada.
+    assert seed_tarefas(db, roster, agenda_path=agenda, delta=True) == 4
+    assert _linhas() == por_replace
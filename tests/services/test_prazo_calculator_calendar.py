@@ -0,0 +1,202 @@
+"""
+Índice de dias úteis do prazo_calculator: mesmo resultado do laço dia a
+dia antigo (propriedade sobre datas/prazos/recessos aleatórios), API em
+lote e calendários por tribunal/comarca vindos do banco.
+"""
+import random
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.models.calendario_forense import CalendarioForenseSuspensao
+from app.services.prazos_iniciais import calendario_forense
+from app.services.prazos_iniciais import prazo_calculator as pc
+
+
+# ─── Implementação de referência (laço dia a dia anterior ao índice) ──
+
+
+def _util(d, extra):
+    return d.weekday() < 5 and d not in pc.feriados_nacionais(d.year) and d not in extra
+
+
+def _proximo(d, extra):
+    while not _util(d, extra):
+        d += timedelta(days=1)
+    return d
+
+
+def _add(base, n, extra):
+    if n == 0:
+        return base
+    step = 1 if n > 0 else -1
+    cur, restantes = base, abs(n)
+    while restantes:
+        cur += timedelta(days=step)
+        if _util(cur, extra):
+            restantes -= 1
+    return cur
+
+
+def _prazo(base, dias, tipo, extra):
+    if tipo == "corrido":
+        return _proximo(base + timedelta(days=dias), extra)
+    cur = _proximo(base + timedelta(days=1), extra)
+    for _ in range(dias - 1):
+        cur += timedelta(days=1)
+        while not _util(cur, extra):
+            cur += timedelta(days=1)
+    return cur
+
+
+def _recessos(rng):
+    extra = set()
+    for _ in range(rng.randint(0, 6)):
+        inicio = date(rng.randint(1995, 2055), rng.randint(1, 12), rng.randint(1, 28))
+        extra.update(inicio + timedelta(days=i) for i in range(rng.randint(1, 35)))
+    return frozenset(extra)
+
+
+def test_propriedade_igual_ao_laco_dia_a_dia():
+    rng = random.Random(20261017)
+    for _ in range(40):
+        extra = _recessos(rng)
+        cal = pc.calendario(extra)
+        casos = [
+            (
+                date(1990, 1, 1) + timedelta(days=rng.randint(0, 70 * 365)),
+                rng.randint(-300, 300),
+                rng.randint(1, 300),
+                rng.choice(("util", "corrido")),
+            )
+            for _ in range(60)
+        ]
+        for base, n, dias, tipo in casos:
+            assert pc.add_business_days(base, n, extra) == _add(base, n, extra)
+            assert pc.calcular_prazo_final(base, dias, tipo, extra_holidays=extra) == _prazo(
+                base, dias, tipo, extra
+            )
+            assert pc.proximo_dia_util(base, calendar=cal) == _proximo(base, extra)
+            assert pc.is_business_day(base, extra) == _util(base, extra)
+
+        bases = [c[0] for c in casos]
+        ns = [c[1] for c in casos]
+        assert pc.add_business_days_bulk(bases, ns, calendar=cal) == [
+            _add(b, n, extra) for b, n in zip(bases, ns)
+        ]
+        itens = [(c[0], c[2], c[3]) for c in casos] + [(None, 5, "util"), (bases[0], 0, "util")]
+        assert pc.calcular_prazos_finais(itens, calendar=cal) == [
+            _prazo(b, d, t, extra) for b, d, t in itens[:-2]
+        ] + [None, None]
+
+
+def test_faixa_do_indice_estende_sob_demanda():
+    cal = pc.BusinessCalendar()
+    base = date(1901, 3, 1)
+    assert cal.add_business_days(base, 1000) == _add(base, 1000, frozenset())
+    assert cal.add_business_days(date(2026, 1, 2), -40000) == _add(date(2026, 1, 2), -40000, frozenset())
+    with pytest.raises(OverflowError):
+        cal.add_business_days(date(9999, 12, 1), 100)
+    assert pc.calcular_prazo_seguro(date(9999, 12, 1), 100, "util") is None
+
+
+@pytest.fixture
+def db():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    CalendarioForenseSuspensao.__table__.create(engine)
+    session = sessionmaker(bind=engine, autoflush=False)()
+    calendario_forense.invalidate_cache()
+    yield session
+    session.close()
+    calendario_forense.invalidate_cache()
+
+
+_CNJ_TJBA = "0001234-56.2026.8.05.0001"
+_CNJ_TJSP = "0001234-56.2026.8.26.0100"
+
+
+def test_calendario_por_tribunal_e_comarca(db):
+    db.add_all([
+        # Nacional: art. 220 CPC.
+        CalendarioForenseSuspensao(
+            data_inicio=date(2026, 12, 20), data_fim=date(2027, 1, 20), tipo="recesso",
+        ),
+        CalendarioForenseSuspensao(
+            tribunal="TJBA", data_inicio=date(2026, 7, 2), data_fim=date(2026, 7, 2),
+            descricao="Independência da Bahia",
+        ),
+        CalendarioForenseSuspensao(
+            tribunal="TJBA", comarca="0001", data_inicio=date(2026, 6, 24),
+            data_fim=date(2026, 6, 24), descricao="São João (Salvador)",
+        ),
+        CalendarioForenseSuspensao(
+            tribunal="TJBA", data_inicio=date(2026, 6, 1), data_fim=date(2026, 6, 5),
+            ativo=False,
+        ),
+    ])
+    db.commit()
+
+    ba = calendario_forense.calendario_do_processo(db, _CNJ_TJBA)
+    sp = calendario_forense.calendario_do_processo(db, _CNJ_TJSP)
+    assert date(2027, 1, 5) in ba.non_working and date(2027, 1, 5) in sp.non_working
+    assert date(2026, 7, 2) in ba.non_working and date(2026, 7, 2) not in sp.non_working
+    assert date(2026, 6, 24) in ba.non_working and date(2026, 6, 24) not in sp.non_working
+    assert date(2026, 6, 3) not in ba.non_working  # inativo
+
+    # 15 dias úteis a partir de 14/12/2026: 4 antes do recesso, o resto depois.
+    assert pc.calcular_prazo_final(date(2026, 12, 14), 15, "util", calendar=sp) == date(2027, 2, 4)
+    assert pc.calcular_prazo_final(date(2026, 12, 14), 15, "util") == date(2027, 1, 6)
+
+    # Cacheado: linha nova só aparece depois de invalidar (ou do TTL).
+    db.add(CalendarioForenseSuspensao(
+        tribunal="TJSP", data_inicio=date(2026, 7, 9), data_fim=date(2026, 7, 9),
+    ))
+    db.commit()
+    assert calendario_forense.calendario_do_processo(db, _CNJ_TJSP) is sp
+    calendario_forense.invalidate_cache()
+    assert date(2026, 7, 9) in calendario_forense.calendario_do_processo(db, _CNJ_TJSP).non_working
+
+
+def test_sem_tabela_cai_no_nacional_sem_quebrar_a_sessao():
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    session = sessionmaker(bind=engine)()
+    calendario_forense.invalidate_cache()
+    assert calendario_forense.calendario_do_processo(session, _CNJ_TJBA) is pc.calendario()
+    assert session.execute(text("SELECT 1")).scalar_one() == 1
+
+
+def test_agendamento_e_recursal_usam_o_calendario_do_processo(db):
+    from datetime import datetime
+    from zoneinfo import ZoneInfo
+
+    from app.services.publication_search_service import PublicationSearchService
+    from app.services.recursal.classifier import RecursalBatchClassifier
+
+    hoje = datetime.now(ZoneInfo("America/Sao_Paulo")).date()
+    fim = hoje + timedelta(days=20)
+    db.add(CalendarioForenseSuspensao(
+        tribunal="TJBA", data_inicio=hoje + timedelta(days=1), data_fim=fim, tipo="recesso",
+    ))
+    db.commit()
+
+    # Fallback de data no passado: próximo dia útil depois do recesso do TJBA.
+    service = PublicationSearchService(db, client=None)
+    payload = {"endDateTime": "2020-01-01T02:59:59Z", "startDateTime": "2020-01-01T02:59:59Z"}
+    service._ensure_endtime_in_future(payload, cnj=_CNJ_TJBA)
+    nova = datetime.fromisoformat(payload["endDateTime"].replace("Z", "+00:00"))
+    assert nova.astimezone(ZoneInfo("America/Sao_Paulo")).date() == pc.proximo_dia_util(
+        fim + timedelta(days=1)
+    )
+
+    cal = calendario_forense.calendario_do_processo(db, _CNJ_TJBA)
+    assert RecursalBatchClassifier._calc_prazo_fatal(
+        hoje, "APELACAO", None, calendar=cal,
+    ) == pc.add_business_days(hoje, 15, calendar=cal)
+    assert pc.add_business_days(hoje, 15, calendar=cal) > pc.add_business_days(hoje, 15)
@@ -0,0 +1,99 @@
+"""
+Dedup da busca de publicações: as sondagens no banco ficam restritas aos
+ids da rodada (IN em chunks) em vez de carregar o histórico inteiro.
+"""
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models.legal_one import LegalOneUser
+from app.models.publication_search import (
+    RECORD_STATUS_DISCARDED_DUPLICATE,
+    RECORD_STATUS_NEW,
+    PublicationRecord,
+    PublicationSearch,
+)
+from app.services.publication_search_service import PublicationSearchService
+
+
+def _make_session():
+    engine = create_engine("sqlite:///:memory:")
+    for model in (LegalOneUser, PublicationSearch, PublicationRecord):
+        model.__table__.create(bind=engine)
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+
+
+def _seed(db):
+    search = PublicationSearch(status="COMPLETED", date_from="2026-01-01")
+    db.add(search)
+    db.flush()
+    rows = [
+        (1, 501, "2026-01-05", RECORD_STATUS_NEW, False),
+        (2, 502, "2026-01-05", RECORD_STATUS_DISCARDED_DUPLICATE, True),
+        (3, 999, "2026-01-06", RECORD_STATUS_NEW, False),
+    ]
+    for update_id, lawsuit_id, pub_date, status, is_dup in rows:
+        db.add(
+            PublicationRecord(
+                search_id=search.id,
+                legal_one_update_id=update_id,
+                linked_lawsuit_id=lawsuit_id,
+                publication_date=pub_date,
+                status=status,
+                is_duplicate=is_dup,
+            )
+        )
+    db.commit()
+
+
+def test_probe_existing_update_ids_only_returns_requested_ids():
+    db = _make_session()
+    _seed(db)
+    service = PublicationSearchService(db, client=None)
+    service._DEDUP_PROBE_CHUNK = 2  # força mais de um chunk
+
+    found = service._probe_existing_update_ids([1, "3", None, 7, 1, "x"])
+
+    assert found == {1, 3}
+
+
+def test_probe_live_lawsuit_date_keys_ignores_discarded_and_other_lawsuits():
+    db = _make_session()
+    _seed(db)
+    service = PublicationSearchService(db, client=None)
+
+    keys = service._probe_live_lawsuit_date_keys([501, 502, None])
+
+    # 502 só tem registro descartado; 999 não foi pedido.
+    assert keys == {(501, "2026-01-05")}
+
+
+def test_streaming_pipeline_commits_each_chunk_and_dedups_across_chunks(monkeypatch):
+    db = _make_session()
+    _seed(db)
+    service = PublicationSearchService(db, client=None)
+    service.STREAM_CHUNK_SIZE = 2
+    monkeypatch.setattr(service, "_enrich_with_lawsuit_data", lambda pubs: pubs)
+    chunk_sizes = []
+    monkeypatch.setattr(
+        service,
+        "_post_persist_chunk",
+        lambda search, new, dup, obs: chunk_sizes.append(len(new) + len(dup) + len(obs)),
+    )
+
+    def _pub(update_id, lawsuit_id):
+        return {
+            "id": update_id,
+            "date": "2026-01-07",
+            "relationships": [{"linkType": "Litigation", "linkId": lawsuit_id}],
+        }
+
+    # 1 já existe; 11 e 13 caem no mesmo (processo, data) em blocos distintos.
+    result = service.create_and_run_search(
+        date_from="2026-01-07",
+        prefetched_publications=[_pub(1, 501), _pub(11, 700), _pub(12, 701), _pub(13, 700)],
+    )
+
+    assert result["status"] == "CONCLUIDO"
+    assert chunk_sizes == [1, 2]
+    assert result["total_new"] == 2
+    assert db.query(PublicationRecord).filter_by(legal_one_update_id=13).one().is_duplicate
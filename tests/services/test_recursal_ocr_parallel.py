@@ -0,0 +1,121 @@
+"""
+OCR da Análise Recursal por página: pool de processos com resultado na
+ordem das páginas (caps iguais ao serial) e cache por imagem renderizada.
+
+O binário `tesseract` é substituído por um script no PATH que "lê" o tom
+de cinza médio da imagem e registra cada chamada.
+"""
+import os
+import stat
+import sys
+
+import fitz
+import pytest
+
+from app.core.config import settings
+from app.services.recursal import ocr
+
+_FAKE_TESSERACT = """#!{python}
+import os, sys
+from PIL import Image, ImageStat
+
+entrada, saida = sys.argv[1], sys.argv[2]
+cinza = round(ImageStat.Stat(Image.open(entrada).convert("L")).mean[0])
+with open(os.environ["FAKE_TESSERACT_LOG"], "a") as fh:
+    fh.write(f"{{cinza}}\\n")
+texto = "" if cinza >= 250 else f"pagina escaneada tom {{cinza}} " * 5
+with open(saida + ".txt", "w") as fh:
+    fh.write(texto)
+"""
+
+
+@pytest.fixture(autouse=True)
+def _fake_tesseract(monkeypatch, tmp_path):
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    script = bin_dir / "tesseract"
+    script.write_text(_FAKE_TESSERACT.format(python=sys.executable))
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    log = tmp_path / "chamadas.log"
+    log.touch()
+    # Antes do spawn dos workers — eles herdam o ambiente.
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.setenv("FAKE_TESSERACT_LOG", str(log))
+    monkeypatch.setattr(settings, "recursal_ocr_cache_path", str(tmp_path / "cache"))
+    monkeypatch.setattr(settings, "recursal_ocr_cache_enabled", True)
+    yield log
+    ocr.shutdown_ocr_pool()
+
+
+def _pdf(tons) -> bytes:
+    """Uma página por item: int = imagem cheia daquele cinza; str = texto."""
+    doc = fitz.open()
+    for tom in tons:
+        page = doc.new_page(width=200, height=200)
+        if isinstance(tom, str):
+            page.insert_text((10, 20), tom * 40)
+            continue
+        pix = fitz.Pixmap(fitz.csGRAY, fitz.IRect(0, 0, 40, 40), False)
+        pix.set_rect(pix.irect, (tom,))
+        page.insert_image(page.rect, pixmap=pix)
+        page.insert_text((10, 190), "Assinado eletronicamente - ID 123")
+    return doc.tobytes()
+
+
+def _chamadas(log) -> int:
+    return len(log.read_text().splitlines())
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_ordem_das_paginas_caps_e_cache(monkeypatch, _fake_tesseract, workers):
+    monkeypatch.setattr(settings, "recursal_ocr_workers", workers)
+    pdf = _pdf([10, "texto de verdade ", 60, 255, 110, 160, 200])
+
+    out = ocr.ocr_paginas_imagem(pdf, max_pages=15, max_chars=18_000)
+    assert [p["pagina"] for p in out] == [1, 3, 5, 6, 7]
+    # O banner escurece 1-2 tons; a ordem dos tons é a das páginas.
+    tons = [int(p["texto"].split()[3]) for p in out]
+    assert tons == sorted(tons) and abs(tons[1] - 60) <= 3
+    # Página de texto não vai pro tesseract; página branca vai (e sai vazia).
+    assert _chamadas(_fake_tesseract) == 6
+
+    # Caps cortam pela ordem das páginas, não pela ordem de término.
+    assert ocr.ocr_paginas_imagem(pdf, max_pages=2) == out[:2]
+    limite = len(out[0]["texto"]) + 10
+    capado = ocr.ocr_paginas_imagem(pdf, max_chars=limite)
+    assert [p["pagina"] for p in capado] == [1, 3]
+    assert capado[1]["texto"] == out[1]["texto"][:10]
+
+    # Tudo acima saiu do cache — inclusive a página em branco.
+    assert _chamadas(_fake_tesseract) == 6
+
+
+def test_sem_cache_chama_o_tesseract_de_novo(monkeypatch, _fake_tesseract):
+    monkeypatch.setattr(settings, "recursal_ocr_workers", 1)
+    monkeypatch.setattr(settings, "recursal_ocr_cache_enabled", False)
+    pdf = _pdf([30, 90])
+    assert ocr.ocr_paginas_imagem(pdf) == ocr.ocr_paginas_imagem(pdf)
+    assert _chamadas(_fake_tesseract) == 4
+
+
+def test_cache_podado_pelo_gc_e_hit_renova(monkeypatch, _fake_tesseract, tmp_path):
+    import time
+
+    from app.services.blob_store import gc_worker
+
+    monkeypatch.setattr(settings, "recursal_ocr_workers", 1)
+    monkeypatch.setattr(settings, "recursal_ocr_cache_max_age_days", 30)
+    pdf_usado, pdf_esquecido = _pdf([40]), _pdf([220])
+    ocr.ocr_paginas_imagem(pdf_usado)
+    ocr.ocr_paginas_imagem(pdf_esquecido)
+    velho = time.time() - 40 * 86400
+    for path in (tmp_path / "cache").rglob("*.txt"):
+        os.utime(path, (velho, velho))
+
+    ocr.ocr_paginas_imagem(pdf_usado)  # hit renova o mtime
+    assert _chamadas(_fake_tesseract) == 2
+
+    assert dict(gc_worker._retention_policies())["ocr_cache"](None)["files_deleted"] == 1
+    ocr.ocr_paginas_imagem(pdf_usado)
+    ocr.ocr_paginas_imagem(pdf_esquecido)
+    assert _chamadas(_fake_tesseract) == 3
@@ -0,0 +1,148 @@
+"""
+Varredura em shards: N runners em paralelo, progresso em JSONL append-only
+lido a partir do último offset e achados inseridos em lote.
+"""
+import json
+import sys
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.config import settings
+from app.models.varredura import (
+    QUEUE_STATUS_COMPLETED,
+    QUEUE_STATUS_FAILED,
+    QUEUE_STATUS_PENDING,
+    RUN_STATUS_DONE,
+    VarreduraAchado,
+    VarreduraProcessado,
+    VarreduraRun,
+)
+from app.services.varredura import varredura_service as vs
+
+# Runner falso: mesmo contrato de args do varredura-andamentos.js. O shard
+# que acha o storage state já gravado registra isso no resultado.
+_FAKE_RUNNER = r'''
+import json, os, sys
+args = dict(zip(sys.argv[1::2], sys.argv[2::2]))
+state = args["--storage-state"]
+compartilhou = os.path.exists(state)
+if not compartilhou:
+    open(state, "w").write("{}")
+items = json.load(open(args["--input"]))["items"]
+with open(args["--progress"], "a") as out:
+    for it in items:
+        if it["lawsuitId"] == 13:
+            rec = {**it, "status": "error", "error": "timeout"}
+        else:
+            rec = {**it, "status": "ok", "andamentos": [
+                {"data": "02/05/2026", "texto": "Sentença publicada", "tipo": "Decisão"},
+                {"data": "02/05/2026", "texto": "Juntada de petição"},
+            ], "compartilhou": compartilhou}
+        out.write(json.dumps(rec) + "\n")
+        out.flush()
+'''
+
+
+def _make_session():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool,
+    )
+    for model in (VarreduraRun, VarreduraProcessado, VarreduraAchado):
+        model.__table__.create(bind=engine)
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+
+
+def test_tail_progress_so_consome_linhas_completas(tmp_path):
+    path = tmp_path / "progress-0.jsonl"
+    path.write_bytes(b'{"processadoId": 1}\n{"processadoId": 2}\n{"processa')
+    records, offset = vs._tail_progress(path, 0)
+    assert [r["processadoId"] for r in records] == [1, 2]
+
+    with path.open("ab") as fh:
+        fh.write(b'doId": 3}\n')
+    records, offset = vs._tail_progress(path, offset)
+    assert records == [{"processadoId": 3}]
+    assert vs._tail_progress(path, offset) == ([], offset)
+    assert vs._tail_progress(tmp_path / "nao-existe.jsonl", 0) == ([], 0)
+
+
+def test_worker_roda_shards_e_aplica_progresso(monkeypatch, tmp_path):
+    db = _make_session()
+    run = VarreduraRun(responsible_office_ids=[61], window_days=30)
+    db.add(run)
+    db.flush()
+    for lid in range(10, 16):
+        db.add(VarreduraProcessado(run_id=run.id, lawsuit_id=lid, queue_status=QUEUE_STATUS_PENDING))
+    db.commit()
+
+    script = tmp_path / "fake_runner.py"
+    script.write_text(_FAKE_RUNNER)
+    monkeypatch.setattr(vs, "_run_dir", lambda run_id: tmp_path / f"run-{run_id}")
+    monkeypatch.setattr(vs, "_runner_script", lambda: script)
+    monkeypatch.setattr(vs, "resolve_node_binary", lambda: sys.executable)
+    monkeypatch.setattr(vs, "resolve_web_credentials", lambda: {})
+    monkeypatch.setattr(vs, "_POLL_INTERVAL_SECONDS", 0.05)
+    monkeypatch.setattr(vs, "_MIN_ITEMS_POR_SHARD", 1)
+    monkeypatch.setattr(settings, "varredura_runner_shards", 2)
+
+    vs._run_subprocess_worker_impl(db, run.id)
+
+    run_dir = tmp_path / f"run-{run.id}"
+    linhas = [
+        json.loads(line)
+        for k in range(2)
+        for line in (run_dir / f"progress-{k}.jsonl").read_text().splitlines()
+    ]
+    assert len(linhas) == 6
+    # Só o 1º shard "logou"; o 2º subiu com o cookie já gravado.
+    assert {r["lawsuitId"] % 2: r.get("compartilhou") for r in linhas if r["status"] == "ok"} == {0: False, 1: True}
+    assert not (run_dir / "session-state.json").exists()
+    # Leitura usada pelos scripts de planilha (sem `items` no status.json).
+    assert sorted(
+        (it["lawsuitId"], it["status"]) for it in vs.read_run_items(run_dir)
+    ) == [(lid, "error" if lid == 13 else "ok") for lid in range(10, 16)]
+
+    db.expire_all()
+    procs = {p.lawsuit_id: p for p in db.query(VarreduraProcessado)}
+    assert procs[13].queue_status == QUEUE_STATUS_FAILED and procs[13].last_error == "timeout"
+    assert procs[10].queue_status == QUEUE_STATUS_COMPLETED
+    assert (procs[10].total_andamentos_lidos, procs[10].total_achados) == (2, 1)
+    assert db.query(VarreduraAchado).count() == 5
+    run = db.get(VarreduraRun, run.id)
+    assert run.status == RUN_STATUS_DONE
+    assert (run.total_processados, run.total_falhas, run.total_achados) == (6, 1, 5)
+
+
+def test_read_run_items_junta_inputs_e_progresso_dos_shards(tmp_path):
+    run_dir = tmp_path / "run-7"
+    run_dir.mkdir()
+    for k, lids in enumerate(([10, 12], [11, 13])):
+        items = [{"processadoId": lid, "lawsuitId": lid, "cnjNumber": ""} for lid in lids]
+        (run_dir / f"input-{k}.json").write_text(json.dumps({"windowDays": 30, "items": items}))
+        (run_dir / f"status-{k}.json").write_text(json.dumps({"state": "running", "totalItems": 2}))
+    (run_dir / "progress-0.jsonl").write_text(
+        json.dumps({"processadoId": 10, "lawsuitId": 10, "status": "ok",
+                    "andamentos": [{"texto": "Sentença publicada"}]}) + "\n"
+        + json.dumps({"processadoId": 12, "lawsuitId": 12, "status": "error", "error": "timeout"}) + "\n"
+    )
+    # Shard 1 morreu no meio de uma linha: 11 e 13 seguem pendentes.
+    (run_dir / "progress-1.jsonl").write_text('{"processadoId": 11, "sta')
+
+    items = {it["lawsuitId"]: it for it in vs.read_run_items(run_dir)}
+
+    assert {lid: it["status"] for lid, it in items.items()} == {
+        10: "ok", 12: "error", 11: "pending", 13: "pending",
+    }
+    assert items[10]["andamentos"] == [{"texto": "Sentença publicada"}]
+    assert vs.read_run_items(tmp_path / "run-8") == []
+
+
+def test_read_run_items_le_status_json_de_runs_antigas(tmp_path):
+    run_dir = tmp_path / "run-16"
+    run_dir.mkdir()
+    legacy = [{"processadoId": 1, "lawsuitId": 10, "status": "ok", "andamentos": []}]
+    (run_dir / "status.json").write_text(json.dumps({"state": "completed", "items": legacy}))
+
+    assert vs.read_run_items(run_dir) == legacy
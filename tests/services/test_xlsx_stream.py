@@ -0,0 +1,79 @@
+"""
+Export XLSX em streaming: o writer write-only consome iteráveis (geradores)
+e o snapshot da Base Processual grava direto no arquivo de destino.
+"""
+import openpyxl
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models.base_processual import (
+    BaseProcessualEvento,
+    BaseProcessualProcesso,
+    BaseProcessualSnapshot,
+    BaseProcessualUpload,
+    EXPORT_TPL_SNAPSHOT_COMPLETO,
+    PRESENCA_ATIVO,
+    PRESENCA_REMOVIDO,
+)
+from app.services.base_processual.exporter import dispatch_template
+from app.services.xlsx_stream import StreamingXlsxWriter
+
+
+def test_writer_consome_gerador_e_calcula_larguras(tmp_path):
+    consumidas = []
+
+    def linhas():
+        for i in range(500):
+            consumidas.append(i)
+            yield [i, f"linha {i}", None]
+
+    writer = StreamingXlsxWriter()
+    total = writer.add_sheet("Dados", ["N", "Texto", "Vazio"], linhas(), freeze_header=True)
+    path = tmp_path / "out.xlsx"
+    size = writer.save(str(path))
+
+    assert total == 500 and len(consumidas) == 500
+    assert size == path.stat().st_size
+    ws = openpyxl.load_workbook(path)["Dados"]
+    assert [c.value for c in ws[1]] == ["N", "Texto", "Vazio"]
+    assert ws["A1"].font.bold
+    assert ws.max_row == 501
+    assert ws["B501"].value == "linha 499"
+    assert ws.freeze_panes == "A2"
+    # Auto-largura pela amostra: mínimo 8 + folga; "linha 199" (9) + 2.
+    assert ws.column_dimensions["A"].width == 10
+    assert ws.column_dimensions["B"].width == 11
+
+
+def test_snapshot_completo_grava_direto_no_destino(tmp_path):
+    engine = create_engine("sqlite://")
+    for model in (
+        BaseProcessualUpload,
+        BaseProcessualProcesso,
+        BaseProcessualSnapshot,
+        BaseProcessualEvento,
+    ):
+        model.__table__.create(bind=engine)
+    db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    for i in range(30):
+        db.add(
+            BaseProcessualProcesso(
+                cod_ajus=f"AJ{i:04d}",
+                empresa="banco_master",
+                situacao_processo="Ativo",
+                valor_causa=100 + i,
+                presenca_status=PRESENCA_REMOVIDO if i % 10 == 0 else PRESENCA_ATIVO,
+            )
+        )
+    db.commit()
+
+    path = tmp_path / "snapshot.xlsx"
+    file_bytes, total, params = dispatch_template(EXPORT_TPL_SNAPSHOT_COMPLETO, db, {}, str(path))
+
+    assert total == 27
+    assert params == {"presenca_status": PRESENCA_ATIVO}
+    assert file_bytes == path.stat().st_size
+    ws = openpyxl.load_workbook(path)["Snapshot"]
+    assert ws.max_row == 28
+    assert ws["A2"].value == "AJ0001"
+    assert ws["U2"].value == 101